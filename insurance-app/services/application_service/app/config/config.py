@@ -107,4 +107,24 @@ class Config:
         """
         外部サービスへのアクセスURL
         """
-        return self._data.get("services", {})
\ No newline at end of file
+        return self._data.get("services", {})
+
+    # --------------------------------------------------------------------------
+    # 一覧APIのページング設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def pagination(self):
+        """
+        一覧APIのページング（既定件数・上限件数）の設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("pagination", {})
+
+    # --------------------------------------------------------------------------
+    # イベントアウトボックス設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def outbox(self):
+        """
+        イベントアウトボックス（発行元・送信リレーのバッチ件数・再試行間隔など）の設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("outbox", {})
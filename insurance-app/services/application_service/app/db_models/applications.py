@@ -6,7 +6,7 @@ PostgreSQL用 applications テーブルおよび application_details テーブ
 # ------------------------------------------------------------------------------
 # インポート
 # ------------------------------------------------------------------------------
-from sqlalchemy import Column, String, Date, Integer, Boolean, Numeric, TIMESTAMP, ForeignKey, text
+from sqlalchemy import Column, String, Date, Integer, Boolean, Numeric, TIMESTAMP, ForeignKey, text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import AsyncAttrs
@@ -47,6 +47,17 @@ class Application(Base):
     created_by = Column(String(64), nullable=True, comment="作成者（オペレーターIDなど）")
     updated_by = Column(String(64), nullable=True, comment="更新者（オペレーターIDなど）")
 
+    # 申込一覧（user_id 指定・applied_at, application_id 降順のキーセットページング）、見積もりIDからの参照用
+    # 作成は quotation_service の Alembic（db/alembic/versions）で CONCURRENTLY 実行する
+    __table_args__ = (
+        Index(
+            "ix_applications_user_id_applied_at",
+            user_id, applied_at.desc(), application_id.desc(),
+            postgresql_include=["application_status", "quote_id"],
+        ),
+        Index("ix_applications_quote_id", quote_id),
+    )
+
 
 # ------------------------------------------------------------------------------
 # ApplicationDetail モデル（申込詳細：契約条件および計算結果）
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+PostgreSQL用 event_outbox テーブルのSQLAlchemyモデル定義
+
+- ドメインの更新と同じトランザクションで発行予定のイベントを記録する（トランザクショナルアウトボックス）
+- 送信は各サービスのリレー（app/services/event_outbox.py）が source 単位で行う
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+from sqlalchemy import BigInteger, Column, Identity, Integer, String, Text, TIMESTAMP, text, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncAttrs
+
+Base = declarative_base(cls=AsyncAttrs)
+
+# ------------------------------------------------------------------------------
+# OutboxEvent モデル（未送信・送信済みイベント）
+# ------------------------------------------------------------------------------
+class OutboxEvent(Base):
+    """
+    event_outbox テーブル
+    - sent_at が NULL の行が未送信。id の昇順に送信する
+    """
+    __tablename__ = "event_outbox"
+
+    id = Column(BigInteger, Identity(always=False), primary_key=True, comment="連番（送信順）")
+    source = Column(String(64), nullable=False, comment="発行元サービス（quotation_service など）")
+    subject = Column(String(255), nullable=False, comment="NATSサブジェクト")
+    payload = Column(JSONB, nullable=False, comment="イベント本文（JSON）")
+
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"), comment="登録日時")
+    sent_at = Column(TIMESTAMP(timezone=True), nullable=True, comment="送信日時（未送信は NULL）")
+    attempts = Column(Integer, nullable=False, server_default="0", comment="送信失敗回数")
+    last_error = Column(Text, nullable=True, comment="直近の送信エラー")
+
+    # リレーの未送信取得（WHERE source = ? AND sent_at IS NULL ORDER BY id）用
+    __table_args__ = (
+        Index(
+            "ix_event_outbox_unsent",
+            source, id,
+            postgresql_where=sent_at.is_(None),
+        ),
+    )
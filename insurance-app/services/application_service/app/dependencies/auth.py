@@ -11,17 +11,16 @@ Keycloakを使ったJWTベースの認証・認可機構
 # インポート
 # ------------------------------------------------------------------------------
 import logging
-from typing import Dict
+from typing import Dict, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
-from jose.utils import base64url_decode
 from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.hazmat.backends import default_backend
-import httpx
 
 from app.config.config import Config
+from app.dependencies.jwks_cache import JWKSCache
+from app.dependencies.token_cache import VerifiedTokenCache
 
 # ------------------------------------------------------------------------------
 # ログと設定の初期化
@@ -43,30 +42,31 @@ ISSUER = KEYCLOAK_BASE_URL
 # FastAPI用のOAuth2認証スキーム
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# 公開鍵キャッシュ（kid単位・プロセス内共有）
+jwks_cache_config = keycloak_config.get("jwks_cache", {})
+jwks_cache = JWKSCache(
+    jwks_url=JWKS_URL,
+    ttl_seconds=jwks_cache_config.get("ttl_seconds", 600),
+    refresh_ahead_seconds=jwks_cache_config.get("refresh_ahead_seconds", 60),
+    unknown_kid_cooldown_seconds=jwks_cache_config.get("unknown_kid_cooldown_seconds", 10),
+)
+
+# 検証済みトークンキャッシュ（トークンハッシュ単位・exp まで保持）
+token_cache = VerifiedTokenCache(
+    max_entries=keycloak_config.get("token_cache", {}).get("max_entries", 10000)
+)
+
 # ------------------------------------------------------------------------------
 # 公開鍵の取得処理（JWKからRSA公開鍵を構築）
 # ------------------------------------------------------------------------------
-async def get_public_key() -> rsa.RSAPublicKey:
+async def get_public_key(kid: Optional[str] = None) -> rsa.RSAPublicKey:
     """
-    Keycloak の JWKs エンドポイントから公開鍵を取得して構築
+    kid に対応する Keycloak の公開鍵をキャッシュから取得（未取得・期限切れ時は JWKs から再取得）
     """
-    logger.info("KeycloakのJWK取得開始")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(JWKS_URL)
-        if response.status_code != 200:
-            logger.error("JWK取得失敗: %s", response.text)
-            raise HTTPException(status_code=500, detail="JWK取得に失敗しました")
-
-        # JWKの最初のキーを使う（必要に応じてkidで選別も可能）
-        jwks = response.json()["keys"]
-        key = jwks[0]
-
-        # n, e をデコードして公開鍵を生成
-        n = int.from_bytes(base64url_decode(key["n"].encode("utf-8")), "big")
-        e = int.from_bytes(base64url_decode(key["e"].encode("utf-8")), "big")
-
-        logger.info("KeycloakのJWK取得成功")
-        return rsa.RSAPublicNumbers(e, n).public_key(default_backend())
+    try:
+        return await jwks_cache.get_key(kid)
+    except KeyError:
+        raise jwt.JWTError(f"kidに対応する公開鍵が見つかりません: {kid}")
 
 # ------------------------------------------------------------------------------
 # 認証処理: アクセストークンの検証とデコード
@@ -77,8 +77,18 @@ async def authenticate_user(token: str = Depends(oauth2_scheme)) -> Dict:
     """
     logger.info("アクセストークン認証開始")
 
+    # 検証済みトークンであれば署名検証を省略
+    cached = token_cache.get(token, jwks_cache.generation)
+    if cached is not None:
+        logger.info("アクセストークン検証済み（キャッシュ）: sub=%s", cached.get("sub"))
+        return {
+            **cached,
+            "access_token": token
+        }
+
     try:
-        public_key = await get_public_key()
+        header = jwt.get_unverified_header(token)
+        public_key = await get_public_key(header.get("kid"))
 
         # クレームの事前ログ出力
         unverified = jwt.get_unverified_claims(token)
@@ -96,6 +106,8 @@ async def authenticate_user(token: str = Depends(oauth2_scheme)) -> Dict:
             issuer=ISSUER,
         )
 
+        token_cache.put(token, payload, jwks_cache.generation)
+
         logger.info("アクセストークン検証成功: sub=%s", payload.get("sub"))
         return {
             **payload,
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Keycloak JWKS（公開鍵セット）のキャッシュ
+
+- kid をキーに、構築済みの RSA 公開鍵オブジェクトを保持する
+- TTL 満了前にバックグラウンドで先行リフレッシュする
+- 未知の kid は 1 回だけ再取得し、同時に発生した取得要求は 1 本に集約する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+from jose.utils import base64url_decode
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.backends import default_backend
+
+# ------------------------------------------------------------------------------
+# ロガー初期化
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------
+# JWK → RSA公開鍵 変換
+# ------------------------------------------------------------------------------
+def build_rsa_public_key(jwk: Dict) -> rsa.RSAPublicKey:
+    """
+    JWK の n, e をデコードして RSA 公開鍵を生成する
+    """
+    n = int.from_bytes(base64url_decode(jwk["n"].encode("utf-8")), "big")
+    e = int.from_bytes(base64url_decode(jwk["e"].encode("utf-8")), "big")
+    return rsa.RSAPublicNumbers(e, n).public_key(default_backend())
+
+
+# ------------------------------------------------------------------------------
+# JWKS キャッシュ
+# ------------------------------------------------------------------------------
+class JWKSCache:
+    """
+    kid 単位で RSA 公開鍵を保持する TTL 付きキャッシュ
+
+    Attributes:
+        generation (int): 鍵セットが入れ替わるたびに加算される世代番号
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl_seconds: float = 600,
+        refresh_ahead_seconds: float = 60,
+        unknown_kid_cooldown_seconds: float = 10,
+    ):
+        self._jwks_url = jwks_url
+        self._ttl = ttl_seconds
+        self._refresh_ahead = refresh_ahead_seconds
+        self._unknown_kid_cooldown = unknown_kid_cooldown_seconds
+
+        self._keys: Dict[str, rsa.RSAPublicKey] = {}
+        self._default_kid: Optional[str] = None
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+        self.generation = 0
+        self.fetch_count = 0
+
+    # --------------------------------------------------------------------------
+    # 公開API
+    # --------------------------------------------------------------------------
+    async def get_key(self, kid: Optional[str]) -> rsa.RSAPublicKey:
+        """
+        kid に対応する公開鍵を返す
+
+        Parameters:
+            kid (str | None): JWT ヘッダの kid（未指定時は鍵セット先頭の鍵）
+
+        Returns:
+            RSAPublicKey: 構築済みの公開鍵
+
+        Raises:
+            KeyError: 再取得後も kid が見つからない場合
+        """
+        now = time.monotonic()
+
+        if not self._keys or now >= self._expires_at:
+            await self._refresh(allow_stale=bool(self._keys))
+        elif now >= self._expires_at - self._refresh_ahead:
+            # TTL満了前の先行リフレッシュ（リクエストは待たせない）
+            self._start_refresh()
+
+        key = self._lookup(kid)
+        if key is not None:
+            return key
+
+        # 未知の kid → 鍵ローテーションの可能性があるため 1 回だけ再取得
+        if time.monotonic() - self._fetched_at >= self._unknown_kid_cooldown:
+            logger.info("[JWKS] 未知のkidのため再取得: kid=%s", kid)
+            await self._refresh(allow_stale=True)
+            key = self._lookup(kid)
+            if key is not None:
+                return key
+
+        logger.warning("[JWKS] kidに対応する公開鍵がありません: kid=%s", kid)
+        raise KeyError(kid)
+
+    # --------------------------------------------------------------------------
+    # 内部処理
+    # --------------------------------------------------------------------------
+    def _lookup(self, kid: Optional[str]) -> Optional[rsa.RSAPublicKey]:
+        if kid is None:
+            kid = self._default_kid
+        return self._keys.get(kid) if kid is not None else None
+
+    def _start_refresh(self) -> asyncio.Task:
+        """
+        実行中の取得があればそれを返し、なければ新しく開始する（取得の集約）
+        """
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._fetch_and_swap())
+            self._inflight.add_done_callback(self._log_background_error)
+        return self._inflight
+
+    async def _refresh(self, allow_stale: bool) -> None:
+        task = self._start_refresh()
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            if not allow_stale:
+                raise
+            logger.warning("[JWKS] 再取得に失敗したため既存の鍵セットを継続使用します")
+
+    @staticmethod
+    def _log_background_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("[JWKS] 取得失敗: %s", task.exception())
+
+    async def _fetch_jwks(self) -> Dict:
+        """
+        Keycloak の JWKs エンドポイントから鍵セットを取得する
+        """
+        logger.info("KeycloakのJWK取得開始")
+        async with httpx.AsyncClient() as client:
+            response = await client.get(self._jwks_url)
+        if response.status_code != 200:
+            logger.error("JWK取得失敗: %s", response.text)
+            raise HTTPException(status_code=500, detail="JWK取得に失敗しました")
+        logger.info("KeycloakのJWK取得成功")
+        return response.json()
+
+    async def _fetch_and_swap(self) -> None:
+        self.fetch_count += 1
+        jwks = await self._fetch_jwks()
+
+        keys: Dict[str, rsa.RSAPublicKey] = {}
+        default_kid: Optional[str] = None
+        for jwk in jwks.get("keys", []):
+            if jwk.get("kty") != "RSA" or jwk.get("use", "sig") != "sig":
+                continue
+            kid = jwk.get("kid", "")
+            keys[kid] = build_rsa_public_key(jwk)
+            if default_kid is None:
+                default_kid = kid
+
+        if not keys:
+            raise HTTPException(status_code=500, detail="JWK取得に失敗しました")
+
+        if set(keys) != set(self._keys):
+            self.generation += 1
+            logger.info("[JWKS] 鍵セット更新: kids=%s generation=%d", sorted(keys), self.generation)
+
+        # 参照の差し替えのみで更新（読み取り側はロック不要）
+        self._keys = keys
+        self._default_kid = default_kid
+        self._fetched_at = time.monotonic()
+        self._expires_at = self._fetched_at + self._ttl
@@ -7,7 +7,7 @@ import logging
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 
-from app.services.rate_loader import load_interest_rates
+from app.services.rate_repository import get_interest_rates
 from app.config.config import Config
 
 config = Config()
@@ -26,6 +26,9 @@ async def validate_quote_before_application(
         quote (dict): quotation_serviceから取得した見積もりデータ
         mongo_client (AsyncIOMotorClient): MongoDBクライアント
 
+    Returns:
+        dict: 照合に使用した利率情報（rate_version を含む）
+
     Raises:
         ValueError: 整合性が取れない場合（利率がずれている等）
     """
@@ -57,9 +60,9 @@ async def validate_quote_before_application(
     if quote_contract_date is None:
         raise ValueError("見積もりに契約開始日が含まれていません")
     
-    # 利率情報をMongoDBから取得
+    # 利率情報を取得（メモリ上の利率テーブル、未読み込み時はMongoDB）
     logger.info(f"plan_code:{config.pension['plan_code']}")
-    rates = await load_interest_rates(
+    rates = await get_interest_rates(
         db = mongo_client,
         plan_code = config.pension["plan_code"],
         contract_date = quote_contract_date
@@ -73,4 +76,6 @@ async def validate_quote_before_application(
     #if quote_interest_rate != interest_rate or quote_min_rate != min_rate:
     #    raise ValueError(f"利率が最新ではありません quote_interest_rate: {quote_interest_rate} quote_min_rate: {quote_min_rate} interest_rate: {interest_rate} min_rate: {min_rate}")
     if quote_interest_rate != interest_rate:
-        raise ValueError(f"利率が最新ではありません quote_interest_rate: {quote_interest_rate} interest_rate: {interest_rate}")
\ No newline at end of file
+        raise ValueError(f"利率が最新ではありません quote_interest_rate: {quote_interest_rate} interest_rate: {interest_rate}")
+
+    return rates
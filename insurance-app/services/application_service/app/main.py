@@ -13,11 +13,14 @@ FastAPI アプリケーション起動スクリプト（保険申込サービス
 import logging
 
 from fastapi import FastAPI
-from motor.motor_asyncio import AsyncIOMotorClient
 
-from app.routes import applications
+from app.routes import applications, metrics
+from app.dependencies.get_mongo_client import init_mongo_client, close_mongo_client
+from app.services.rate_repository import rate_repository
+from app.services.mongo_indexes import index_manager
 from app.config.config import Config
 from app.services.nats_publisher import init_nats_connection, close_nats_connection
+from app.services.event_outbox import outbox_relay
 
 # ------------------------------------------------------------------------------
 # 設定・構成の読み込み
@@ -42,6 +45,7 @@ app = FastAPI(title="Application Service")
 # ルーター登録（申込API）
 # ------------------------------------------------------------------------------
 app.include_router(applications.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
 
 # ------------------------------------------------------------------------------
 # スタートアップイベント（必要に応じて）
@@ -49,16 +53,35 @@ app.include_router(applications.router, prefix="/api/v1")
 @app.on_event("startup")
 async def startup_db_client():
     """
-    アプリケーション起動時にMongoDBクライアントを初期化し、
+    アプリケーション起動時に共有MongoDBクライアントを初期化し、
     `app.state.mongo_client` に接続インスタンスを保持する。
     """
     logger.info("MongoDB クライアントの初期化")
-    app.state.mongo_client = AsyncIOMotorClient(config.mongodb["dsn"])
+    app.state.mongo_client = init_mongo_client()
+
+    # 検索用インデックスの不足分を作成（大規模コレクションでは無効化し、CLI で作成する）
+    if config.mongodb.get("indexes", {}).get("ensure_on_startup", True):
+        await index_manager.ensure(app.state.mongo_client)
+
+    # 利率テーブルをメモリに読み込み、変更追従を開始
+    await rate_repository.start(app.state.mongo_client)
+
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    """
+    アプリケーション停止時に利率の変更追従を止め、共有MongoDBクライアントをクローズする。
+    """
+    await rate_repository.stop()
+    close_mongo_client()
 
 @app.on_event("startup")
 async def on_startup():
     await init_nats_connection()
+    # アウトボックスの未送信イベントの発行を開始
+    outbox_relay.start()
 
 @app.on_event("shutdown")
 async def on_shutdown():
+    # 実行中の送信バッチを終えてから NATS を drain して切断する
+    await outbox_relay.stop()
     await close_nats_connection()
\ No newline at end of file
@@ -10,8 +10,10 @@
 import logging
 from datetime import datetime
 from uuid import uuid4, UUID
-from typing import List
-from fastapi import APIRouter, Depends, Path, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Path, Query, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 
 
 from app.dependencies.auth import (
@@ -34,13 +36,14 @@ from app.services.fetch_quote import (
 from app.services.application_manager import (
     save_application,
     get_applications_by_user_id,
+    APPLICATION_LIST_FIELDS,
     get_application_by_application_id,
-    get_scenarios_by_application_id,
     update_application_status,
     update_application,
     save_beneficiaries_to_mongo,
     save_scenarios_to_mongo,
     get_beneficiaries_by_application_id,
+    get_application_relations_by_ids,
 )
 
 from app.models.events import (
@@ -48,7 +51,9 @@ from app.models.events import (
     ApplicationStatusChangedEvent,
     ApplicationChangedEvent,
 )
-from app.services.nats_publisher import publish_event
+from app.services.event_outbox import stage_event
+from app.services.pagination import NEXT_CURSOR_HEADER, parse_fields
+from app.config.config import Config
 
 from app.db.database import get_async_session
 
@@ -62,6 +67,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 # ------------------------------------------------------------------------------
 logger = logging.getLogger(__name__)
 router = APIRouter()
+config = Config()
+
+# 一覧APIのページング件数（cursor のみ指定時の既定値・指定可能な上限）
+# limit・cursor とも未指定の場合は従来どおり全件を返す
+DEFAULT_PAGE_LIMIT = config.pagination.get("default_limit", 50)
+MAX_PAGE_LIMIT = config.pagination.get("max_limit", 200)
 
 # ------------------------------------------------------------------------------
 # POST /applications/pension - 新しい見積もりを作成
@@ -97,7 +108,7 @@ async def post_application(
     )
 
     #見積もりに問題がないかをチェック
-    await validate_quote_before_application(
+    rates = await validate_quote_before_application(
         user_id=user_id, 
         quote=quote_dict, 
         mongo_client=mongo_client
@@ -110,6 +121,15 @@ async def post_application(
     application_id = uuid4()  # 新規発行用のID
     logger.info(f"[申し込みID発行]quote_id: {application_id}")
 
+    #作成イベントをアウトボックスに登録（申込の登録と同じコミットで確定し、リレーが発行する）
+    event = ApplicationCreatedEvent(
+        quote_id=quote_id,
+        user_id=user_id,
+        application_id=application_id,
+        created_at=datetime.utcnow()
+    )
+    stage_event(session, "applications.ApplicationCreated", event.dict())
+
     # 申込実行
     await save_application(
         application_id = application_id,
@@ -126,36 +146,24 @@ async def post_application(
     await save_scenarios_to_mongo(
         mongo_client = mongo_client,
         application_id = str(application_id),
-        scenarios = quote.scenarios
+        scenarios = quote.scenarios,
+        rate_version = rates.get("rate_version")
     )
 
-    #イベントを発火
-    event = ApplicationCreatedEvent(
-        quote_id=quote_id,
-        user_id=user_id,
-        application_id=application_id,
-        created_at=datetime.utcnow()
-    )
-    await publish_event("applications.ApplicationCreated", event.dict())
-
     #DBから最新データを取得してレスポンス構築
     created_application = await get_application_by_application_id(
         session=session,
         application_id=application_id,
         user_id=user_id
     )
-    created_application_scenarios = await get_scenarios_by_application_id(
-        mongo_client = mongo_client,
-        application_id = str(application_id)
-    )
-    created_application_beneficiaries = await get_beneficiaries_by_application_id(
+    scenarios_map, beneficiaries_map = await get_application_relations_by_ids(
         mongo_client = mongo_client,
-        application_id = str(application_id)
+        application_ids = [str(application_id)]
     )
 
     #シナリオをマージする
-    created_application.scenarios = created_application_scenarios
-    created_application.beneficiaries = created_application_beneficiaries
+    created_application.scenarios = scenarios_map[str(application_id)]
+    created_application.beneficiaries = beneficiaries_map[str(application_id)]
 
     return created_application
 
@@ -213,6 +221,15 @@ async def update_application_satus(
             detail=f"不正な状態遷移: {current_state} → {payload.new_state}"
         )
 
+    #イベントをアウトボックスに登録（状態の更新と同じコミットで確定する）
+    event = ApplicationStatusChangedEvent(
+        application_id=application_id,
+        from_state=current_state.value, 
+        to_state=payload.new_state.value,
+        changed_at=datetime.utcnow().isoformat()
+    )
+    stage_event(session, "applications.ApplicationStatusChanged", event.dict())
+
     #DBのquoteの状態を変更
     try:
         await update_application_status(
@@ -223,15 +240,6 @@ async def update_application_satus(
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    
-    #イベントを発火
-    event = ApplicationStatusChangedEvent(
-        application_id=application_id,
-        from_state=current_state.value, 
-        to_state=payload.new_state.value,
-        changed_at=datetime.utcnow().isoformat()
-    )
-    await publish_event("applications.ApplicationStatusChanged", event.dict())
 
     return ApplicationStatusUpdateModel(
         application_id=application_id, 
@@ -302,6 +310,13 @@ async def patch_my_quote(
         )
     )
 
+    #変更イベントをアウトボックスに登録（申込の更新と同じコミットで確定する）
+    event = ApplicationChangedEvent(
+        application_id=application_id,
+        changed_at=datetime.utcnow()
+    )
+    stage_event(session, "applications.ApplicationChanged", event.dict())
+
     # applicationテーブル、application_detailsテーブルを更新
     await update_application(
         session=session,
@@ -315,31 +330,20 @@ async def patch_my_quote(
         beneficiaries = new_request_model.beneficiaries
     )
 
-    #イベントを発火
-    event = ApplicationChangedEvent(
-        application_id=application_id,
-        changed_at=datetime.utcnow()
-    )
-    await publish_event("applications.ApplicationChanged", event.dict())
-
     #DBから最新データを取得してレスポンス構築
     updated_application = await get_application_by_application_id(
         session=session,
         application_id=application_id,
         user_id=user_id
     )
-    updated_application_scenarios = await get_scenarios_by_application_id(
-        mongo_client = mongo_client,
-        application_id = application_id
-    )
-    updated_application_beneficiaries = await get_beneficiaries_by_application_id(
+    scenarios_map, beneficiaries_map = await get_application_relations_by_ids(
         mongo_client = mongo_client,
-        application_id = application_id
+        application_ids = [str(application_id)]
     )
 
     #シナリオをマージする
-    updated_application.scenarios = updated_application_scenarios
-    updated_application.beneficiaries = updated_application_beneficiaries
+    updated_application.scenarios = scenarios_map[str(application_id)]
+    updated_application.beneficiaries = beneficiaries_map[str(application_id)]
 
     return updated_application
 
@@ -389,6 +393,15 @@ async def update_application_state(
             detail=f"不正な状態遷移: {current_state} → cancelled"
         )
     
+    #イベントをアウトボックスに登録（状態の更新と同じコミットで確定する）
+    event = ApplicationStatusChangedEvent(
+        application_id=application_id,
+        from_state=current_state.value, 
+        to_state="cancelled",
+        changed_at=datetime.utcnow().isoformat()
+    )
+    stage_event(session, "applications.ApplicationStatusChanged", event.dict())
+
     #DBのquoteの状態を変更
     try:
         await update_application_status(
@@ -399,15 +412,6 @@ async def update_application_state(
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    
-    #イベントを発火
-    event = ApplicationStatusChangedEvent(
-        application_id=application_id,
-        from_state=current_state.value, 
-        to_state="cancelled",
-        changed_at=datetime.utcnow().isoformat()
-    )
-    await publish_event("applications.ApplicationStatusChanged", event.dict())
 
     return ApplicationStatusUpdateModel(
         application_id=application_id, 
@@ -420,6 +424,10 @@ async def update_application_state(
 # ------------------------------------------------------------------------------
 @router.get("/my/applications", response_model=List[PensionApplicationResponseModel])
 async def get_my_applications(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="1ページの最大件数"),
+    cursor: Optional[str] = Query(None, description="次ページ取得用カーソル（前回レスポンスの X-Next-Cursor）"),
+    fields: Optional[str] = Query(None, description="取得項目（カンマ区切り、例: application_id,application_status,applied_at）"),
     token_payload: dict = Depends(require_application_read_permission),
     mongo_client: AsyncIOMotorClient = Depends(get_mongo_client),
     session: AsyncSession = Depends(get_async_session),
@@ -431,26 +439,50 @@ async def get_my_applications(
 
     logger.info(f"[API] GET /my/applications (user_id={user_id})")
 
-    applications = await get_applications_by_user_id(
+    field_list = parse_fields(fields, list(APPLICATION_LIST_FIELDS) + ["scenarios", "beneficiaries"])
+    column_fields = None
+    if field_list is not None:
+        column_fields = [f for f in field_list if f not in ("scenarios", "beneficiaries")]
+        needs_mongo = "scenarios" in field_list or "beneficiaries" in field_list
+        if needs_mongo and "application_id" not in column_fields:
+            column_fields.append("application_id")  # MongoDB突合用（レスポンスからは除外）
+
+    applications, next_cursor = await get_applications_by_user_id(
         session=session,
         user_id=user_id,
+        limit=limit or (DEFAULT_PAGE_LIMIT if cursor else None),
+        cursor=cursor,
+        fields=column_fields,
     )
-    for application in applications:
-        # シナリオを取得する
-        scenarios = await get_scenarios_by_application_id(
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+    # 項目絞り込みなし：シナリオ・保険金代理受取人を一括取得する（件数に関わらず各コレクション1クエリ）
+    if field_list is None:
+        scenarios_map, beneficiaries_map = await get_application_relations_by_ids(
             mongo_client = mongo_client,
-            application_id = str(application.application_id)
+            application_ids = [str(application.application_id) for application in applications]
         )
-        application.scenarios = scenarios
-
-        # 保険金代理受取人を取得する
-        beneficiaries = await get_beneficiaries_by_application_id(
+        for application in applications:
+            application.scenarios = scenarios_map.get(str(application.application_id), [])
+            application.beneficiaries = beneficiaries_map.get(str(application.application_id), [])
+        response.headers.update(headers)
+        return applications
+
+    # 項目絞り込みあり：scenarios / beneficiaries 指定時のみMongoDBを参照
+    if "scenarios" in field_list or "beneficiaries" in field_list:
+        scenarios_map, beneficiaries_map = await get_application_relations_by_ids(
             mongo_client = mongo_client,
-            application_id = str(application.application_id)
+            application_ids = [str(a["application_id"]) for a in applications]
         )
-        application.beneficiaries = beneficiaries
-
-    return applications
+        for application in applications:
+            application_id = str(application["application_id"])
+            if "scenarios" in field_list:
+                application["scenarios"] = scenarios_map.get(application_id, [])
+            if "beneficiaries" in field_list:
+                application["beneficiaries"] = beneficiaries_map.get(application_id, [])
+            if "application_id" not in field_list:
+                del application["application_id"]
+    return JSONResponse(content=jsonable_encoder(applications), headers=headers)
 
 # ------------------------------------------------------------------------------
 # GET /my/applications/{application_id}
@@ -474,18 +506,12 @@ async def get_my_application_by_id(
         user_id = user_id
     )
 
-    # シナリオを取得する
-    scenarios = await get_scenarios_by_application_id(
-        mongo_client = mongo_client,
-        application_id = str(application.application_id)
-    )
-    application.scenarios = scenarios
-
-    # 保険金代理受取人を取得する
-    beneficiaries = await get_beneficiaries_by_application_id(
+    # シナリオ・保険金代理受取人を取得する
+    scenarios_map, beneficiaries_map = await get_application_relations_by_ids(
         mongo_client = mongo_client,
-        application_id = str(application.application_id)
+        application_ids = [str(application.application_id)]
     )
-    application.beneficiaries = beneficiaries
+    application.scenarios = scenarios_map[str(application.application_id)]
+    application.beneficiaries = beneficiaries_map[str(application.application_id)]
 
     return application
@@ -10,15 +10,22 @@
 # ------------------------------------------------------------------------------
 # インポート
 # ------------------------------------------------------------------------------
+import asyncio
 import logging
 import uuid
 import json
 from uuid import UUID
 import asyncpg
 from datetime import datetime
+from typing import Any
 from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
 
+from sqlalchemy import tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -39,6 +46,8 @@ from app.models.applications import (
     QuoteScenarioModel,
     ApplicationBeneficiariesModel
 )
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.scenario_store import ScenarioStore
 
 # ------------------------------------------------------------------------------
 # 設定・ロガー初期化
@@ -47,32 +56,113 @@ logger = logging.getLogger(__name__)
 config = Config()
 rules = config.pension
 
+# シナリオ保存先（1申込1ドキュメント、未移行分は従来形式から読み込み）
+scenario_store = ScenarioStore(
+    key_field="application_id",
+    database=config.mongodb["database"],
+    legacy_collection=config.mongodb["scenario_collection"],
+    settings=config.mongodb.get("scenario_storage", {}),
+)
+
+# 一覧取得で fields= 指定可能な項目（レスポンス項目名 → カラム）
+APPLICATION_LIST_FIELDS = {
+    "application_id": Application.application_id,
+    "quote_id": Application.quote_id,
+    "user_id": Application.user_id,
+    "application_status": Application.application_status,
+    "approved_by": Application.approved_by,
+    "approval_date": Application.approval_date,
+    "application_number": Application.application_number,
+    "applied_at": Application.applied_at,
+    "updated_at": Application.updated_at,
+    "created_by": Application.created_by,
+    "updated_by": Application.updated_by,
+    "user_consent": ApplicationDetail.user_consent,
+    "payment_method": ApplicationDetail.payment_method,
+    "identity_verified": ApplicationDetail.identity_verified,
+    "birth_date": ApplicationDetail.birth_date,
+    "gender": ApplicationDetail.gender,
+    "monthly_premium": ApplicationDetail.monthly_premium,
+    "payment_period_years": ApplicationDetail.payment_period_years,
+    "tax_deduction_enabled": ApplicationDetail.tax_deduction_enabled,
+    "contract_date": ApplicationDetail.contract_date,
+    "contract_interest_rate": ApplicationDetail.contract_interest_rate,
+    "total_paid_amount": ApplicationDetail.total_paid_amount,
+    "pension_start_age": ApplicationDetail.pension_start_age,
+    "annual_tax_deduction": ApplicationDetail.annual_tax_deduction,
+    "plan_code": ApplicationDetail.plan_code,
+    "detail_payment_method": ApplicationDetail.payment_method,
+}
+
 ####参照処理
 
 # ------------------------------------------------------------------------------
-# 申し込み一覧取得（ユーザー単位、シナリオなし）
+# 申し込み一覧取得（ユーザー単位、シナリオなし、キーセットページング）
 # ------------------------------------------------------------------------------
 async def get_applications_by_user_id(
     session: AsyncSession,
-    user_id: UUID
-) -> List[PensionApplicationResponseModel]:
+    user_id: UUID,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[Union[PensionApplicationResponseModel, Dict[str, Any]]], Optional[str]]:
     """
     指定ユーザーの申込一覧を取得
+
+    - (applied_at, application_id) の降順でキーセットページングする
+    - fields 指定時は該当カラムのみを SELECT し、dict で返す
+      （application_details のカラムを含まない場合は JOIN も省略）
+
+    Returns:
+        (申込一覧, 次ページカーソル or None)
     """
-    logger.info("申込一覧取得: user_id=%s", user_id)
+    logger.info("申込一覧取得: user_id=%s, limit=%s, cursor=%s", user_id, limit, bool(cursor))
+
+    if fields is None:
+        stmt = (
+            select(Application, ApplicationDetail)
+            .join(ApplicationDetail, Application.application_id == ApplicationDetail.application_id)
+        )
+    else:
+        # カーソル生成用の applied_at / application_id は常に取得する
+        columns = list(dict.fromkeys(fields + ["applied_at", "application_id"]))
+        stmt = select(*[APPLICATION_LIST_FIELDS[f].label(f) for f in columns])
+        if any(APPLICATION_LIST_FIELDS[f].class_ is ApplicationDetail for f in columns):
+            stmt = stmt.join(ApplicationDetail, Application.application_id == ApplicationDetail.application_id)
+        else:
+            stmt = stmt.select_from(Application)
+
+    stmt = stmt.where(Application.user_id == user_id)
+    if cursor:
+        cursor_applied_at, cursor_application_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Application.applied_at, Application.application_id)
+            < tuple_(cursor_applied_at, cursor_application_id)
+        )
+    stmt = stmt.order_by(Application.applied_at.desc(), Application.application_id.desc())
+    if limit is not None:
+        # 次ページ有無の判定用に1件多く取得
+        stmt = stmt.limit(limit + 1)
 
-    stmt = (
-        select(Application, ApplicationDetail)
-        .join(ApplicationDetail, Application.application_id == ApplicationDetail.application_id)
-        .where(Application.user_id == user_id)
-        .order_by(Application.applied_at.desc())
-    )
     results = await session.execute(stmt)
+    records = results.all()
 
-    return [
-        _build_application_response_model(application, detail, scenarios=[], beneficiaries=[])
-        for application, detail in results.all()
-    ]
+    has_more = limit is not None and len(records) > limit
+    if has_more:
+        records = records[:limit]
+
+    if fields is None:
+        applications = [
+            _build_application_response_model(application, detail, scenarios=[], beneficiaries=[])
+            for application, detail in records
+        ]
+        last_key = (records[-1][0].applied_at, records[-1][0].application_id) if records else None
+    else:
+        applications = [{f: row._mapping[f] for f in fields} for row in records]
+        last_key = (records[-1].applied_at, records[-1].application_id) if records else None
+
+    next_cursor = encode_cursor(*last_key) if has_more and last_key else None
+    return applications, next_cursor
 
 # ------------------------------------------------------------------------------
 # 申し込み単体取得
@@ -114,22 +204,8 @@ async def get_scenarios_by_application_id(
     """
     指定された application_id に対応するシナリオ情報を MongoDB から取得する。
     """
-    try:
-        db_name = config.mongodb["database"]
-        collection_name = config.mongodb["scenario_collection"]
-        logger.info(f"MongoDBシナリオ取得開始 (application_id={application_id})")
-
-        cursor = mongo_client[db_name][collection_name].find({"application_id": application_id})
-        documents = await cursor.to_list(length=None)
-
-        logger.info(f"MongoDBシナリオ取得成功 (application_id={application_id}, 件数={len(documents)})")
-
-        scenarios = [PensionApplicationScenarioModel(**doc) for doc in documents]
-        return scenarios
-
-    except Exception as e:
-        logger.error(f"MongoDBシナリオ取得失敗 (application_id={application_id}): {e}")
-        return []
+    scenarios_map = await get_scenarios_by_application_ids(mongo_client, [application_id])
+    return scenarios_map.get(str(application_id), [])
     
 # ------------------------------------------------------------------------------
 # 申し込み保険金受け取り代理人取得（申し込みID単位）
@@ -141,23 +217,101 @@ async def get_beneficiaries_by_application_id(
     """
     指定された application_id に対応する保険金受け取り代理人情報を MongoDB から取得する。
     """
+    beneficiaries_map = await get_beneficiaries_by_application_ids(mongo_client, [application_id])
+    return beneficiaries_map.get(str(application_id), [])
+
+# ------------------------------------------------------------------------------
+# 申し込みシナリオ一括取得（複数申し込みID、$in による1クエリ）
+# ------------------------------------------------------------------------------
+async def get_scenarios_by_application_ids(
+    mongo_client: AsyncIOMotorClient,
+    application_ids: Iterable[str]
+) -> Dict[str, List[PensionApplicationScenarioModel]]:
+    """
+    複数の application_id に対応するシナリオ情報を1回のクエリで取得し、
+    application_id ごとにグループ化して返す（シナリオが無いIDは空リスト）。
+    """
+    ids = list(dict.fromkeys(str(a) for a in application_ids))
+    scenarios_map: Dict[str, List[PensionApplicationScenarioModel]] = {a: [] for a in ids}
+    if not ids:
+        return scenarios_map
+
+    try:
+        logger.info(f"MongoDBシナリオ一括取得開始 (application_id件数={len(ids)})")
+
+        documents = await scenario_store.load_many(mongo_client, ids)
+        for application_id, docs in documents.items():
+            scenarios_map[application_id] = [PensionApplicationScenarioModel(**doc) for doc in docs]
+
+        logger.info(f"MongoDBシナリオ一括取得成功 (application_id件数={len(ids)}, 取得件数={len(documents)})")
+        return scenarios_map
+
+    except Exception as e:
+        logger.error(f"MongoDBシナリオ一括取得失敗 (application_id件数={len(ids)}): {e}")
+        return {a: [] for a in ids}
+
+# ------------------------------------------------------------------------------
+# 申し込み保険金受け取り代理人一括取得（複数申し込みID、$in による1クエリ）
+# ------------------------------------------------------------------------------
+async def get_beneficiaries_by_application_ids(
+    mongo_client: AsyncIOMotorClient,
+    application_ids: Iterable[str]
+) -> Dict[str, List[ApplicationBeneficiariesModel]]:
+    """
+    複数の application_id に対応する保険金受け取り代理人情報を1回のクエリで取得し、
+    application_id ごとにグループ化して返す（該当なしのIDは空リスト）。
+    """
+    ids = list(dict.fromkeys(str(a) for a in application_ids))
+    beneficiaries_map: Dict[str, List[ApplicationBeneficiariesModel]] = {a: [] for a in ids}
+    if not ids:
+        return beneficiaries_map
+
     try:
         db_name = config.mongodb["database"]
         collection_name = config.mongodb["collection"]
-        collection = mongo_client[db_name][collection_name]
-        logger.info(f"MongoDB保険金受け取り代理人情報取得開始 (application_id={application_id})")
+        logger.info(f"MongoDB保険金受け取り代理人情報一括取得開始 (application_id件数={len(ids)})")
 
-        cursor = collection.find({"application_id": application_id})
+        cursor = mongo_client[db_name][collection_name].find(
+            {"application_id": {"$in": ids}},
+            {"_id": 0}
+        )
         documents = await cursor.to_list(length=None)
 
-        logger.info(f"MongoDB保険金受け取り代理人情報取得成功 (application_id={application_id}, 件数={len(documents)})")
+        for doc in documents:
+            beneficiaries_map.setdefault(str(doc["application_id"]), []).append(
+                ApplicationBeneficiariesModel(**doc)
+            )
 
-        beneficiaries = [ApplicationBeneficiariesModel(**doc) for doc in documents]
-        return beneficiaries
+        logger.info(f"MongoDB保険金受け取り代理人情報一括取得成功 (application_id件数={len(ids)}, 件数={len(documents)})")
+        return beneficiaries_map
 
     except Exception as e:
-        logger.error(f"MongoDB保険金受け取り代理人情報取得失敗 (application_id={application_id}): {e}")
-        return []
+        logger.error(f"MongoDB保険金受け取り代理人情報一括取得失敗 (application_id件数={len(ids)}): {e}")
+        return {a: [] for a in ids}
+
+# ------------------------------------------------------------------------------
+# シナリオ・保険金受け取り代理人の一括取得（2コレクションを並行取得）
+# ------------------------------------------------------------------------------
+async def get_application_relations_by_ids(
+    mongo_client: AsyncIOMotorClient,
+    application_ids: Iterable[str]
+) -> Tuple[
+    Dict[str, List[PensionApplicationScenarioModel]],
+    Dict[str, List[ApplicationBeneficiariesModel]]
+]:
+    """
+    申し込みIDの一覧に対し、シナリオと保険金受け取り代理人を
+    各コレクション1クエリずつ並行して取得する。
+
+    Returns:
+        (application_id → シナリオ一覧, application_id → 受取人情報一覧)
+    """
+    ids = [str(a) for a in application_ids]
+    scenarios_map, beneficiaries_map = await asyncio.gather(
+        get_scenarios_by_application_ids(mongo_client, ids),
+        get_beneficiaries_by_application_ids(mongo_client, ids),
+    )
+    return scenarios_map, beneficiaries_map
 
 ####更新処理
 
@@ -346,24 +500,17 @@ async def save_beneficiaries_to_mongo(
         raise
 
 # ------------------------------------------------------------------------------
-# シナリオ保存（既存削除→上書き保存）
+# シナリオ保存（1申込1ドキュメントで置き換え保存）
 # ------------------------------------------------------------------------------
 async def save_scenarios_to_mongo(
     mongo_client: AsyncIOMotorClient,
     application_id: str,
-    scenarios: List[QuoteScenarioModel]
+    scenarios: List[QuoteScenarioModel],
+    rate_version: Optional[str] = None
 ):
     logger.info("MongoDBシナリオ上書き開始: application_id=%s", application_id)
 
-    db_name = config.mongodb["database"]
-    collection_name = config.mongodb["scenario_collection"]
-    collection = mongo_client[db_name][collection_name]
-
     try:
-        # 既存データを削除
-        delete_result = await collection.delete_many({"application_id": str(application_id)})
-        logger.info(f"[MongoDB] 既存削除完了 (deleted_count={delete_result.deleted_count})")
-
         scenario_docs = []
         for scenario in scenarios:
             doc = scenario.model_dump(mode="json")
@@ -383,11 +530,13 @@ async def save_scenarios_to_mongo(
 
             scenario_docs.append(doc)
 
-        if scenario_docs:
-            await collection.insert_many(scenario_docs)
-            logger.info("MongoDBシナリオ上書き完了: 件数=%d", len(scenario_docs))
-        else:
-            logger.warning("保存対象のシナリオが空のためMongoDBへの保存をスキップ")
+        # document モード: replace_one の1操作 / legacy モード: 削除 → 一括挿入
+        await scenario_store.save(
+            mongo_client,
+            str(application_id),
+            scenario_docs,
+            rate_version=rate_version,
+        )
 
     except Exception as e:
         logger.exception(f"[MongoDB] 保険金受取人情報の保存中にエラー発生: {e}")
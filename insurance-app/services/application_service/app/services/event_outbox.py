@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+トランザクショナルアウトボックス（イベントの登録と送信リレー）
+
+- stage_event(): ドメインの更新と同じセッションにイベント行を追加する（コミットは呼び出し側）。
+  コミットされたイベントのみが送信され、コミット後にプロセスが停止しても失われない
+- OutboxRelay: 未送信行を id 順にバッチで取得して NATS に発行し、flush 成功後に sent_at を設定して
+  コミットする（少なくとも1回の配信）
+- 複数レプリカで起動しても、バッチの処理は source ごとのアドバイザリロック
+  （pg_try_advisory_xact_lock）を取得した1レプリカのみが行う（ロックを取れないレプリカは次の周期まで待つ）
+- 発行に失敗した行は attempts を加算し、リレー全体が retry_backoff_seconds に従って待機してから再試行する
+  （行単位で後回しにしないため、送信順は登録順のまま保たれる）
+- max_attempts 回失敗した行は送信対象から外す（last_error を確認して手動で再送する）
+- 送信済みの行は retention_hours 経過後に削除する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import AsyncSessionLocal
+from app.db_models.outbox import OutboxEvent
+from app.services.nats_publisher import flush_events, publish_event
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 設定・ロガー初期化
+# ------------------------------------------------------------------------------
+config = Config()
+logger = logging.getLogger(__name__)
+
+# 既定値（config.yaml の outbox で上書き可能）
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "source": "default",
+    "relay_enabled": True,
+    "batch_size": 100,
+    "poll_interval_seconds": 0.5,
+    "retry_backoff_seconds": [1, 2, 5, 10, 30],
+    "max_attempts": 20,
+    "retention_hours": 24,
+    "purge_interval_seconds": 3600,
+}
+
+OUTBOX_SETTINGS: Dict[str, Any] = {**DEFAULT_SETTINGS, **config.outbox}
+
+
+# ------------------------------------------------------------------------------
+# イベント登録
+# ------------------------------------------------------------------------------
+def stage_event(session: AsyncSession, subject: str, payload: Dict[str, Any]) -> OutboxEvent:
+    """
+    イベントをアウトボックスに登録する（session のコミットで確定し、ロールバックで破棄される）
+
+    Parameters:
+        subject (str): NATSサブジェクト（例: "quotes.QuoteCreated"）
+        payload (dict): イベント本文（datetime・UUID は文字列に変換して保存）
+    """
+    event = OutboxEvent(
+        source=OUTBOX_SETTINGS["source"],
+        subject=subject,
+        payload=json.loads(json.dumps(payload, ensure_ascii=False, default=str)),
+    )
+    session.add(event)
+    logger.debug("アウトボックス登録: subject=%s", subject)
+    return event
+
+
+# ------------------------------------------------------------------------------
+# 送信リレー
+# ------------------------------------------------------------------------------
+class OutboxRelay:
+    """
+    アウトボックスの未送信イベントを NATS に発行するバックグラウンド処理
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        publish: Callable[[str, Dict[str, Any]], Awaitable[None]],
+        flush: Callable[[], Awaitable[None]],
+        settings: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Parameters:
+            session_factory: AsyncSession を生成する関数（AsyncSessionLocal）
+            publish: 1件発行する関数（nats_publisher.publish_event）
+            flush: 発行済みメッセージの送信完了を待つ関数（nats_publisher.flush_events）
+        """
+        s = {**OUTBOX_SETTINGS, **(settings or {})}
+        self.session_factory = session_factory
+        self.publish = publish
+        self.flush = flush
+        self.source = s["source"]
+        self.enabled = bool(s["relay_enabled"])
+        self.batch_size = int(s["batch_size"])
+        self.poll_interval = float(s["poll_interval_seconds"])
+        self.backoff = [float(b) for b in s["retry_backoff_seconds"]] or [1.0]
+        self.max_attempts = int(s["max_attempts"])
+        self.retention = timedelta(hours=float(s["retention_hours"]))
+        self.purge_interval = float(s["purge_interval_seconds"])
+
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._last_purge = 0.0
+
+        self.batches = 0
+        self.published = 0
+        self.publish_failures = 0
+        self.consecutive_failures = 0
+        self.purged = 0
+        self.lock_skips = 0
+        self.lag_seconds_total = 0.0
+        self.lag_seconds_max = 0.0
+        self.last_batch_size = 0
+
+    # --------------------------------------------------------------------------
+    # 起動・停止
+    # --------------------------------------------------------------------------
+    def start(self) -> None:
+        """
+        リレーを起動する（relay_enabled: false の場合は起動しない）
+        """
+        if not self.enabled or self._task is not None:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+        logger.info("[アウトボックス] リレー起動: source=%s, batch_size=%d", self.source, self.batch_size)
+
+    async def stop(self) -> None:
+        """
+        実行中のバッチを終えてからリレーを停止する
+        """
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info("[アウトボックス] リレー停止: source=%s", self.source)
+
+    def backoff_for(self, failures: int) -> float:
+        """
+        連続失敗回数に応じた再試行までの待ち時間（秒）
+        """
+        return self.backoff[min(max(failures, 1), len(self.backoff)) - 1]
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                sent, failed = await self.relay_once()
+            except Exception:
+                logger.exception("[アウトボックス] 送信バッチの処理に失敗しました")
+                sent, failed = 0, True
+
+            if failed:
+                self.consecutive_failures += 1
+                delay = self.backoff_for(self.consecutive_failures)
+            else:
+                self.consecutive_failures = 0
+                # 取得上限まで送信した場合は残りがあるため待たずに続ける
+                delay = 0.0 if sent >= self.batch_size else self.poll_interval
+
+            if time.monotonic() - self._last_purge >= self.purge_interval:
+                await self._purge()
+
+            if not delay:
+                await asyncio.sleep(0)
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    # --------------------------------------------------------------------------
+    # 送信
+    # --------------------------------------------------------------------------
+    async def relay_once(self) -> Tuple[int, bool]:
+        """
+        未送信イベントを1バッチ分発行する（他のレプリカが処理中の場合は何もしない）
+
+        Returns:
+            (送信済みにした件数, 発行に失敗したか)
+        """
+        async with self.session_factory() as session:
+            async with session.begin():
+                # 同じ source のバッチを並行して発行すると送信順が入れ替わるため、1レプリカに限定する
+                # （トランザクション終了時に解放される）
+                locked = await session.execute(
+                    select(func.pg_try_advisory_xact_lock(func.hashtext(f"event_outbox:{self.source}")))
+                )
+                if not locked.scalar():
+                    self.lock_skips += 1
+                    return 0, False
+
+                result = await session.execute(
+                    select(OutboxEvent)
+                    .where(
+                        OutboxEvent.source == self.source,
+                        OutboxEvent.sent_at.is_(None),
+                        OutboxEvent.attempts < self.max_attempts,
+                    )
+                    .order_by(OutboxEvent.id)
+                    .limit(self.batch_size)
+                )
+                rows: List[OutboxEvent] = list(result.scalars().all())
+                if not rows:
+                    return 0, False
+
+                published: List[OutboxEvent] = []
+                failed_row: Optional[OutboxEvent] = None
+                error: Optional[Exception] = None
+                for row in rows:
+                    try:
+                        await self.publish(row.subject, row.payload)
+                    except Exception as e:
+                        failed_row, error = row, e
+                        break
+                    published.append(row)
+
+                if published:
+                    # flush に失敗した場合は例外でロールバックし、バッチ全体を再送対象に残す
+                    await self.flush()
+
+                now = datetime.now(timezone.utc)
+                for row in published:
+                    row.sent_at = now
+                    lag = (now - row.created_at).total_seconds() if row.created_at else 0.0
+                    self.lag_seconds_total += lag
+                    self.lag_seconds_max = max(self.lag_seconds_max, lag)
+
+                if failed_row is not None:
+                    failed_row.attempts += 1
+                    failed_row.last_error = str(error)[:1000]
+                    self.publish_failures += 1
+                    log = logger.error if failed_row.attempts >= self.max_attempts else logger.warning
+                    log(
+                        "[アウトボックス] 発行失敗: id=%s, subject=%s, 失敗回数=%d, error=%s",
+                        failed_row.id, failed_row.subject, failed_row.attempts, error
+                    )
+
+        self.batches += 1
+        self.published += len(published)
+        self.last_batch_size = len(published)
+        logger.debug("[アウトボックス] 送信: %d件", len(published))
+        return len(published), failed_row is not None
+
+    async def _purge(self) -> None:
+        """
+        保存期間を過ぎた送信済みイベントを削除する
+        """
+        self._last_purge = time.monotonic()
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    delete(OutboxEvent).where(
+                        OutboxEvent.source == self.source,
+                        OutboxEvent.sent_at < func.now() - self.retention,
+                    )
+                )
+                await session.commit()
+            self.purged += result.rowcount or 0
+        except Exception:
+            logger.exception("[アウトボックス] 送信済みイベントの削除に失敗しました")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        送信件数・失敗回数・登録から送信までの遅延を返す（メトリクス用）
+        """
+        return {
+            "source": self.source,
+            "running": self._task is not None,
+            "batches": self.batches,
+            "published": self.published,
+            "publish_failures": self.publish_failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_batch_size": self.last_batch_size,
+            "purged": self.purged,
+            "lock_skips": self.lock_skips,
+            "lag_seconds_avg": round(self.lag_seconds_total / self.published, 6) if self.published else 0.0,
+            "lag_seconds_max": round(self.lag_seconds_max, 6),
+        }
+
+
+# ------------------------------------------------------------------------------
+# 共有インスタンス
+# ------------------------------------------------------------------------------
+outbox_relay = OutboxRelay(AsyncSessionLocal, publish_event, flush_events)
@@ -2,64 +2,61 @@
 """
 NATSイベントパブリッシュ処理モジュール（接続再利用対応）
 
-- アプリ起動時に NATS へ接続
-- publish_event() で常駐接続を使ってイベント送信
+- アプリ起動時に NATS へ接続（接続はプロセス内で共有する nats_manager が保持する）
+- publish_event() で共有接続を使ってイベント送信
+- nats.jetstream.enabled の場合はストリームに発行し、永続化の応答（PubAck）を待つ
+- アプリからの発行はアウトボックス（app/services/event_outbox.py）のリレー経由で行う
 """
 
 import json
 import logging
-from typing import Optional
-from nats.aio.client import Client as NATS
 from nats.aio.errors import ErrConnectionClosed, ErrTimeout, ErrNoServers
+from nats.errors import OutboundBufferLimitError
+from nats.js.errors import Error as JetStreamError
 
-from app.models.events import QuoteCreatedEvent
-
+from app.services import nats_jetstream
+from app.services.nats_connection import nats_manager
 from app.config.config import Config
 
 config = Config()
 logger = logging.getLogger(__name__)
 
-# グローバル接続インスタンス（初期はNone）
-nats_client: Optional[NATS] = None
-
 async def init_nats_connection():
     """
-    アプリ起動時に呼び出される NATS 接続初期化関数
+    アプリ起動時に呼び出される NATS 接続初期化関数（接続できない場合はバックグラウンドで再試行）
     """
-    global nats_client
-    if nats_client is None:
-        logger.info("NATS接続を初期化: %s", config.nats["address"])
-        nats_client = NATS()
-        await nats_client.connect(config.nats["address"])
-        logger.info("NATS接続完了")
+    await nats_manager.connect()
 
 async def close_nats_connection():
     """
-    アプリ終了時に呼び出される NATS 切断処理
+    アプリ終了時に呼び出される NATS 切断処理（処理中の購読・送信バッファを drain してから切断）
     """
-    global nats_client
-    if nats_client and nats_client.is_connected:
-        await nats_client.close()
-        logger.info("NATS接続をクローズしました")
-
-logger = logging.getLogger(__name__)
+    await nats_manager.drain()
 
 async def publish_event(subject: str, payload: dict):
     """
-    再利用中のNATS接続を用いて、指定トピックにイベントを送信する
+    共有のNATS接続を用いて、指定トピックにイベントを送信する
 
     Parameters:
         subject (str): トピック名（例: "applications.ApplicationConfirmed"）
         payload (dict): JSON形式のペイロード
     """
-    if not nats_client or not nats_client.is_connected:
-        raise RuntimeError("NATS接続が確立されていません")
-
     try:
         message = json.dumps(payload, ensure_ascii=False, default=str).encode()
         logger.info("NATSパブリッシュ開始: subject=%s", subject)
-        await nats_client.publish(subject, message)
+        if nats_jetstream.jetstream_enabled():
+            async with nats_manager.measure_publish(len(message)):
+                await nats_jetstream.publish(nats_manager.jetstream(), subject, message)
+        else:
+            await nats_manager.publish(subject, message)
         logger.info("NATSパブリッシュ成功: subject=%s", subject)
-    except (ErrConnectionClosed, ErrTimeout, ErrNoServers) as e:
+    except (ErrConnectionClosed, ErrTimeout, ErrNoServers, OutboundBufferLimitError, JetStreamError) as e:
         logger.error("NATSパブリッシュ失敗: subject=%s, error=%s", subject, str(e))
-        raise
\ No newline at end of file
+        raise
+
+
+async def flush_events(timeout: float = None):
+    """
+    発行済みメッセージがサーバに届くまで待つ（アウトボックスのリレーが送信済みにする前に呼び出す）
+    """
+    await nats_manager.flush(timeout)
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+シナリオ保存ストア（MongoDB）
+
+- document モード: 1見積もり（1申込）= 1ドキュメント
+  { _id: <ID>, <キー項目>: <ID>, rate_version, scenarios: [...], updated_at }
+  - 保存は replace_one(upsert=True) の1操作（読み取り側から見て常に全シナリオが揃っている）
+  - 取得は _id による1回のインデックス検索
+- legacy モード: 従来どおり1シナリオ = 1ドキュメント（delete_many → insert_many）
+- document モードで legacy_read_fallback が有効な場合、未移行のIDは従来コレクションから読む
+- 従来ドキュメントの一括移行は app/tools/migrate_scenarios.py を使用する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+# ------------------------------------------------------------------------------
+# ロガー初期化
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+MODE_DOCUMENT = "document"
+MODE_LEGACY = "legacy"
+
+# 既定値（config.yaml の mongodb.scenario_storage で上書き可能）
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "mode": MODE_DOCUMENT,
+    "document_collection": None,
+    "legacy_read_fallback": True,
+}
+
+# 埋め込み配列に保存しない項目（親ドキュメント側で保持する）
+_EMBEDDED_EXCLUDE = ("_id", "logged_at")
+
+
+class ScenarioStore:
+    """
+    見積もり・申込ごとのシナリオ一覧を保存・取得する
+    """
+
+    def __init__(
+        self,
+        key_field: str,
+        database: str,
+        legacy_collection: str,
+        settings: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Parameters:
+            key_field (str): ID項目名（"quote_id" / "application_id"）
+            database (str): DB名
+            legacy_collection (str): 従来形式（1シナリオ1ドキュメント）のコレクション名
+            settings (dict): config.yaml の scenario_storage セクション
+        """
+        s = {**DEFAULT_SETTINGS, **(settings or {})}
+        if s["mode"] not in (MODE_DOCUMENT, MODE_LEGACY):
+            raise ValueError(f"未定義のシナリオ保存モードです: {s['mode']}")
+        self.key_field = key_field
+        self.database = database
+        self.legacy_collection = legacy_collection
+        self.document_collection = s["document_collection"] or f"{key_field.split('_')[0]}_scenario_sets"
+        self.mode = s["mode"]
+        self.legacy_read_fallback = bool(s["legacy_read_fallback"])
+
+    def _collection(self, mongo_client: AsyncIOMotorClient, name: str):
+        return mongo_client[self.database][name]
+
+    # --------------------------------------------------------------------------
+    # ドキュメント組み立て
+    # --------------------------------------------------------------------------
+    def build_document(
+        self,
+        key: str,
+        scenario_docs: List[Dict[str, Any]],
+        rate_version: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        シナリオ一覧を1ドキュメント（埋め込み配列）に変換する
+        """
+        embedded = [
+            {k: v for k, v in doc.items() if k not in _EMBEDDED_EXCLUDE and k != self.key_field}
+            for doc in scenario_docs
+        ]
+        return {
+            "_id": str(key),
+            self.key_field: str(key),
+            "rate_version": rate_version,
+            "scenarios": embedded,
+            "updated_at": datetime.utcnow(),
+        }
+
+    def _expand(self, document: Dict[str, Any]) -> List[Dict[str, Any]]:
+        key = document[self.key_field]
+        return [{**scenario, self.key_field: key} for scenario in document.get("scenarios", [])]
+
+    # --------------------------------------------------------------------------
+    # 保存・削除
+    # --------------------------------------------------------------------------
+    async def save(
+        self,
+        mongo_client: AsyncIOMotorClient,
+        key: str,
+        scenario_docs: List[Dict[str, Any]],
+        rate_version: Optional[str] = None,
+        replace_existing: bool = True,
+    ) -> None:
+        """
+        シナリオ一覧を保存する（既存分は置き換え）
+
+        Parameters:
+            replace_existing: legacy モードで既存シナリオを先に削除するか（document モードでは常に置き換え）
+        """
+        if self.mode == MODE_DOCUMENT:
+            document = self.build_document(key, scenario_docs, rate_version)
+            await self._collection(mongo_client, self.document_collection).replace_one(
+                {"_id": document["_id"]}, document, upsert=True
+            )
+            logger.info("MongoDBシナリオ保存完了: %s=%s, 件数=%d", self.key_field, key, len(scenario_docs))
+            return
+
+        collection = self._collection(mongo_client, self.legacy_collection)
+        if replace_existing:
+            delete_result = await collection.delete_many({self.key_field: str(key)})
+            logger.debug("既存シナリオ削除完了: 件数=%d", delete_result.deleted_count)
+        if scenario_docs:
+            await collection.insert_many(scenario_docs)
+            logger.info("MongoDBシナリオ上書き完了: 件数=%d", len(scenario_docs))
+        else:
+            logger.warning("保存対象のシナリオが空のためMongoDBへの保存をスキップ")
+
+    async def delete(self, mongo_client: AsyncIOMotorClient, key: str) -> int:
+        """
+        指定IDのシナリオを削除し、削除件数を返す（従来形式を読む設定の場合は従来コレクションも削除）
+        """
+        deleted = 0
+        if self.mode == MODE_DOCUMENT:
+            result = await self._collection(mongo_client, self.document_collection).delete_one({"_id": str(key)})
+            deleted += result.deleted_count
+        if self.mode == MODE_LEGACY or self.legacy_read_fallback:
+            result = await self._collection(mongo_client, self.legacy_collection).delete_many({self.key_field: str(key)})
+            deleted += result.deleted_count
+        return deleted
+
+    # --------------------------------------------------------------------------
+    # 取得
+    # --------------------------------------------------------------------------
+    async def _load_legacy(self, mongo_client: AsyncIOMotorClient, keys: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        cursor = self._collection(mongo_client, self.legacy_collection).find(
+            {self.key_field: {"$in": keys}},
+            {"_id": 0}
+        )
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for doc in await cursor.to_list(length=None):
+            grouped.setdefault(str(doc[self.key_field]), []).append(doc)
+        return grouped
+
+    async def load_many(
+        self,
+        mongo_client: AsyncIOMotorClient,
+        keys: Iterable[str],
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        複数IDのシナリオを取得し、ID → シナリオ（dict）のリストで返す（見つからないIDは含まない）
+        """
+        ids = list(dict.fromkeys(str(k) for k in keys))
+        if not ids:
+            return {}
+        if self.mode == MODE_LEGACY:
+            return await self._load_legacy(mongo_client, ids)
+
+        cursor = self._collection(mongo_client, self.document_collection).find({"_id": {"$in": ids}})
+        grouped = {str(doc["_id"]): self._expand(doc) for doc in await cursor.to_list(length=None)}
+
+        missing = [k for k in ids if k not in grouped]
+        if missing and self.legacy_read_fallback:
+            grouped.update(await self._load_legacy(mongo_client, missing))
+        return grouped
+
+    # --------------------------------------------------------------------------
+    # 従来形式からの一括移行
+    # --------------------------------------------------------------------------
+    async def migrate_legacy(
+        self,
+        mongo_client: AsyncIOMotorClient,
+        batch_size: int = 500,
+        dry_run: bool = False,
+    ) -> Dict[str, int]:
+        """
+        従来形式のシナリオを ID ごとにまとめ、document 形式のコレクションへ一括で書き込む
+
+        - 既に document 形式で保存済みのIDは上書きしない（$setOnInsert）ため、稼働中でも実行できる
+        - 従来コレクションは削除しない（確認後に手動で削除する）
+
+        Returns:
+            dict: groups（対象ID数）/ inserted（新規作成数）/ skipped（既存のため未変更）
+        """
+        pipeline = [
+            {"$sort": {self.key_field: 1, "logged_at": 1}},
+            {"$group": {"_id": f"${self.key_field}", "scenarios": {"$push": "$$ROOT"}}},
+        ]
+        cursor = self._collection(mongo_client, self.legacy_collection).aggregate(pipeline, allowDiskUse=True)
+        target = self._collection(mongo_client, self.document_collection)
+
+        stats = {"groups": 0, "inserted": 0, "skipped": 0}
+        operations: List[UpdateOne] = []
+
+        async def flush():
+            if not operations:
+                return
+            if not dry_run:
+                result = await target.bulk_write(operations, ordered=False)
+                stats["inserted"] += result.upserted_count
+                stats["skipped"] += len(operations) - result.upserted_count
+            operations.clear()
+
+        async for group in cursor:
+            stats["groups"] += 1
+            document = self.build_document(str(group["_id"]), group["scenarios"], rate_version=None)
+            operations.append(UpdateOne({"_id": document["_id"]}, {"$setOnInsert": document}, upsert=True))
+            if len(operations) >= batch_size:
+                await flush()
+        await flush()
+
+        logger.info("[シナリオ移行] %s: %s", self.document_collection, stats)
+        return stats
@@ -20,6 +20,12 @@ CREATE TABLE applications (
     updated_by VARCHAR(64)                             -- 更新者（オペレーターIDなど）
 );
 
+-- 申込一覧（user_id 指定・applied_at, application_id 降順のキーセットページング）
+CREATE INDEX ix_applications_user_id_applied_at
+    ON applications (user_id, applied_at DESC, application_id DESC) INCLUDE (application_status, quote_id);
+-- 見積もりIDからの申込参照
+CREATE INDEX ix_applications_quote_id ON applications (quote_id);
+
 -- ============================================================================
 -- テーブル: application_details（申込時の契約条件および計算結果を保持）
 -- ============================================================================
@@ -47,4 +53,21 @@ CREATE TABLE application_details (
     payment_method VARCHAR NOT NULL,                    -- 支払方法（スナップショット）
     user_consent BOOLEAN NOT NULL,                     -- 同意の有無（重要事項説明への同意）
     identity_verified BOOLEAN NOT NULL                -- 本人確認完了フラグ
-);
\ No newline at end of file
+);
+
+-- ============================================================================
+-- テーブル: event_outbox（発行予定のドメインイベント。更新と同じトランザクションで登録）
+-- ============================================================================
+CREATE TABLE event_outbox (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY, -- 連番（送信順）
+    source VARCHAR(64) NOT NULL,                       -- 発行元サービス（quotation_service など）
+    subject VARCHAR(255) NOT NULL,                     -- NATSサブジェクト
+    payload JSONB NOT NULL,                            -- イベント本文
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP, -- 登録日時
+    sent_at TIMESTAMPTZ,                               -- 送信日時（未送信は NULL）
+    attempts INTEGER NOT NULL DEFAULT 0,               -- 送信失敗回数
+    last_error TEXT                                    -- 直近の送信エラー
+);
+
+-- リレーの未送信取得（source 指定・id 順）
+CREATE INDEX ix_event_outbox_unsent ON event_outbox (source, id) WHERE sent_at IS NULL;
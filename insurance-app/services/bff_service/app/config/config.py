@@ -78,4 +78,54 @@ class Config:
         """
         contraction_serviceに関する設定情報を返す（未設定時は空dictを返す）
         """
-        return self._data.get("contraction_service", {})
\ No newline at end of file
+        return self._data.get("contraction_service", {})
+
+    # --------------------------------------------------------------------------
+    # 上流HTTPクライアント設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def http_clients(self):
+        """
+        上流サービス向けHTTPクライアント（接続プール・タイムアウト）の設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("http_clients", {})
+
+    # --------------------------------------------------------------------------
+    # プロキシルートテーブルの取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def proxy(self):
+        """
+        BFF プロキシのルート定義（defaults / routes）を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("proxy", {})
+
+    # --------------------------------------------------------------------------
+    # NATS設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def nats(self):
+        """
+        NATS 接続設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("nats", {})
+
+    # --------------------------------------------------------------------------
+    # ダッシュボードキャッシュ設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def dashboard_cache(self):
+        """
+        /my/dashboard のキャッシュ（TTL・stale-while-revalidate）設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("dashboard_cache", {})
+
+    # --------------------------------------------------------------------------
+    # 上流一覧APIのページ送り設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def pagination(self):
+        """
+        上流一覧APIをカーソルで辿る際の設定（1ページ件数・最大ページ数）を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("pagination", {})
@@ -15,7 +15,6 @@ import logging
 import time
 import json
 
-import httpx
 import redis.asyncio as redis
 from jose import jwt
 from fastapi import Request, HTTPException, status
@@ -120,28 +119,28 @@ async def get_valid_session(request: Request):
             "client_secret": config.keycloak["client_secret"]
         }
 
-        async with httpx.AsyncClient() as client:
-            token_resp = await client.post(oidc_client.endpoints["token_endpoint"], data=data)
-            if token_resp.status_code != 200:
-                logger.warning("リフレッシュトークン失敗：認証エラー")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="再認証が必要です"
-                )
-
-            token_data = token_resp.json()
-            logger.info("アクセストークン更新成功")
-
-            # セッションの内容を更新
-            session["access_token"] = token_data["access_token"]
-            if token_data.get("refresh_token"):
-                session["refresh_token"] = token_data["refresh_token"]
-
-            # Redisのセッションも更新
-            serializer = URLSafeSerializer(config.session["secret_key"])
-            token = request.cookies.get(SESSION_COOKIE_NAME)
-            session_id = serializer.loads(token)
-            await redis_client.setex(session_id, 1800, json.dumps(session))
-            logger.info(f"セッション更新完了: {session_id}")
+        client = request.app.state.http_clients.get("keycloak")
+        token_resp = await client.post(oidc_client.endpoints["token_endpoint"], data=data)
+        if token_resp.status_code != 200:
+            logger.warning("リフレッシュトークン失敗：認証エラー")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="再認証が必要です"
+            )
+
+        token_data = token_resp.json()
+        logger.info("アクセストークン更新成功")
+
+        # セッションの内容を更新
+        session["access_token"] = token_data["access_token"]
+        if token_data.get("refresh_token"):
+            session["refresh_token"] = token_data["refresh_token"]
+
+        # Redisのセッションも更新
+        serializer = URLSafeSerializer(config.session["secret_key"])
+        token = request.cookies.get(SESSION_COOKIE_NAME)
+        session_id = serializer.loads(token)
+        await redis_client.setex(session_id, 1800, json.dumps(session))
+        logger.info(f"セッション更新完了: {session_id}")
 
     return session
\ No newline at end of file
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+上流サービス向け HTTP クライアント管理
+
+責務:
+- 上流サービス（quotation / application / contract / plans / keycloak）ごとに
+  長寿命の httpx.AsyncClient を 1 つずつ保持する（起動時生成・停止時クローズ）
+- 接続プール上限・Keep-Alive・HTTP/2・タイムアウトを config.yaml から設定する
+- 接続プールの利用状況をメトリクスとして公開する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import Request
+
+# ------------------------------------------------------------------------------
+# ロガー初期化
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# 管理対象の上流サービス名
+UPSTREAMS = ("quotation", "application", "contract", "plans", "keycloak")
+
+# 既定値（config.yaml の http_clients.defaults で上書き可能）
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    "http2": False,
+    "connect_timeout": 2.0,
+    "read_timeout": 5.0,
+    "write_timeout": 5.0,
+    "pool_timeout": 2.0,
+}
+
+
+# ------------------------------------------------------------------------------
+# HTTP/2 利用可否の判定
+# ------------------------------------------------------------------------------
+def _http2_available() -> bool:
+    """
+    HTTP/2 に必要な h2 パッケージが導入済みかを判定する
+    """
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# ------------------------------------------------------------------------------
+# 上流ごとのクライアント統計
+# ------------------------------------------------------------------------------
+class _UpstreamStats:
+    """
+    リクエスト件数・ステータス別件数を集計する（event_hooks から更新）
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.responses = 0
+        self.errors_4xx = 0
+        self.errors_5xx = 0
+
+    async def on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+
+    async def on_response(self, response: httpx.Response) -> None:
+        self.responses += 1
+        if 400 <= response.status_code < 500:
+            self.errors_4xx += 1
+        elif response.status_code >= 500:
+            self.errors_5xx += 1
+
+
+# ------------------------------------------------------------------------------
+# 上流クライアント管理クラス
+# ------------------------------------------------------------------------------
+class UpstreamClients:
+    """
+    上流サービスごとの httpx.AsyncClient を保持する
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Parameters:
+            settings (dict): config.yaml の http_clients セクション
+        """
+        settings = settings or {}
+        self._defaults = {**DEFAULT_SETTINGS, **settings.get("defaults", {})}
+        self._overrides = settings.get("upstreams", {})
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, _UpstreamStats] = {}
+        self._limits: Dict[str, httpx.Limits] = {}
+
+    def _settings_for(self, name: str) -> Dict[str, Any]:
+        return {**self._defaults, **self._overrides.get(name, {})}
+
+    def _build_client(self, name: str) -> httpx.AsyncClient:
+        s = self._settings_for(name)
+
+        http2 = bool(s["http2"])
+        if http2 and not _http2_available():
+            logger.warning("[HTTPクライアント] h2 未導入のため HTTP/1.1 で接続します: upstream=%s", name)
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=s["max_connections"],
+            max_keepalive_connections=s["max_keepalive_connections"],
+            keepalive_expiry=s["keepalive_expiry"],
+        )
+        timeout = httpx.Timeout(
+            connect=s["connect_timeout"],
+            read=s["read_timeout"],
+            write=s["write_timeout"],
+            pool=s["pool_timeout"],
+        )
+        stats = _UpstreamStats()
+        self._stats[name] = stats
+        self._limits[name] = limits
+
+        logger.info(
+            "[HTTPクライアント] 生成: upstream=%s http2=%s max_connections=%s keepalive=%s",
+            name, http2, s["max_connections"], s["max_keepalive_connections"]
+        )
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=limits,
+            timeout=timeout,
+            event_hooks={"request": [stats.on_request], "response": [stats.on_response]},
+        )
+
+    # --------------------------------------------------------------------------
+    # ライフサイクル
+    # --------------------------------------------------------------------------
+    def start(self) -> None:
+        """
+        全上流のクライアントを生成する（アプリ起動時に 1 回だけ呼ぶ）
+        """
+        for name in UPSTREAMS:
+            if name not in self._clients:
+                self._clients[name] = self._build_client(name)
+
+    async def close(self) -> None:
+        """
+        全クライアントをクローズする（アプリ停止時）
+        """
+        for name, client in self._clients.items():
+            await client.aclose()
+            logger.info("[HTTPクライアント] クローズ: upstream=%s", name)
+        self._clients.clear()
+
+    # --------------------------------------------------------------------------
+    # 取得
+    # --------------------------------------------------------------------------
+    def get(self, name: str) -> httpx.AsyncClient:
+        """
+        上流名に対応するクライアントを返す
+
+        Raises:
+            KeyError: 未定義の上流名が指定された場合
+        """
+        client = self._clients.get(name)
+        if client is None:
+            if name not in UPSTREAMS:
+                raise KeyError(f"未定義の上流サービスです: {name}")
+            client = self._clients[name] = self._build_client(name)
+        return client
+
+    # --------------------------------------------------------------------------
+    # メトリクス
+    # --------------------------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        上流ごとの接続プール利用状況を返す
+        """
+        result: Dict[str, Any] = {}
+        for name, client in self._clients.items():
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []) or [])
+            idle = sum(1 for c in connections if c.is_idle())
+            limits = self._limits[name]
+            stats = self._stats[name]
+            result[name] = {
+                "connections": len(connections),
+                "active": len(connections) - idle,
+                "idle": idle,
+                "queued_requests": max(len(getattr(pool, "_requests", [])) - (len(connections) - idle), 0),
+                "max_connections": limits.max_connections,
+                "utilization": round((len(connections) - idle) / limits.max_connections, 4)
+                if limits.max_connections else 0.0,
+                "requests": stats.requests,
+                "responses": stats.responses,
+                "errors_4xx": stats.errors_4xx,
+                "errors_5xx": stats.errors_5xx,
+            }
+        return result
+
+
+# ------------------------------------------------------------------------------
+# FastAPI 依存関数
+# ------------------------------------------------------------------------------
+def get_http_clients(request: Request) -> UpstreamClients:
+    """
+    app.state に保持された上流クライアント群を返す
+    """
+    return request.app.state.http_clients
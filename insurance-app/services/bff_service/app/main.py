@@ -9,6 +9,7 @@
 # ------------------------------------------------------------------------------
 # インポート
 # ------------------------------------------------------------------------------
+import asyncio
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,9 +17,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.routes import (
     api_synthesis, 
     api_proxy,
-    auth 
+    auth,
+    metrics
 )
 from app.dependencies.oidc_client import OIDCClient
+from app.dependencies.http_clients import UpstreamClients
+from app.services.nats_subscriber import run_nats_subscriber, close_nats_subscriber
 
 from app.config.config import Config
 
@@ -56,17 +60,23 @@ app.add_middleware(
     allow_credentials=True,  # Cookieを使うので必要
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # 一覧の次ページカーソルをフロントから読めるようにする
 )
 
 # OIDCクライアントをアプリケーションステートに保持
 app.state.oidc_client = oidc_client
 
+# 上流サービス向けHTTPクライアント群（起動時に生成）
+http_clients = UpstreamClients(config.http_clients)
+app.state.http_clients = http_clients
+
 # ------------------------------------------------------------------------------
 # ルーター登録
 # ------------------------------------------------------------------------------
 app.include_router(auth.router, prefix="/api/v1/auth")
 app.include_router(api_synthesis.router, prefix="/api/v1/bff")
 app.include_router(api_proxy.router, prefix="/api/v1/bff")
+app.include_router(metrics.router, prefix="/api/v1/bff")
 
 # ------------------------------------------------------------------------------
 # アプリケーション起動時イベント
@@ -74,8 +84,22 @@ app.include_router(api_proxy.router, prefix="/api/v1/bff")
 @app.on_event("startup")
 async def startup_event():
     """
-    アプリケーション起動時にOIDC情報を初期化する
+    アプリケーション起動時に上流HTTPクライアントとOIDC情報を初期化する
+    - ダッシュボードキャッシュ無効化用のNATS購読を開始
     """
     logger.info("=== アプリケーション起動開始 ===")
+    http_clients.start()
+    asyncio.create_task(run_nats_subscriber())
     await oidc_client.initialize()
     logger.info("=== OIDCディスカバリー情報と公開鍵 初期化完了 ===")
+
+# ------------------------------------------------------------------------------
+# アプリケーション停止時イベント
+# ------------------------------------------------------------------------------
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    アプリケーション停止時にNATS購読を終了し、上流HTTPクライアントをクローズする
+    """
+    await close_nats_subscriber()
+    await http_clients.close()
@@ -1,18 +1,30 @@
 # -*- coding: utf-8 -*-
+"""
+上流サービスへのプロキシAPI（ルートテーブル駆動）
+
+- config.yaml の proxy.routes に定義されたルートを起動時に登録する
+- 各ルートは共有HTTPクライアント経由で上流へストリーミング転送する
+- タイムアウト・リトライ・同時実行数はルート単位で設定可能
+"""
 
 # ------------------------------------------------------------------------------
 # インポート
 # ------------------------------------------------------------------------------
+import asyncio
+import inspect
 import logging
-import httpx
-from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Path
-from fastapi.responses import JSONResponse
+import string
+from typing import Any, Dict, List, Optional, Type
+
+from fastapi import APIRouter, Depends, Path, Request
+from pydantic import BaseModel
 
 from app.model.bff_quotes import (
     PensionQuoteRequestModel,
     QuoteStateUpdateRequest,
     PartialQuoteUpdateModel,
+    PensionQuoteSimulationRequestModel,
+    PensionQuoteMonteCarloRequestModel,
 )
 from app.model.bff_applications import (
     PensionApplicationRequestModel,
@@ -20,6 +32,8 @@ from app.model.bff_applications import (
     PartialApplicationUpdateModel
 )
 from app.dependencies.auth_guard import get_valid_session
+from app.dependencies.http_clients import UpstreamClients, get_http_clients
+from app.services.bff_proxy_service import ProxyRoute, RetryPolicy, stream_upstream
 
 from app.config.config import Config
 
@@ -27,425 +41,154 @@ from app.config.config import Config
 # 初期設定
 # ------------------------------------------------------------------------------
 logger = logging.getLogger(__name__)
-router = APIRouter()
 config = Config()
 
-QUOTES_CREATE_URL = config.quotation_service["base_url"] + config.quotation_service["create_path"]
-QUOTES_GET_URL = config.quotation_service["base_url"] + config.quotation_service["get_path"]
-QUOTES_CHANGE_URL = config.quotation_service["base_url"] + config.quotation_service["change_path"]
-QUOTES_CHANGE_STATUS_ADDITIONAL_PATH = config.quotation_service["change_status_additional_path"]
-
-APPLICATIONS_CREATE_URL = config.application_service["base_url"] + config.application_service["create_path"]
-APPLICATIONS_GET_URL = config.application_service["base_url"] + config.application_service["get_path"]
-APPLICATIONS_CHANGE_URL = config.application_service["base_url"] + config.application_service["change_path"]
-APPLICATIONS_CHANGE_STATUS_ADDITIONAL_PATH = config.application_service["change_status_additional_path"]
+# 上流サービス名 → ベースURL
+UPSTREAM_BASE_URLS: Dict[str, str] = {
+    "quotation": config.quotation_service.get("base_url", ""),
+    "application": config.application_service.get("base_url", ""),
+    "contract": config.contraction_service.get("base_url", ""),
+    "plans": config.plans_service.get("base_url", ""),
+}
+
+# ルート定義で参照できるリクエスト本文モデル
+BODY_MODELS: Dict[str, Type[BaseModel]] = {
+    "PensionQuoteRequestModel": PensionQuoteRequestModel,
+    "QuoteStateUpdateRequest": QuoteStateUpdateRequest,
+    "PartialQuoteUpdateModel": PartialQuoteUpdateModel,
+    "PensionQuoteSimulationRequestModel": PensionQuoteSimulationRequestModel,
+    "PensionQuoteMonteCarloRequestModel": PensionQuoteMonteCarloRequestModel,
+    "PensionApplicationRequestModel": PensionApplicationRequestModel,
+    "ApplicationStatusUpdateRequest": ApplicationStatusUpdateRequest,
+    "PartialApplicationUpdateModel": PartialApplicationUpdateModel,
+}
 
-CONTRACTS_URL = config.contraction_service["base_url"] + config.contraction_service["get_path"]
 
 # ------------------------------------------------------------------------------
-# Quotation_service Proxy API
+# ルート定義の読み込み（defaults を各ルートにマージ）
 # ------------------------------------------------------------------------------
-@router.post("/quotes/pension")
-async def post_pension_quote(
-    request_model: PensionQuoteRequestModel,
-    user_session: dict = Depends(get_valid_session)
-):
+def load_proxy_routes(proxy_config: Dict[str, Any]) -> List[ProxyRoute]:
     """
-    個人年金保険の見積もり作成処理（BFF経由で quotation_service を呼び出す）
-
-    - 成功時は PensionQuoteResponseModel を返却
+    config.yaml の proxy セクションからルート定義を生成する
     """
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の見積処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                QUOTES_CREATE_URL,
-                headers=headers,
-                content=request_model.json()
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 見積作成失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="見積もり作成APIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 見積もり作成成功 quote_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
-
-    except Exception as e:
-        logger.exception("[BFF] 見積作成処理中に例外発生")
-        raise HTTPException(status_code=500, detail="見積もり作成処理に失敗しました")
-    
-@router.put("/my/quotes/{quote_id}/changestate")
-async def update_quote_state(
-    payload: QuoteStateUpdateRequest,
-    quote_id: str = Path(..., description="更新対象の見積もりID"),
-    user_session: dict = Depends(get_valid_session)
-): 
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の見積ステータス更新処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                QUOTES_CHANGE_URL + "/" + quote_id + QUOTES_CHANGE_STATUS_ADDITIONAL_PATH,
-                headers=headers,
-                content=payload.json()
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 見積ステータス更新失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="見積ステータス更新APIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 見積ステータス更新成功 quote_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
-
-    except Exception as e:
-        logger.exception("[BFF] 見積ステータス更新処理中に例外発生")
-        raise HTTPException(status_code=500, detail="見積ステータス更新処理に失敗しました")
-    
-@router.patch("/my/quotes/{quote_id}")
-async def patch_my_quote(
-    payload: PartialQuoteUpdateModel,
-    quote_id: str = Path(..., description="対象の見積もりID"),
-    user_session: dict = Depends(get_valid_session)
-):
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の見積更新処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                QUOTES_CHANGE_URL + "/" + quote_id,
-                headers=headers,
-                content=payload.json()
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 見積更新失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="見積更新APIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 見積更新成功 quote_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
-
-    except Exception as e:
-        logger.exception("[BFF] 見積更新処理中に例外発生")
-        raise HTTPException(status_code=500, detail="見積更新処理に失敗しました")
-    
-@router.delete("/my/quotes/{quote_id}")
-async def update_quote_state(
-    quote_id: str = Path(..., description="削除対象の見積もりID"),
-    user_session: dict = Depends(get_valid_session)
-):
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の見積削除処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                QUOTES_CHANGE_URL + "/" + quote_id,
-                headers=headers
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 見積削除失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="見積削除APIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 見積削除成功 quote_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
-
-    except Exception as e:
-        logger.exception("[BFF] 見積削除処理中に例外発生")
-        raise HTTPException(status_code=500, detail="見積削除処理に失敗しました")
-    
-@router.get("/my/quotes")
-async def get_my_quotes(
-    user_session: dict = Depends(get_valid_session)
-):
-
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の見積取得処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                QUOTES_GET_URL,
-                headers=headers,
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 見積取得失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="見積もり取得APIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 見積取得成功 quote_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
-
-    except Exception as e:
-        logger.exception("[BFF] 見積取得処理中に例外発生")
-        raise HTTPException(status_code=500, detail="見積取得処理に失敗しました")
-    
-@router.get("/my/quotes/{quote_id}")
-async def get_my_quotes(
-    quote_id: str = Path(..., description="取得対象の見積もりID"),
-    user_session: dict = Depends(get_valid_session)
-):
-
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の見積取得処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                QUOTES_GET_URL + "/" + quote_id,
-                headers=headers,
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 見積取得失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="見積もり取得APIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 見積取得成功 quote_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
+    defaults = proxy_config.get("defaults", {})
+    routes = []
+    for entry in proxy_config.get("routes", []):
+        merged = {**defaults, **entry}
+        merged["retry"] = {**defaults.get("retry", {}), **entry.get("retry", {})}
+        route = ProxyRoute(**merged)
+        if route.upstream not in UPSTREAM_BASE_URLS:
+            raise ValueError(f"未定義の上流サービスです: {route.upstream}")
+        if route.body_model and route.body_model not in BODY_MODELS:
+            raise ValueError(f"未定義の本文モデルです: {route.body_model}")
+        routes.append(route)
+    return routes
 
-    except Exception as e:
-        logger.exception("[BFF] 見積取得処理中に例外発生")
-        raise HTTPException(status_code=500, detail="見積取得処理に失敗しました")
 
 # ------------------------------------------------------------------------------
-# Application_service Proxy API
+# ルートハンドラ生成
 # ------------------------------------------------------------------------------
-@router.post("/applications/pension")
-async def post_application(
-    request_model: PensionApplicationRequestModel,
-    user_session: dict = Depends(get_valid_session)
-):
+def _path_params(path: str) -> List[str]:
+    return [name for _, name, _, _ in string.Formatter().parse(path) if name]
 
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の申込処理開始")
 
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                APPLICATIONS_CREATE_URL,
-                headers=headers,
-                content=request_model.json()
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 申込失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="申込APIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 申込成功 quote_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
-
-    except Exception as e:
-        logger.exception("[BFF] 申込処理中に例外発生")
-        raise HTTPException(status_code=500, detail="申込処理に失敗しました")
-    
-@router.put("/my/applications/{application_id}/changestate")
-async def update_application_satus(
-    payload: ApplicationStatusUpdateRequest,
-    application_id: str = Path(..., description="更新対象の申込ID"),
-    user_session: dict = Depends(get_valid_session)
-):
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の申込ステータス更新処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                APPLICATIONS_CHANGE_URL + "/" + application_id + APPLICATIONS_CHANGE_STATUS_ADDITIONAL_PATH,
-                headers=headers,
-                content=payload.json()
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 申込ステータス更新失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="申込ステータス更新APIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 申込ステータス更新成功 application_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
-
-    except Exception as e:
-        logger.exception("[BFF] 申込ステータス更新処理中に例外発生")
-        raise HTTPException(status_code=500, detail="申込ステータス更新処理に失敗しました")
-    
-@router.patch("/my/applications/{application_id}")
-async def patch_my_application(
-    payload: PartialApplicationUpdateModel,
-    application_id: str = Path(..., description="更新対象の申込ID"),
-    user_session: dict = Depends(get_valid_session)
-):
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の申込更新処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                APPLICATIONS_CHANGE_URL + "/" + application_id,
-                headers=headers,
-                content=payload.json()
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 見積更新失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="見積更新APIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 見積更新成功 application_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
-
-    except Exception as e:
-        logger.exception("[BFF] 見積更新処理中に例外発生")
-        raise HTTPException(status_code=500, detail="見積更新処理に失敗しました")
-    
-@router.delete("/my/applications/{application_id}")
-async def delete_application_state(
-    application_id: str = Path(..., description="更新対象の申込ID"),
-    user_session: dict = Depends(get_valid_session)
-):
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の申込キャンセル処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                APPLICATIONS_CHANGE_URL + "/" + application_id,
-                headers=headers
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 申込キャンセル失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="申込キャンセルAPIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 申込キャンセル成功 application_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
-
-    except Exception as e:
-        logger.exception("[BFF] 申込キャンセル処理中に例外発生")
-        raise HTTPException(status_code=500, detail="申込キャンセル処理に失敗しました")
-    
-@router.get("/my/applications")
-async def get_my_applications(
-    user_session: dict = Depends(get_valid_session)
-):
-
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の申込取得処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                APPLICATIONS_GET_URL,
-                headers=headers,
-            )
-
-        if response.status_code != 200:
-            logger.error(f"[BFF] 申込取得失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="申込取得APIの呼び出しに失敗しました")
-
-        logger.info(f"[BFF] 申込取得成功 quote_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
-
-    except Exception as e:
-        logger.exception("[BFF] 申込取得処理中に例外発生")
-        raise HTTPException(status_code=500, detail="申込取得処理に失敗しました")
-    
-@router.get("/my/applications/{application_id}")
-async def get_my_application_by_id(
-    application_id: str = Path(..., description="取得対象の申込ID"),
-    user_session: dict = Depends(get_valid_session)
-):
-
-    user_id = user_session["user_info"]["sub"]
-    access_token = user_session["access_token"]
-    logger.info(f"[BFF] ユーザー {user_id} の見積取得処理開始")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                APPLICATIONS_GET_URL + "/" + application_id,
-                headers=headers,
-            )
+def _build_handler(route: ProxyRoute):
+    """
+    ルート定義から FastAPI のハンドラ関数を生成する
 
-        if response.status_code != 200:
-            logger.error(f"[BFF] 申込取得失敗: status={response.status_code}, body={response.text}")
-            raise HTTPException(status_code=response.status_code, detail="申込取得APIの呼び出しに失敗しました")
+    シグネチャ（パスパラメータ・本文モデル・セッション依存）を動的に組み立て、
+    従来の手書きハンドラと同じ検証・OpenAPI 定義になるようにする。
+    """
+    base_url = UPSTREAM_BASE_URLS[route.upstream]
+    body_model = BODY_MODELS.get(route.body_model) if route.body_model else None
+    limiter: Optional[asyncio.Semaphore] = (
+        asyncio.Semaphore(route.max_concurrency) if route.max_concurrency else None
+    )
+    retry: RetryPolicy = route.retry
+    path_names = _path_params(route.path)
+
+    async def handler(request: Request, **kwargs):
+        user_session: Optional[dict] = kwargs.get("user_session")
+        http_clients: UpstreamClients = kwargs["http_clients"]
+        path_values = {name: kwargs[name] for name in path_names}
+
+        headers = {"Content-Type": "application/json"}
+        if user_session is not None:
+            user_id = user_session["user_info"]["sub"]
+            headers["Authorization"] = f"Bearer {user_session['access_token']}"
+            logger.info(f"[BFF] ユーザー {user_id} の{route.label}処理開始")
+        else:
+            logger.info(f"[BFF] {route.label}処理開始")
+
+        payload: Optional[BaseModel] = kwargs.get("payload")
+        if payload is not None:
+            content = payload.json().encode("utf-8")
+        elif route.method in ("POST", "PUT", "PATCH"):
+            content = await request.body() or None
+        else:
+            content = None
+
+        return await stream_upstream(
+            client=http_clients.get(route.upstream),
+            method=route.method,
+            url=base_url + route.upstream_path.format(**path_values),
+            headers=headers,
+            label=route.label,
+            content=content,
+            params=dict(request.query_params) or None,
+            timeout=route.timeout,
+            retry=retry,
+            limiter=limiter,
+            queue_timeout=route.queue_timeout,
+        )
+
+    parameters = [
+        inspect.Parameter("request", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=Request)
+    ]
+    for name in path_names:
+        parameters.append(inspect.Parameter(
+            name, inspect.Parameter.KEYWORD_ONLY, annotation=str, default=Path(...)
+        ))
+    if body_model is not None:
+        parameters.append(inspect.Parameter(
+            "payload", inspect.Parameter.KEYWORD_ONLY, annotation=body_model
+        ))
+    if route.auth == "session":
+        parameters.append(inspect.Parameter(
+            "user_session", inspect.Parameter.KEYWORD_ONLY, annotation=dict,
+            default=Depends(get_valid_session)
+        ))
+    parameters.append(inspect.Parameter(
+        "http_clients", inspect.Parameter.KEYWORD_ONLY, annotation=UpstreamClients,
+        default=Depends(get_http_clients)
+    ))
+    handler.__signature__ = inspect.Signature(parameters)
+    handler.__name__ = "proxy_" + route.method.lower() + "_" + "_".join(
+        part.strip("{}").replace("-", "_") for part in route.path.strip("/").split("/")
+    )
+    handler.__doc__ = f"{route.label}（BFF経由で {route.upstream} を呼び出す）"
+    return handler
 
-        logger.info(f"[BFF] 申込取得成功 quote_id含む")
-        return JSONResponse(content=response.json(), status_code=response.status_code)
 
-    except Exception as e:
-        logger.exception("[BFF] 申込取得処理中に例外発生")
-        raise HTTPException(status_code=500, detail="申込取得処理に失敗しました")
\ No newline at end of file
+# ------------------------------------------------------------------------------
+# ルーター構築
+# ------------------------------------------------------------------------------
+def build_proxy_router(routes: List[ProxyRoute]) -> APIRouter:
+    """
+    ルート定義一覧から APIRouter を構築する
+    """
+    proxy_router = APIRouter()
+    for route in routes:
+        proxy_router.add_api_route(
+            route.path,
+            _build_handler(route),
+            methods=[route.method],
+        )
+        logger.info(
+            "[BFF] プロキシルート登録: %s %s -> %s%s",
+            route.method, route.path, route.upstream, route.upstream_path
+        )
+    return proxy_router
+
+
+router = build_proxy_router(load_proxy_routes(config.proxy))
@@ -11,7 +11,6 @@ import json
 import base64
 from urllib.parse import urlencode
 
-import httpx
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import RedirectResponse, JSONResponse
 
@@ -116,23 +115,23 @@ async def auth_callback(request: Request, code: str, state: str = None):
     }
 
     # アクセストークン取得
-    async with httpx.AsyncClient() as client:
-        logger.info("Keycloakにトークン取得リクエスト送信")
-        token_resp = await client.post(
-            oidc_client.endpoints["token_endpoint"], data=data
-        )
-        token_resp.raise_for_status()
-        token_data = token_resp.json()
-        logger.info("アクセストークン取得成功")
-
-        # ユーザー情報取得
-        userinfo_resp = await client.get(
-            oidc_client.endpoints["userinfo_endpoint"],
-            headers={"Authorization": f"Bearer {token_data['access_token']}"},
-        )
-        userinfo_resp.raise_for_status()
-        userinfo_data = userinfo_resp.json()
-        logger.info(f"ユーザ情報取得成功: サブID={userinfo_data['sub']}")
+    client = request.app.state.http_clients.get("keycloak")
+    logger.info("Keycloakにトークン取得リクエスト送信")
+    token_resp = await client.post(
+        oidc_client.endpoints["token_endpoint"], data=data
+    )
+    token_resp.raise_for_status()
+    token_data = token_resp.json()
+    logger.info("アクセストークン取得成功")
+
+    # ユーザー情報取得
+    userinfo_resp = await client.get(
+        oidc_client.endpoints["userinfo_endpoint"],
+        headers={"Authorization": f"Bearer {token_data['access_token']}"},
+    )
+    userinfo_resp.raise_for_status()
+    userinfo_data = userinfo_resp.json()
+    logger.info(f"ユーザ情報取得成功: サブID={userinfo_data['sub']}")
 
     # セッション情報構築
     session_data = {
@@ -177,14 +176,14 @@ async def logout(request: Request):
             "refresh_token": refresh_token,
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                logger.info("Keycloakにトークン失効要求送信")
-                resp = await client.post(logout_url, data=data)
-                resp.raise_for_status()
-                logger.info("Keycloak側トークン失効成功")
-            except Exception as e:
-                logger.warning(f"KeycloakログアウトAPI失敗: {e}")
+        client = request.app.state.http_clients.get("keycloak")
+        try:
+            logger.info("Keycloakにトークン失効要求送信")
+            resp = await client.post(logout_url, data=data)
+            resp.raise_for_status()
+            logger.info("Keycloak側トークン失効成功")
+        except Exception as e:
+            logger.warning(f"KeycloakログアウトAPI失敗: {e}")
 
     # セッションとCookie削除
     response = JSONResponse(content={"message": "ログアウト完了"})
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+運用メトリクス公開ルーター
+
+- 上流HTTPクライアントの接続プール利用状況等を JSON で返す（監視・チューニング用）
+- NATS 接続の readiness を返す（未接続の場合は 503）
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+from app.dependencies.http_clients import UpstreamClients, get_http_clients
+from app.services.bff_dashboard_cache import dashboard_cache
+from app.services.nats_connection import nats_manager
+
+# ------------------------------------------------------------------------------
+# 初期化
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+# ------------------------------------------------------------------------------
+# メトリクス取得エンドポイント
+# ------------------------------------------------------------------------------
+@router.get("/internal/metrics")
+async def get_metrics(
+    http_clients: UpstreamClients = Depends(get_http_clients)
+) -> Dict[str, Any]:
+    """
+    BFF 内部の計測値を返す
+
+    Returns:
+        dict: 各コンポーネントのメトリクス
+    """
+    return {
+        "http_clients": http_clients.snapshot(),
+        "dashboard_cache": dashboard_cache.snapshot(),
+        "nats_connection": nats_manager.snapshot(),
+    }
+
+
+# ------------------------------------------------------------------------------
+# readiness エンドポイント
+# ------------------------------------------------------------------------------
+@router.get("/internal/health/ready")
+async def get_readiness() -> JSONResponse:
+    """
+    NATS 接続が確立している場合に 200、未接続・再接続中の場合に 503 を返す
+
+    Returns:
+        JSONResponse: NATS 接続の状態
+    """
+    health = {"nats": nats_manager.health()}
+    ready = all(component["ready"] for component in health.values())
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, **health})
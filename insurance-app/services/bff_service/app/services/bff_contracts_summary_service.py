@@ -9,10 +9,11 @@
 # インポート
 # ------------------------------------------------------------------------------
 import logging
-import httpx
 from app.model.bff_contracts_summary import ContractSummaryResponseModel
 
 from app.config.config import Config
+from app.dependencies.http_clients import UpstreamClients
+from app.services.bff_pagination import fetch_all_pages
 
 # ------------------------------------------------------------------------------
 # 初期設定
@@ -25,17 +26,14 @@ CONTRACTS_URL = config.contraction_service["base_url"] + config.contraction_serv
 # ------------------------------------------------------------------------------
 # サービスロジック
 # ------------------------------------------------------------------------------
-async def fetch_contract_summary(access_token: str) -> ContractSummaryResponseModel:
+async def fetch_contract_summary(access_token: str, http_clients: UpstreamClients) -> ContractSummaryResponseModel:
     """
     契約一覧を取得し、ステータス別に件数を集計して返す
     """
     headers = {"Authorization": f"Bearer {access_token}"}
 
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(CONTRACTS_URL, headers=headers)
-            resp.raise_for_status()
-            contracts = resp.json()
+        contracts = await fetch_all_pages(http_clients.get("contract"), CONTRACTS_URL, headers)
     except Exception as e:
         logger.exception("契約情報取得失敗")
         raise
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+/bff/my/dashboard 用キャッシュ（Redis）
+
+責務:
+- 集約済みダッシュボードをユーザー単位で Redis に保存し、ヒット時は上流呼び出しを省略する
+- 見積・申込・契約イベント（NATS）を契機にユーザーのキャッシュを無効化する
+- イベント取りこぼし時の保険として TTL で必ず失効させる
+- stale-while-revalidate 有効時は、古いキャッシュを返しつつ裏で再集約する
+
+キー構成（prefix は config.yaml の dashboard_cache.key_prefix）:
+- {prefix}:data:{user_id}    … ダッシュボード JSON（TTL = ttl + stale_ttl）
+- {prefix}:fresh:{user_id}   … 鮮度フラグ（TTL = ttl、無効化時は削除）
+- {prefix}:owner:{entity_id} … 見積ID・申込ID → user_id の逆引き（user_id を持たないイベント用）
+- {prefix}:refresh:{user_id} … 再集約の重複実行防止ロック
+- {prefix}:gen:{user_id}     … 無効化の世代番号（無効化ごとに INCR。集約中に無効化された結果は保存しない）
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from redis.exceptions import WatchError
+
+from app.model.bff_dashboard import DashboardResponseModel
+from app.dependencies.session_manager import redis_client
+
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 初期設定
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+config = Config()
+
+# 既定値（config.yaml の dashboard_cache で上書き可能）
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "ttl_seconds": 60,
+    "stale_while_revalidate": False,
+    "stale_ttl_seconds": 300,
+    "refresh_lock_seconds": 10,
+    "key_prefix": "bff:dashboard",
+}
+
+
+# ------------------------------------------------------------------------------
+# キャッシュ本体
+# ------------------------------------------------------------------------------
+class DashboardCache:
+    """
+    ユーザー単位のダッシュボードキャッシュ
+    """
+
+    def __init__(self, redis, settings: Optional[Dict[str, Any]] = None):
+        """
+        Parameters:
+            redis: redis.asyncio クライアント（セッションと同じ接続を共有）
+            settings (dict): config.yaml の dashboard_cache セクション
+        """
+        s = {**DEFAULT_SETTINGS, **(settings or {})}
+        self._redis = redis
+        self.enabled = bool(s["enabled"])
+        self.ttl = int(s["ttl_seconds"])
+        self.swr = bool(s["stale_while_revalidate"])
+        self.stale_ttl = int(s["stale_ttl_seconds"]) if self.swr else 0
+        self.refresh_lock_seconds = int(s["refresh_lock_seconds"])
+        self.prefix = s["key_prefix"]
+
+        # 実行中のバックグラウンド再集約（GC 回収防止のため参照を保持）
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+        # 統計
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.discarded_writes = 0
+        self.errors = 0
+
+    # --------------------------------------------------------------------------
+    # キー生成
+    # --------------------------------------------------------------------------
+    def _data_key(self, user_id: str) -> str:
+        return f"{self.prefix}:data:{user_id}"
+
+    def _fresh_key(self, user_id: str) -> str:
+        return f"{self.prefix}:fresh:{user_id}"
+
+    def _owner_key(self, entity_id: str) -> str:
+        return f"{self.prefix}:owner:{entity_id}"
+
+    def _refresh_key(self, user_id: str) -> str:
+        return f"{self.prefix}:refresh:{user_id}"
+
+    def _gen_key(self, user_id: str) -> str:
+        return f"{self.prefix}:gen:{user_id}"
+
+    # --------------------------------------------------------------------------
+    # 読み込み・書き込み
+    # --------------------------------------------------------------------------
+    async def get(self, user_id: str) -> Tuple[Optional[bytes], bool, Optional[bytes]]:
+        """
+        キャッシュ済みダッシュボードを取得する（MGET 1 回）
+
+        Returns:
+            (JSON バイト列 or None, 鮮度切れかどうか, 取得時点の無効化世代)
+        """
+        data, fresh, generation = await self._redis.mget(
+            self._data_key(user_id), self._fresh_key(user_id), self._gen_key(user_id)
+        )
+        if data is None:
+            self.misses += 1
+            return None, False, generation
+        if fresh is None:
+            return data, True, generation
+        self.hits += 1
+        return data, False, generation
+
+    async def put(self, user_id: str, dashboard: DashboardResponseModel, generation: Optional[bytes]) -> bytes:
+        """
+        ダッシュボードを保存し、見積ID・申込ID → user_id の逆引きを登録する
+
+        集約開始前に読んだ世代（generation）から無効化世代が進んでいる場合は、
+        無効化前のデータで上書きしないよう保存しない（WATCH で世代の変化を検知する）。
+
+        Returns:
+            bytes: 集約結果の JSON（保存しなかった場合もそのままレスポンスに使える）
+        """
+        body = dashboard.model_dump_json().encode("utf-8")
+        hard_ttl = self.ttl + self.stale_ttl
+
+        entity_ids = [str(q.quote_id) for q in dashboard.quotes]
+        entity_ids += [str(a.application_id) for a in dashboard.applications]
+        entity_ids += [str(c.contract_id) for c in dashboard.contracts]
+
+        gen_key = self._gen_key(user_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(gen_key)
+                if await pipe.get(gen_key) != generation:
+                    self.discarded_writes += 1
+                    logger.info("[ダッシュボードキャッシュ] 集約中に無効化されたため保存しない: user_id=%s", user_id)
+                    return body
+                pipe.multi()
+                pipe.set(self._data_key(user_id), body, ex=hard_ttl)
+                pipe.set(self._fresh_key(user_id), b"1", ex=self.ttl)
+                for entity_id in entity_ids:
+                    pipe.set(self._owner_key(entity_id), user_id, ex=hard_ttl)
+                await pipe.execute()
+            except WatchError:
+                self.discarded_writes += 1
+                logger.info("[ダッシュボードキャッシュ] 集約中に無効化されたため保存しない: user_id=%s", user_id)
+        return body
+
+    # --------------------------------------------------------------------------
+    # 無効化
+    # --------------------------------------------------------------------------
+    async def invalidate_user(self, user_id: str) -> None:
+        """
+        ユーザーのキャッシュを無効化する
+
+        stale-while-revalidate 有効時は鮮度フラグのみ削除し、次回アクセスで
+        古いデータを返しつつ再集約する。無効時はデータごと削除する。
+        無効化世代を進め、実行中の集約が無効化前のデータを保存しないようにする。
+        """
+        keys = [self._fresh_key(user_id)]
+        if not self.swr:
+            keys.append(self._data_key(user_id))
+        gen_key = self._gen_key(user_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.delete(*keys)
+        pipe.incr(gen_key)
+        pipe.expire(gen_key, self.ttl + self.stale_ttl + self.refresh_lock_seconds)
+        await pipe.execute()
+        self.invalidations += 1
+        logger.info("[ダッシュボードキャッシュ] 無効化: user_id=%s", user_id)
+
+    async def invalidate_entities(self, entity_ids: Iterable[str]) -> None:
+        """
+        見積ID・申込ID・契約IDから所有ユーザーを逆引きして無効化する
+        """
+        keys = [self._owner_key(e) for e in entity_ids if e]
+        if not keys:
+            return
+        owners = await self._redis.mget(*keys)
+        for user_id in {o.decode() if isinstance(o, bytes) else o for o in owners if o}:
+            await self.invalidate_user(user_id)
+
+    # --------------------------------------------------------------------------
+    # 取得（キャッシュ経由）
+    # --------------------------------------------------------------------------
+    async def get_or_load(
+        self,
+        user_id: str,
+        loader: Callable[[], Awaitable[DashboardResponseModel]],
+    ) -> bytes:
+        """
+        キャッシュを優先してダッシュボード JSON を返す
+
+        - ヒット: Redis の値をそのまま返す
+        - 鮮度切れ（stale-while-revalidate 有効時）: 古い値を返し、裏で再集約
+        - ミス: loader で集約して保存してから返す
+        Redis 障害時は loader の結果をそのまま返す（キャッシュは迂回）。
+        """
+        try:
+            data, stale, generation = await self.get(user_id)
+        except Exception:
+            self.errors += 1
+            logger.exception("[ダッシュボードキャッシュ] 読み込み失敗（上流から直接取得）")
+            return (await loader()).model_dump_json().encode("utf-8")
+
+        if data is not None and not stale:
+            return data
+        if data is not None and self.swr:
+            self.stale_hits += 1
+            self._schedule_refresh(user_id, loader, generation)
+            return data
+        if data is not None:
+            self.misses += 1
+
+        dashboard = await loader()
+        try:
+            return await self.put(user_id, dashboard, generation)
+        except Exception:
+            self.errors += 1
+            logger.exception("[ダッシュボードキャッシュ] 書き込み失敗")
+            return dashboard.model_dump_json().encode("utf-8")
+
+    def _schedule_refresh(
+        self,
+        user_id: str,
+        loader: Callable[[], Awaitable[DashboardResponseModel]],
+        generation: Optional[bytes],
+    ) -> None:
+        task = asyncio.create_task(self._refresh(user_id, loader, generation))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(
+        self,
+        user_id: str,
+        loader: Callable[[], Awaitable[DashboardResponseModel]],
+        generation: Optional[bytes],
+    ) -> None:
+        """
+        バックグラウンド再集約（同一ユーザーの同時再集約はロックで 1 本にまとめる）
+        """
+        lock_key = self._refresh_key(user_id)
+        try:
+            if not await self._redis.set(lock_key, b"1", nx=True, ex=self.refresh_lock_seconds):
+                return
+            try:
+                await self.put(user_id, await loader(), generation)
+                logger.info("[ダッシュボードキャッシュ] 再集約完了: user_id=%s", user_id)
+            finally:
+                await self._redis.delete(lock_key)
+        except Exception:
+            self.errors += 1
+            logger.exception("[ダッシュボードキャッシュ] 再集約失敗: user_id=%s", user_id)
+
+    # --------------------------------------------------------------------------
+    # メトリクス
+    # --------------------------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        キャッシュ統計を返す
+        """
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "stale_while_revalidate": self.swr,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "discarded_writes": self.discarded_writes,
+            "errors": self.errors,
+            "hit_ratio": round((self.hits + self.stale_hits) / total, 4) if total else 0.0,
+            "refreshing": len(self._refresh_tasks),
+        }
+
+
+# ------------------------------------------------------------------------------
+# 共有インスタンス
+# ------------------------------------------------------------------------------
+dashboard_cache = DashboardCache(redis_client, config.dashboard_cache)
@@ -9,7 +9,6 @@
 # インポート
 # ------------------------------------------------------------------------------
 import logging
-import httpx
 import asyncio
 from app.model.bff_dashboard import (
     DashboardResponseModel,
@@ -21,6 +20,8 @@ from app.model.bff_dashboard import (
 )
 
 from app.config.config import Config
+from app.dependencies.http_clients import UpstreamClients
+from app.services.bff_pagination import fetch_all_pages
 
 # ------------------------------------------------------------------------------
 # 初期設定
@@ -33,34 +34,49 @@ QUOTES_URL = config.quotation_service["base_url"] + config.quotation_service["ge
 APPLICATIONS_URL = config.application_service["base_url"] + config.application_service["get_path"]
 CONTRACTS_URL = config.contraction_service["base_url"] + config.contraction_service["get_path"]
 
+# 上流一覧APIから取得する項目（fields= による絞り込み）
+QUOTE_FIELDS = (
+    "quote_id", "quote_state", "plan_code", "monthly_premium",
+    "payment_period_years", "contract_date", "created_at", "scenarios",
+)
+APPLICATION_FIELDS = (
+    "application_id", "quote_id", "application_status", "monthly_premium",
+    "contract_date", "plan_code", "applied_at", "scenarios",
+)
+
 # ------------------------------------------------------------------------------
 # サービスロジック
 # ------------------------------------------------------------------------------
-async def fetch_user_dashboard(access_token: str) -> DashboardResponseModel:
+async def fetch_user_dashboard(access_token: str, http_clients: UpstreamClients) -> DashboardResponseModel:
     """
     ユーザー個別の見積もり・申込・契約を一括取得する
     """
     headers = {"Authorization": f"Bearer {access_token}"}
 
-    async with httpx.AsyncClient() as client:
-        try:
-#            quote_resp, app_resp, contract_resp = await asyncio.gather(
-#                client.get(QUOTES_URL, headers=headers),
-#                client.get(APPLICATIONS_URL, headers=headers),
-#                client.get(CONTRACTS_URL, headers=headers)
-#            )
-            quote_resp, app_resp= await asyncio.gather(
-                client.get(QUOTES_URL, headers=headers),
-                client.get(APPLICATIONS_URL, headers=headers)
+    try:
+#        quote_resp, app_resp, contract_resp = await asyncio.gather(
+#            http_clients.get("quotation").get(QUOTES_URL, headers=headers),
+#            http_clients.get("application").get(APPLICATIONS_URL, headers=headers),
+#            http_clients.get("contract").get(CONTRACTS_URL, headers=headers)
+#        )
+        # ダッシュボード表示に必要な項目のみを全ページ取得
+        quotes_raw, applications_raw = await asyncio.gather(
+            fetch_all_pages(
+                http_clients.get("quotation"), QUOTES_URL, headers,
+                fields=QUOTE_FIELDS
+            ),
+            fetch_all_pages(
+                http_clients.get("application"), APPLICATIONS_URL, headers,
+                fields=APPLICATION_FIELDS
             )
-        except Exception as e:
-            logger.exception("外部API呼び出し失敗")
-            raise
+        )
+    except Exception as e:
+        logger.exception("外部API呼び出し失敗")
+        raise
 
     # 見積もりの整形
     quotes = []
     try:
-        quotes_raw = quote_resp.json()
         for item in quotes_raw:
             quotes.append(
                 QuoteModel(
@@ -89,7 +105,6 @@ async def fetch_user_dashboard(access_token: str) -> DashboardResponseModel:
     # 申込の整形
     applications = []
     try:
-        applications_raw = app_resp.json()
         for item in applications_raw:
             applications.append(
                 ApplicationModel(
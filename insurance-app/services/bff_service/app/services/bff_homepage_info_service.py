@@ -9,7 +9,6 @@
 # インポート
 # ------------------------------------------------------------------------------
 import logging
-import httpx
 from app.model.bff_homepage_info import (
     HomepageInfoResponseModel,
     FeaturedPlanModel,
@@ -17,6 +16,7 @@ from app.model.bff_homepage_info import (
 )
 
 from app.config.config import Config
+from app.dependencies.http_clients import UpstreamClients
 
 # ------------------------------------------------------------------------------
 # 初期設定
@@ -29,17 +29,17 @@ PLANS_URL = config.plans_service["base_url"] + config.plans_service["get_path"]
 # ------------------------------------------------------------------------------
 # サービスロジック
 # ------------------------------------------------------------------------------
-async def fetch_homepage_info() -> HomepageInfoResponseModel:
+async def fetch_homepage_info(http_clients: UpstreamClients) -> HomepageInfoResponseModel:
     """
     トップページで使用する情報を集約
     - 保険紹介一覧（public_plans_service）
     - キャンペーン情報（現状はmock）
     """
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(PLANS_URL)
-            resp.raise_for_status()
-            plans = resp.json()
+        client = http_clients.get("plans")
+        resp = await client.get(PLANS_URL)
+        resp.raise_for_status()
+        plans = resp.json()
     except Exception as e:
         logger.warning(f"保険紹介取得失敗: {e}")
         plans = []
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+上流一覧APIのページ送り（キーセットカーソル追従）
+
+- 上流の一覧API（/my/quotes, /my/applications, /my/contracts）は limit 件ずつ返し、
+  続きがある場合は X-Next-Cursor ヘッダーにカーソルを返す
+- 集約系サービスはこのモジュールでカーソルを辿り、全件を透過的に取得する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 初期設定
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+config = Config()
+
+NEXT_CURSOR_HEADER = "x-next-cursor"
+PAGE_SIZE = config.pagination.get("page_size", 200)
+MAX_PAGES = config.pagination.get("max_pages", 100)
+
+
+# ------------------------------------------------------------------------------
+# 全ページ取得
+# ------------------------------------------------------------------------------
+async def fetch_all_pages(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: Dict[str, str],
+    fields: Optional[Sequence[str]] = None,
+) -> List[Any]:
+    """
+    X-Next-Cursor を辿って一覧APIの全ページを取得し、結合したリストを返す
+
+    Parameters:
+        client: 上流サービス用の共有HTTPクライアント
+        url: 一覧APIのURL
+        headers: リクエストヘッダー（Authorization など）
+        fields: 取得項目の絞り込み（任意、上流の fields= に渡す）
+
+    Raises:
+        httpx.HTTPStatusError: 上流が 2xx 以外を返した場合
+    """
+    params: Dict[str, Any] = {"limit": PAGE_SIZE}
+    if fields:
+        params["fields"] = ",".join(fields)
+
+    items: List[Any] = []
+    for _ in range(MAX_PAGES):
+        resp = await client.get(url, headers=headers, params=params)
+        resp.raise_for_status()
+        items.extend(resp.json())
+
+        next_cursor = resp.headers.get(NEXT_CURSOR_HEADER)
+        if not next_cursor:
+            return items
+        params["cursor"] = next_cursor
+
+    logger.warning(f"[BFF] ページ数上限に達したため取得を打ち切りました: url={url}, pages={MAX_PAGES}")
+    return items
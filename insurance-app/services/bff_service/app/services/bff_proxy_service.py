@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+BFF プロキシ用サービスロジック（ストリーミング透過転送）
+
+- 上流レスポンスを JSON デコード／再エンコードせず、バイト列のまま転送する
+- 上流のステータスと選択したヘッダーを引き継ぐ
+- 上流エラー時は従来どおり HTTPException に変換する
+- ルート単位のタイムアウト・参照メソッドのリトライ・同時実行数制限
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Literal, Optional
+
+import httpx
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+
+# ------------------------------------------------------------------------------
+# 初期設定
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# 上流からクライアントへ引き継ぐレスポンスヘッダー
+FORWARD_RESPONSE_HEADERS = (
+    "content-type",
+    "content-length",
+    "content-encoding",
+    "cache-control",
+    "etag",
+    "last-modified",
+    "x-next-cursor",
+)
+
+# リトライ対象とする参照メソッド
+SAFE_METHODS = {"GET", "HEAD"}
+
+# 上流にリクエストが届いていないことが確実な通信エラー（更新メソッドの retry_writes で再送する）
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.PoolTimeout)
+
+
+# ------------------------------------------------------------------------------
+# ルート定義モデル（config.yaml の proxy セクション）
+# ------------------------------------------------------------------------------
+class RetryPolicy(BaseModel):
+    """
+    リトライ方針（GET / HEAD に適用。更新メソッドは retry_writes 指定時のみ）
+    """
+    attempts: int = Field(1, ge=1, description="最大試行回数（初回を含む）")
+    backoff_seconds: float = Field(0.1, ge=0, description="初回リトライまでの待機秒（以降は倍々）")
+    on_status: List[int] = Field(default_factory=lambda: [502, 503, 504], description="リトライ対象の上流ステータス（GET / HEAD のみ）")
+    retry_writes: bool = Field(False, description="更新メソッドも接続失敗（上流に未到達）時に限り再送する")
+
+
+class ProxyRoute(BaseModel):
+    """
+    プロキシルート定義（1 エントリ = 1 エンドポイント）
+    """
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str = Field(..., description="BFF 側のパス（例: /my/quotes/{quote_id}）")
+    upstream: str = Field(..., description="上流サービス名（quotation / application / contract / plans）")
+    upstream_path: str = Field(..., description="上流パスのテンプレート（BFF パスのパラメータで展開）")
+    label: str = Field(..., description="ログ・エラーメッセージ用の処理名")
+    auth: Literal["session", "none"] = "session"
+    body_model: Optional[str] = Field(None, description="リクエスト本文の検証に使うモデル名")
+    timeout: Optional[float] = Field(None, description="上流呼び出しのタイムアウト秒")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="ルート単位の同時実行数上限")
+    queue_timeout: float = Field(2.0, ge=0, description="同時実行枠の待ち上限秒（超過時は503）")
+    retry: RetryPolicy = Field(default_factory=RetryPolicy)
+
+
+# ------------------------------------------------------------------------------
+# 上流レスポンスと同時実行枠の解放（複数経路から呼ばれても1回だけ解放する）
+# ------------------------------------------------------------------------------
+class _UpstreamRelease:
+    """
+    本文ストリームの終了時と、レスポンス送信後のバックグラウンドタスクの両方から呼び出す
+
+    - 本文の読み出し開始前にクライアントが切断した場合、ジェネレータの finally は実行されないため、
+      StreamingResponse の background で確実に解放する
+    """
+
+    def __init__(self, response: httpx.Response, limiter: Optional[asyncio.Semaphore] = None):
+        self.response = response
+        self.limiter = limiter
+        self.released = False
+
+    async def __call__(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        try:
+            await self.response.aclose()
+        finally:
+            if self.limiter is not None:
+                self.limiter.release()
+
+
+# ------------------------------------------------------------------------------
+# 本文のストリーミング（終了時に上流レスポンスと同時実行枠を解放）
+# ------------------------------------------------------------------------------
+async def _iter_body(response: httpx.Response, release: _UpstreamRelease) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in response.aiter_raw():
+            yield chunk
+    finally:
+        await release()
+
+
+async def _send_with_retry(
+    client: httpx.AsyncClient,
+    request: httpx.Request,
+    retry: RetryPolicy,
+    label: str,
+) -> httpx.Response:
+    """
+    GET / HEAD は通信エラーまたはリトライ対象ステータスで再送する
+
+    - 更新メソッド（POST / PUT / PATCH / DELETE）は状態遷移やイベント発行を伴うため再送しない
+    - retry_writes 指定のルートのみ、上流に届いていない接続失敗（ConnectError / PoolTimeout）に限り再送する
+    """
+    safe = request.method in SAFE_METHODS
+    attempts = retry.attempts if safe or retry.retry_writes else 1
+    retryable = httpx.TransportError if safe else NOT_SENT_ERRORS
+    delay = retry.backoff_seconds
+
+    for attempt in range(1, attempts + 1):
+        try:
+            response = await client.send(request, stream=True)
+        except retryable as e:
+            if attempt >= attempts:
+                raise
+            logger.warning(f"[BFF] {label} 通信エラーのため再試行: attempt={attempt}, error={e}")
+        else:
+            if not safe or response.status_code not in retry.on_status or attempt >= attempts:
+                return response
+            logger.warning(f"[BFF] {label} 上流ステータス{response.status_code}のため再試行: attempt={attempt}")
+            await response.aclose()
+
+        await asyncio.sleep(delay)
+        delay *= 2
+
+    raise RuntimeError("unreachable")
+
+
+# ------------------------------------------------------------------------------
+# サービスロジック
+# ------------------------------------------------------------------------------
+async def stream_upstream(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    headers: Dict[str, str],
+    label: str,
+    content: Optional[bytes] = None,
+    params: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    retry: Optional[RetryPolicy] = None,
+    limiter: Optional[asyncio.Semaphore] = None,
+    queue_timeout: float = 2.0,
+) -> StreamingResponse:
+    """
+    上流サービスへリクエストを送り、レスポンス本文をそのままストリーミングで返す
+
+    Parameters:
+        client: 上流サービス用の共有HTTPクライアント
+        method: HTTPメソッド
+        url: 上流URL
+        headers: 転送するリクエストヘッダー
+        label: ログ・エラーメッセージ用の処理名（例: "見積もり作成"）
+        content: リクエスト本文（任意）
+        params: クエリパラメータ（任意）
+        timeout: タイムアウト秒（未指定時はクライアント既定値）
+        retry: リトライ方針（GET / HEAD、retry_writes 指定時は更新メソッドの接続失敗にも適用）
+        limiter: 同時実行数を制限するセマフォ（任意）
+        queue_timeout: 同時実行枠の待ち上限秒
+
+    Returns:
+        StreamingResponse: 上流のステータス・ヘッダー・本文を引き継いだレスポンス
+
+    Raises:
+        HTTPException: 上流が 200 以外を返した場合は同じステータス、
+                       同時実行枠の待ち超過時は 503、通信失敗時は 500
+    """
+    if limiter is not None:
+        try:
+            await asyncio.wait_for(limiter.acquire(), timeout=queue_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"[BFF] {label} 同時実行数上限のため拒否")
+            raise HTTPException(status_code=503, detail=f"{label}処理が混雑しています")
+
+    try:
+        request = client.build_request(
+            method,
+            url,
+            headers=headers,
+            content=content,
+            params=params,
+            timeout=timeout if timeout is not None else client.timeout,
+        )
+        response = await _send_with_retry(client, request, retry or RetryPolicy(), label)
+    except Exception:
+        if limiter is not None:
+            limiter.release()
+        logger.exception(f"[BFF] {label}処理中に例外発生")
+        raise HTTPException(status_code=500, detail=f"{label}処理に失敗しました")
+
+    if response.status_code != 200:
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+            if limiter is not None:
+                limiter.release()
+        logger.error(f"[BFF] {label}失敗: status={response.status_code}, body={body[:1000]!r}")
+        raise HTTPException(status_code=response.status_code, detail=f"{label}APIの呼び出しに失敗しました")
+
+    forwarded = {
+        name: response.headers[name]
+        for name in FORWARD_RESPONSE_HEADERS
+        if name in response.headers
+    }
+    logger.info(f"[BFF] {label}成功: status={response.status_code}")
+    release = _UpstreamRelease(response, limiter)
+    return StreamingResponse(
+        _iter_body(response, release),
+        status_code=response.status_code,
+        headers=forwarded,
+        background=BackgroundTask(release),
+    )
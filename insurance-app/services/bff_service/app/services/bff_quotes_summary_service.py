@@ -9,12 +9,13 @@
 # インポート
 # ------------------------------------------------------------------------------
 import logging
-import httpx
 from typing import List
 from datetime import datetime
 from app.model.bff_quotes_summary import QuoteSummaryResponseModel
 
 from app.config.config import Config
+from app.dependencies.http_clients import UpstreamClients
+from app.services.bff_pagination import fetch_all_pages
 
 # ------------------------------------------------------------------------------
 # 初期設定
@@ -27,16 +28,17 @@ QUOTES_URL = config.quotation_service["base_url"] + config.quotation_service["ge
 # ------------------------------------------------------------------------------
 # サービスロジック
 # ------------------------------------------------------------------------------
-async def fetch_quote_summary(access_token: str) -> QuoteSummaryResponseModel:
+async def fetch_quote_summary(access_token: str, http_clients: UpstreamClients) -> QuoteSummaryResponseModel:
     """
     見積もり一覧からサマリー情報を集約する
     """
     headers = {"Authorization": f"Bearer {access_token}"}
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(QUOTES_URL, headers=headers)
-            resp.raise_for_status()
-            quotes = resp.json()
+        # サマリーに必要な項目のみを全ページ取得
+        quotes = await fetch_all_pages(
+            http_clients.get("quotation"), QUOTES_URL, headers,
+            fields=("quote_id", "quote_state", "created_at")
+        )
     except Exception as e:
         logger.exception("見積もり一覧取得失敗")
         raise
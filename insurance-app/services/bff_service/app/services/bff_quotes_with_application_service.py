@@ -5,9 +5,12 @@
 # ------------------------------------------------------------------------------
 import logging
 import asyncio
+
 import httpx
 
 from app.config.config import Config
+from app.dependencies.http_clients import UpstreamClients
+from app.services.bff_pagination import fetch_all_pages
 
 # ------------------------------------------------------------------------------
 # 初期設定
@@ -15,7 +18,7 @@ from app.config.config import Config
 logger = logging.getLogger(__name__)
 config = Config()
 
-async def fetch_quotes_with_application(access_token: str) -> list:
+async def fetch_quotes_with_application(access_token: str, http_clients: UpstreamClients) -> list:
     """
     見積もり一覧と申込一覧を取得し、quote_id をキーに合成する
     Returns:
@@ -25,18 +28,21 @@ async def fetch_quotes_with_application(access_token: str) -> list:
     application_url = f"{config.application_service['base_url']}/api/v1/my/applications"
     headers = {"Authorization": f"Bearer {access_token}"}
 
-    async with httpx.AsyncClient() as client:
-        quote_resp, app_resp = await asyncio.gather(
-            client.get(quotation_url, headers=headers),
-            client.get(application_url, headers=headers),
+    try:
+        quotes, applications = await asyncio.gather(
+            fetch_all_pages(http_clients.get("quotation"), quotation_url, headers),
+            fetch_all_pages(
+                http_clients.get("application"), application_url, headers,
+                fields=(
+                    "application_id", "quote_id", "application_status", "application_number",
+                    "applied_at", "payment_method", "user_consent", "identity_verified",
+                )
+            ),
         )
-
-    if quote_resp.status_code != 200 or app_resp.status_code != 200:
-        logger.error(f"[BFF] サービス呼び出し失敗: quote={quote_resp.status_code}, app={app_resp.status_code}")
+    except httpx.HTTPStatusError as e:
+        logger.error(f"[BFF] サービス呼び出し失敗: url={e.request.url}, status={e.response.status_code}")
         raise Exception("外部サービス呼び出しに失敗")
 
-    quotes = quote_resp.json()
-    applications = app_resp.json()
     logger.debug(f"[BFF] 取得件数: quotes={len(quotes)}, applications={len(applications)}")
 
     app_map = {app["quote_id"]: app for app in applications}
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+NATSイベント購読モジュール（bff_service）
+
+- "quotes.*" / "applications.*" / "contracts.*" トピックを購読
+- イベントに含まれる user_id、または見積ID・申込ID・契約IDの逆引きから
+  対象ユーザーを特定し、ダッシュボードキャッシュを無効化する
+"""
+
+import json
+import logging
+
+from nats.aio.msg import Msg
+
+from app.services.bff_dashboard_cache import dashboard_cache
+from app.services.nats_connection import nats_manager
+
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 設定・ロガー初期化
+# ------------------------------------------------------------------------------
+config = Config()
+logger = logging.getLogger(__name__)
+
+# 購読対象トピック
+SUBJECTS = ("quotes.*", "applications.*", "contracts.*")
+
+# ------------------------------------------------------------------------------
+# NATS購読処理のエントリポイント
+# ------------------------------------------------------------------------------
+async def run_nats_subscriber():
+    """
+    bff_service 起動時に呼び出されるNATS購読セットアップ関数。
+
+    - 共有のNATS接続（nats_manager）の確立を待つ
+    - 見積・申込・契約トピックを購読
+    - 受信メッセージを message_handler に委譲
+    """
+    logger.info("[NATS] サブスクライバ初期化開始")
+    try:
+        logger.debug(f"[NATS] 接続先: {config.nats['address']}")
+        await nats_manager.connect()
+        nc = await nats_manager.wait_connected()
+        logger.info("[NATS] 接続成功")
+
+        for subject in SUBJECTS:
+            await nc.subscribe(subject, cb=message_handler)
+            logger.info(f"NATS購読開始: トピック = {subject}")
+
+    except Exception as e:
+        logger.exception("[NATS] サブスクライバ初期化中にエラーが発生しました")
+
+
+async def close_nats_subscriber():
+    """
+    アプリ停止時に購読を終了し、接続を閉じる（処理中のメッセージを終えてから切断）
+    """
+    await nats_manager.drain()
+    logger.info("[NATS] サブスクライバ停止")
+
+# ------------------------------------------------------------------------------
+# 汎用メッセージハンドラ
+# ------------------------------------------------------------------------------
+async def message_handler(msg: Msg):
+    """
+    受信イベントからキャッシュ無効化対象を特定して無効化する
+
+    - user_id を含むイベント（QuoteCreated / ApplicationCreated など）は直接無効化
+    - ID のみのイベント（QuoteUpdated / ApplicationStatusChanged など）は逆引きで無効化
+    """
+    subject = msg.subject
+    logger.info(f"[NATS] 受信: subject={subject}")
+
+    try:
+        data = json.loads(msg.data.decode())
+    except Exception as e:
+        logger.warning(f"[NATS] ペイロードの解析に失敗しました: subject={subject}, error={e}")
+        return
+
+    try:
+        user_id = data.get("user_id")
+        if user_id:
+            await dashboard_cache.invalidate_user(str(user_id))
+
+        entity_ids = [
+            str(data[key]) for key in ("quote_id", "application_id", "contract_id")
+            if data.get(key)
+        ]
+        await dashboard_cache.invalidate_entities(entity_ids)
+
+    except Exception as e:
+        logger.exception(f"[NATS] キャッシュ無効化に失敗しました: subject={subject}")
@@ -77,4 +77,24 @@ class Config:
         """
         セッション制御に関する設定情報を返す（未設定時は空dictを返す）
         """
-        return self._data.get("session", {})
\ No newline at end of file
+        return self._data.get("session", {})
+
+    # --------------------------------------------------------------------------
+    # 一覧APIのページング設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def pagination(self):
+        """
+        一覧APIのページング（既定件数・上限件数）の設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("pagination", {})
+
+    # --------------------------------------------------------------------------
+    # 保険商品設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def pension(self):
+        """
+        保険商品に関する業務設定値（プランコードなど）の設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("pension", {})
@@ -2,16 +2,25 @@
 """
 PostgreSQLとの非同期接続およびセッション管理
 
-- config.yaml からDB接続設定（dsn, echo）を読み込み
+- config.yaml からDB接続設定（dsn, echo, pool, statement_cache_size, statement_timeout_ms, pgbouncer など）を読み込み
 - SQLAlchemyの AsyncSession を生成
 - FastAPIのDepends連携で使用可能なセッションを提供
+- 接続プールの待ち時間・使用率、SQL実行時間の計測
 """
 
 # ------------------------------------------------------------------------------
 # インポート
 # ------------------------------------------------------------------------------
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import AsyncAttrs,AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config.config import Config
 
@@ -19,19 +28,224 @@ from app.config.config import Config
 # 設定読み込み
 # ------------------------------------------------------------------------------
 config = Config()  # YAMLを読み込んで設定オブジェクトを生成
+logger = logging.getLogger(__name__)
 postgres_cfg = config.postgres
 POSTGRES_DSN = postgres_cfg["dsn"]
 ECHO_ENABLED = postgres_cfg.get("echo", False)  # echoが未設定の場合はFalse
 
+# 接続プールの既定値（config.yaml の postgres.pool で上書き可能）
+DEFAULT_POOL_SETTINGS: Dict[str, Any] = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+}
+
+
+# ------------------------------------------------------------------------------
+# 接続プール・SQL実行の計測
+# ------------------------------------------------------------------------------
+class PostgresPoolMetrics:
+    """
+    接続プールのチェックアウト待ち時間・使用率と SQL 実行時間を集計する
+
+    使用率（saturation）は チェックアウト中の接続数 / (pool_size + max_overflow)。
+    1.0 に近い状態が続く場合はチェックアウト待ちが発生している（プール枯渇の予兆）。
+    """
+
+    def __init__(self, slow_statement_ms: float = 500.0):
+        self._lock = threading.Lock()
+        self.pool = None
+        self.capacity = 0
+        self.slow_statement_seconds = slow_statement_ms / 1000
+
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.max_checked_out = 0
+
+        self.statements = 0
+        self.statement_errors = 0
+        self.slow_statements = 0
+        self.statement_seconds_total = 0.0
+        self.statement_seconds_max = 0.0
+        self.by_operation: Dict[str, Dict[str, float]] = {}
+
+    def bind(self, pool: Any, capacity: int) -> None:
+        """
+        計測対象のプールと上限接続数を設定する
+        """
+        self.pool = pool
+        self.capacity = capacity
+
+    # --- チェックアウト --------------------------------------------------------
+    def observe_checkout(self, wait_seconds: float, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+            self.max_checked_out = max(self.max_checked_out, checked_out)
+
+    def observe_timeout(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    # --- SQL実行 ---------------------------------------------------------------
+    def observe_statement(self, statement: str, seconds: float, failed: bool = False) -> None:
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        with self._lock:
+            self.statements += 1
+            self.statement_seconds_total += seconds
+            self.statement_seconds_max = max(self.statement_seconds_max, seconds)
+            if failed:
+                self.statement_errors += 1
+            stats = self.by_operation.setdefault(operation, {"count": 0, "seconds_total": 0.0, "seconds_max": 0.0})
+            stats["count"] += 1
+            stats["seconds_total"] += seconds
+            stats["seconds_max"] = max(stats["seconds_max"], seconds)
+            slow = seconds >= self.slow_statement_seconds
+            if slow:
+                self.slow_statements += 1
+        if slow:
+            logger.warning("[PostgreSQL] 低速SQL: %.3fs %s", seconds, " ".join(statement.split())[:300])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        現在の集計値を辞書で返す
+        """
+        checked_out = self.pool.checkedout() if self.pool is not None else 0
+        with self._lock:
+            return {
+                "pool_size": self.pool.size() if self.pool is not None else 0,
+                "capacity": self.capacity,
+                "checked_out": checked_out,
+                "max_checked_out": self.max_checked_out,
+                "saturation": round(checked_out / self.capacity, 4) if self.capacity else 0.0,
+                "overflow": self.pool.overflow() if self.pool is not None else 0,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "statements": self.statements,
+                "statement_errors": self.statement_errors,
+                "slow_statements": self.slow_statements,
+                "statement_seconds_total": round(self.statement_seconds_total, 6),
+                "statement_seconds_avg": round(self.statement_seconds_total / self.statements, 6) if self.statements else 0.0,
+                "statement_seconds_max": round(self.statement_seconds_max, 6),
+                "by_operation": {
+                    op: {**stats, "seconds_total": round(stats["seconds_total"], 6), "seconds_max": round(stats["seconds_max"], 6)}
+                    for op, stats in self.by_operation.items()
+                },
+            }
+
+
+pg_pool_metrics = PostgresPoolMetrics(postgres_cfg.get("slow_statement_ms", 500))
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    チェックアウト待ち時間を計測する AsyncAdaptedQueuePool
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            pg_pool_metrics.observe_timeout(time.perf_counter() - started)
+            raise
+        pg_pool_metrics.observe_checkout(time.perf_counter() - started, self.checkedout())
+        return record
+
+
+# ------------------------------------------------------------------------------
+# 接続パラメータの組み立て
+# ------------------------------------------------------------------------------
+def build_engine_options(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    config.yaml の postgres セクションから create_async_engine の引数を組み立てる
+
+    - pgbouncer: true（トランザクションプーリング）の場合は、接続をまたいで再利用できない
+      プリペアドステートメントのキャッシュを無効化し、文名を一意にする。
+      起動パラメータ（server_settings）は PgBouncer が拒否するため送らない
+      （statement_timeout はロール・DB 側で設定する）
+    """
+    pool = {**DEFAULT_POOL_SETTINGS, **cfg.get("pool", {})}
+    pgbouncer = bool(cfg.get("pgbouncer", False))
+
+    connect_args: Dict[str, Any] = {}
+    if pgbouncer:
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    else:
+        cache_size = int(cfg.get("statement_cache_size", 100))
+        connect_args["statement_cache_size"] = cache_size
+        connect_args["prepared_statement_cache_size"] = cache_size
+        server_settings: Dict[str, str] = {}
+        if cfg.get("statement_timeout_ms"):
+            server_settings["statement_timeout"] = str(int(cfg["statement_timeout_ms"]))
+        if cfg.get("application_name"):
+            server_settings["application_name"] = str(cfg["application_name"])
+        if server_settings:
+            connect_args["server_settings"] = server_settings
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": int(pool["pool_size"]),
+        "max_overflow": int(pool["max_overflow"]),
+        "pool_timeout": float(pool["pool_timeout"]),
+        "pool_recycle": int(pool["pool_recycle"]),
+        "pool_pre_ping": bool(pool["pool_pre_ping"]),
+        "connect_args": connect_args,
+    }
+
+
 # ------------------------------------------------------------------------------
 # 非同期エンジンの作成（SQLAlchemy v2対応）
 # ------------------------------------------------------------------------------
+engine_options = build_engine_options(postgres_cfg)
 engine = create_async_engine(
     POSTGRES_DSN,
     echo=ECHO_ENABLED,  # config.yamlの設定に応じてSQLログ出力
     future=True,
+    **engine_options,
+)
+pg_pool_metrics.bind(engine.pool, engine_options["pool_size"] + engine_options["max_overflow"])
+logger.info(
+    "[PostgreSQL] エンジン生成: pool_size=%d, max_overflow=%d, pgbouncer=%s",
+    engine_options["pool_size"], engine_options["max_overflow"], bool(postgres_cfg.get("pgbouncer", False))
 )
 
+
+# ------------------------------------------------------------------------------
+# SQL実行時間の計測（カーソル実行の前後）
+# ------------------------------------------------------------------------------
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    pg_pool_metrics.observe_statement(statement, time.perf_counter() - conn.info["query_started"].pop())
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    started: Optional[list] = conn.info.get("query_started") if conn is not None else None
+    if started:
+        pg_pool_metrics.observe_statement(
+            exception_context.statement or "", time.perf_counter() - started.pop(), failed=True
+        )
+
+
 # ------------------------------------------------------------------------------
 # 非同期セッションファクトリ
 # ------------------------------------------------------------------------------
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, Date, DateTime, Float, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Boolean, Date, DateTime, Float, ForeignKey, JSON, Index, Numeric, Table
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
@@ -6,6 +6,42 @@ import uuid
 
 Base = declarative_base()
 
+# ------------------------------------------------------------------------------
+# 参照テーブル（外部キーの解決・契約作成時の申込読み込み用）
+# - 作成・変更は quotation_service / application_service 側で行う（本サービスは読み取りのみ）
+# ------------------------------------------------------------------------------
+quotes = Table(
+    "quotes",
+    Base.metadata,
+    Column("quote_id", PG_UUID(as_uuid=True), primary_key=True),
+)
+
+applications = Table(
+    "applications",
+    Base.metadata,
+    Column("application_id", PG_UUID(as_uuid=True), primary_key=True),
+    Column("quote_id", PG_UUID(as_uuid=True), nullable=False),
+    Column("user_id", PG_UUID(as_uuid=True), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+application_details = Table(
+    "application_details",
+    Base.metadata,
+    Column("application_id", PG_UUID(as_uuid=True), ForeignKey("applications.application_id"), primary_key=True),
+    Column("birth_date", Date, nullable=False),
+    Column("gender", String, nullable=False),
+    Column("monthly_premium", Integer, nullable=False),
+    Column("payment_period_years", Integer, nullable=False),
+    Column("tax_deduction_enabled", Boolean, nullable=False),
+    Column("contract_date", Date, nullable=False),
+    Column("contract_interest_rate", Numeric(5, 2), nullable=False),
+    Column("total_paid_amount", Integer, nullable=False),
+    Column("annual_tax_deduction", Integer, nullable=False),
+    Column("plan_code", String, nullable=False),
+    Column("user_consent", Boolean, nullable=False),
+)
+
 class Contract(Base):
     """
     contracts テーブル
@@ -43,4 +79,11 @@ class Contract(Base):
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False, comment="契約作成日時")
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, comment="契約更新日時")
     created_by = Column(String, nullable=True, comment="作成者ID（オペレータなど）")
-    updated_by = Column(String, nullable=True, comment="更新者ID")
\ No newline at end of file
+    updated_by = Column(String, nullable=True, comment="更新者ID")
+
+    # 契約一覧（user_id 指定）・申込IDからの参照用
+    # 作成は quotation_service の Alembic（db/alembic/versions）で CONCURRENTLY 実行する
+    __table_args__ = (
+        Index("ix_contracts_user_id", user_id),
+        Index("ix_contracts_application_id", application_id),
+    )
\ No newline at end of file
@@ -11,17 +11,16 @@ Keycloakを使ったJWTベースの認証・認可機構
 # インポート
 # ------------------------------------------------------------------------------
 import logging
-from typing import Dict
+from typing import Dict, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
-from jose.utils import base64url_decode
 from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.hazmat.backends import default_backend
-import httpx
 
 from app.config.config import Config
+from app.dependencies.jwks_cache import JWKSCache
+from app.dependencies.token_cache import VerifiedTokenCache
 
 # ------------------------------------------------------------------------------
 # ログと設定の初期化
@@ -43,30 +42,31 @@ ISSUER = KEYCLOAK_BASE_URL
 # FastAPI用のOAuth2認証スキーム
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# 公開鍵キャッシュ（kid単位・プロセス内共有）
+jwks_cache_config = keycloak_config.get("jwks_cache", {})
+jwks_cache = JWKSCache(
+    jwks_url=JWKS_URL,
+    ttl_seconds=jwks_cache_config.get("ttl_seconds", 600),
+    refresh_ahead_seconds=jwks_cache_config.get("refresh_ahead_seconds", 60),
+    unknown_kid_cooldown_seconds=jwks_cache_config.get("unknown_kid_cooldown_seconds", 10),
+)
+
+# 検証済みトークンキャッシュ（トークンハッシュ単位・exp まで保持）
+token_cache = VerifiedTokenCache(
+    max_entries=keycloak_config.get("token_cache", {}).get("max_entries", 10000)
+)
+
 # ------------------------------------------------------------------------------
 # 公開鍵の取得処理（JWKからRSA公開鍵を構築）
 # ------------------------------------------------------------------------------
-async def get_public_key() -> rsa.RSAPublicKey:
+async def get_public_key(kid: Optional[str] = None) -> rsa.RSAPublicKey:
     """
-    Keycloak の JWKs エンドポイントから公開鍵を取得して構築
+    kid に対応する Keycloak の公開鍵をキャッシュから取得（未取得・期限切れ時は JWKs から再取得）
     """
-    logger.info("KeycloakのJWK取得開始")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(JWKS_URL)
-        if response.status_code != 200:
-            logger.error("JWK取得失敗: %s", response.text)
-            raise HTTPException(status_code=500, detail="JWK取得に失敗しました")
-
-        # JWKの最初のキーを使う（必要に応じてkidで選別も可能）
-        jwks = response.json()["keys"]
-        key = jwks[0]
-
-        # n, e をデコードして公開鍵を生成
-        n = int.from_bytes(base64url_decode(key["n"].encode("utf-8")), "big")
-        e = int.from_bytes(base64url_decode(key["e"].encode("utf-8")), "big")
-
-        logger.info("KeycloakのJWK取得成功")
-        return rsa.RSAPublicNumbers(e, n).public_key(default_backend())
+    try:
+        return await jwks_cache.get_key(kid)
+    except KeyError:
+        raise jwt.JWTError(f"kidに対応する公開鍵が見つかりません: {kid}")
 
 # ------------------------------------------------------------------------------
 # 認証処理: アクセストークンの検証とデコード
@@ -77,8 +77,18 @@ async def authenticate_user(token: str = Depends(oauth2_scheme)) -> Dict:
     """
     logger.info("アクセストークン認証開始")
 
+    # 検証済みトークンであれば署名検証を省略
+    cached = token_cache.get(token, jwks_cache.generation)
+    if cached is not None:
+        logger.info("アクセストークン検証済み（キャッシュ）: sub=%s", cached.get("sub"))
+        return {
+            **cached,
+            "access_token": token
+        }
+
     try:
-        public_key = await get_public_key()
+        header = jwt.get_unverified_header(token)
+        public_key = await get_public_key(header.get("kid"))
 
         # クレームの事前ログ出力
         unverified = jwt.get_unverified_claims(token)
@@ -96,6 +106,8 @@ async def authenticate_user(token: str = Depends(oauth2_scheme)) -> Dict:
             issuer=ISSUER,
         )
 
+        token_cache.put(token, payload, jwks_cache.generation)
+
         logger.info("アクセストークン検証成功: sub=%s", payload.get("sub"))
         return {
             **payload,
@@ -131,71 +143,71 @@ async def authenticate_user(token: str = Depends(oauth2_scheme)) -> Dict:
         )
 
 # ------------------------------------------------------------------------------
-# 認可: application_writer権限を保持しているかの確認
+# 認可: contract_writer権限を保持しているかの確認
 # ------------------------------------------------------------------------------
-def has_application_write_permission(token: dict) -> bool:
+def has_contract_write_permission(token: dict) -> bool:
     """
-    tokenに 'application_writer' 権限が含まれているかを判定
+    tokenに 'contract_writer' 権限が含まれているかを判定
     """
     try:
         roles = token.get("resource_access", {}) \
                      .get(CLIENT_ID, {}) \
                      .get("roles", [])
-        return "application_writer" in roles
+        return "contract_writer" in roles
     except Exception:
-        logger.exception("application_writer権限チェック中に例外発生")
+        logger.exception("contract_writer権限チェック中に例外発生")
         return False
     
 # ------------------------------------------------------------------------------
-# 認可: application_reader権限を保持しているかの確認
+# 認可: contract_reader権限を保持しているかの確認
 # ------------------------------------------------------------------------------
-def has_application_read_permission(token: dict) -> bool:
+def has_contract_read_permission(token: dict) -> bool:
     """
-    tokenに 'application_reader' 権限が含まれているかを判定
+    tokenに 'contract_reader' 権限が含まれているかを判定
     """
     try:
         roles = token.get("resource_access", {}) \
                      .get(CLIENT_ID, {}) \
                      .get("roles", [])
-        return "application_reader" in roles
+        return "contract_reader" in roles
     except Exception:
-        logger.exception("application_reader権限チェック中に例外発生")
+        logger.exception("contract_reader権限チェック中に例外発生")
         return False
 
 # ------------------------------------------------------------------------------
-# FastAPI依存関数: application_writer権限を強制する
+# FastAPI依存関数: contract_writer権限を強制する
 # ------------------------------------------------------------------------------
-async def require_application_write_permission(
+async def require_contract_write_permission(
     token: dict = Depends(authenticate_user)
 ) -> dict:
     """
-    application_writer権限を持つユーザのみを許可する依存関数
+    contract_writer権限を持つユーザのみを許可する依存関数
     """
-    if not has_application_write_permission(token):
-        logger.warning("application_writer権限なし: sub=%s", token.get("sub"))
+    if not has_contract_write_permission(token):
+        logger.warning("contract_writer権限なし: sub=%s", token.get("sub"))
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="application_writer権限がありません"
+            detail="contract_writer権限がありません"
         )
 
-    logger.info("application_writer権限確認済み: sub=%s", token.get("sub"))
+    logger.info("contract_writer権限確認済み: sub=%s", token.get("sub"))
     return token
 
 # ------------------------------------------------------------------------------
-# FastAPI依存関数: application_reader権限を強制する
+# FastAPI依存関数: contract_reader権限を強制する
 # ------------------------------------------------------------------------------
-async def require_application_read_permission(
+async def require_contract_read_permission(
     token: dict = Depends(authenticate_user)
 ) -> dict:
     """
-    application_reader権限を持つユーザのみを許可する依存関数
+    contract_reader権限を持つユーザのみを許可する依存関数
     """
-    if not has_application_read_permission(token):
-        logger.warning("application_reader権限なし: sub=%s", token.get("sub"))
+    if not has_contract_read_permission(token):
+        logger.warning("contract_reader権限なし: sub=%s", token.get("sub"))
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="application_reader権限がありません"
+            detail="contract_reader権限がありません"
         )
 
-    logger.info("application_reader権限確認済み: sub=%s", token.get("sub"))
+    logger.info("contract_reader権限確認済み: sub=%s", token.get("sub"))
     return token
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+検証済みアクセストークンのキャッシュ
+
+- トークンのハッシュ値をキーに、検証済みクレームを保持する（LRU・件数上限あり）
+- エントリはトークン自身の exp まで有効
+- 公開鍵セットの世代が変わった場合は全件破棄する
+- ヒット・ミス件数を計測する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+# ------------------------------------------------------------------------------
+# 検証済みトークンキャッシュ
+# ------------------------------------------------------------------------------
+class VerifiedTokenCache:
+    """
+    RS256 署名検証済みのクレームを exp まで保持する LRU キャッシュ
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _hash(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _check_generation(self, generation: int) -> None:
+        """
+        鍵セットの世代が変わっていればキャッシュを全件破棄する
+        """
+        if self._generation != generation:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, token: str, generation: int) -> Optional[Dict[str, Any]]:
+        """
+        キャッシュ済みのクレームを返す（未登録・期限切れ時は None）
+
+        Parameters:
+            token (str): アクセストークン
+            generation (int): 現在の公開鍵セットの世代
+
+        Returns:
+            dict | None: 検証済みクレームのコピー
+        """
+        key = self._hash(token)
+        with self._lock:
+            self._check_generation(generation)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            claims, exp = entry
+            if exp <= time.time():
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(claims)
+
+    def put(self, token: str, claims: Dict[str, Any], generation: int) -> None:
+        """
+        検証済みクレームを登録する（exp を持たないトークンはキャッシュしない）
+        """
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= time.time():
+            return
+
+        key = self._hash(token)
+        with self._lock:
+            self._check_generation(generation)
+            self._entries[key] = (dict(claims), float(exp))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        現在の集計値を辞書で返す
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
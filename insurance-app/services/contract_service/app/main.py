@@ -14,11 +14,12 @@ import asyncio
 import logging
 
 from fastapi import FastAPI
-from motor.motor_asyncio import AsyncIOMotorClient
 
-from app.routes import quotes
+from app.routes import contracts, metrics
 from app.config.config import Config
-from app.services.nats_subscriber import run_nats_subscriber
+from app.dependencies.get_mongo_client import init_mongo_client, close_mongo_client
+from app.services.mongo_indexes import index_manager
+from app.services.nats_subscriber import run_nats_subscriber, stop_nats_subscriber, close_nats_subscriber
 
 # ------------------------------------------------------------------------------
 # 設定・構成の読み込み
@@ -37,12 +38,13 @@ logger = logging.getLogger(__name__)
 # ------------------------------------------------------------------------------
 # FastAPI アプリケーション初期化
 # ------------------------------------------------------------------------------
-app = FastAPI(title="Quotation Service")
+app = FastAPI(title="Contract Service")
 
 # ------------------------------------------------------------------------------
-# ルーター登録（見積もりAPI）
+# ルーター登録（契約API）
 # ------------------------------------------------------------------------------
-app.include_router(quotes.router, prefix="/api/v1")
+app.include_router(contracts.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
 
 # ------------------------------------------------------------------------------
 # スタートアップイベント: MongoDB クライアントの初期化
@@ -54,10 +56,30 @@ async def startup_db_client():
     `app.state.mongo_client` に接続インスタンスを保持する。
     """
     logger.info("MongoDB クライアントの初期化")
-    app.state.mongo_client = AsyncIOMotorClient(config.mongodb["dsn"])
+    app.state.mongo_client = init_mongo_client()
+
+    # 検索用インデックスの不足分を作成（大規模コレクションでは無効化し、CLI で作成する）
+    if config.mongodb.get("indexes", {}).get("ensure_on_startup", True):
+        await index_manager.ensure(app.state.mongo_client)
+
+@app.on_event("shutdown")
+async def shutdown_nats_subscriber():
+    """
+    アプリケーション停止時に NATS の取得ループを止め、処理中のメッセージを終えてから drain して切断する。
+    （MongoDB クライアントのクローズより先に実行する）
+    """
+    await stop_nats_subscriber()
+    await close_nats_subscriber()
+
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    """
+    アプリケーション停止時に共有 MongoDB クライアントをクローズする
+    """
+    close_mongo_client()
 
 # 起動時に NATS 購読を開始
 @app.on_event("startup")
 async def startup_event():
     logging.basicConfig(level=logging.INFO)
-    asyncio.create_task(run_nats_subscriber())
\ No newline at end of file
+    asyncio.create_task(run_nats_subscriber())
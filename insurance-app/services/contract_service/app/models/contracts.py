@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, Any, List
 from uuid import UUID
 from datetime import datetime, date
@@ -9,6 +9,7 @@ class ContractResponseModel(BaseModel):
     契約情報のレスポンスモデル
     - contracts テーブルに対応
     """
+    model_config = ConfigDict(from_attributes=True)
 
     contract_id: UUID = Field(..., description="契約ID（UUID）")
     application_id: UUID = Field(..., description="申込ID（applications）")
@@ -31,8 +32,8 @@ class ContractResponseModel(BaseModel):
     refund_rate: float = Field(..., description="返戻率（%）")
     tax_deduction_amount: Optional[int] = Field(None, description="税控除見込額（適用時）")
 
-    # JSONB形式で保存される詳細シナリオ情報
-    scenario_data: Dict[str, Any] = Field(..., description="試算時のシナリオ情報（複数シナリオ）")
+    # 試算時のシナリオ情報（contracts テーブルには保持しないため未設定）
+    scenario_data: Optional[Dict[str, Any]] = Field(None, description="試算時のシナリオ情報（複数シナリオ）")
 
     # 契約者の同意情報など
     user_consent: bool = Field(..., description="利用規約への同意")
@@ -91,6 +92,15 @@ class ContractBeneficiaryItem(BaseModel):
     allocation: int = Field(..., description="受取割合（%）")
     note: str = Field(..., description="備考欄")
 
+class ApplicationBeneficiariesModel(BaseModel):
+    """
+    申込時に application_service が MongoDB に保存した受取人情報モデル
+    - 契約作成時に契約の受取人情報として引き継ぐ
+    """
+    application_id: UUID = Field(..., description="申込ID")
+    beneficiaries: List[ContractBeneficiaryItem] = Field(..., description="受取人情報リスト")
+    updated_at: datetime = Field(..., description="最終更新日時（ISO形式）")
+
 class ContractBeneficiariesModel(BaseModel):
     """
     MongoDBに保存される契約者の受取人情報モデル
@@ -4,40 +4,56 @@
 
 - 自ユーザーの契約一覧取得
 - 自ユーザーの契約詳細取得
-- 契約の明示的確定
-- 契約のキャンセル（解約）
+- 自ユーザーの契約の年次推移表
+- 契約の作成は申込確定イベント（applications.ApplicationStatusChanged）で行う
 """
 
 import logging
-from fastapi import APIRouter, Depends, Path, HTTPException, status
-from typing import List
-
-from app.dependencies.auth import (
-    require_contract_read_permission,
-    require_contract_write_permission
-)
-from app.models.contracts import (
-    ContractResponseModel,
-    ContractCreateRequestModel,
-    ContractUpdateModel
-)
+from fastapi import APIRouter, Depends, Path, Query, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorClient
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies.auth import require_contract_read_permission
+from app.models.contracts import ContractResponseModel
+from app.db.database import get_async_session
+from app.dependencies.get_mongo_client import get_mongo_client
 from app.services.contract_manager import (
+    CONTRACT_LIST_FIELDS,
     get_contracts_by_user_id,
-    get_contract_by_id,
-    create_contract_by_application_id,
-    cancel_contract,
-    update_contract
+    get_contract_for_user,
 )
+from app.services.pagination import NEXT_CURSOR_HEADER, parse_fields
+from app.services.projection_engine import ProjectionSchedule, iter_ndjson
+from app.services.rate_loader import load_interest_rates
+from app.config.config import Config
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+config = Config()
+
+# 一覧APIのページング件数（cursor のみ指定時の既定値・指定可能な上限）
+# limit・cursor とも未指定の場合は従来どおり全件を返す
+DEFAULT_PAGE_LIMIT = config.pagination.get("default_limit", 50)
+MAX_PAGE_LIMIT = config.pagination.get("max_limit", 200)
+
+# 利率テーブル参照用のプランコード
+PLAN_CODE = config.pension.get("plan_code", "PENSION_001")
 
 # ------------------------------------------------------
 # GET /my/contracts
 # ------------------------------------------------------
 @router.get("/my/contracts", response_model=List[ContractResponseModel])
 async def get_my_contracts(
-    token_payload: dict = Depends(require_contract_read_permission)
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="1ページの最大件数"),
+    cursor: Optional[str] = Query(None, description="次ページ取得用カーソル（前回レスポンスの X-Next-Cursor）"),
+    fields: Optional[str] = Query(None, description="取得項目（カンマ区切り、例: contract_id,contract_date,created_at）"),
+    token_payload: dict = Depends(require_contract_read_permission),
+    session: AsyncSession = Depends(get_async_session),
 ):
     user_id_from_token = token_payload.get("sub")
     if not user_id_from_token:
@@ -45,15 +61,28 @@ async def get_my_contracts(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: no user ID")
 
     logger.info(f"【API】/api/v1/my/contracts 呼び出し (user_id={user_id_from_token})")
-    return await get_contracts_by_user_id(user_id_from_token)
+    field_list = parse_fields(fields, CONTRACT_LIST_FIELDS)
+    contracts, next_cursor = await get_contracts_by_user_id(
+        session,
+        user_id_from_token,
+        limit=limit or (DEFAULT_PAGE_LIMIT if cursor else None),
+        cursor=cursor,
+        fields=field_list,
+    )
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    if field_list is not None:
+        return JSONResponse(content=jsonable_encoder(contracts), headers=headers)
+    response.headers.update(headers)
+    return contracts
 
 # ------------------------------------------------------
 # GET /my/contracts/{contract_id}
 # ------------------------------------------------------
 @router.get("/my/contracts/{contract_id}", response_model=ContractResponseModel)
 async def get_my_contract_by_id(
-    contract_id: str = Path(..., description="取得対象の契約ID"),
-    token_payload: dict = Depends(require_contract_read_permission)
+    contract_id: UUID = Path(..., description="取得対象の契約ID"),
+    token_payload: dict = Depends(require_contract_read_permission),
+    session: AsyncSession = Depends(get_async_session),
 ):
     logger.info(f"【API】/api/v1/my/contracts/{contract_id} 呼び出し")
 
@@ -62,66 +91,54 @@ async def get_my_contract_by_id(
         logger.warning("アクセストークンにsubが含まれていません")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: no user ID")
 
-    contract = await get_contract_by_id(contract_id)
-
-    user_id_from_contract = contract.user_id
-    logger.info(f"検索した契約を作成したユーザ (user_id={user_id_from_contract})")
-    logger.info(f"トークンから取得したユーザID (user_id={user_id_from_token})")
-    if user_id_from_contract != user_id_from_token:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="他人の契約情報は参照できません")
-
-    return contract
-
-# ------------------------------------------------------
-# PUT /my/contracts/{contract_id}
-# ------------------------------------------------------
-@router.put("/my/contracts/{contract_id}", response_model=ContractResponseModel)
-async def update_my_contract(
-    update_model: ContractUpdateModel,
-    contract_id: str = Path(..., description="更新対象の契約ID"),
-    token_payload: dict = Depends(require_contract_write_permission)
-):
-    logger.info(f"【API】/api/v1/my/contracts/{contract_id} 更新呼び出し")
-
-    user_id_from_token = token_payload.get("sub")
-    if not user_id_from_token:
-        logger.warning("アクセストークンにsubが含まれていません")
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: no user ID")
-
-    updated_contract = await update_contract(contract_id, user_id_from_token, update_model.dict(exclude_unset=True))
-    return updated_contract
-
-# ------------------------------------------------------
-# POST /contracts/confirm
-# ------------------------------------------------------
-@router.post("/contracts/confirm", response_model=ContractResponseModel)
-async def confirm_contract(
-    request_model: ContractCreateRequestModel,
-    token_payload: dict = Depends(require_contract_write_permission)
-):
-    user_id_from_token = token_payload.get("sub")
-    if not user_id_from_token:
-        logger.warning("アクセストークンにsubが含まれていません")
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: no user ID")
-
-    logger.info(f"【API】/api/v1/contracts/confirm 契約確定呼び出し (application_id={request_model.application_id})")
-    contract = await create_contract_by_application_id(request_model.application_id, user_id_from_token)
-    return contract
+    # 存在しない場合は 404、他人の契約の場合は 403
+    return await get_contract_for_user(session, contract_id, user_id_from_token)
 
 # ------------------------------------------------------
-# PUT /my/contracts/{contract_id}/cancel
+# GET /my/contracts/{contract_id}/projection
 # ------------------------------------------------------
-@router.put("/my/contracts/{contract_id}/cancel", response_model=ContractResponseModel)
-async def cancel_my_contract(
-    contract_id: str = Path(..., description="キャンセル対象の契約ID"),
-    token_payload: dict = Depends(require_contract_write_permission)
+@router.get("/my/contracts/{contract_id}/projection")
+async def get_my_contract_projection(
+    contract_id: UUID = Path(..., description="取得対象の契約ID"),
+    token_payload: dict = Depends(require_contract_read_permission),
+    mongo_client: AsyncIOMotorClient = Depends(get_mongo_client),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    logger.info(f"【API】/api/v1/my/contracts/{contract_id}/cancel 契約キャンセル呼び出し")
+    """
+    契約の年次推移表（累計払込額・積立額・解約返戻金・年金支払額）を NDJSON でストリーミング返却する
+    - 積立利率は契約時に確定した contract_interest_rate を使用する
+    - 年金移行利率・解約返戻率は契約日時点の利率テーブルを参照する
+    """
+    logger.info(f"【API】/api/v1/my/contracts/{contract_id}/projection 呼び出し")
 
     user_id_from_token = token_payload.get("sub")
     if not user_id_from_token:
         logger.warning("アクセストークンにsubが含まれていません")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: no user ID")
 
-    contract = await cancel_contract(contract_id, user_id_from_token)
-    return contract
+    contract = await get_contract_for_user(session, contract_id, user_id_from_token)
+
+    try:
+        rates = await load_interest_rates(
+            db=mongo_client,
+            plan_code=PLAN_CODE,
+            contract_date=contract.contract_date
+        )
+    except Exception:
+        logger.exception("[利率取得失敗] MongoDBエラー")
+        raise HTTPException(status_code=503, detail="利率情報の取得に失敗しました")
+
+    schedule = ProjectionSchedule(
+        monthly_premium=contract.monthly_premium,
+        payment_years=contract.payment_period_years,
+        pension_years=contract.pension_payment_years,
+        contract_rate=contract.contract_interest_rate,
+        annuity_conversion_rate=rates["annuity_conversion_rate"],
+        surrender_rates=rates["surrender_rates"],
+    )
+    header = {
+        "contract_id": str(contract.contract_id),
+        "interest_rate": contract.contract_interest_rate,
+        "contract_date": contract.contract_date.isoformat(),
+    }
+    return StreamingResponse(iter_ndjson(schedule, header), media_type="application/x-ndjson")
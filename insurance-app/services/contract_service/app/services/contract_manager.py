@@ -1,15 +1,18 @@
 from uuid import UUID, uuid4
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime
 
-from app.db_models.contracts import Contract
-from app.models.contracts import ContractCreateModel
-from app.models.beneficiaries import ContractBeneficiariesModel
-from app.models.scenarios import PensionQuoteScenarioModel
+from app.db_models.contracts import Contract, applications, application_details
+from app.models.contracts import ContractCreateModel, ContractBeneficiariesModel
 from app.config.config import Config
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.benefit_engine import benefit_rows, compute_benefit_columns
+from app.services.rate_loader import load_interest_rates
 from app.services.mongo_helpers import (
-    get_scenarios_by_application_id,
     get_application_beneficiaries_by_application_id,
     save_contract_beneficiaries
 )
@@ -20,6 +23,161 @@ import logging
 logger = logging.getLogger(__name__)
 config = Config()
 
+# 年金受取年数（申込情報に含まれないため契約作成時はこの値で確定する）
+PENSION_PAYMENT_YEARS = config.pension.get("pension_payment_years", 10)
+
+# 契約作成元の申込（application_service が同じDBに保存した申込・申込詳細）
+APPLICATION_SNAPSHOT_COLUMNS = [
+    applications.c.application_id,
+    applications.c.quote_id,
+    applications.c.user_id,
+    applications.c.applied_at,
+    *[column for column in application_details.c if column.name != "application_id"],
+]
+
+# 一覧取得で fields= 指定可能な項目（レスポンス項目名 → カラム）
+CONTRACT_LIST_FIELDS = {column.name: column for column in Contract.__table__.columns}
+
+
+async def get_contracts_by_user_id(
+    session: AsyncSession,
+    user_id: UUID,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    指定ユーザーの契約一覧を最新順で取得する
+
+    - (created_at, contract_id) の降順でキーセットページングする
+    - fields 指定時は該当カラムのみを SELECT する
+
+    Returns:
+        (契約一覧, 次ページカーソル or None)
+    """
+    logger.info(f"[Contract] 契約一覧取得 user_id={user_id}, limit={limit}, cursor={bool(cursor)}")
+
+    output_fields = fields or list(CONTRACT_LIST_FIELDS)
+    columns = list(dict.fromkeys(output_fields + ["created_at", "contract_id"]))
+    stmt = select(*[CONTRACT_LIST_FIELDS[f] for f in columns]).where(Contract.user_id == user_id)
+    if cursor:
+        cursor_created_at, cursor_contract_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Contract.created_at, Contract.contract_id) < tuple_(cursor_created_at, cursor_contract_id)
+        )
+    stmt = stmt.order_by(Contract.created_at.desc(), Contract.contract_id.desc())
+    if limit is not None:
+        # 次ページ有無の判定用に1件多く取得
+        stmt = stmt.limit(limit + 1)
+
+    records = (await session.execute(stmt)).all()
+    has_more = limit is not None and len(records) > limit
+    if has_more:
+        records = records[:limit]
+
+    contracts = [{f: row._mapping[f] for f in output_fields} for row in records]
+    next_cursor = (
+        encode_cursor(records[-1].created_at, records[-1].contract_id)
+        if has_more and records else None
+    )
+    return contracts, next_cursor
+
+
+async def get_contract_for_user(
+    session: AsyncSession,
+    contract_id: UUID,
+    user_id: UUID,
+) -> Contract:
+    """
+    契約IDを指定して本人の契約を1件取得する
+
+    Raises:
+        HTTPException: 存在しない場合は 404、他人の契約の場合は 403
+    """
+    logger.info(f"[Contract] 契約取得 contract_id={contract_id}")
+
+    contract = (
+        await session.execute(select(Contract).where(Contract.contract_id == contract_id))
+    ).scalar_one_or_none()
+    if contract is None:
+        raise HTTPException(status_code=404, detail="契約が存在しません")
+    if str(contract.user_id) != str(user_id):
+        raise HTTPException(status_code=403, detail="他人の契約情報は参照できません")
+    return contract
+
+
+async def create_contract_from_application(
+    session: AsyncSession,
+    mongo_client: AsyncIOMotorClient,
+    application_id: UUID,
+) -> UUID:
+    """
+    確定した申込から契約を作成する（申込確定イベントから呼び出す）
+
+    - 同じ申込の契約が作成済みの場合は何もしない（イベントの再配信で重複作成しない）
+    - 申込・申込詳細は同じ PostgreSQL から、利率は契約日時点の利率テーブルから取得する
+    - 取得できない場合は例外を送出し、呼び出し元（JetStream）の再配信に任せる
+
+    Returns:
+        UUID: 作成済み（または既存）の契約ID
+    """
+    existing = (
+        await session.execute(select(Contract.contract_id).where(Contract.application_id == application_id))
+    ).scalar_one_or_none()
+    if existing is not None:
+        logger.info(f"[Contract] 契約作成済みのためスキップ application_id={application_id}, contract_id={existing}")
+        return existing
+
+    application = (
+        await session.execute(
+            select(*APPLICATION_SNAPSHOT_COLUMNS)
+            .select_from(applications.join(application_details))
+            .where(applications.c.application_id == application_id)
+        )
+    ).mappings().one_or_none()
+    if application is None:
+        raise LookupError(f"申込情報が存在しません: application_id={application_id}")
+
+    rates = await load_interest_rates(
+        db=mongo_client,
+        plan_code=application["plan_code"],
+        contract_date=application["contract_date"],
+    )
+    benefits = benefit_rows(
+        compute_benefit_columns(
+            application["monthly_premium"],
+            application["payment_period_years"],
+            PENSION_PAYMENT_YEARS,
+            float(application["contract_interest_rate"]),
+            rates["annuity_conversion_rate"],
+            rates["surrender_rates"].get(15, 0.0),
+        )
+    )[0]
+
+    contract_input = ContractCreateModel(
+        contract_id=uuid4(),
+        application_id=application["application_id"],
+        quote_id=application["quote_id"],
+        user_id=application["user_id"],
+        gender=application["gender"],
+        birth_date=application["birth_date"],
+        monthly_premium=application["monthly_premium"],
+        payment_period_years=application["payment_period_years"],
+        pension_payment_years=PENSION_PAYMENT_YEARS,
+        tax_deduction_enabled=application["tax_deduction_enabled"],
+        contract_date=application["contract_date"],
+        contract_interest_rate=float(application["contract_interest_rate"]),
+        total_amount_paid=application["total_paid_amount"],
+        total_amount_returned=benefits["lump_sum_amount"],
+        refund_rate=benefits["lump_sum_refund_rate"],
+        tax_deduction_amount=application["annual_tax_deduction"] if application["tax_deduction_enabled"] else None,
+        scenario_data={"base": benefits},
+        user_consent=application["user_consent"],
+        applied_at=application["applied_at"],
+        created_by="contract_service",
+    )
+    return await create_contract(session, mongo_client, contract_input)
+
 
 async def create_contract(
     session: AsyncSession,
@@ -40,6 +198,16 @@ async def create_contract(
     contract_id = contract_input.contract_id
     logger.info(f"[Contract] 契約作成開始 contract_id={contract_id}")
 
+    # --- MongoDBから受取人情報を取得（未登録の場合は契約を作成しない） ---
+    app_beneficiaries = await get_application_beneficiaries_by_application_id(
+        mongo_client,
+        application_id=contract_input.application_id
+    )
+
+    if not app_beneficiaries:
+        logger.warning(f"[Contract] 受取人情報が見つかりませんでした application_id={contract_input.application_id}")
+        raise LookupError(f"受取人情報が存在しません: application_id={contract_input.application_id}")
+
     # --- PostgreSQL への登録 ---
     new_contract = Contract(
         contract_id=contract_id,
@@ -65,19 +233,9 @@ async def create_contract(
     )
 
     session.add(new_contract)
-    await session.commit()
-
-    # --- MongoDBから受取人情報を取得 ---
-    app_beneficiaries = await get_application_beneficiaries_by_application_id(
-        mongo_client,
-        application_id=contract_input.application_id
-    )
+    await session.flush()
 
-    if not app_beneficiaries:
-        logger.warning(f"[Contract] 受取人情報が見つかりませんでした application_id={contract_input.application_id}")
-        raise HTTPException(status_code=400, detail="受取人情報が存在しません")
-
-    # --- MongoDBに保存（contract_idに紐づける） ---
+    # --- MongoDBに保存（contract_idに紐づける。upsert のため再実行しても1件） ---
     contract_beneficiaries_doc = ContractBeneficiariesModel(
         contract_id=contract_id,
         beneficiaries=app_beneficiaries.beneficiaries,
@@ -86,5 +244,8 @@ async def create_contract(
 
     await save_contract_beneficiaries(mongo_client, contract_beneficiaries_doc)
 
+    # 受取人情報の保存後にコミット（失敗時は契約も作成されず、再配信で作り直す）
+    await session.commit()
+
     logger.info(f"[Contract] 契約および受取人情報の登録完了 contract_id={contract_id}")
     return contract_id
\ No newline at end of file
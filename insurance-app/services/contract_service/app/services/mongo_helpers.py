@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+受取人情報の MongoDB 読み書き
+
+- 申込時の受取人情報（application_service が保存）を application_id で取得する
+- 契約の受取人情報を contract_id 単位で保存する（再実行時も1件に保つため upsert）
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+from typing import Optional
+from uuid import UUID
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.contracts import ApplicationBeneficiariesModel, ContractBeneficiariesModel
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 初期化
+# ------------------------------------------------------------------------------
+config = Config()
+logger = logging.getLogger(__name__)
+
+beneficiary_config = config.mongodb.get("beneficiaries", {})
+
+
+# ------------------------------------------------------------------------------
+# 申込の受取人情報取得
+# ------------------------------------------------------------------------------
+async def get_application_beneficiaries_by_application_id(
+    mongo_client: AsyncIOMotorClient,
+    application_id: UUID,
+) -> Optional[ApplicationBeneficiariesModel]:
+    """
+    申込IDに紐づく受取人情報を取得する（未登録の場合は None）
+    """
+    collection = mongo_client[beneficiary_config.get("application_database", "application_db")][
+        beneficiary_config.get("application_collection", "application_beneficiaries")
+    ]
+    doc = await collection.find_one({"application_id": str(application_id)}, {"_id": 0})
+    if doc is None:
+        return None
+    return ApplicationBeneficiariesModel(**doc)
+
+
+# ------------------------------------------------------------------------------
+# 契約の受取人情報保存
+# ------------------------------------------------------------------------------
+async def save_contract_beneficiaries(
+    mongo_client: AsyncIOMotorClient,
+    document: ContractBeneficiariesModel,
+) -> None:
+    """
+    契約の受取人情報を保存する（同じ contract_id のドキュメントは置き換える）
+    """
+    collection = mongo_client[beneficiary_config.get("contract_database", "contract_db")][
+        beneficiary_config.get("contract_collection", "contract_beneficiaries")
+    ]
+    contract_id = str(document.contract_id)
+    await collection.replace_one(
+        {"contract_id": contract_id},
+        {
+            "contract_id": contract_id,
+            "beneficiaries": [b.dict() for b in document.beneficiaries],
+            "updated_at": document.updated_at,
+        },
+        upsert=True,
+    )
+    logger.info("[MongoDB] 契約の受取人情報を保存: contract_id=%s", contract_id)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+MongoDB インデックス定義と起動時の整備
+
+- サービスが検索に使うコレクションのインデックスを宣言的に定義する（INDEX_SPECS）
+- 起動時（mongodb.indexes.ensure_on_startup）または CLI（app/tools/ensure_indexes.py）で
+  不足分のみを作成する（既存インデックスは変更しないため何度実行してもよい）
+- 同名で定義と異なるインデックス・同一キーで別名のインデックスは「ドリフト」として警告する
+  （削除・再作成は運用判断が必要なため自動では行わない）
+- 定義にないインデックスは「管理外」としてログに残す
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 設定・ロガー初期化
+# ------------------------------------------------------------------------------
+config = Config()
+logger = logging.getLogger(__name__)
+
+# 比較対象とするインデックスオプション（未指定時の既定値）
+COMPARED_OPTIONS: Dict[str, Any] = {
+    "unique": False,
+    "sparse": False,
+    "partialFilterExpression": None,
+    "expireAfterSeconds": None,
+}
+
+# 結果区分
+STATUSES = ("created", "ok", "missing", "drift", "unmanaged", "failed")
+
+
+def _normalize_keys(keys: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+    # サーバによっては方向が 1.0 のように float で返るため整数に揃える
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in keys]
+
+
+def _options_of(info: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: info.get(name, default) for name, default in COMPARED_OPTIONS.items()}
+
+
+class MongoIndexManager:
+    """
+    インデックス定義に従って MongoDB のインデックスを確認・作成する
+    """
+
+    def __init__(self, specs: List[Dict[str, Any]]):
+        """
+        Parameters:
+            specs: インデックス定義のリスト
+                { database, collection, name, keys: [(項目, 1 | -1)], options: {unique など} }
+        """
+        self.specs = specs
+        self.last_report: Optional[Dict[str, List[str]]] = None
+        self.last_run_at: Optional[float] = None
+        self.last_duration_seconds = 0.0
+
+    def _group_by_collection(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        grouped: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for spec in self.specs:
+            grouped.setdefault((spec["database"], spec["collection"]), []).append(spec)
+        return grouped
+
+    # --------------------------------------------------------------------------
+    # 確認・作成
+    # --------------------------------------------------------------------------
+    async def ensure(self, mongo_client: AsyncIOMotorClient, create: bool = True) -> Dict[str, List[str]]:
+        """
+        定義と実際のインデックスを比較し、不足分を作成する
+
+        Parameters:
+            create: False の場合は確認のみ行う（不足分は missing として返す）
+
+        Returns:
+            dict: 結果区分（created / ok / missing / drift / unmanaged / failed）→ "DB.コレクション.インデックス名" のリスト
+        """
+        started = time.perf_counter()
+        report: Dict[str, List[str]] = {status: [] for status in STATUSES}
+
+        for (database, collection_name), specs in self._group_by_collection().items():
+            collection = mongo_client[database][collection_name]
+            prefix = f"{database}.{collection_name}"
+            try:
+                existing = await collection.index_information()
+            except Exception:
+                logger.exception("[Mongoインデックス] インデックス情報の取得に失敗: %s", prefix)
+                report["failed"].extend(f"{prefix}.{spec['name']}" for spec in specs)
+                continue
+
+            by_keys = {tuple(_normalize_keys(info["key"])): name for name, info in existing.items()}
+            for spec in specs:
+                label = f"{prefix}.{spec['name']}"
+                keys = _normalize_keys(spec["keys"])
+                options = {**COMPARED_OPTIONS, **spec.get("options", {})}
+
+                info = existing.get(spec["name"])
+                if info is not None:
+                    if _normalize_keys(info["key"]) == keys and _options_of(info) == options:
+                        report["ok"].append(label)
+                    else:
+                        logger.warning(
+                            "[Mongoインデックス] 定義と異なります: %s (定義=%s %s, 実際=%s %s)",
+                            label, keys, spec.get("options", {}), info["key"], _options_of(info)
+                        )
+                        report["drift"].append(label)
+                    continue
+
+                other_name = by_keys.get(tuple(keys))
+                if other_name is not None:
+                    logger.warning("[Mongoインデックス] 同一キーのインデックスが別名で存在します: %s (実際=%s)", label, other_name)
+                    report["drift"].append(label)
+                    continue
+
+                if not create:
+                    logger.warning("[Mongoインデックス] 未作成: %s", label)
+                    report["missing"].append(label)
+                    continue
+
+                try:
+                    await collection.create_index(keys, name=spec["name"], **spec.get("options", {}))
+                    logger.info("[Mongoインデックス] 作成: %s %s", label, keys)
+                    report["created"].append(label)
+                except Exception:
+                    # 一意制約違反のデータが既にある場合など
+                    logger.exception("[Mongoインデックス] 作成に失敗: %s", label)
+                    report["failed"].append(label)
+
+            managed = {spec["name"] for spec in specs} | {"_id_"}
+            for name in existing:
+                if name not in managed:
+                    logger.info("[Mongoインデックス] 定義外のインデックス: %s.%s", prefix, name)
+                    report["unmanaged"].append(f"{prefix}.{name}")
+
+        self.last_report = report
+        self.last_run_at = time.time()
+        self.last_duration_seconds = time.perf_counter() - started
+        logger.info(
+            "[Mongoインデックス] 確認完了: %s",
+            {status: len(labels) for status, labels in report.items()}
+        )
+        return report
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        直近の確認結果を返す（メトリクス用）
+        """
+        return {
+            "specs": len(self.specs),
+            "last_run_at": self.last_run_at,
+            "last_duration_seconds": round(self.last_duration_seconds, 6),
+            "report": self.last_report,
+        }
+
+
+# ------------------------------------------------------------------------------
+# インデックス定義（契約サービス）
+# ------------------------------------------------------------------------------
+def build_index_specs() -> List[Dict[str, Any]]:
+    """
+    config.yaml のコレクション名からインデックス定義を組み立てる
+    """
+    mongo_cfg = config.mongodb
+    return [
+        # 利率: plan_code 一致 + start_date <= 契約日 < end_date（rate_loader）
+        {
+            "database": mongo_cfg["database"],
+            "collection": mongo_cfg["collection"],
+            "name": "ix_rates_plan_code_period",
+            "keys": [("plan_code", 1), ("start_date", 1), ("end_date", 1)],
+        },
+    ]
+
+
+# ------------------------------------------------------------------------------
+# 共有インスタンス
+# ------------------------------------------------------------------------------
+index_manager = MongoIndexManager(build_index_specs())
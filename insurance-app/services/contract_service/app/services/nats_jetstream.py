@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+NATS JetStream 連携（config.yaml の nats.jetstream.enabled で有効化）
+
+- ストリームはサブジェクトの先頭トークンごとに1つ（例: "quotes.*" → QUOTES）。
+  発行側・購読側のどちらからも冪等に作成する（ensure_stream）
+- 購読は durable pull consumer でバッチ取得し、ハンドラ成功（DBコミット完了）後に ack する
+- 失敗時は配信回数に応じた待ち時間（backoff_seconds）を指定して nak し、再配信させる
+- max_deliver 回失敗したメッセージはデッドレター（"<dlq_prefix>.<元のサブジェクト>"）へ転送して term する
+- dispatcher を渡した場合、バッチ内のメッセージはディスパッチャのワーカーで並列に処理する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from nats.aio.msg import Msg
+from nats.errors import TimeoutError as NatsTimeoutError
+from nats.js.api import AckPolicy, ConsumerConfig, StorageType
+from nats.js.client import JetStreamContext
+from nats.js.errors import BadRequestError
+
+from app.services.nats_metrics import SubscriberMetrics, subscriber_metrics
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 設定・ロガー初期化
+# ------------------------------------------------------------------------------
+config = Config()
+logger = logging.getLogger(__name__)
+
+# 既定値（config.yaml の nats.jetstream で上書き可能）
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "enabled": False,
+    "durable": None,                  # durable 名の接頭辞（未指定時は queue_group）
+    "batch_size": 50,
+    "fetch_timeout_seconds": 2.0,
+    "ack_wait_seconds": 30,
+    "max_deliver": 5,
+    "backoff_seconds": [1, 5, 30, 120],
+    "dlq_prefix": "dlq",
+    "stream_max_age_seconds": 7 * 24 * 3600,
+    "publish_timeout_seconds": 2.0,
+}
+
+JETSTREAM_SETTINGS: Dict[str, Any] = {**DEFAULT_SETTINGS, **config.nats.get("jetstream", {})}
+
+
+def jetstream_enabled() -> bool:
+    """
+    JetStream モードが有効かを返す
+    """
+    return bool(JETSTREAM_SETTINGS["enabled"])
+
+
+# ------------------------------------------------------------------------------
+# ストリーム管理
+# ------------------------------------------------------------------------------
+def stream_for(subject: str) -> Dict[str, Any]:
+    """
+    サブジェクト（パターン可）から格納先ストリームの定義を返す
+    """
+    prefix = subject.split(".", 1)[0]
+    if prefix == JETSTREAM_SETTINGS["dlq_prefix"]:
+        return {"name": "DLQ", "subjects": [f"{prefix}.>"]}
+    return {"name": prefix.upper(), "subjects": [f"{prefix}.*"]}
+
+
+_ensured_streams: Set[str] = set()
+
+
+async def ensure_stream(js: JetStreamContext, subject: str) -> str:
+    """
+    サブジェクトを格納するストリームを作成し（既存の場合は設定を更新）、ストリーム名を返す
+    """
+    stream = stream_for(subject)
+    if stream["name"] in _ensured_streams:
+        return stream["name"]
+
+    params = {
+        **stream,
+        "storage": StorageType.FILE,
+        "max_age": float(JETSTREAM_SETTINGS["stream_max_age_seconds"]),
+    }
+    try:
+        await js.add_stream(**params)
+    except BadRequestError:
+        # 同名ストリームが異なる設定で存在する場合
+        await js.update_stream(**params)
+    _ensured_streams.add(stream["name"])
+    logger.info("[JetStream] ストリーム確認: %s %s", stream["name"], stream["subjects"])
+    return stream["name"]
+
+
+async def publish(js: JetStreamContext, subject: str, message: bytes) -> None:
+    """
+    ストリームにメッセージを発行し、サーバでの永続化（PubAck）を待つ
+    """
+    await ensure_stream(js, subject)
+    ack = await js.publish(subject, message, timeout=float(JETSTREAM_SETTINGS["publish_timeout_seconds"]))
+    logger.debug("[JetStream] 発行: subject=%s, stream=%s, seq=%s", subject, ack.stream, ack.seq)
+
+
+def durable_name(subject: str) -> str:
+    """
+    購読サブジェクトに対応する durable 名（"." / "*" / ">" は使えないため置き換える）
+    """
+    prefix = JETSTREAM_SETTINGS["durable"] or config.nats.get("queue_group") or "consumer"
+    token = subject.replace(".", "_").replace("*", "all").replace(">", "all")
+    return f"{prefix}-{token}"
+
+
+# ------------------------------------------------------------------------------
+# durable pull consumer
+# ------------------------------------------------------------------------------
+class PullConsumer:
+    """
+    1サブジェクト分の durable pull consumer（バッチ取得 → 処理 → ack / nak / デッドレター）
+    """
+
+    def __init__(
+        self,
+        js: JetStreamContext,
+        subject: str,
+        handler: Callable[[Msg], Awaitable[None]],
+        settings: Optional[Dict[str, Any]] = None,
+        metrics: Optional[SubscriberMetrics] = None,
+        dispatcher: Optional[Any] = None,
+    ):
+        s = {**JETSTREAM_SETTINGS, **(settings or {})}
+        self.js = js
+        self.subject = subject
+        self.handler = handler
+        self.metrics = metrics or subscriber_metrics
+        self.dispatcher = dispatcher
+        self.durable = durable_name(subject)
+        self.batch_size = int(s["batch_size"])
+        self.fetch_timeout = float(s["fetch_timeout_seconds"])
+        self.ack_wait = float(s["ack_wait_seconds"])
+        self.max_deliver = int(s["max_deliver"])
+        self.backoff = [float(b) for b in s["backoff_seconds"]] or [0.0]
+        self.dlq_prefix = s["dlq_prefix"]
+        self._subscription = None
+        self._stopped = asyncio.Event()
+
+    async def subscribe(self) -> None:
+        """
+        ストリーム・durable consumer を用意して購読を開始する
+        """
+        stream = await ensure_stream(self.js, self.subject)
+        await ensure_stream(self.js, f"{self.dlq_prefix}.{self.subject}")
+        self._subscription = await self.js.pull_subscribe(
+            self.subject,
+            durable=self.durable,
+            stream=stream,
+            config=ConsumerConfig(
+                ack_policy=AckPolicy.EXPLICIT,
+                ack_wait=self.ack_wait,
+                # 再配信の打ち切りはクライアント側（デッドレター転送）で行う
+                max_deliver=self.max_deliver + 1,
+            ),
+        )
+        logger.info("[JetStream] 購読開始: subject=%s, durable=%s, batch=%d", self.subject, self.durable, self.batch_size)
+
+    def backoff_for(self, num_delivered: int) -> float:
+        """
+        配信回数に応じた再配信までの待ち時間（秒）
+        """
+        return self.backoff[min(max(num_delivered, 1), len(self.backoff)) - 1]
+
+    async def process(self, msg: Msg) -> None:
+        """
+        1メッセージを処理し、結果に応じて ack / nak / デッドレター転送する
+        """
+        if await self.metrics.run(self.handler, msg):
+            await msg.ack()
+            return
+
+        num_delivered = msg.metadata.num_delivered
+        if num_delivered >= self.max_deliver:
+            headers = {
+                "X-Original-Subject": msg.subject,
+                "X-Num-Delivered": str(num_delivered),
+                "X-Durable": self.durable,
+            }
+            await self.js.publish(f"{self.dlq_prefix}.{msg.subject}", msg.data, headers=headers)
+            await msg.term()
+            self.metrics.observe_outcome(msg.subject, "dead_lettered")
+            logger.error("[JetStream] デッドレターへ転送: subject=%s, 配信回数=%d", msg.subject, num_delivered)
+        else:
+            delay = self.backoff_for(num_delivered)
+            await msg.nak(delay=delay)
+            self.metrics.observe_outcome(msg.subject, "redelivery_requested")
+            logger.warning("[JetStream] 再配信要求: subject=%s, 配信回数=%d, %.1f秒後", msg.subject, num_delivered, delay)
+
+    async def run(self) -> None:
+        """
+        停止されるまでバッチ取得と処理を繰り返す
+        """
+        if self._subscription is None:
+            await self.subscribe()
+
+        while not self._stopped.is_set():
+            try:
+                messages = await self._subscription.fetch(self.batch_size, timeout=self.fetch_timeout)
+            except NatsTimeoutError:
+                continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("[JetStream] メッセージ取得に失敗しました: subject=%s", self.subject)
+                await asyncio.sleep(self.fetch_timeout)
+                continue
+
+            # ack はハンドラのコミット完了後（ディスパッチャ未指定の場合はバッチ内を順に処理する）
+            if self.dispatcher is not None:
+                await self._dispatch_batch(messages)
+                continue
+            for msg in messages:
+                try:
+                    await self.process(msg)
+                except Exception:
+                    # ack / nak 自体の失敗は ack_wait 経過後の再配信に任せる
+                    logger.exception("[JetStream] 応答送信に失敗しました: subject=%s", msg.subject)
+
+    async def _dispatch_batch(self, messages: List[Msg]) -> None:
+        """
+        バッチをディスパッチャのワーカーで並列に処理し、全件の応答が終わるまで待つ
+
+        - 次の取得はバッチの処理完了後に行うため、未応答のメッセージは batch_size 件までに抑えられる
+          （ワーカーの待ち行列に ack_wait を超えて滞留し、処理中に再配信されることを防ぐ）
+        """
+        remaining = len(messages)
+        finished = asyncio.Event()
+
+        async def process(msg: Msg) -> None:
+            nonlocal remaining
+            try:
+                await self.process(msg)
+            finally:
+                remaining -= 1
+                if remaining == 0:
+                    finished.set()
+
+        for msg in messages:
+            await self.dispatcher.submit(process, msg)
+        if messages:
+            await finished.wait()
+
+    def stop(self) -> None:
+        """
+        取得ループを停止する（処理中のバッチは最後まで処理する）
+        """
+        self._stopped.set()
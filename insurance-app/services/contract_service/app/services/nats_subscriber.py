@@ -1,14 +1,16 @@
 # -*- coding: utf-8 -*-
 """
-NATSイベント購読モジュール（quotation_service）
+NATSイベント購読モジュール（contract_service）
 
-- "applications.*" トピックを購読し、保険申込関連イベント（例: ApplicationConfirmed, ApplicationCancelled）を受信
-- 対象の quote_id に対応する quote_state を適切に更新する
+- "applications.*" トピックを購読し、保険申込関連イベント（例: ApplicationStatusChanged）を受信
+- 申込が確定（to_state = "confirmed"）した場合に契約を作成する
+- JetStream モードでは作成に失敗したイベントを再配信し、停止中に確定した申込も再開後に契約化する
 """
 
+import asyncio
 import json
 import logging
-from nats.aio.client import Client as NATS
+from typing import List
 from nats.aio.msg import Msg
 
 from app.models.events import (
@@ -16,10 +18,14 @@ from app.models.events import (
     ApplicationStatusChangedEvent,
     ApplicationChangedEvent,
 )
-from app.services.contract_manager import create_contract
+from app.services.contract_manager import create_contract_from_application
+from app.dependencies.get_mongo_client import get_mongo_client
 
 from app.db.database import get_async_session
 
+from app.services.nats_connection import nats_manager
+from app.services.nats_jetstream import PullConsumer, jetstream_enabled
+from app.services.nats_metrics import subscriber_metrics
 from app.config.config import Config
 
 # ------------------------------------------------------------------------------
@@ -28,31 +34,77 @@ from app.config.config import Config
 config = Config()
 logger = logging.getLogger(__name__)
 
+# 購読対象トピック
+SUBJECTS = ["applications.*"]
+
+# JetStream モードで起動した consumer と取得ループのタスク
+pull_consumers: List[PullConsumer] = []
+consumer_tasks: List[asyncio.Task] = []
+
 # ------------------------------------------------------------------------------
 # NATS購読処理のエントリポイント
 # ------------------------------------------------------------------------------
 async def run_nats_subscriber():
     """
-    quotation_service 起動時に呼び出されるNATS購読セットアップ関数。
+    contract_service 起動時に呼び出されるNATS購読セットアップ関数。
 
-    - NATSサーバに接続
+    - 共有のNATS接続（nats_manager）の確立を待つ
     - "applications.*" トピックを購読
     - 受信メッセージを汎用 message_handler に委譲
+    - nats.jetstream.enabled の場合は durable pull consumer で購読する
     """
     logger.info("[NATS] サブスクライバ初期化開始")
     try:
-        nc = NATS()
         logger.debug(f"[NATS] 接続先: {config.nats['address']}")
-        await nc.connect(config.nats["address"])
+        await nats_manager.connect()
+        nc = await nats_manager.wait_connected()
         logger.info("[NATS] 接続成功")
 
-        # メッセージハンドラをトピックにバインド（applications.*）
-        await nc.subscribe("applications.*", cb=message_handler)
-        logger.info("NATS購読開始: トピック = applications.*")
-        
+        if jetstream_enabled():
+            # JetStream: durable pull consumer でバッチ取得し、処理成功後に ack する
+            js = nats_manager.jetstream()
+            for subject in SUBJECTS:
+                consumer = PullConsumer(js, subject, message_handler)
+                await consumer.subscribe()
+                pull_consumers.append(consumer)
+                consumer_tasks.append(asyncio.create_task(consumer.run()))
+            return
+
+        # 同一キューグループ内では1メッセージを1レプリカのみが処理する（空の場合は全レプリカに配信）
+        queue_group = config.nats.get("queue_group", "")
+        callback = subscriber_metrics.instrument(message_handler)
+
+        # メッセージハンドラをトピックにバインド
+        for subject in SUBJECTS:
+            await nc.subscribe(subject, queue=queue_group, cb=callback)
+            logger.info("NATS購読開始: トピック = %s, キューグループ = %s", subject, queue_group or "(なし)")
+
     except Exception as e:
         logger.exception("[NATS] サブスクライバ初期化中にエラーが発生しました")
 
+
+async def stop_nats_subscriber():
+    """
+    アプリ停止時に JetStream の取得ループを止める（取得済みのバッチは処理・応答してから終了する）
+
+    - 接続の drain・ディスパッチャの停止より先に呼び出す
+    """
+    for consumer in pull_consumers:
+        consumer.stop()
+    if consumer_tasks:
+        await asyncio.gather(*consumer_tasks, return_exceptions=True)
+    pull_consumers.clear()
+    consumer_tasks.clear()
+    logger.info("[NATS] 取得ループ停止")
+
+
+async def close_nats_subscriber():
+    """
+    アプリ停止時に購読を終了し、接続を閉じる（処理中のメッセージを終えてから切断）
+    """
+    await nats_manager.drain()
+    logger.info("[NATS] サブスクライバ停止")
+
 # ------------------------------------------------------------------------------
 # NATSメッセージ共通ハンドラ
 # ------------------------------------------------------------------------------
@@ -62,34 +114,30 @@ async def message_handler(msg: Msg):
 
     - JSONデコード → イベント種別判定 → 各処理にディスパッチ
     - サポート対象外のイベントは警告ログ出力
-    - 処理中の例外はすべてログ出力し握り潰す（サービス継続性確保のため）
+    - 処理中の例外は呼び出し元（subscriber_metrics.instrument）でログ出力し、失敗として計上する
     """
-    try:
-        logger.debug(f"[NATS] メッセージ受信: subject={msg.subject}, data={msg.data}")
-        data = json.loads(msg.data.decode())
-        event_type = data.get("event")
-        logger.debug(f"[NATS] パース結果: event_type={event_type}")
-
-        if event_type == "ApplicationCreated":
-            event = ApplicationCreatedEvent(**data)
-            logger.debug(f"[NATS] ApplicationCreated イベントインスタンス生成: {event}")
-            await handle_application_created(event)
+    logger.debug(f"[NATS] メッセージ受信: subject={msg.subject}, data={msg.data}")
+    data = json.loads(msg.data.decode())
+    event_type = data.get("event")
+    logger.debug(f"[NATS] パース結果: event_type={event_type}")
 
-        elif event_type == "ApplicationStatusChanged":
-            event = ApplicationStatusChangedEvent(**data)
-            logger.debug(f"[NATS] ApplicationStatusChanged イベントインスタンス生成: {event}")
-            await handle_application_status_changed(event)
+    if event_type == "ApplicationCreated":
+        event = ApplicationCreatedEvent(**data)
+        logger.debug(f"[NATS] ApplicationCreated イベントインスタンス生成: {event}")
+        await handle_application_created(event)
 
-        elif event_type == "ApplicationChanged":
-            event = ApplicationChangedEvent(**data)
-            logger.debug(f"[NATS] ApplicationChanged イベントインスタンス生成: {event}")
-            await handle_application_changed(event)
+    elif event_type == "ApplicationStatusChanged":
+        event = ApplicationStatusChangedEvent(**data)
+        logger.debug(f"[NATS] ApplicationStatusChanged イベントインスタンス生成: {event}")
+        await handle_application_status_changed(event)
 
-        else:
-            logger.warning(f"[NATS] 未対応のイベント種別を受信: event={event_type}")
+    elif event_type == "ApplicationChanged":
+        event = ApplicationChangedEvent(**data)
+        logger.debug(f"[NATS] ApplicationChanged イベントインスタンス生成: {event}")
+        await handle_application_changed(event)
 
-    except Exception as e:
-        logger.exception("NATSメッセージ処理中にエラーが発生しました")
+    else:
+        logger.warning(f"[NATS] 未対応のイベント種別を受信: event={event_type}")
 
 # ------------------------------------------------------------------------------
 # イベント別処理関数群
@@ -106,21 +154,24 @@ async def handle_application_status_changed(event: ApplicationStatusChangedEvent
     ApplicationStatusChanged イベントの処理
 
     - 保険申込の状態が変更されたことを示すイベント
-    - 対象の quote_id に対して quote_state を更新
+    - 確定（confirmed）した申込から契約を作成する（作成済みの場合は何もしない）
+    - 失敗時は例外を送出し、JetStream モードでは再配信させる
     """
-    logger.info(f"[NATS] ApplicationStatusChanged 処理開始: quote_id={event.quote_id}")
+    logger.info(f"[NATS] ApplicationStatusChanged 処理開始: application_id={event.application_id}")
 
     if event.to_state == "confirmed":
         try:
             async for session in get_async_session():
-                await create_contract(
+                contract_id = await create_contract_from_application(
                     session=session,
+                    mongo_client=get_mongo_client(),
                     application_id=event.application_id,
                 )
-                logger.info(f"[NATS] quote_state を 'applied' に更新完了: quote_id={event.quote_id}")
+                logger.info(f"[NATS] 契約作成完了: application_id={event.application_id}, contract_id={contract_id}")
                 break
         except Exception as e:
-            logger.exception(f"[NATS] ApplicationCreated 処理失敗: quote_id={event.quote_id}")
+            logger.error(f"[NATS] ApplicationStatusChanged 処理失敗: application_id={event.application_id}")
+            raise
 
 async def handle_application_changed(event: ApplicationChangedEvent):
     """
@@ -128,4 +179,4 @@ async def handle_application_changed(event: ApplicationChangedEvent):
 
     - 保険申込の内容が変更されたことを示すイベント
     """
-    logger.info(f"[NATS] ApplicationChanged 処理開始: quote_id={event.quote_id}")
\ No newline at end of file
+    logger.info(f"[NATS] ApplicationChanged 処理開始: application_id={event.application_id}")
\ No newline at end of file
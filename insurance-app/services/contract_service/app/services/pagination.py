@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+一覧APIのページング・項目絞り込み共通処理
+
+- キーセット方式（並び順の日時 + ID）のカーソルを不透明な文字列として発行・解釈する
+- fields= クエリ（カンマ区切り）を検証し、取得項目の一覧に変換する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import base64
+import json
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+
+# 次ページカーソルを返すレスポンスヘッダー名
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# ------------------------------------------------------------------------------
+# カーソルの発行・解釈
+# ------------------------------------------------------------------------------
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    """
+    最終行の（並び順の日時, ID）から次ページカーソルを生成する
+    """
+    raw = json.dumps({"t": sort_value.isoformat(), "id": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    カーソル文字列を（並び順の日時, ID）に戻す
+
+    Raises:
+        HTTPException: 不正なカーソルの場合は 400
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(data["t"]), UUID(data["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="cursor が不正です")
+
+
+# ------------------------------------------------------------------------------
+# 取得項目の絞り込み
+# ------------------------------------------------------------------------------
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    fields= クエリを検証して項目名の一覧を返す（未指定時は None = 全項目）
+
+    Raises:
+        HTTPException: 未定義の項目が含まれる場合は 400
+    """
+    if not fields:
+        return None
+    allowed = set(allowed)
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in names if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"fields に未定義の項目があります: {', '.join(unknown)}")
+    return names or None
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+MongoDB インデックスの確認・作成ツール
+
+- app/services/mongo_indexes.py の定義に従い、不足しているインデックスを作成する
+- --check 指定時は作成せず、不足・ドリフトがあれば終了コード 1 を返す（CI・デプロイ前確認用）
+
+使い方（サービスのルートディレクトリで実行）:
+    python -m app.tools.ensure_indexes [--check]
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.dependencies.get_mongo_client import init_mongo_client, close_mongo_client
+from app.services.mongo_indexes import index_manager
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------
+# 確認・作成処理
+# ------------------------------------------------------------------------------
+async def run(check_only: bool) -> dict:
+    """
+    インデックス定義と実際のインデックスを比較し、結果を返す
+    """
+    mongo_client = init_mongo_client()
+    try:
+        return await index_manager.ensure(mongo_client, create=not check_only)
+    finally:
+        close_mongo_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MongoDB インデックスを定義に合わせて作成する")
+    parser.add_argument("--check", action="store_true", help="作成せずに確認のみ行う")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(name)s - %(message)s")
+    report = asyncio.run(run(args.check))
+    for status, labels in report.items():
+        for label in labels:
+            print(f"{status:10s} {label}")
+
+    if report["missing"] or report["drift"] or report["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# tests/services/test_contract_manager.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../")))
+
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+from sqlalchemy.dialects import postgresql
+
+from app.models.contracts import ApplicationBeneficiariesModel
+from app.services import contract_manager
+from app.services.pagination import decode_cursor, encode_cursor
+
+USER_ID = uuid4()
+
+
+def _rows(count):
+    base = datetime(2025, 8, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        mapping = {"contract_id": uuid4(), "created_at": base - timedelta(days=i), "contract_date": base.date()}
+        rows.append(SimpleNamespace(_mapping=mapping, **mapping))
+    return rows
+
+
+def _session(mocker, rows):
+    result = mocker.Mock()
+    result.all.return_value = rows
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(return_value=result)
+    return session
+
+
+def _sql(session):
+    stmt = session.execute.await_args.args[0]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_get_contracts_returns_next_cursor_when_more_rows(mocker):
+    rows = _rows(3)
+    session = _session(mocker, rows)
+
+    contracts, next_cursor = await contract_manager.get_contracts_by_user_id(
+        session, USER_ID, limit=2, fields=["contract_id", "contract_date"]
+    )
+
+    assert [c["contract_id"] for c in contracts] == [rows[0].contract_id, rows[1].contract_id]
+    assert set(contracts[0]) == {"contract_id", "contract_date"}
+    assert decode_cursor(next_cursor) == (rows[1].created_at, rows[1].contract_id)
+    sql = _sql(session)
+    assert "ORDER BY contracts.created_at DESC, contracts.contract_id DESC" in sql
+    assert "LIMIT" in sql
+
+
+@pytest.mark.asyncio
+async def test_get_contracts_applies_keyset_condition(mocker):
+    rows = _rows(1)
+    session = _session(mocker, rows)
+    cursor = encode_cursor(datetime(2025, 9, 1, tzinfo=timezone.utc), uuid4())
+
+    contracts, next_cursor = await contract_manager.get_contracts_by_user_id(
+        session, USER_ID, limit=2, cursor=cursor, fields=["contract_id"]
+    )
+
+    assert len(contracts) == 1 and next_cursor is None
+    assert "(contracts.created_at, contracts.contract_id) <" in _sql(session)
+
+
+@pytest.mark.asyncio
+async def test_get_contracts_without_limit_returns_all(mocker):
+    session = _session(mocker, _rows(3))
+
+    contracts, next_cursor = await contract_manager.get_contracts_by_user_id(
+        session, USER_ID, fields=["contract_id"]
+    )
+
+    assert len(contracts) == 3 and next_cursor is None
+    assert "LIMIT" not in _sql(session)
+
+
+def _application(application_id):
+    return {
+        "application_id": application_id,
+        "quote_id": uuid4(),
+        "user_id": USER_ID,
+        "applied_at": datetime(2025, 8, 1, tzinfo=timezone.utc),
+        "birth_date": date(1990, 1, 1),
+        "gender": "male",
+        "monthly_premium": 10000,
+        "payment_period_years": 20,
+        "tax_deduction_enabled": True,
+        "contract_date": date(2025, 9, 1),
+        "contract_interest_rate": Decimal("1.20"),
+        "total_paid_amount": 2400000,
+        "annual_tax_deduction": 40000,
+        "plan_code": "PENSION_001",
+        "user_consent": True,
+    }
+
+
+def _create_session(mocker, existing=None, application=None):
+    existing_result = mocker.Mock()
+    existing_result.scalar_one_or_none.return_value = existing
+    application_result = mocker.Mock()
+    application_result.mappings.return_value.one_or_none.return_value = application
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(side_effect=[existing_result, application_result])
+    session.flush = mocker.AsyncMock()
+    session.commit = mocker.AsyncMock()
+    return session
+
+
+@pytest.fixture
+def mongo(mocker):
+    beneficiaries = ApplicationBeneficiariesModel(
+        application_id=uuid4(),
+        beneficiaries=[{"name": "山田花子", "relation": "配偶者", "allocation": 100, "note": ""}],
+        updated_at=datetime(2025, 8, 1),
+    )
+    mocker.patch.object(
+        contract_manager, "load_interest_rates",
+        mocker.AsyncMock(return_value={"annuity_conversion_rate": 95.0, "surrender_rates": {15: 0.85}}),
+    )
+    mocker.patch.object(
+        contract_manager, "get_application_beneficiaries_by_application_id", mocker.AsyncMock(return_value=beneficiaries)
+    )
+    return mocker.patch.object(contract_manager, "save_contract_beneficiaries", mocker.AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_create_contract_from_application_is_idempotent(mocker, mongo):
+    existing = uuid4()
+    session = _create_session(mocker, existing=existing)
+
+    assert await contract_manager.create_contract_from_application(session, mocker.Mock(), uuid4()) == existing
+
+    session.add.assert_not_called()
+    session.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_contract_from_application_builds_contract(mocker, mongo):
+    application_id = uuid4()
+    session = _create_session(mocker, application=_application(application_id))
+
+    contract_id = await contract_manager.create_contract_from_application(session, mocker.Mock(), application_id)
+
+    contract = session.add.call_args.args[0]
+    assert contract.contract_id == contract_id
+    assert contract.application_id == application_id
+    assert contract.total_amount_paid == 2400000
+    assert contract.pension_payment_years == contract_manager.PENSION_PAYMENT_YEARS
+    assert contract.total_amount_returned > contract.total_amount_paid
+    assert contract.tax_deduction_amount == 40000
+    mongo.assert_awaited_once()
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_contract_without_beneficiaries_does_not_commit(mocker, mongo):
+    contract_manager.get_application_beneficiaries_by_application_id.return_value = None
+    application_id = uuid4()
+    session = _create_session(mocker, application=_application(application_id))
+
+    with pytest.raises(LookupError):
+        await contract_manager.create_contract_from_application(session, mocker.Mock(), application_id)
+
+    session.add.assert_not_called()
+    session.commit.assert_not_called()
@@ -0,0 +1,77 @@
+# tests/services/test_nats_subscriber.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../")))
+
+import json
+import pytest
+from uuid import uuid4
+
+from app.services import nats_subscriber
+from app.services.nats_jetstream import PullConsumer
+from app.services.nats_metrics import SubscriberMetrics
+
+SETTINGS = {"max_deliver": 3, "backoff_seconds": [1, 10]}
+
+
+def _msg(mocker, to_state="confirmed", num_delivered=1):
+    msg = mocker.Mock()
+    msg.subject = "applications.ApplicationStatusChanged"
+    msg.data = json.dumps({
+        "event": "ApplicationStatusChanged",
+        "application_id": str(uuid4()),
+        "from_state": "under_review",
+        "to_state": to_state,
+        "changed_at": "2025-08-01T00:00:00",
+    }).encode()
+    msg.metadata.num_delivered = num_delivered
+    msg.ack = mocker.AsyncMock()
+    msg.nak = mocker.AsyncMock()
+    msg.term = mocker.AsyncMock()
+    return msg
+
+
+@pytest.fixture
+def create_contract(mocker):
+    session = mocker.Mock()
+
+    async def _session():
+        yield session
+
+    mocker.patch.object(nats_subscriber, "get_async_session", _session)
+    mocker.patch.object(nats_subscriber, "get_mongo_client", return_value=mocker.Mock())
+    return mocker.patch.object(nats_subscriber, "create_contract_from_application", mocker.AsyncMock(return_value=uuid4()))
+
+
+@pytest.mark.asyncio
+async def test_confirmed_application_creates_contract_and_acks(mocker, create_contract):
+    consumer = PullConsumer(mocker.Mock(), "applications.*", nats_subscriber.message_handler, settings=SETTINGS, metrics=SubscriberMetrics())
+    msg = _msg(mocker)
+
+    await consumer.process(msg)
+
+    create_contract.assert_awaited_once()
+    assert str(create_contract.await_args.kwargs["application_id"]) == json.loads(msg.data)["application_id"]
+    msg.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_contract_creation_failure_is_redelivered(mocker, create_contract):
+    create_contract.side_effect = ConnectionError("postgres down")
+    consumer = PullConsumer(mocker.Mock(), "applications.*", nats_subscriber.message_handler, settings=SETTINGS, metrics=SubscriberMetrics())
+    msg = _msg(mocker)
+
+    await consumer.process(msg)
+
+    msg.ack.assert_not_called()
+    msg.nak.assert_awaited_once_with(delay=1.0)
+
+
+@pytest.mark.asyncio
+async def test_other_status_changes_do_not_create_contract(mocker, create_contract):
+    msg = _msg(mocker, to_state="under_review")
+
+    await nats_subscriber.message_handler(msg)
+
+    create_contract.assert_not_called()
@@ -0,0 +1,97 @@
+# tests/test_main.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../")))
+
+import json
+import uuid
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import contracts as contracts_route
+from app.db.database import get_async_session
+from app.dependencies.auth import require_contract_read_permission
+from app.dependencies.get_mongo_client import get_mongo_client
+
+USER_ID = uuid.uuid4()
+
+
+def _contract(user_id=USER_ID):
+    return SimpleNamespace(
+        contract_id=uuid.uuid4(),
+        user_id=user_id,
+        monthly_premium=10000,
+        payment_period_years=20,
+        pension_payment_years=10,
+        contract_interest_rate=1.2,
+        contract_date=date(2025, 4, 1),
+        created_at=datetime(2025, 4, 1),
+    )
+
+
+def _client(mocker, contract):
+    result = mocker.Mock()
+    result.scalar_one_or_none.return_value = contract
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(return_value=result)
+
+    async def _session():
+        yield session
+
+    app.dependency_overrides = {
+        get_async_session: _session,
+        require_contract_read_permission: lambda: {"sub": str(USER_ID)},
+        get_mongo_client: lambda: mocker.Mock(),
+    }
+    return TestClient(app)
+
+
+def test_app_mounts_contract_routes():
+    paths = {route.path for route in app.routes}
+    assert {
+        "/api/v1/my/contracts",
+        "/api/v1/my/contracts/{contract_id}",
+        "/api/v1/my/contracts/{contract_id}/projection",
+        "/api/v1/internal/metrics",
+    } <= paths
+
+
+def test_metrics_exports_subscriber_pool_and_token_cache():
+    response = TestClient(app).get("/api/v1/internal/metrics")
+
+    assert response.status_code == 200
+    assert {"postgres_pool", "token_cache", "nats_subscriber", "nats_connection"} <= set(response.json())
+
+
+def test_projection_streams_ndjson(mocker):
+    contract = _contract()
+    mocker.patch.object(
+        contracts_route, "load_interest_rates",
+        mocker.AsyncMock(return_value={"annuity_conversion_rate": 95.0, "surrender_rates": {15: 0.85}}),
+    )
+    client = _client(mocker, contract)
+    try:
+        response = client.get(f"/api/v1/my/contracts/{contract.contract_id}/projection")
+    finally:
+        app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["contract_id"] == str(contract.contract_id)
+    assert len(lines) > 1
+
+
+def test_projection_rejects_other_users_contract(mocker):
+    contract = _contract(user_id=uuid.uuid4())
+    client = _client(mocker, contract)
+    try:
+        response = client.get(f"/api/v1/my/contracts/{contract.contract_id}/projection")
+    finally:
+        app.dependency_overrides = {}
+
+    assert response.status_code == 403
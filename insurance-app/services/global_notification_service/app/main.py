@@ -4,11 +4,14 @@
 import logging
 
 from fastapi import FastAPI
-from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.routes import (
-    global_notifications 
+    global_notifications,
+    metrics
 )
+from app.dependencies.get_mongo_client import init_mongo_client, close_mongo_client
+from app.services.mongo_indexes import index_manager
+from app.services.nats_publisher import init_nats_connection, close_nats_connection
 
 from app.config.config import Config
 
@@ -35,6 +38,7 @@ app = FastAPI(title="Notification Service")
 # ルーター登録（通知管理API）
 # ------------------------------------------------------------------------------
 app.include_router(global_notifications.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
 
 # ------------------------------------------------------------------------------
 # スタートアップイベント: MongoDB クライアントの初期化
@@ -42,8 +46,28 @@ app.include_router(global_notifications.router, prefix="/api/v1")
 @app.on_event("startup")
 async def startup_db_client():
     """
-    アプリケーション起動時にMongoDBクライアントを初期化し、
+    アプリケーション起動時に共有MongoDBクライアントを初期化し、
     `app.state.mongo_client` に接続インスタンスを保持する。
     """
     logger.info("MongoDB クライアントの初期化")
-    app.state.mongo_client = AsyncIOMotorClient(config.mongodb["dsn"])
\ No newline at end of file
+    app.state.mongo_client = init_mongo_client()
+
+    # 検索用インデックスの不足分を作成（大規模コレクションでは無効化し、CLI で作成する）
+    if config.mongodb.get("indexes", {}).get("ensure_on_startup", True):
+        await index_manager.ensure(app.state.mongo_client)
+
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    """
+    アプリケーション停止時に共有MongoDBクライアントをクローズする。
+    """
+    close_mongo_client()
+
+@app.on_event("startup")
+async def on_startup():
+    await init_nats_connection()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # 送信バッファを flush してから NATS を drain して切断する
+    await close_nats_connection()
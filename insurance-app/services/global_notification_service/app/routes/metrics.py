@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+運用メトリクス公開ルーター
+
+- 接続プール等の内部計測値を JSON で返す（監視・チューニング用）
+- NATS 接続の readiness を返す（未接続の場合は 503）
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.dependencies.get_mongo_client import pool_metrics
+from app.services.mongo_indexes import index_manager
+from app.services.nats_connection import nats_manager
+
+# ------------------------------------------------------------------------------
+# 初期化
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+# ------------------------------------------------------------------------------
+# メトリクス取得エンドポイント
+# ------------------------------------------------------------------------------
+@router.get("/internal/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """
+    サービス内部の計測値を返す
+
+    Returns:
+        dict: 各コンポーネントのメトリクス
+    """
+    return {
+        "mongo_pool": pool_metrics.snapshot(),
+        "mongo_indexes": index_manager.snapshot(),
+        "nats_connection": nats_manager.snapshot(),
+    }
+
+
+# ------------------------------------------------------------------------------
+# readiness エンドポイント
+# ------------------------------------------------------------------------------
+@router.get("/internal/health/ready")
+async def get_readiness() -> JSONResponse:
+    """
+    NATS 接続が確立している場合に 200、未接続・再接続中の場合に 503 を返す
+
+    Returns:
+        JSONResponse: NATS 接続の状態
+    """
+    health = {"nats": nats_manager.health()}
+    ready = all(component["ready"] for component in health.values())
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, **health})
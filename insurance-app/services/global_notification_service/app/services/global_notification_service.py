@@ -24,7 +24,8 @@ async def get_all_global_notifications(
         collection_name = config.mongodb["global_collection"]
         logger.info(f"GlobalNotifications取得開始 (DB={db_name}, Collection={collection_name})")
 
-        cursor = mongo_client[db_name][collection_name].find()
+        # 告知日の新しい順（ix_global_notifications_announcement_date を使用）
+        cursor = mongo_client[db_name][collection_name].find().sort("announcement_date", -1)
         documents = await cursor.to_list(length=None)
 
         logger.info(f"GlobalNotifications取得成功 (DB={db_name}, Collection={collection_name})")
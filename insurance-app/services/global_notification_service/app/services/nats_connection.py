@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+NATS 接続管理（1プロセス1接続）
+
+- 発行・購読・JetStream は nats_manager が保持する1本の接続を共有する
+- 再接続方針（間隔・回数）、送信バッファ上限（pending_size_bytes）、flush タイムアウトは
+  config.yaml の nats.connection で設定する
+- 起動時に接続できない場合はリクエスト処理を止めず、connect_backoff_seconds に従って
+  バックグラウンドで再試行する（接続までの間は readiness が false）
+- 再接続中の発行は送信バッファに積み、再接続後に送信する（上限超過時は OutboundBufferLimitError）
+- 停止時は drain（購読の処理中メッセージを終えてから送信バッファを flush して切断）する
+- 発行の処理時間・送信バイト数・再接続回数などを集計する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from nats.aio.client import Client as NATS
+from nats.js.client import JetStreamContext
+
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 設定・ロガー初期化
+# ------------------------------------------------------------------------------
+config = Config()
+logger = logging.getLogger(__name__)
+
+# 既定値（config.yaml の nats.connection で上書き可能）
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "name": None,                        # 接続名（未指定時は queue_group）。NATS の監視画面に表示される
+    "connect_timeout_seconds": 2,
+    "connect_backoff_seconds": [1, 2, 5, 10, 30],  # 起動時に接続できない場合の再試行間隔
+    "reconnect_time_wait_seconds": 2,    # 切断後の再接続間隔
+    "max_reconnect_attempts": -1,        # -1 は無制限
+    "ping_interval_seconds": 20,
+    "max_outstanding_pings": 3,
+    "pending_size_bytes": 2 * 1024 * 1024,  # 切断中・送信待ちのバッファ上限（超過時は発行が失敗する）
+    "flush_timeout_seconds": 2.0,
+    "drain_timeout_seconds": 30,
+}
+
+
+class NatsConnectionManager:
+    """
+    プロセス内で共有する NATS 接続と、その状態・送信統計を管理する
+    """
+
+    def __init__(self, address: str, settings: Optional[Dict[str, Any]] = None):
+        s = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.address = address
+        self.name = s["name"] or config.nats.get("queue_group") or None
+        self.connect_timeout = float(s["connect_timeout_seconds"])
+        self.connect_backoff = [float(b) for b in s["connect_backoff_seconds"]] or [1.0]
+        self.reconnect_time_wait = float(s["reconnect_time_wait_seconds"])
+        self.max_reconnect_attempts = int(s["max_reconnect_attempts"])
+        self.ping_interval = int(s["ping_interval_seconds"])
+        self.max_outstanding_pings = int(s["max_outstanding_pings"])
+        self.pending_size = int(s["pending_size_bytes"])
+        self.flush_timeout = float(s["flush_timeout_seconds"])
+        self.drain_timeout = int(s["drain_timeout_seconds"])
+
+        self.client: Optional[NATS] = None
+        self._js: Optional[JetStreamContext] = None
+        self._lock = asyncio.Lock()
+        self._connected = asyncio.Event()
+        self._retry_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.connect_attempts = 0
+        self.disconnects = 0
+        self.reconnects = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.connected_since: Optional[float] = None
+
+        self.published = 0
+        self.publish_failures = 0
+        self.bytes_out = 0
+        self.publish_seconds_total = 0.0
+        self.publish_seconds_max = 0.0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+
+    # --------------------------------------------------------------------------
+    # 接続・切断
+    # --------------------------------------------------------------------------
+    @property
+    def is_connected(self) -> bool:
+        return self.client is not None and self.client.is_connected
+
+    async def connect(self) -> None:
+        """
+        接続する（接続済み・再試行中の場合は何もしない）。失敗時はバックグラウンドで再試行する
+        """
+        async with self._lock:
+            if self.client is not None or (self._retry_task and not self._retry_task.done()):
+                return
+            self._closing = False
+            if not await self._try_connect():
+                self._retry_task = asyncio.create_task(self._retry_connect())
+
+    async def _try_connect(self) -> bool:
+        self.connect_attempts += 1
+        client = NATS()
+        try:
+            await client.connect(
+                servers=[self.address],
+                name=self.name,
+                connect_timeout=self.connect_timeout,
+                reconnect_time_wait=self.reconnect_time_wait,
+                max_reconnect_attempts=self.max_reconnect_attempts,
+                ping_interval=self.ping_interval,
+                max_outstanding_pings=self.max_outstanding_pings,
+                pending_size=self.pending_size,
+                flush_timeout=self.flush_timeout,
+                drain_timeout=self.drain_timeout,
+                error_cb=self._on_error,
+                disconnected_cb=self._on_disconnected,
+                reconnected_cb=self._on_reconnected,
+                closed_cb=self._on_closed,
+            )
+        except Exception as e:
+            self.last_error = str(e) or e.__class__.__name__
+            logger.warning("[NATS] 接続失敗: %s (%s)", self.address, self.last_error)
+            return False
+
+        self.client = client
+        self._js = None
+        self.connected_since = time.time()
+        self._connected.set()
+        logger.info("[NATS] 接続成功: %s (name=%s)", self.address, self.name)
+        return True
+
+    async def _retry_connect(self) -> None:
+        failures = 0
+        while not self._closing:
+            failures += 1
+            delay = self.connect_backoff[min(failures, len(self.connect_backoff)) - 1]
+            await asyncio.sleep(delay)
+            if await self._try_connect():
+                return
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> NATS:
+        """
+        接続が確立するまで待ち、接続を返す（購読の開始前に呼び出す）
+        """
+        await asyncio.wait_for(self._connected.wait(), timeout=timeout)
+        return self.client
+
+    def require_client(self) -> NATS:
+        """
+        接続中のクライアントを返す（未接続・切断済みの場合は RuntimeError）
+
+        再接続中は送信バッファ（pending_size_bytes）に積めるためクライアントを返す。
+        バッファが上限を超えた場合は publish が OutboundBufferLimitError を送出する
+        """
+        client = self.client
+        if client is None or client.is_closed or not (client.is_connected or client.is_reconnecting):
+            raise RuntimeError("NATS接続が確立されていません")
+        return client
+
+    def jetstream(self) -> JetStreamContext:
+        """
+        共有接続上の JetStream コンテキストを返す
+        """
+        client = self.require_client()
+        if self._js is None:
+            self._js = client.jetstream()
+        return self._js
+
+    async def drain(self) -> None:
+        """
+        購読の処理中メッセージと送信バッファを処理し終えてから切断する（アプリ停止時）
+        """
+        self._closing = True
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+            self._retry_task = None
+        client, self.client = self.client, None
+        self._connected.clear()
+        if client is None or client.is_closed:
+            return
+        try:
+            await client.drain()
+            logger.info("[NATS] drain 完了・切断しました")
+        except Exception:
+            logger.exception("[NATS] drain に失敗したため切断します")
+            await client.close()
+
+    # --------------------------------------------------------------------------
+    # 接続状態コールバック
+    # --------------------------------------------------------------------------
+    async def _on_error(self, e: Exception) -> None:
+        self.errors += 1
+        self.last_error = str(e) or e.__class__.__name__
+        logger.warning("[NATS] エラー: %s", self.last_error)
+
+    async def _on_disconnected(self) -> None:
+        self.disconnects += 1
+        logger.warning("[NATS] 切断されました（再接続を待機）")
+
+    async def _on_reconnected(self) -> None:
+        self.reconnects += 1
+        self.connected_since = time.time()
+        logger.info("[NATS] 再接続しました: %s", self.client.connected_url.netloc if self.client and self.client.connected_url else "")
+
+    async def _on_closed(self) -> None:
+        logger.info("[NATS] 接続を閉じました")
+
+    # --------------------------------------------------------------------------
+    # 発行・flush
+    # --------------------------------------------------------------------------
+    @asynccontextmanager
+    async def measure_publish(self, nbytes: int) -> AsyncIterator[None]:
+        """
+        発行処理の時間・送信バイト数・失敗を計測する（JetStream 発行など、呼び出し側で発行する場合に使う）
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.publish_failures += 1
+            raise
+        else:
+            self.published += 1
+            self.bytes_out += nbytes
+        finally:
+            seconds = time.perf_counter() - started
+            self.publish_seconds_total += seconds
+            self.publish_seconds_max = max(self.publish_seconds_max, seconds)
+
+    async def publish(self, subject: str, data: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        """
+        共有接続で発行する（送信バッファへの書き込み。サーバ到達を待つ場合は flush() を呼ぶ）
+        """
+        client = self.require_client()
+        async with self.measure_publish(len(data)):
+            await client.publish(subject, data, headers=headers)
+
+    async def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        送信バッファがサーバに届くまで待つ（既定のタイムアウトは flush_timeout_seconds）
+        """
+        client = self.require_client()
+        started = time.perf_counter()
+        try:
+            await client.flush(timeout=timeout or self.flush_timeout)
+        except Exception:
+            self.flush_failures += 1
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.flushes += 1
+            self.flush_seconds_total += seconds
+            self.flush_seconds_max = max(self.flush_seconds_max, seconds)
+
+    # --------------------------------------------------------------------------
+    # 状態・統計
+    # --------------------------------------------------------------------------
+    def health(self) -> Dict[str, Any]:
+        """
+        readiness 判定用の接続状態を返す
+        """
+        client = self.client
+        if client is None:
+            status = "retrying" if self._retry_task and not self._retry_task.done() else "disconnected"
+        elif client.is_connected:
+            status = "connected"
+        elif client.is_reconnecting:
+            status = "reconnecting"
+        elif client.is_draining:
+            status = "draining"
+        else:
+            status = "disconnected"
+        return {
+            "ready": status == "connected",
+            "status": status,
+            "server": client.connected_url.netloc if client is not None and client.connected_url else None,
+            "last_error": self.last_error,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        接続状態と発行・flush・再接続の集計値を返す（メトリクス用）
+        """
+        client = self.client
+        stats = client.stats if client is not None else {}
+        return {
+            **self.health(),
+            "connect_attempts": self.connect_attempts,
+            "disconnects": self.disconnects,
+            "reconnects": self.reconnects,
+            "errors": self.errors,
+            "published": self.published,
+            "publish_failures": self.publish_failures,
+            "bytes_out": self.bytes_out,
+            "publish_seconds_avg": round(self.publish_seconds_total / self.published, 6) if self.published else 0.0,
+            "publish_seconds_max": round(self.publish_seconds_max, 6),
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "flush_seconds_avg": round(self.flush_seconds_total / self.flushes, 6) if self.flushes else 0.0,
+            "flush_seconds_max": round(self.flush_seconds_max, 6),
+            "pending_bytes": client.pending_data_size if client is not None else 0,
+            "pending_size_limit": self.pending_size,
+            "in_msgs": stats.get("in_msgs", 0),
+            "in_bytes": stats.get("in_bytes", 0),
+            "out_msgs": stats.get("out_msgs", 0),
+        }
+
+
+# ------------------------------------------------------------------------------
+# 共有インスタンス
+# ------------------------------------------------------------------------------
+nats_manager = NatsConnectionManager(config.nats["address"], config.nats.get("connection", {}))
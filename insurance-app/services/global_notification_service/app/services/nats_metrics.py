@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+NATS 購読メトリクス
+
+- 受信サブジェクトごとに受信数・処理成功数・失敗数・ハンドラ処理時間を集計する
+- instrument() で包んだハンドラの例外はここでログ出力して握り潰す（購読は継続する）
+- JetStream 購読では再配信要求（nak）・デッドレター送信の件数も集計する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from nats.aio.msg import Msg
+
+# ------------------------------------------------------------------------------
+# ロガー初期化
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+
+class SubscriberMetrics:
+    """
+    サブジェクト単位の購読処理統計
+    """
+
+    def __init__(self):
+        self._subjects: Dict[str, Dict[str, float]] = {}
+
+    def _stats(self, subject: str) -> Dict[str, float]:
+        return self._subjects.setdefault(subject, {
+            "received": 0,
+            "handled": 0,
+            "failed": 0,
+            "handler_seconds_total": 0.0,
+            "handler_seconds_max": 0.0,
+            "redelivery_requested": 0,
+            "dead_lettered": 0,
+        })
+
+    def observe(self, subject: str, seconds: float, failed: bool) -> None:
+        """
+        1メッセージ分の処理結果を記録する
+        """
+        stats = self._stats(subject)
+        stats["received"] += 1
+        stats["failed" if failed else "handled"] += 1
+        stats["handler_seconds_total"] += seconds
+        stats["handler_seconds_max"] = max(stats["handler_seconds_max"], seconds)
+
+    def observe_outcome(self, subject: str, outcome: str) -> None:
+        """
+        JetStream の再配信要求（redelivery_requested）・デッドレター送信（dead_lettered）を記録する
+        """
+        self._stats(subject)[outcome] += 1
+
+    async def run(self, handler: Callable[[Msg], Awaitable[None]], msg: Msg) -> bool:
+        """
+        ハンドラを実行して計測し、成功したかを返す（例外はログ出力して握り潰す）
+        """
+        started = time.perf_counter()
+        failed = False
+        try:
+            await handler(msg)
+        except Exception:
+            failed = True
+            logger.exception("[NATS] メッセージ処理中にエラーが発生しました: subject=%s", msg.subject)
+        finally:
+            self.observe(msg.subject, time.perf_counter() - started, failed)
+        return not failed
+
+    def instrument(self, handler: Callable[[Msg], Awaitable[None]]) -> Callable[[Msg], Awaitable[None]]:
+        """
+        ハンドラを計測付きのコールバックに包む
+        """
+        async def callback(msg: Msg) -> None:
+            await self.run(handler, msg)
+
+        return callback
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        サブジェクトごとの集計値を返す（メトリクス用）
+        """
+        return {
+            subject: {
+                "received": int(stats["received"]),
+                "handled": int(stats["handled"]),
+                "failed": int(stats["failed"]),
+                "handler_seconds_total": round(stats["handler_seconds_total"], 6),
+                "handler_seconds_avg": round(stats["handler_seconds_total"] / stats["received"], 6) if stats["received"] else 0.0,
+                "handler_seconds_max": round(stats["handler_seconds_max"], 6),
+                "redelivery_requested": int(stats["redelivery_requested"]),
+                "dead_lettered": int(stats["dead_lettered"]),
+            }
+            for subject, stats in self._subjects.items()
+        }
+
+
+# ------------------------------------------------------------------------------
+# 共有インスタンス
+# ------------------------------------------------------------------------------
+subscriber_metrics = SubscriberMetrics()
@@ -2,49 +2,45 @@
 """
 NATSイベントパブリッシュ処理モジュール（接続再利用対応）
 
-- アプリ起動時に NATS へ接続
-- publish_event() で常駐接続を使ってイベント送信
+- アプリ起動時に NATS へ接続（接続はプロセス内で共有する nats_manager が保持し、切断時は自動で再接続する）
+- publish_event() で共有接続を使ってイベント送信
+- nats.jetstream.enabled の場合はストリームに発行し、永続化の応答（PubAck）を待つ
 """
 
 import json
 import logging
-from typing import Optional
-from nats.aio.client import Client as NATS
 
+from app.services import nats_jetstream
+from app.services.nats_connection import nats_manager
 from app.config.config import Config
 
 config = Config()
 logger = logging.getLogger(__name__)
 
-# グローバル接続インスタンス（初期はNone）
-nats_client: Optional[NATS] = None
+async def init_nats_connection():
+    """
+    アプリ起動時に呼び出される NATS 接続初期化関数（接続できない場合はバックグラウンドで再試行）
+    """
+    await nats_manager.connect()
 
-logger = logging.getLogger(__name__)
+async def close_nats_connection():
+    """
+    アプリ終了時に呼び出される NATS 切断処理（送信バッファを drain してから切断）
+    """
+    await nats_manager.drain()
 
 async def publish_event(subject: str, payload: dict):
     """
-    再利用中のNATS接続を使ってイベント送信（再接続対応）
+    共有のNATS接続を使ってイベント送信（未接続・送信失敗時はログ出力のみで処理継続）
     """
-    global nats_client
-    if not nats_client or not nats_client.is_connected:
-        try:
-            logger.warning("NATS未接続。再接続を試みます...")
-            nats_client = NATS()
-            await nats_client.connect(
-                servers=[config.nats["address"]],
-                reconnect_time_wait=1,
-                max_reconnect_attempts=2,
-                connect_timeout=1
-            )
-            logger.info("NATS再接続成功")
-        except Exception as e:
-            logger.error("NATS再接続失敗（パブリッシュ中止）: %s", str(e))
-            return  # ※失敗しても処理継続
-
     try:
         message = json.dumps(payload, ensure_ascii=False, default=str).encode()
         logger.info("NATSパブリッシュ開始: subject=%s", subject)
-        await nats_client.publish(subject, message)
+        if nats_jetstream.jetstream_enabled():
+            async with nats_manager.measure_publish(len(message)):
+                await nats_jetstream.publish(nats_manager.jetstream(), subject, message)
+        else:
+            await nats_manager.publish(subject, message)
         logger.info("NATSパブリッシュ成功: subject=%s", subject)
     except Exception as e:
-        logger.error("NATSパブリッシュ失敗: subject=%s, error=%s", subject, str(e))
\ No newline at end of file
+        logger.error("NATSパブリッシュ失敗: subject=%s, error=%s", subject, str(e))
@@ -1,9 +1,9 @@
 from fastapi import FastAPI
-from motor.motor_asyncio import AsyncIOMotorClient
 
 import logging
 
-from app.routes import plans
+from app.routes import plans, metrics
+from app.dependencies.get_mongo_client import init_mongo_client, close_mongo_client
 from app.config.config import Config
 
 # ------------------------------------------------------------------------------
@@ -29,6 +29,7 @@ app = FastAPI(title="Quotation Service")
 # ルーター登録（見積もりAPI）
 # ------------------------------------------------------------------------------
 app.include_router(plans.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
 
 # ------------------------------------------------------------------------------
 # スタートアップイベント: MongoDB クライアントの初期化
@@ -36,8 +37,15 @@ app.include_router(plans.router, prefix="/api/v1")
 @app.on_event("startup")
 async def startup_db_client():
     """
-    アプリケーション起動時にMongoDBクライアントを初期化し、
+    アプリケーション起動時に共有MongoDBクライアントを初期化し、
     `app.state.mongo_client` に接続インスタンスを保持する。
     """
     logger.info("MongoDB クライアントの初期化")
-    app.state.mongo_client = AsyncIOMotorClient(config.mongodb["dsn"])
+    app.state.mongo_client = init_mongo_client()
+
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    """
+    アプリケーション停止時に共有MongoDBクライアントをクローズする。
+    """
+    close_mongo_client()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+運用メトリクス公開ルーター
+
+- 接続プール等の内部計測値を JSON で返す（監視・チューニング用）
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.dependencies.get_mongo_client import pool_metrics
+
+# ------------------------------------------------------------------------------
+# 初期化
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+# ------------------------------------------------------------------------------
+# メトリクス取得エンドポイント
+# ------------------------------------------------------------------------------
+@router.get("/internal/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """
+    サービス内部の計測値を返す
+
+    Returns:
+        dict: 各コンポーネントのメトリクス
+    """
+    return {
+        "mongo_pool": pool_metrics.snapshot(),
+    }
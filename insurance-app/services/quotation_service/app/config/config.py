@@ -88,3 +88,43 @@ class Config:
         保険商品に関する業務設定値（契約年齢・控除額など）
         """
         return self._data.get("pension", {})
+
+    # --------------------------------------------------------------------------
+    # 一覧APIのページング設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def pagination(self):
+        """
+        一覧APIのページング（既定件数・上限件数）の設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("pagination", {})
+
+    # --------------------------------------------------------------------------
+    # 見積もり試算グリッド設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def simulation(self):
+        """
+        見積もり試算グリッド（組み合わせ数の上限など）の設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("simulation", {})
+
+    # --------------------------------------------------------------------------
+    # 確率的利率シナリオ（モンテカルロ）設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def monte_carlo(self):
+        """
+        確率的利率シナリオ試算（プロセス数・試行回数上限・利率モデル）の設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("monte_carlo", {})
+
+    # --------------------------------------------------------------------------
+    # イベントアウトボックス設定の取得（任意項目）
+    # --------------------------------------------------------------------------
+    @property
+    def outbox(self):
+        """
+        イベントアウトボックス（発行元・送信リレーのバッチ件数・再試行間隔など）の設定情報を返す（未設定時は空dictを返す）
+        """
+        return self._data.get("outbox", {})
@@ -6,7 +6,7 @@ PostgreSQL用 quotes テーブルのSQLAlchemyモデル定義
 # ------------------------------------------------------------------------------
 # インポート
 # ------------------------------------------------------------------------------
-from sqlalchemy import Column, String, Date, Integer, Boolean, Numeric, TIMESTAMP, text, ForeignKey
+from sqlalchemy import Column, String, Date, Integer, Boolean, Numeric, TIMESTAMP, text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import AsyncAttrs
@@ -23,6 +23,8 @@ class Quote(Base):
     見積もり情報テーブル（quotes）
     """
     __tablename__ = "quotes"
+    # INSERT 時に created_at / updated_at（サーバ既定値）を RETURNING で取得する
+    __mapper_args__ = {"eager_defaults": True}
 
     quote_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, comment="見積もりID（UUID）")
     user_id = Column(UUID(as_uuid=True), nullable=False, comment="ユーザーID（UUID）")
@@ -34,6 +36,16 @@ class Quote(Base):
     created_by = Column(String, nullable=True, comment="作成者（オペレータIDなど）")
     updated_by = Column(String, nullable=True, comment="更新者（オペレータIDなど）")
 
+    # 見積もり一覧（user_id 指定・created_at, quote_id 降順のキーセットページング）用
+    # 作成は Alembic（db/alembic/versions）で CONCURRENTLY 実行する
+    __table_args__ = (
+        Index(
+            "ix_quotes_user_id_created_at",
+            user_id, created_at.desc(), quote_id.desc(),
+            postgresql_include=["quote_state"],
+        ),
+    )
+
 # ------------------------------------------------------------------------------
 # QuoteDetail モデル（見積もり詳細）
 # ------------------------------------------------------------------------------
@@ -3,18 +3,171 @@
 MongoDB クライアント初期化処理
 
 FastAPI における Depends インジェクション用の非同期 MongoDB クライアントを提供します。
+
+- プロセス内で共有する単一の AsyncIOMotorClient（起動時生成・停止時クローズ）
+- 接続プールのサイズ設定（config.yaml の mongodb.pool）
+- 接続プールの利用状況（チェックアウト数・待ち時間）の計測
 """
 
 # ------------------------------------------------------------------------------
 # インポート
 # ------------------------------------------------------------------------------
+import logging
+import threading
+from typing import Any, Dict, Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
 from app.config.config import Config
 
 # ------------------------------------------------------------------------------
 # 設定読み込み
 # ------------------------------------------------------------------------------
 config = Config()
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------
+# 接続プール計測リスナー
+# ------------------------------------------------------------------------------
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    PyMongo の接続プールイベント（CMAP）を集計するリスナー
+
+    チェックアウト回数・失敗回数・待ち時間・使用中接続数を保持し、
+    プールサイズのチューニング材料として公開する。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkout_started = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.checkout_failed = 0
+        self.checkout_timeouts = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _observe_wait(self, duration: Optional[float]) -> None:
+        if duration is None:
+            return
+        self.wait_seconds_total += duration
+        self.wait_seconds_max = max(self.wait_seconds_max, duration)
+
+    # --- チェックアウト関連 ----------------------------------------------------
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.checkout_started += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self._observe_wait(getattr(event, "duration", None))
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failed += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.checkout_timeouts += 1
+            self._observe_wait(getattr(event, "duration", None))
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_in += 1
+            self.in_use = max(self.in_use - 1, 0)
+
+    # --- 接続ライフサイクル ----------------------------------------------------
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    # --- プールライフサイクル --------------------------------------------------
+    def pool_created(self, event):
+        logger.info("[MongoDBプール] 作成: %s", event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        logger.warning("[MongoDBプール] クリア: %s", event.address)
+
+    def pool_closed(self, event):
+        logger.info("[MongoDBプール] クローズ: %s", event.address)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        現在の集計値を辞書で返す
+        """
+        with self._lock:
+            avg_wait = self.wait_seconds_total / self.checked_out if self.checked_out else 0.0
+            return {
+                "checkout_started": self.checkout_started,
+                "checked_out": self.checked_out,
+                "checked_in": self.checked_in,
+                "checkout_failed": self.checkout_failed,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(avg_wait, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+# ------------------------------------------------------------------------------
+# 共有クライアント（プロセス内シングルトン）
+# ------------------------------------------------------------------------------
+pool_metrics = MongoPoolMetrics()
+_mongo_client: Optional[AsyncIOMotorClient] = None
+
+
+def init_mongo_client() -> AsyncIOMotorClient:
+    """
+    共有 MongoDB クライアントを生成する（生成済みの場合はそれを返す）
+
+    Returns:
+        AsyncIOMotorClient: プロセス内で共有される非同期MongoDBクライアント
+    """
+    global _mongo_client
+    if _mongo_client is None:
+        pool = config.mongodb.get("pool", {})
+        _mongo_client = AsyncIOMotorClient(
+            config.mongodb["dsn"],
+            uuidRepresentation="standard",
+            maxPoolSize=pool.get("maxPoolSize", 100),
+            minPoolSize=pool.get("minPoolSize", 0),
+            waitQueueTimeoutMS=pool.get("waitQueueTimeoutMS"),
+            event_listeners=[pool_metrics],
+        )
+        logger.info("[MongoDB] 共有クライアント生成: pool=%s", pool)
+    return _mongo_client
+
+
+def close_mongo_client() -> None:
+    """
+    共有 MongoDB クライアントをクローズする
+    """
+    global _mongo_client
+    if _mongo_client is not None:
+        _mongo_client.close()
+        _mongo_client = None
+        logger.info("[MongoDB] 共有クライアントをクローズしました")
 
 
 # ------------------------------------------------------------------------------
@@ -25,9 +178,6 @@ def get_mongo_client() -> AsyncIOMotorClient:
     FastAPI の Depends 経由で使用される MongoDB クライアントを返す
 
     Returns:
-        AsyncIOMotorClient: 非同期MongoDBクライアントインスタンス
+        AsyncIOMotorClient: 共有の非同期MongoDBクライアントインスタンス
     """
-    return AsyncIOMotorClient(
-        config.mongodb["dsn"],
-        uuidRepresentation="standard"
-    )
+    return init_mongo_client()
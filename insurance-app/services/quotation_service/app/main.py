@@ -14,12 +14,17 @@ import asyncio
 import logging
 
 from fastapi import FastAPI
-from motor.motor_asyncio import AsyncIOMotorClient
 
-from app.services.nats_subscriber import run_nats_subscriber
+from app.services.nats_subscriber import run_nats_subscriber, stop_nats_subscriber
+from app.services.nats_dispatcher import dispatcher
 from app.services.nats_publisher import init_nats_connection, close_nats_connection
+from app.services.event_outbox import outbox_relay
 
-from app.routes import quotes
+from app.routes import quotes, metrics
+from app.dependencies.get_mongo_client import init_mongo_client, close_mongo_client
+from app.services.rate_repository import rate_repository
+from app.services.mongo_indexes import index_manager
+from app.services.monte_carlo import monte_carlo_runner
 from app.config.config import Config
 
 # ------------------------------------------------------------------------------
@@ -45,6 +50,7 @@ app = FastAPI(title="Quotation Service")
 # ルーター登録（見積もりAPI）
 # ------------------------------------------------------------------------------
 app.include_router(quotes.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
 
 # ------------------------------------------------------------------------------
 # スタートアップイベント: MongoDB クライアントの初期化
@@ -52,11 +58,44 @@ app.include_router(quotes.router, prefix="/api/v1")
 @app.on_event("startup")
 async def startup_db_client():
     """
-    アプリケーション起動時にMongoDBクライアントを初期化し、
+    アプリケーション起動時に共有MongoDBクライアントを初期化し、
     `app.state.mongo_client` に接続インスタンスを保持する。
     """
     logger.info("MongoDB クライアントの初期化")
-    app.state.mongo_client = AsyncIOMotorClient(config.mongodb["dsn"])
+    app.state.mongo_client = init_mongo_client()
+
+    # 検索用インデックスの不足分を作成（大規模コレクションでは無効化し、CLI で作成する）
+    if config.mongodb.get("indexes", {}).get("ensure_on_startup", True):
+        await index_manager.ensure(app.state.mongo_client)
+
+    # 利率テーブルをメモリに読み込み、変更追従を開始
+    await rate_repository.start(app.state.mongo_client)
+
+    # 確率的シナリオ試算用のプロセスプールを起動
+    monte_carlo_runner.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """
+    アプリケーション停止時に NATS の受信・イベント処理・発行を順に止めて切断する。
+    （イベント処理が DB・利率テーブルを使うため、MongoDB クライアントのクローズより先に実行する）
+    """
+    # 新規の受信を止める（購読の drain・JetStream の取得ループ停止）
+    await stop_nats_subscriber()
+    # 受信済みイベントの処理を終えてからワーカーを停止する
+    await dispatcher.stop()
+    # 実行中の送信バッチを終えてから NATS を drain して切断する
+    await outbox_relay.stop()
+    await close_nats_connection()
+
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    """
+    アプリケーション停止時に利率の変更追従・試算プロセスプールを止め、共有MongoDBクライアントをクローズする。
+    """
+    await rate_repository.stop()
+    monte_carlo_runner.shutdown()
+    close_mongo_client()
 
 # 起動時に NATS 購読を開始
 @app.on_event("startup")
@@ -67,7 +106,5 @@ async def startup_event():
 @app.on_event("startup")
 async def on_startup():
     await init_nats_connection()
-
-@app.on_event("shutdown")
-async def on_shutdown():
-    await close_nats_connection()
\ No newline at end of file
+    # アウトボックスの未送信イベントの発行を開始
+    outbox_relay.start()
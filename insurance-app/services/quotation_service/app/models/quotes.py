@@ -9,7 +9,7 @@
 # ------------------------------------------------------------------------------
 from datetime import date, datetime
 from uuid import UUID
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 from enum import Enum
 
 from pydantic import BaseModel, Field, conint, constr
@@ -71,6 +71,94 @@ class PensionQuoteCalculateResult(BaseModel):
     pension_start_age: int
     annual_tax_deduction: int
     scenarios: List[PensionQuoteScenarioModel]
+    rate_version: Optional[str] = None
+
+# ------------------------------------------------------------------------------
+# 試算グリッド（what-if シミュレーション）モデル
+# ------------------------------------------------------------------------------
+class PremiumRangeModel(BaseModel):
+    """
+    月額保険料の試算範囲（min〜max を step 刻み、両端を含む）
+    """
+    min: conint(ge=10000, le=50000, multiple_of=1000) = Field(..., description="最小月額保険料（円）")
+    max: conint(ge=10000, le=50000, multiple_of=1000) = Field(..., description="最大月額保険料（円）")
+    step: conint(ge=1000, multiple_of=1000) = Field(1000, description="刻み幅（1,000円単位）")
+
+class PaymentPeriodRangeModel(BaseModel):
+    """
+    払込期間の試算範囲（min〜max を step 刻み、両端を含む）
+    """
+    min: conint(ge=15, le=45) = Field(..., description="最小払込期間（年）")
+    max: conint(ge=15, le=45) = Field(..., description="最大払込期間（年）")
+    step: conint(ge=1) = Field(1, description="刻み幅（年）")
+
+class PensionPaymentRangeModel(BaseModel):
+    """
+    年金受取期間の試算範囲（min〜max を step 刻み、両端を含む）
+    """
+    min: conint(ge=5, le=30) = Field(..., description="最小年金受取期間（年）")
+    max: conint(ge=5, le=30) = Field(..., description="最大年金受取期間（年）")
+    step: conint(ge=1) = Field(1, description="刻み幅（年）")
+
+class PensionQuoteSimulationRequestModel(BaseModel):
+    """
+    見積もり試算グリッドの要求モデル
+    - 月額保険料 × 払込期間 × 年金受取期間 の全組み合わせを試算する（保存は行わない）
+    """
+    birth_date: date = Field(..., description="契約者の生年月日（date型）")
+    gender: Literal["male", "female"] = Field(..., description="性別（'male' または 'female'）")
+    monthly_premium: PremiumRangeModel = Field(..., description="月額保険料の範囲")
+    payment_period_years: PaymentPeriodRangeModel = Field(..., description="払込期間の範囲")
+    pension_payment_years: PensionPaymentRangeModel = Field(..., description="年金受取期間の範囲")
+    tax_deduction_enabled: bool = Field(..., description="税制適格特約の有無（True/False）")
+
+class PensionQuoteSimulationResponseModel(BaseModel):
+    """
+    見積もり試算グリッドの結果モデル（列形式）
+    - axes: 各行の条件（monthly_premium / payment_period_years / pension_payment_years）
+    - scenarios: シナリオ種別（base / low / high）ごとの計算結果列（axes と同じ行順）
+    """
+    contract_date: date = Field(..., description="契約開始日")
+    pension_start_age: int = Field(..., description="契約年齢")
+    annual_tax_deduction: int = Field(..., description="年間控除額")
+    rate_version: Optional[str] = Field(None, description="計算に使用した利率版ID")
+    interest_rates: Dict[str, float] = Field(..., description="シナリオ種別ごとの利率（%）")
+    grid_size: int = Field(..., description="条件の組み合わせ数（行数）")
+    axes: Dict[str, List[int]] = Field(..., description="条件列")
+    scenarios: Dict[str, Dict[str, List[float]]] = Field(..., description="シナリオ種別ごとの結果列")
+
+# ------------------------------------------------------------------------------
+# 確率的利率シナリオ（モンテカルロ）モデル
+# ------------------------------------------------------------------------------
+class PensionQuoteMonteCarloRequestModel(PensionQuoteRequestModel):
+    """
+    確率的利率シナリオによる見積もり試算の要求モデル
+    - 見積もり条件に加えて、試行回数と乱数シードを指定する（保存は行わない）
+    """
+    paths: conint(ge=100) = Field(1000, description="利率パスの試行回数")
+    seed: Optional[conint(ge=0)] = Field(None, description="乱数シード（未指定時は設定値、同一シードは同一結果）")
+
+class PercentileBandModel(BaseModel):
+    """
+    パーセンタイル帯（5% / 50% / 95%）
+    """
+    p5: float = Field(..., description="5パーセンタイル")
+    p50: float = Field(..., description="中央値")
+    p95: float = Field(..., description="95パーセンタイル")
+
+class PensionQuoteMonteCarloResponseModel(BaseModel):
+    """
+    確率的利率シナリオによる見積もり試算の結果モデル
+    """
+    contract_date: date = Field(..., description="契約開始日")
+    rate_version: Optional[str] = Field(None, description="計算に使用した利率版ID")
+    seed: int = Field(..., description="使用した乱数シード")
+    paths: int = Field(..., description="利率パスの試行回数")
+    total_paid_amount: int = Field(..., description="総払込額")
+    model: Dict[str, float] = Field(..., description="利率モデルのパラメータ（平均回帰先・回帰速度・ボラティリティ・下限）")
+    average_rate: PercentileBandModel = Field(..., description="払込期間の平均利率（%）")
+    lump_sum_amount: PercentileBandModel = Field(..., description="一括受取額（円）")
+    annual_pension: PercentileBandModel = Field(..., description="年金年額（円）")
 
 # ------------------------------------------------------------------------------
 # ステータス更新モデル
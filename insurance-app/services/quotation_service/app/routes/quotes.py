@@ -5,13 +5,15 @@
 
 import logging
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, Path, HTTPException, status
+from fastapi import APIRouter, Depends, Path, Query, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies.auth import require_quote_write_permission
+from app.dependencies.auth import authenticate_user, require_quote_write_permission
 from app.dependencies.get_mongo_client import get_mongo_client
 from app.models.quotes import (
     PensionQuoteRequestModel,
@@ -20,27 +22,46 @@ from app.models.quotes import (
     QuoteStateUpdateRequest, 
     QuoteState,
     PartialQuoteUpdateModel,
+    PensionQuoteSimulationRequestModel,
+    PensionQuoteSimulationResponseModel,
+    PensionQuoteMonteCarloRequestModel,
+    PensionQuoteMonteCarloResponseModel,
 )
 from app.db.database import get_async_session
 from app.models.events import (
     QuoteCreatedEvent,
     QuoteStatusChangedEvent
 )
-from app.services.calculate_quote import calculate_quote
+from app.services.calculate_quote import calculate_quote, PLAN_CODE
+from app.services.quote_simulation import simulate_quote_grid, SCENARIO_RATES
+from app.services.monte_carlo import simulate_quote_monte_carlo
+from app.services.projection_engine import ProjectionSchedule, iter_ndjson
+from app.services.rate_repository import get_interest_rates
 from app.services.quote_manager import (
+    create_quote,
     get_quotes_by_user_id,
+    QUOTE_LIST_FIELDS,
     get_quote_by_id,
     mark_quote_state,
-    save_quote,
     get_scenarios_by_quote_id,
+    get_scenarios_by_quote_ids,
     update_quote,
     save_scenarios_to_mongo
 )
 
-from app.services.nats_publisher import publish_event
+from app.services.event_outbox import stage_event
+from app.services.pagination import NEXT_CURSOR_HEADER, parse_fields
+
+from app.config.config import Config
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+config = Config()
+
+# 一覧APIのページング件数（cursor のみ指定時の既定値・指定可能な上限）
+# limit・cursor とも未指定の場合は従来どおり全件を返す
+DEFAULT_PAGE_LIMIT = config.pagination.get("default_limit", 50)
+MAX_PAGE_LIMIT = config.pagination.get("max_limit", 200)
 
 # ------------------------------------------------------------------------------
 # POST /quotes/pension - 新しい見積もりを作成
@@ -64,43 +85,61 @@ async def post_pension_quote(
     calculated_result = await calculate_quote(request_model, mongo_client)
     logger.debug(f"[DEBUG] calculated_result: {calculated_result}")
 
-    #見積もりを格納
-    quote_id = await save_quote(
-        session=session,
-        user_id=user_id,
-        request=request_model,
-        calculate_result=calculated_result
-    )
-
-    #シナリオを格納
-    try:
-        await save_scenarios_to_mongo(
-            mongo_client=mongo_client,
-            quote_id=str(quote_id),
-            scenarios=calculated_result.scenarios
-        )
-    except Exception as e:
-        logger.error("MongoDBシナリオ保存失敗: %s", e)
-        raise HTTPException(status_code=500, detail="Failed to save scenario")
-
-    #イベントを発火
+    #作成イベント（見積もりと同じトランザクションでアウトボックスに登録し、リレーが発行する）
     event = QuoteCreatedEvent(
-        quote_id=quote_id,
+        quote_id=calculated_result.quote_id,
         user_id=user_id,
         created_at=datetime.utcnow()
     )
-    await publish_event("quotes.QuoteCreated", event.dict())
 
-    #DBから最新データを取得してレスポンス構築
-    created_quote = await get_quote_by_id(
+    #見積もり（PostgreSQL）とシナリオ（MongoDB）を並行して格納し、保存内容からレスポンスを構築
+    created_quote = await create_quote(
         session=session,
-        quote_id=quote_id,
-        user_id=UUID(user_id)
+        mongo_client=mongo_client,
+        user_id=user_id,
+        request=request_model,
+        calculate_result=calculated_result,
+        events=[("quotes.QuoteCreated", event.dict())]
     )
-    created_quote.scenarios = calculated_result.scenarios
 
     return created_quote
 
+# ------------------------------------------------------------------------------
+# POST /quotes/pension/simulate - 見積もり試算グリッド（保存なし）
+# ------------------------------------------------------------------------------
+@router.post("/quotes/pension/simulate", response_model=PensionQuoteSimulationResponseModel)
+async def post_pension_quote_simulation(
+    request_model: PensionQuoteSimulationRequestModel,
+    token_payload: dict = Depends(authenticate_user),
+    mongo_client: AsyncIOMotorClient = Depends(get_mongo_client),
+):
+    """
+    月額保険料 × 払込期間 × 年金受取期間 の全組み合わせを試算して列形式で返す
+    - DB保存・イベント発行は行わない
+    - 結果は計算済みの JSON 値のため、レスポンスモデルの再検証を省いて返却する
+    """
+    logger.info(f"[API] POST /quotes/pension/simulate called (user_id={token_payload.get('sub')})")
+
+    result = await simulate_quote_grid(request_model, mongo_client)
+    return JSONResponse(content=result)
+
+# ------------------------------------------------------------------------------
+# POST /quotes/pension/montecarlo - 確率的利率シナリオ試算（保存なし）
+# ------------------------------------------------------------------------------
+@router.post("/quotes/pension/montecarlo", response_model=PensionQuoteMonteCarloResponseModel)
+async def post_pension_quote_monte_carlo(
+    request_model: PensionQuoteMonteCarloRequestModel,
+    token_payload: dict = Depends(authenticate_user),
+    mongo_client: AsyncIOMotorClient = Depends(get_mongo_client),
+):
+    """
+    利率パスを乱数で生成し、一括受取額・年金年額のパーセンタイル帯（p5 / p50 / p95）を返す
+    - 計算はプロセスプールで実行され、同一条件・同一シード・同一利率版の結果はキャッシュされる
+    """
+    logger.info(f"[API] POST /quotes/pension/montecarlo called (user_id={token_payload.get('sub')})")
+
+    return await simulate_quote_monte_carlo(request_model, mongo_client)
+
 # ------------------------------------------------------------------------------
 # PUT /my/quotes/{quote_id}/changestate - 見積もり状態の更新
 # ------------------------------------------------------------------------------
@@ -150,16 +189,16 @@ async def update_quote_state(
 
     #DBのquoteの状態を変更
     try:
-        await mark_quote_state(session=session, quote_id=quote_id, user_id=user_id, new_state=payload.new_state.value)
-        #イベントを発火
+        #イベントをアウトボックスに登録（状態の更新と同じコミットで確定する）
         event = QuoteStatusChangedEvent(
             quote_id=str(quote_id),
             from_state=current_state.value, 
             to_state=payload.new_state.value,
             changed_at=datetime.utcnow().isoformat()
         )
+        stage_event(session, "quotes.QuoteUpdated", event.dict())
 
-        await publish_event("quotes.QuoteUpdated", event.dict())
+        await mark_quote_state(session=session, quote_id=quote_id, user_id=user_id, new_state=payload.new_state.value)
 
         return QuoteStateUpdateModel(
             quote_id=str(quote_id), 
@@ -187,7 +226,7 @@ async def patch_my_quote(
     - 更新対象フィールドが1つも指定されていない場合はエラー。
     - PostgreSQLのquote_detailsを更新。
     - シナリオはMongoDBに再保存。
-    - 見積もり変更イベント（QuoteChanged）を発火。
+    - 見積もり変更イベント（QuoteChanged）をアウトボックスに登録（quote_details の更新と同じコミット）。
     """
     user_id = token_payload.get("sub")
     logger.info(f"[PATCH] PATCH /my/quotes/{quote_id} by user_id={user_id}")
@@ -249,7 +288,18 @@ async def patch_my_quote(
         scenarios=calculated_result.scenarios
     )
 
-    # 5. quote_detailsテーブルを更新（契約条件・計算結果の上書き）
+    # 5. QuoteChanged イベントをアウトボックスに登録（変更履歴用途。quote_details の更新と同じコミットで確定する）
+    stage_event(
+        session,
+        "quotes.changed",
+        {
+            "event": "QuoteChanged",
+            "quote_id": quote_id,
+            "changed_at": datetime.utcnow().isoformat()
+        }
+    )
+
+    # 6. quote_detailsテーブルを更新（契約条件・計算結果の上書き）
     await update_quote(
         session=session,
         quote_id=UUID(quote_id),
@@ -257,21 +307,12 @@ async def patch_my_quote(
         updates=response_model
     )
 
-    # 6. シナリオ情報をMongoDBに再保存（新しい内容で上書き）
+    # 7. シナリオ情報をMongoDBに再保存（新しい内容で上書き）
     await save_scenarios_to_mongo(
         mongo_client=mongo_client,
         quote_id=quote_id,
         scenarios=calculated_result.scenarios,
-    )
-    
-    # 7. QuoteChanged イベントをNATSで発火（変更履歴用途）
-    await publish_event(
-        subject="quotes.changed",
-        payload={
-            "event": "QuoteChanged",
-            "quote_id": quote_id,
-            "changed_at": datetime.utcnow().isoformat()
-        }
+        rate_version=calculated_result.rate_version,
     )
 
     # 8. DBから最新の見積もりを再取得（scenariosは手動で渡す）
@@ -336,16 +377,16 @@ async def update_quote_state(
 
     #DBのquoteの状態を変更
     try:
-        await mark_quote_state(session=session, quote_id=quote_id, user_id=user_id, new_state="cancelled")
-        #イベントを発火
+        #イベントをアウトボックスに登録（状態の更新と同じコミットで確定する）
         event = QuoteStatusChangedEvent(
             quote_id=str(quote_id),
             from_state=current_state.value, 
             to_state="cancelled",
             changed_at=datetime.utcnow().isoformat()
         )
+        stage_event(session, "quotes.QuoteUpdated", event.dict())
 
-        await publish_event("quotes.QuoteUpdated", event.dict())
+        await mark_quote_state(session=session, quote_id=quote_id, user_id=user_id, new_state="cancelled")
 
         return QuoteStateUpdateModel(
             quote_id=str(quote_id), 
@@ -360,6 +401,10 @@ async def update_quote_state(
 # ------------------------------------------------------------------------------
 @router.get("/my/quotes", response_model=List[PensionQuoteResponseModel])
 async def get_my_quotes(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="1ページの最大件数"),
+    cursor: Optional[str] = Query(None, description="次ページ取得用カーソル（前回レスポンスの X-Next-Cursor）"),
+    fields: Optional[str] = Query(None, description="取得項目（カンマ区切り、例: quote_id,quote_state,created_at）"),
     token_payload: dict = Depends(require_quote_write_permission),
     mongo_client: AsyncIOMotorClient = Depends(get_mongo_client),
     session: AsyncSession = Depends(get_async_session),
@@ -371,15 +416,41 @@ async def get_my_quotes(
 
     logger.info(f"[API] GET /my/quotes (user_id={user_id})")
 
-    # PostgreSQLから見積もり一覧（scenariosなし）を取得
-    quotes = await get_quotes_by_user_id(session, user_id)
-
-    # 各見積もりに対してMongoDBからscenariosを補完
-    for quote in quotes:
-        scenarios = await get_scenarios_by_quote_id(mongo_client, str(quote.quote_id))
-        quote.scenarios = scenarios  # 直接セット
+    field_list = parse_fields(fields, list(QUOTE_LIST_FIELDS) + ["scenarios"])
+    column_fields = None
+    if field_list is not None:
+        column_fields = [f for f in field_list if f != "scenarios"]
+        if "scenarios" in field_list and "quote_id" not in column_fields:
+            column_fields.append("quote_id")  # シナリオ突合用（レスポンスからは除外）
+
+    # PostgreSQLから見積もり一覧（scenariosなし）を1ページ分取得
+    quotes, next_cursor = await get_quotes_by_user_id(
+        session,
+        user_id,
+        limit=limit or (DEFAULT_PAGE_LIMIT if cursor else None),
+        cursor=cursor,
+        fields=column_fields,
+    )
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
 
-    return quotes
+    # 項目絞り込みなし：MongoDBからscenariosを一括取得して補完（件数に関わらず1クエリ）
+    if field_list is None:
+        scenarios_map = await get_scenarios_by_quote_ids(
+            mongo_client, [str(quote.quote_id) for quote in quotes]
+        )
+        for quote in quotes:
+            quote.scenarios = scenarios_map.get(str(quote.quote_id), [])  # 直接セット
+        response.headers.update(headers)
+        return quotes
+
+    # 項目絞り込みあり：scenarios 指定時のみMongoDBを参照
+    if "scenarios" in field_list:
+        scenarios_map = await get_scenarios_by_quote_ids(mongo_client, [str(q["quote_id"]) for q in quotes])
+        for quote in quotes:
+            quote["scenarios"] = scenarios_map.get(str(quote["quote_id"]), [])
+            if "quote_id" not in field_list:
+                del quote["quote_id"]
+    return JSONResponse(content=jsonable_encoder(quotes), headers=headers)
 
 # ------------------------------------------------------------------------------
 # GET /my/quotes/{quote_id} - 自ユーザーの個別見積もり取得
@@ -402,4 +473,62 @@ async def get_my_quote_by_id(
     scenarios = await get_scenarios_by_quote_id(mongo_client, quote_id)
     quote.scenarios = scenarios
 
-    return quote
\ No newline at end of file
+    return quote
+
+# ------------------------------------------------------------------------------
+# GET /my/quotes/{quote_id}/projection - 見積もりの年次推移表（NDJSONストリーミング）
+# ------------------------------------------------------------------------------
+@router.get("/my/quotes/{quote_id}/projection")
+async def get_my_quote_projection(
+    quote_id: str = Path(..., description="取得対象の見積もりID"),
+    scenario: str = Query("base", pattern="^(base|low|high)$", description="シナリオ種別（base / low / high）"),
+    token_payload: dict = Depends(require_quote_write_permission),
+    mongo_client: AsyncIOMotorClient = Depends(get_mongo_client),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    払込期間・年金受取期間の各年の累計払込額・積立額・解約返戻金・年金支払額を返す
+    - 1行目はヘッダー（見積もりID・利率・列名・満了時点の集計値）、以降は1年1行の配列
+    - シナリオ利率は保存済みの見積もりシナリオの値を使う（利率改定後も保存した見積もりと一致する）
+    - 年金移行率・解約返戻率は契約日に該当する利率レコードから取得する
+    """
+    user_id = token_payload.get("sub")
+    if not user_id:
+        logger.warning("アクセストークンにsubが含まれていません")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: no user ID")
+
+    quote = await get_quote_by_id(session, quote_id, user_id)
+
+    try:
+        rates = await get_interest_rates(
+            db=mongo_client,
+            plan_code=PLAN_CODE,
+            contract_date=quote.contract_date
+        )
+    except Exception:
+        logger.exception("[利率取得失敗] MongoDBエラー")
+        raise HTTPException(status_code=503, detail="利率情報の取得に失敗しました")
+
+    stored = {item.scenario_type: item for item in await get_scenarios_by_quote_id(mongo_client, quote_id)}
+    if scenario in stored:
+        interest_rate = stored[scenario].interest_rate
+    else:
+        # シナリオ未保存の見積もりは契約日の利率レコードから求める
+        logger.warning("保存済みシナリオがないため利率レコードの値を使用: quote_id=%s, scenario=%s", quote_id, scenario)
+        interest_rate = rates[dict(SCENARIO_RATES)[scenario]]
+    schedule = ProjectionSchedule(
+        monthly_premium=quote.monthly_premium,
+        payment_years=quote.payment_period_years,
+        pension_years=quote.pension_payment_years,
+        contract_rate=interest_rate,
+        annuity_conversion_rate=rates["annuity_conversion_rate"],
+        surrender_rates=rates["surrender_rates"],
+    )
+    header = {
+        "quote_id": str(quote.quote_id),
+        "scenario": scenario,
+        "interest_rate": interest_rate,
+        "rate_version": rates.get("rate_version"),
+        "contract_date": quote.contract_date.isoformat(),
+    }
+    return StreamingResponse(iter_ndjson(schedule, header), media_type="application/x-ndjson")
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+給付計算エンジン（NumPy によるベクトル化版）
+
+- (月額保険料, 払込年数, 年金受取年数, 利率, 年金移行利率) の配列を受け取り、
+  総払込額・一括受取額・年金額・返戻率・15年時点の解約返戻金を列配列で一括計算する
+- 端数処理（int() による切り捨て、round(x, 2)）は calculate_benefits のスカラー計算と完全に一致させる
+  - 複利の累乗は libm の pow と一致させるため、(利率, 年数) の組ごとに Python の ** で計算する
+  - round(x, 2) は Python と同じく「x の正確な値」を10進で偶数丸めする（py_round を参照）
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+from typing import Dict, List, Union
+
+import numpy as np
+
+# ------------------------------------------------------------------------------
+# ロガー初期化
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[int, float, List[float], np.ndarray]
+
+# Veltkamp 分割用の定数（2^27 + 1）
+_SPLITTER = 134217729.0
+
+# 計算結果の列名（calculate_benefits の戻り値キーと同じ）
+BENEFIT_COLUMNS = (
+    "total_paid",
+    "lump_sum_amount",
+    "annual_pension",
+    "estimated_pension",
+    "pension_refund_rate",
+    "lump_sum_refund_rate",
+    "refund_on_15_years",
+    "refund_rate",
+)
+
+
+# ------------------------------------------------------------------------------
+# 端数処理
+# ------------------------------------------------------------------------------
+def _split(a: np.ndarray):
+    c = _SPLITTER * a
+    hi = c - (c - a)
+    return hi, a - hi
+
+
+def _two_product(a: np.ndarray, b: float):
+    """
+    a * b の浮動小数点積 p と、その丸め誤差 e（a * b = p + e が厳密に成立）を返す
+    """
+    p = a * b
+    a_hi, a_lo = _split(a)
+    b_hi, b_lo = _split(np.float64(b))
+    e = ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+    return p, e
+
+
+def py_round(values: ArrayLike, ndigits: int = 2) -> np.ndarray:
+    """
+    Python 組み込みの round(x, ndigits) と同一結果を返すベクトル版
+
+    Python の round は x の正確な2進値を10進で偶数丸めし、最も近い double に戻す。
+    np.round は x * 10^n を一度丸めてから処理するため、境界値で結果が異なることがある。
+    ここでは x * 10^n の丸め誤差を厳密に求め、ちょうど .5 に見える値の真の向きを判定する。
+    """
+    x = np.asarray(values, dtype=np.float64)
+    scale = float(10 ** ndigits)
+
+    p, e = _two_product(x, scale)
+    r = np.rint(p)
+    d = p - r
+
+    # p がちょうど .5 の場合のみ、誤差 e の符号で真の丸め方向が決まる（e == 0 は真の同値 → 偶数丸め）
+    half = np.abs(d) == 0.5
+    k = np.where(half & (e > 0), p + 0.5, np.where(half & (e < 0), p - 0.5, r))
+    return k / scale
+
+
+def _truncate(values: np.ndarray) -> np.ndarray:
+    """
+    int() と同じ 0 方向への切り捨てを行い int64 に変換する
+    """
+    return np.trunc(values).astype(np.int64)
+
+
+def _growth_factors(contract_rate: np.ndarray, payment_years: np.ndarray) -> np.ndarray:
+    """
+    (1 + 利率 / 100) ** 払込年数 を計算する
+
+    ベクトル化された pow は libm と最終ビットが異なる場合があるため、
+    (利率, 年数) の組ごとに Python の float ** int で計算し、結果を展開する。
+    """
+    base = 1 + contract_rate / 100
+    pairs, inverse = np.unique(
+        np.stack([base, payment_years.astype(np.float64)]), axis=1, return_inverse=True
+    )
+    factors = np.array([float(b) ** int(y) for b, y in pairs.T], dtype=np.float64)
+    return factors[np.asarray(inverse).reshape(-1)]
+
+
+# ------------------------------------------------------------------------------
+# 給付計算（列単位）
+# ------------------------------------------------------------------------------
+def compute_benefit_columns(
+    monthly_premium: ArrayLike,
+    payment_years: ArrayLike,
+    pension_years: ArrayLike,
+    contract_rate: ArrayLike,
+    annuity_conversion_rate: ArrayLike,
+    surrender_rate_15: ArrayLike = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    給付シミュレーションを列配列で一括計算する（各引数はスカラーまたは同じ長さの配列）
+
+    Parameters:
+        monthly_premium: 月額保険料
+        payment_years: 払込年数
+        pension_years: 年金受取年数
+        contract_rate: 積立期間中の予定利率（%）
+        annuity_conversion_rate: 年金移行時の利率（%）
+        surrender_rate_15: 15年経過時点の解約返戻率
+
+    Returns:
+        dict: 列名 → 配列（BENEFIT_COLUMNS 参照）
+    """
+    monthly, pay_years, pen_years, rate, conv_rate, sr15 = np.broadcast_arrays(
+        np.asarray(monthly_premium, dtype=np.int64),
+        np.asarray(payment_years, dtype=np.int64),
+        np.asarray(pension_years, dtype=np.int64),
+        np.asarray(contract_rate, dtype=np.float64),
+        np.asarray(annuity_conversion_rate, dtype=np.float64),
+        np.asarray(surrender_rate_15, dtype=np.float64),
+    )
+    monthly = np.atleast_1d(monthly)
+    pay_years = np.atleast_1d(pay_years)
+    pen_years = np.atleast_1d(pen_years)
+    rate = np.atleast_1d(rate)
+    conv_rate = np.atleast_1d(conv_rate)
+    sr15 = np.atleast_1d(sr15)
+
+    # 総払込額
+    total_paid = monthly * 12 * pay_years
+
+    # 将来一括受取額（積立利率での複利）
+    lump_sum = _truncate(total_paid * _growth_factors(rate, pay_years))
+
+    # 年金年額（年金移行利率を考慮）
+    annual_pension = _truncate(lump_sum * (conv_rate / 100) / pen_years)
+
+    # 年金累計額（年金 × 年数）
+    estimated_pension = annual_pension * pen_years
+
+    # 返戻率（対総払込額）
+    pension_refund_rate = py_round(estimated_pension / total_paid * 100, 2)
+    lump_sum_refund_rate = py_round(lump_sum / total_paid * 100, 2)
+
+    # 15年時点の解約返戻金
+    refund_at_15 = _truncate(monthly * 12 * 15 * sr15)
+    refund_rate_15 = py_round(sr15 * 100, 2)
+
+    return {
+        "total_paid": total_paid,
+        "lump_sum_amount": lump_sum,
+        "annual_pension": annual_pension,
+        "estimated_pension": estimated_pension,
+        "pension_refund_rate": pension_refund_rate,
+        "lump_sum_refund_rate": lump_sum_refund_rate,
+        "refund_on_15_years": refund_at_15,
+        "refund_rate": refund_rate_15,
+    }
+
+
+def benefit_rows(columns: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+    """
+    列配列を行ごとの dict（calculate_benefits と同じ形式・Python の int / float）に変換する
+    """
+    size = len(columns["total_paid"])
+    return [
+        {
+            name: (
+                int(columns[name][i])
+                if np.issubdtype(columns[name].dtype, np.integer)
+                else float(columns[name][i])
+            )
+            for name in BENEFIT_COLUMNS
+        }
+        for i in range(size)
+    ]
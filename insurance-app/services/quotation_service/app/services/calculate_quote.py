@@ -11,7 +11,7 @@
 import logging
 from datetime import date, timedelta
 from uuid import uuid4, UUID
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -21,7 +21,8 @@ from app.models.quotes import (
     PensionQuoteScenarioModel,
     PensionQuoteCalculateResult
 )
-from app.services.rate_loader import load_interest_rates
+from app.services.rate_repository import get_interest_rates
+from app.services.benefit_engine import compute_benefit_columns, benefit_rows
 from app.config.config import Config
 
 # ------------------------------------------------------------------------------
@@ -60,6 +61,56 @@ def get_contract_start_date(today: date) -> date:
     logger.debug("[契約日確定] 翌月1日: %s", next_month)
     return next_month
 
+# ------------------------------------------------------------------------------
+# 契約年齢算出ロジック
+# ------------------------------------------------------------------------------
+def get_contract_age(birth_date: date, contract_date: date) -> int:
+    """
+    契約日時点の満年齢を算出
+
+    Parameters:
+        birth_date (date): 生年月日
+        contract_date (date): 契約日
+
+    Returns:
+        int: 契約年齢
+    """
+    age = contract_date.year - birth_date.year
+    if contract_date < birth_date.replace(year=contract_date.year):
+        age -= 1
+    return age
+
+# ------------------------------------------------------------------------------
+# 契約条件バリデーション
+# ------------------------------------------------------------------------------
+def check_contract_conditions(birth_date: date, payment_period_years: int) -> Tuple[date, int]:
+    """
+    本日時点の契約日・契約年齢を算出し、契約年齢と払込期間の業務ルールを検証する
+
+    Parameters:
+        birth_date (date): 生年月日
+        payment_period_years (int): 払込期間（範囲指定の場合は最小値）
+
+    Returns:
+        (契約日, 契約年齢)
+
+    Raises:
+        HTTPException: 業務ルールに反する場合は 400
+    """
+    contract_date = get_contract_start_date(date.today())
+    pension_start_age = get_contract_age(birth_date, contract_date)
+
+    logger.debug("[年金開始年齢] %d歳", pension_start_age)
+
+    if pension_start_age < MIN_AGE or pension_start_age > MAX_AGE:
+        logger.warning("[契約年齢エラー] %d歳", pension_start_age)
+        raise HTTPException(status_code=400, detail=f"契約年齢は{MIN_AGE}〜{MAX_AGE}歳の範囲です")
+
+    if payment_period_years < MIN_PAYMENT_YEARS:
+        raise HTTPException(status_code=400, detail=f"払込期間は最低{MIN_PAYMENT_YEARS}年以上必要です")
+
+    return contract_date, pension_start_age
+
 # ------------------------------------------------------------------------------
 # 金額・給付シミュレーションロジック
 # ------------------------------------------------------------------------------
@@ -73,6 +124,7 @@ def calculate_benefits(
 ) -> Dict[str, float]:
     """
     利率ごとに金額・給付シミュレーションを行う（実務対応版）
+    内部では benefit_engine のベクトル化計算を1行分だけ実行する（端数処理は同一）
 
     Parameters:
         monthly_premium: 月額保険料
@@ -85,40 +137,16 @@ def calculate_benefits(
     Returns:
         dict: 結果（年金累計額、返戻金、返戻率など）
     """
-
-    # 総払込額
-    total_paid = monthly_premium * 12 * payment_years
-
-    # 将来一括受取額（積立利率での複利）
-    lump_sum = int(total_paid * (1 + contract_rate / 100) ** payment_years)
-
-    # 年金年額（年金移行利率を考慮）
-    annual_pension = int(lump_sum * (annuity_conversion_rate / 100) / pension_years)
-
-    # 年金累計額（年金 × 年数）
-    estimated_pension = annual_pension * pension_years
-
-    # 年金累計額の返戻率（対総払込額）
-    pension_refund_rate = round(estimated_pension / total_paid * 100, 2)
-
-    # 一括受取時の返戻率
-    lump_sum_refund_rate = round(lump_sum / total_paid * 100, 2)
-
-    # 15年時点の解約返戻金（テーブルを参照）
-    surrender_rate_15 = surrender_rates.get(15, 0.0)
-    refund_at_15 = int(monthly_premium * 12 * 15 * surrender_rate_15)
-    refund_rate_15 = round(surrender_rate_15 * 100, 2)
-
-    return {
-        "total_paid": total_paid,
-        "lump_sum_amount": lump_sum,
-        "annual_pension": annual_pension,
-        "estimated_pension": estimated_pension,
-        "pension_refund_rate": pension_refund_rate,
-        "lump_sum_refund_rate": lump_sum_refund_rate,
-        "refund_on_15_years": refund_at_15,
-        "refund_rate": refund_rate_15
-    }
+    columns = compute_benefit_columns(
+        monthly_premium=monthly_premium,
+        payment_years=payment_years,
+        pension_years=pension_years,
+        contract_rate=contract_rate,
+        annuity_conversion_rate=annuity_conversion_rate,
+        # 15年時点の解約返戻率（テーブルを参照）
+        surrender_rate_15=surrender_rates.get(15, 0.0),
+    )
+    return benefit_rows(columns)[0]
 
 # ------------------------------------------------------------------------------
 # シナリオ構築（各利率パターン）
@@ -184,28 +212,15 @@ async def calculate_quote(
     # ────────────────────────────────
     # Step 1: 契約日・契約年齢の算出
     # ────────────────────────────────
-    today = date.today()
-    contract_date = get_contract_start_date(today)
-    birth_date = request.birth_date
-
-    pension_start_age = contract_date.year - birth_date.year
-    if contract_date < birth_date.replace(year=contract_date.year):
-        pension_start_age -= 1
-
-    logger.debug("[年金開始年齢] %d歳", pension_start_age)
-
-    if pension_start_age < MIN_AGE or pension_start_age > MAX_AGE:
-        logger.warning("[契約年齢エラー] %d歳", pension_start_age)
-        raise HTTPException(status_code=400, detail=f"契約年齢は{MIN_AGE}〜{MAX_AGE}歳の範囲です")
-
-    if request.payment_period_years < MIN_PAYMENT_YEARS:
-        raise HTTPException(status_code=400, detail=f"払込期間は最低{MIN_PAYMENT_YEARS}年以上必要です")
+    contract_date, pension_start_age = check_contract_conditions(
+        request.birth_date, request.payment_period_years
+    )
 
     # ────────────────────────────────
-    # Step 2: MongoDBから利率情報取得
+    # Step 2: 利率情報取得（メモリ上の利率テーブル、未読み込み時はMongoDB）
     # ────────────────────────────────
     try:
-        rates = await load_interest_rates(
+        rates = await get_interest_rates(
             db=mongo_client, 
             plan_code=PLAN_CODE,
             contract_date=contract_date
@@ -228,19 +243,21 @@ async def calculate_quote(
     pension_years = request.pension_payment_years or 10  # 初期値10年
 
     scenarios: List[PensionQuoteScenarioModel] = []
+    scenario_rates = [("base", "contract_rate"), ("low", "min_rate"), ("high", "high_rate")]
+
+    # 3シナリオ分をまとめて計算
+    columns = compute_benefit_columns(
+        monthly_premium=request.monthly_premium,
+        payment_years=request.payment_period_years,
+        pension_years=pension_years,
+        contract_rate=[rates[rate_key] for _, rate_key in scenario_rates],
+        annuity_conversion_rate=rates["annuity_conversion_rate"],
+        surrender_rate_15=rates["surrender_rates"].get(15, 0.0)
+    )
 
-    for scenario_type, rate_key in [("base", "contract_rate"), ("low", "min_rate"), ("high", "high_rate")]:
+    for (scenario_type, rate_key), benefits in zip(scenario_rates, benefit_rows(columns)):
         rate = rates[rate_key]
 
-        benefits = calculate_benefits(
-            monthly_premium=request.monthly_premium,
-            payment_years=request.payment_period_years,
-            pension_years=pension_years,
-            contract_rate=rate,
-            annuity_conversion_rate=rates["annuity_conversion_rate"],
-            surrender_rates=rates["surrender_rates"]
-        )
-
         scenario_model = build_scenario_model(
             quote_id=quote_id,
             scenario_type=scenario_type,
@@ -262,7 +279,8 @@ async def calculate_quote(
         total_paid_amount=total_paid_amount,
         pension_start_age=pension_start_age,
         annual_tax_deduction=MAX_ANNUAL_TAX_DEDUCTION,
-        scenarios=scenarios
+        scenarios=scenarios,
+        rate_version=rates.get("rate_version")
     )
 
     logger.info("[見積もり完了] quote_id=%s", quote_id)
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+確率的利率シナリオ（モンテカルロ）による見積もり試算
+
+- 利率は contract_rate を平均回帰先とする離散 Ornstein-Uhlenbeck 過程で年ごとに変動させ、min_rate を下限とする
+- N 本のパスを乱数シード付きで一括生成し、一括受取額・年金年額のパーセンタイル帯（p5 / p50 / p95）を返す
+- 計算は ProcessPoolExecutor 上で実行し、イベントループ（他リクエスト）を止めない
+  （ワーカーは spawn で起動する。Motor / PyMongo の監視スレッドやイベントループを持つプロセスを
+  fork すると、子プロセスがロックを保持したまま複製されデッドロックするおそれがあるため）
+- 結果は（入力条件, 利率版ID, シード）単位で LRU キャッシュし、同一条件の同時要求は1回の計算を共有する
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import asyncio
+import logging
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.quotes import PensionQuoteMonteCarloRequestModel
+from app.services.calculate_quote import PLAN_CODE, check_contract_conditions
+from app.services.rate_repository import get_interest_rates
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 設定・ロガー初期化
+# ------------------------------------------------------------------------------
+config = Config()
+logger = logging.getLogger(__name__)
+
+# 既定値（config.yaml の monte_carlo で上書き可能）
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "max_workers": 2,
+    "max_paths": 20000,
+    "default_seed": 20240601,
+    "mean_reversion": 0.15,
+    "volatility": 0.25,
+    "cache_max_entries": 256,
+    "start_method": "spawn",   # spawn | forkserver（fork は使わない）
+}
+
+PERCENTILES = (5, 50, 95)
+
+
+# ------------------------------------------------------------------------------
+# パス生成・集計（ワーカープロセスで実行される純粋関数）
+# ------------------------------------------------------------------------------
+def _bands(values: np.ndarray, ndigits: Optional[int] = None) -> Dict[str, float]:
+    p5, p50, p95 = np.percentile(values, PERCENTILES)
+    if ndigits is None:
+        return {"p5": int(p5), "p50": int(p50), "p95": int(p95)}
+    return {"p5": round(float(p5), ndigits), "p50": round(float(p50), ndigits), "p95": round(float(p95), ndigits)}
+
+
+def simulate_rate_paths(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    利率パスを生成し、一括受取額・年金年額のパーセンタイル帯を返す
+
+    1年目は contract_rate で付利し、以降は
+        r(t+1) = max(r(t) + mean_reversion * (contract_rate - r(t)) + volatility * ε, min_rate)
+    で変動させる（ε は標準正規乱数）。volatility = 0 のとき決定論的な base シナリオと一致する。
+
+    Parameters:
+        params: monthly_premium / payment_years / pension_years / contract_rate / min_rate /
+                annuity_conversion_rate / mean_reversion / volatility / paths / seed
+
+    Returns:
+        dict: average_rate / lump_sum_amount / annual_pension のパーセンタイル帯
+    """
+    paths = int(params["paths"])
+    payment_years = int(params["payment_years"])
+    theta = float(params["contract_rate"])
+    floor = float(params["min_rate"])
+    kappa = float(params["mean_reversion"])
+    sigma = float(params["volatility"])
+
+    rng = np.random.default_rng(int(params["seed"]))
+    rate = np.full(paths, theta, dtype=np.float64)
+    growth = np.ones(paths, dtype=np.float64)
+    rate_sum = np.zeros(paths, dtype=np.float64)
+
+    for _ in range(payment_years):
+        growth *= 1 + rate / 100
+        rate_sum += rate
+        rate = np.maximum(rate + kappa * (theta - rate) + sigma * rng.standard_normal(paths), floor)
+
+    total_paid = int(params["monthly_premium"]) * 12 * payment_years
+    lump_sum = np.trunc(total_paid * growth)
+    annual_pension = np.trunc(lump_sum * (float(params["annuity_conversion_rate"]) / 100) / int(params["pension_years"]))
+
+    return {
+        "average_rate": _bands(rate_sum / payment_years, 4),
+        "lump_sum_amount": _bands(lump_sum),
+        "annual_pension": _bands(annual_pension),
+    }
+
+
+# ------------------------------------------------------------------------------
+# 実行管理（プロセスプール・キャッシュ）
+# ------------------------------------------------------------------------------
+class MonteCarloRunner:
+    """
+    モンテカルロ試算をプロセスプールで実行し、結果をキャッシュする
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        s = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.max_workers = int(s["max_workers"])
+        self.max_paths = int(s["max_paths"])
+        self.default_seed = int(s["default_seed"])
+        self.mean_reversion = float(s["mean_reversion"])
+        self.volatility = float(s["volatility"])
+        self.cache_max_entries = int(s["cache_max_entries"])
+        self.start_method = s["start_method"]
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+        # 統計
+        self.runs = 0
+        self.cache_hits = 0
+        self.shared = 0
+        self.failures = 0
+        self.run_seconds_total = 0.0
+        self.run_seconds_max = 0.0
+
+    # --------------------------------------------------------------------------
+    # ライフサイクル
+    # --------------------------------------------------------------------------
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+            )
+            logger.info("[モンテカルロ] プロセスプール起動: workers=%d, start_method=%s", self.max_workers, self.start_method)
+        return self._executor
+
+    def start(self) -> None:
+        """
+        プロセスプールを起動する（アプリ起動時）
+        """
+        self._get_executor()
+
+    def shutdown(self) -> None:
+        """
+        プロセスプールを停止する（アプリ停止時、未着手の計算は破棄）
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # --------------------------------------------------------------------------
+    # 実行
+    # --------------------------------------------------------------------------
+    async def run(self, params: Dict[str, Any], rate_version: Optional[str]) -> Dict[str, Any]:
+        """
+        試算結果を返す（キャッシュ済み・計算中の同一条件があればそれを使う）
+
+        利率版IDが不明（スナップショット未読み込み）の場合は、利率変更を検知できないためキャッシュしない。
+        """
+        key = (tuple(sorted(params.items())), rate_version)
+        if rate_version is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return self._cache[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        future = loop.run_in_executor(self._get_executor(), simulate_rate_paths, params)
+        self._inflight[key] = future
+        try:
+            result = await asyncio.shield(future)
+        except BrokenProcessPool:
+            # ワーカーが異常終了した場合は次回呼び出しでプールを作り直す
+            self.failures += 1
+            self._executor = None
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        elapsed = time.perf_counter() - started
+        self.runs += 1
+        self.run_seconds_total += elapsed
+        self.run_seconds_max = max(self.run_seconds_max, elapsed)
+
+        if rate_version is not None:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        実行状況を返す（メトリクス用）
+        """
+        return {
+            "workers": self.max_workers,
+            "runs": self.runs,
+            "cache_hits": self.cache_hits,
+            "cache_entries": len(self._cache),
+            "shared": self.shared,
+            "inflight": len(self._inflight),
+            "failures": self.failures,
+            "run_seconds_total": round(self.run_seconds_total, 6),
+            "run_seconds_avg": round(self.run_seconds_total / self.runs, 6) if self.runs else 0.0,
+            "run_seconds_max": round(self.run_seconds_max, 6),
+        }
+
+
+# ------------------------------------------------------------------------------
+# 共有インスタンス
+# ------------------------------------------------------------------------------
+monte_carlo_runner = MonteCarloRunner(config.monte_carlo)
+
+
+# ------------------------------------------------------------------------------
+# メイン処理：確率的利率シナリオ試算
+# ------------------------------------------------------------------------------
+async def simulate_quote_monte_carlo(
+    request: PensionQuoteMonteCarloRequestModel,
+    mongo_client: AsyncIOMotorClient,
+) -> Dict[str, Any]:
+    """
+    確率的利率シナリオによる見積もり試算を行う（保存なし）
+
+    Returns:
+        dict: PensionQuoteMonteCarloResponseModel と同じ構造
+
+    Raises:
+        HTTPException: 業務ルール違反・試行回数超過は 400、利率取得失敗・計算失敗は 503
+    """
+    contract_date, _ = check_contract_conditions(request.birth_date, request.payment_period_years)
+
+    if request.paths > monte_carlo_runner.max_paths:
+        raise HTTPException(
+            status_code=400,
+            detail=f"試行回数が上限を超えています（{request.paths} > {monte_carlo_runner.max_paths}）"
+        )
+
+    try:
+        rates = await get_interest_rates(
+            db=mongo_client,
+            plan_code=PLAN_CODE,
+            contract_date=contract_date
+        )
+    except Exception:
+        logger.exception("[利率取得失敗] MongoDBエラー")
+        raise HTTPException(status_code=503, detail="利率情報の取得に失敗しました")
+
+    seed = request.seed if request.seed is not None else monte_carlo_runner.default_seed
+    params = {
+        "monthly_premium": request.monthly_premium,
+        "payment_years": request.payment_period_years,
+        "pension_years": request.pension_payment_years,
+        "contract_rate": rates["contract_rate"],
+        "min_rate": rates["min_rate"],
+        "annuity_conversion_rate": rates["annuity_conversion_rate"],
+        "mean_reversion": monte_carlo_runner.mean_reversion,
+        "volatility": monte_carlo_runner.volatility,
+        "paths": request.paths,
+        "seed": seed,
+    }
+
+    try:
+        bands = await monte_carlo_runner.run(params, rates.get("rate_version"))
+    except Exception:
+        logger.exception("[モンテカルロ] 試算に失敗しました")
+        raise HTTPException(status_code=503, detail="確率的シナリオの試算に失敗しました")
+
+    logger.info("[モンテカルロ] paths=%d, seed=%d, rate_version=%s", request.paths, seed, rates.get("rate_version"))
+
+    return {
+        "contract_date": contract_date,
+        "rate_version": rates.get("rate_version"),
+        "seed": seed,
+        "paths": request.paths,
+        "total_paid_amount": request.monthly_premium * 12 * request.payment_period_years,
+        "model": {
+            "mean_rate": rates["contract_rate"],
+            "mean_reversion": monte_carlo_runner.mean_reversion,
+            "volatility": monte_carlo_runner.volatility,
+            "min_rate": rates["min_rate"],
+        },
+        **bands,
+    }
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+NATS メッセージの並列処理ディスパッチャ
+
+- 受信メッセージを N 個の非同期ワーカーに振り分け、DB の同時実行数に応じて並列に処理する
+- 振り分け先はキー（quote_id → application_id → サブジェクトの順）のハッシュで固定し、
+  同一キーのイベントは受信順に処理する（別キー同士の順序は保証しない）
+- ワーカーごとのキューは上限付き。満杯の場合は submit() が空きを待つため、
+  受信側（購読コールバック・JetStream の取得ループ）に背圧がかかる
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import asyncio
+import json
+import logging
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from nats.aio.msg import Msg
+
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 設定・ロガー初期化
+# ------------------------------------------------------------------------------
+config = Config()
+logger = logging.getLogger(__name__)
+
+# 既定値（config.yaml の nats.dispatcher で上書き可能）
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "workers": 8,
+    "queue_size": 100,   # ワーカー1つあたりの待ち行列の上限
+}
+
+# 順序保証に使うキー項目（先に見つかったものを使う）
+ORDERING_KEYS = ("quote_id", "application_id")
+
+Job = Tuple[Callable[[Msg], Awaitable[Any]], Msg, float]
+
+
+def ordering_key(msg: Msg) -> str:
+    """
+    メッセージの順序保証キーを返す（JSONでない・キー項目がない場合はサブジェクト）
+    """
+    try:
+        data = json.loads(msg.data)
+    except (ValueError, TypeError):
+        return msg.subject
+    if isinstance(data, dict):
+        for field in ORDERING_KEYS:
+            if data.get(field):
+                return str(data[field])
+    return msg.subject
+
+
+class KeyedDispatcher:
+    """
+    キー単位の順序を保ったまま、メッセージ処理を固定数のワーカーで並列実行する
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        s = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.workers = max(int(s["workers"]), 1)
+        self.queue_size = max(int(s["queue_size"]), 1)
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.handler_seconds_total = 0.0
+        self.handler_seconds_max = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    # --------------------------------------------------------------------------
+    # 起動・停止
+    # --------------------------------------------------------------------------
+    def start(self) -> None:
+        """
+        ワーカーを起動する（イベントループ内で呼び出す。起動済みの場合は何もしない）
+        """
+        if self.running:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._worker(queue)) for queue in self._queues]
+        logger.info("[NATSディスパッチャ] 起動: workers=%d, queue_size=%d", self.workers, self.queue_size)
+
+    async def stop(self) -> None:
+        """
+        投入済みのメッセージを処理し終えてからワーカーを停止する
+        """
+        if not self.running:
+            return
+        await asyncio.gather(*(queue.join() for queue in self._queues))
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("[NATSディスパッチャ] 停止")
+
+    # --------------------------------------------------------------------------
+    # 投入・処理
+    # --------------------------------------------------------------------------
+    def worker_for(self, key: str) -> int:
+        """
+        キーの振り分け先ワーカー番号（プロセスをまたいで同じ値になるよう crc32 を使う）
+        """
+        return zlib.crc32(key.encode()) % self.workers
+
+    async def submit(self, handler: Callable[[Msg], Awaitable[Any]], msg: Msg, key: Optional[str] = None) -> None:
+        """
+        メッセージをキーに対応するワーカーの待ち行列に入れる（満杯の場合は空きを待つ）
+        """
+        queue = self._queues[self.worker_for(key if key is not None else ordering_key(msg))]
+        await queue.put((handler, msg, time.perf_counter()))
+        self.submitted += 1
+        self.max_queue_depth = max(self.max_queue_depth, queue.qsize())
+
+    def wrap(self, handler: Callable[[Msg], Awaitable[Any]]) -> Callable[[Msg], Awaitable[None]]:
+        """
+        購読コールバック用に、ハンドラをディスパッチャ経由の呼び出しに包む
+        """
+        async def callback(msg: Msg) -> None:
+            await self.submit(handler, msg)
+
+        return callback
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            handler, msg, enqueued_at = await queue.get()
+            started = time.perf_counter()
+            wait = started - enqueued_at
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            try:
+                await handler(msg)
+            except Exception:
+                self.failed += 1
+                logger.exception("[NATSディスパッチャ] メッセージ処理中にエラーが発生しました: subject=%s", msg.subject)
+            finally:
+                seconds = time.perf_counter() - started
+                self.completed += 1
+                self.handler_seconds_total += seconds
+                self.handler_seconds_max = max(self.handler_seconds_max, seconds)
+                queue.task_done()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        待ち行列の深さ・待ち時間・処理時間を返す（メトリクス用）
+        """
+        depths = [queue.qsize() for queue in self._queues]
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "running": self.running,
+            "queue_depth": sum(depths),
+            "queue_depth_by_worker": depths,
+            "max_queue_depth": self.max_queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_seconds_avg": round(self.wait_seconds_total / self.completed, 6) if self.completed else 0.0,
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+            "handler_seconds_avg": round(self.handler_seconds_total / self.completed, 6) if self.completed else 0.0,
+            "handler_seconds_max": round(self.handler_seconds_max, 6),
+        }
+
+
+# ------------------------------------------------------------------------------
+# 共有インスタンス
+# ------------------------------------------------------------------------------
+dispatcher = KeyedDispatcher(config.nats.get("dispatcher", {}))
@@ -6,10 +6,12 @@ NATSイベント購読モジュール（quotation_service）
 - 対象の quote_id に対応する quote_state を適切に更新する
 """
 
+import asyncio
 import json
 import logging
-from nats.aio.client import Client as NATS
+from typing import List
 from nats.aio.msg import Msg
+from nats.aio.subscription import Subscription
 
 from app.models.events import (
     ApplicationCreatedEvent,
@@ -20,6 +22,10 @@ from app.services.quote_manager import mark_quote_state
 
 from app.db.database import get_async_session
 
+from app.services.nats_connection import nats_manager
+from app.services.nats_dispatcher import dispatcher
+from app.services.nats_jetstream import PullConsumer, jetstream_enabled
+from app.services.nats_metrics import subscriber_metrics
 from app.config.config import Config
 
 # ------------------------------------------------------------------------------
@@ -28,6 +34,16 @@ from app.config.config import Config
 config = Config()
 logger = logging.getLogger(__name__)
 
+# 購読対象トピック
+SUBJECTS = ["applications.*", "contracts.*"]
+
+# JetStream モードで起動した consumer と取得ループのタスク
+pull_consumers: List[PullConsumer] = []
+consumer_tasks: List[asyncio.Task] = []
+
+# コア NATS モードの購読（停止時に drain する）
+subscriptions: List[Subscription] = []
+
 # ------------------------------------------------------------------------------
 # NATS購読処理のエントリポイント
 # ------------------------------------------------------------------------------
@@ -35,28 +51,67 @@ async def run_nats_subscriber():
     """
     quotation_service 起動時に呼び出されるNATS購読セットアップ関数。
 
-    - NATSサーバに接続
+    - 共有のNATS接続（nats_manager）の確立を待つ（発行と同じ接続を使う）
     - "applications.*" トピックを購読
     - 受信メッセージを汎用 message_handler に委譲
+    - nats.jetstream.enabled の場合は durable pull consumer で購読する
+    - 処理は dispatcher のワーカーで並列に行う（同一 quote_id / application_id は受信順）
     """
     logger.info("[NATS] サブスクライバ初期化開始")
     try:
-        nc = NATS()
         logger.debug(f"[NATS] 接続先: {config.nats['address']}")
-        await nc.connect(config.nats["address"])
+        await nats_manager.connect()
+        nc = await nats_manager.wait_connected()
         logger.info("[NATS] 接続成功")
 
-        # メッセージハンドラをトピックにバインド（applications.*）
-        await nc.subscribe("applications.*", cb=message_handler)
-        logger.info("NATS購読開始: トピック = applications.*")
+        dispatcher.start()
+
+        if jetstream_enabled():
+            # JetStream: durable pull consumer でバッチ取得し、処理成功後に ack する
+            js = nats_manager.jetstream()
+            for subject in SUBJECTS:
+                consumer = PullConsumer(js, subject, message_handler, dispatcher=dispatcher)
+                await consumer.subscribe()
+                pull_consumers.append(consumer)
+                consumer_tasks.append(asyncio.create_task(consumer.run()))
+            return
 
-        # メッセージハンドラをトピックにバインド（contracts.*）
-        await nc.subscribe("contracts.*", cb=message_handler)
-        logger.info("NATS購読開始: トピック = contracts.*")
+        # 同一キューグループ内では1メッセージを1レプリカのみが処理する（空の場合は全レプリカに配信）
+        queue_group = config.nats.get("queue_group", "")
+        callback = dispatcher.wrap(subscriber_metrics.instrument(message_handler))
+
+        # メッセージハンドラをトピックにバインド
+        for subject in SUBJECTS:
+            subscriptions.append(await nc.subscribe(subject, queue=queue_group, cb=callback))
+            logger.info("NATS購読開始: トピック = %s, キューグループ = %s", subject, queue_group or "(なし)")
 
     except Exception as e:
         logger.exception("[NATS] サブスクライバ初期化中にエラーが発生しました")
 
+
+async def stop_nats_subscriber():
+    """
+    アプリ停止時に新規の受信を止める（ディスパッチャの停止・接続の drain より先に呼び出す）
+
+    - JetStream: 取得ループを止める（取得済みのバッチは処理・応答してから終了する）
+    - コア NATS: 購読を drain する（受信済みのメッセージをディスパッチャへ投入し終えるまで待つ）
+    """
+    for consumer in pull_consumers:
+        consumer.stop()
+    if consumer_tasks:
+        await asyncio.gather(*consumer_tasks, return_exceptions=True)
+    pull_consumers.clear()
+    consumer_tasks.clear()
+
+    for subscription in subscriptions:
+        try:
+            await subscription.drain()
+        except Exception:
+            logger.exception("[NATS] 購読の drain に失敗しました: subject=%s", subscription.subject)
+    subscriptions.clear()
+    logger.info("[NATS] 受信停止")
+
+
 # ------------------------------------------------------------------------------
 # NATSメッセージ共通ハンドラ
 # ------------------------------------------------------------------------------
@@ -66,34 +121,30 @@ async def message_handler(msg: Msg):
 
     - JSONデコード → イベント種別判定 → 各処理にディスパッチ
     - サポート対象外のイベントは警告ログ出力
-    - 処理中の例外はすべてログ出力し握り潰す（サービス継続性確保のため）
+    - 処理中の例外は呼び出し元（subscriber_metrics.instrument）でログ出力し、失敗として計上する
     """
-    try:
-        logger.debug(f"[NATS] メッセージ受信: subject={msg.subject}, data={msg.data}")
-        data = json.loads(msg.data.decode())
-        event_type = data.get("event")
-        logger.debug(f"[NATS] パース結果: event_type={event_type}")
-
-        if event_type == "ApplicationCreated":
-            event = ApplicationCreatedEvent(**data)
-            logger.debug(f"[NATS] ApplicationCreated イベントインスタンス生成: {event}")
-            await handle_application_created(event)
+    logger.debug(f"[NATS] メッセージ受信: subject={msg.subject}, data={msg.data}")
+    data = json.loads(msg.data.decode())
+    event_type = data.get("event")
+    logger.debug(f"[NATS] パース結果: event_type={event_type}")
 
-        elif event_type == "ApplicationStatusChanged":
-            event = ApplicationStatusChangedEvent(**data)
-            logger.debug(f"[NATS] ApplicationStatusChanged イベントインスタンス生成: {event}")
-            await handle_application_status_changed(event)
+    if event_type == "ApplicationCreated":
+        event = ApplicationCreatedEvent(**data)
+        logger.debug(f"[NATS] ApplicationCreated イベントインスタンス生成: {event}")
+        await handle_application_created(event)
 
-        elif event_type == "ApplicationChanged":
-            event = ApplicationChangedEvent(**data)
-            logger.debug(f"[NATS] ApplicationChanged イベントインスタンス生成: {event}")
-            await handle_application_changed(event)
+    elif event_type == "ApplicationStatusChanged":
+        event = ApplicationStatusChangedEvent(**data)
+        logger.debug(f"[NATS] ApplicationStatusChanged イベントインスタンス生成: {event}")
+        await handle_application_status_changed(event)
 
-        else:
-            logger.warning(f"[NATS] 未対応のイベント種別を受信: event={event_type}")
+    elif event_type == "ApplicationChanged":
+        event = ApplicationChangedEvent(**data)
+        logger.debug(f"[NATS] ApplicationChanged イベントインスタンス生成: {event}")
+        await handle_application_changed(event)
 
-    except Exception as e:
-        logger.exception("NATSメッセージ処理中にエラーが発生しました")
+    else:
+        logger.warning(f"[NATS] 未対応のイベント種別を受信: event={event_type}")
 
 # ------------------------------------------------------------------------------
 # イベント別処理関数群
@@ -115,7 +166,8 @@ async def handle_application_created(event: ApplicationCreatedEvent):
             logger.info(f"[NATS] quote_state を 'applied' に更新完了: quote_id={event.quote_id}")
             break
     except Exception as e:
-        logger.exception(f"[NATS] ApplicationCreated 処理失敗: quote_id={event.quote_id}")
+        logger.error(f"[NATS] ApplicationCreated 処理失敗: quote_id={event.quote_id}")
+        raise
 
 async def handle_application_status_changed(event: ApplicationStatusChangedEvent):
     """
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+年次キャッシュフロー・解約返戻金の推移表（projection schedule）
+
+- 払込期間・年金受取期間の各年について、累計払込額・積立額・解約返戻金・年金支払額を列配列で算出する
+- 列は初回参照時に一括計算し（遅延生成）、行は dict を作らずタプルで順次取り出す
+- NDJSON（1行目: ヘッダー、2行目以降: 列順の配列）としてストリーミング出力できる
+- 年金額・一括受取額は benefit_engine と同じ計算式・端数処理を用いる（払込満了年の積立額 = 一括受取額）
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import json
+import logging
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.services.benefit_engine import compute_benefit_columns
+from app.services.rate_loader import normalize_surrender_rates
+
+# ------------------------------------------------------------------------------
+# ロガー初期化
+# ------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# 推移表の列名（行タプルの並び順）
+PROJECTION_COLUMNS = (
+    "year",
+    "phase",
+    "premium_paid",
+    "cumulative_premium",
+    "accumulated_value",
+    "surrender_rate",
+    "surrender_value",
+    "annuity_payment",
+    "cumulative_annuity",
+)
+
+PHASE_ACCUMULATION = "accumulation"
+PHASE_ANNUITY = "annuity"
+
+
+# ------------------------------------------------------------------------------
+# 推移表
+# ------------------------------------------------------------------------------
+class ProjectionSchedule:
+    """
+    1契約（または1見積もり・1シナリオ）分の年次推移表
+
+    Parameters:
+        monthly_premium: 月額保険料
+        payment_years: 払込年数
+        pension_years: 年金受取年数
+        contract_rate: 積立期間中の予定利率（%）
+        annuity_conversion_rate: 年金移行時の利率（%）
+        surrender_rates: {経過年数: 返戻率}（キーは文字列・整数どちらでも可、表に無い年は 0.0）
+    """
+
+    __slots__ = (
+        "monthly_premium",
+        "payment_years",
+        "pension_years",
+        "contract_rate",
+        "annuity_conversion_rate",
+        "surrender_rates",
+        "_columns",
+        "_totals",
+    )
+
+    def __init__(
+        self,
+        monthly_premium: int,
+        payment_years: int,
+        pension_years: int,
+        contract_rate: float,
+        annuity_conversion_rate: float,
+        surrender_rates: Optional[Mapping[Any, Any]] = None,
+    ):
+        self.monthly_premium = int(monthly_premium)
+        self.payment_years = int(payment_years)
+        self.pension_years = int(pension_years)
+        self.contract_rate = float(contract_rate)
+        self.annuity_conversion_rate = float(annuity_conversion_rate)
+        self.surrender_rates = normalize_surrender_rates(surrender_rates)
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+        self._totals: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self.payment_years + self.pension_years
+
+    # --------------------------------------------------------------------------
+    # 列の一括計算（初回参照時のみ）
+    # --------------------------------------------------------------------------
+    def _build(self) -> None:
+        # 満了時点の一括受取額・年金年額（calculate_benefits と同一の計算）
+        benefits = compute_benefit_columns(
+            monthly_premium=self.monthly_premium,
+            payment_years=self.payment_years,
+            pension_years=self.pension_years,
+            contract_rate=self.contract_rate,
+            annuity_conversion_rate=self.annuity_conversion_rate,
+        )
+        lump_sum = int(benefits["lump_sum_amount"][0])
+        annual_pension = int(benefits["annual_pension"][0])
+
+        years = np.arange(1, len(self) + 1, dtype=np.int64)
+        accumulating = years <= self.payment_years
+        elapsed = np.minimum(years, self.payment_years)
+
+        annual_premium = self.monthly_premium * 12
+        premium_paid = np.where(accumulating, annual_premium, 0)
+        cumulative_premium = annual_premium * elapsed
+
+        # 積立額: 累計払込額を経過年数分複利で増やす（満了年は一括受取額と一致）
+        base = 1 + self.contract_rate / 100
+        growth = np.array([base ** int(t) for t in elapsed], dtype=np.float64)
+        accumulated_value = np.where(
+            accumulating, np.trunc(cumulative_premium * growth).astype(np.int64), 0
+        )
+
+        # 解約返戻金: 払込期間中のみ（返戻率テーブルに無い年は 0.0）
+        surrender_rate = np.array(
+            [self.surrender_rates.get(int(t), 0.0) if acc else 0.0 for t, acc in zip(years, accumulating)],
+            dtype=np.float64,
+        )
+        surrender_value = np.trunc(cumulative_premium * surrender_rate).astype(np.int64)
+
+        # 年金支払: 払込満了の翌年から年金受取年数分
+        annuity_payment = np.where(accumulating, 0, annual_pension).astype(np.int64)
+        cumulative_annuity = np.cumsum(annuity_payment)
+
+        self._columns = {
+            "year": years,
+            "phase": np.where(accumulating, PHASE_ACCUMULATION, PHASE_ANNUITY),
+            "premium_paid": premium_paid.astype(np.int64),
+            "cumulative_premium": cumulative_premium,
+            "accumulated_value": accumulated_value,
+            "surrender_rate": surrender_rate,
+            "surrender_value": surrender_value,
+            "annuity_payment": annuity_payment,
+            "cumulative_annuity": cumulative_annuity,
+        }
+        self._totals = {
+            "total_paid": annual_premium * self.payment_years,
+            "lump_sum_amount": lump_sum,
+            "annual_pension": annual_pension,
+            "estimated_pension": annual_pension * self.pension_years,
+        }
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        列名 → 配列（PROJECTION_COLUMNS 参照）
+        """
+        if self._columns is None:
+            self._build()
+        return self._columns
+
+    @property
+    def totals(self) -> Dict[str, int]:
+        """
+        満了時点の集計値（総払込額・一括受取額・年金年額・年金累計額）
+        """
+        if self._totals is None:
+            self._build()
+        return self._totals
+
+    # --------------------------------------------------------------------------
+    # 行の取り出し
+    # --------------------------------------------------------------------------
+    def iter_rows(self) -> Iterator[Tuple[Any, ...]]:
+        """
+        PROJECTION_COLUMNS 順のタプルを1年ずつ返す（値は Python の int / float / str）
+        """
+        columns = self.columns
+        return zip(*(columns[name].tolist() for name in PROJECTION_COLUMNS))
+
+
+# ------------------------------------------------------------------------------
+# NDJSON ストリーミング出力
+# ------------------------------------------------------------------------------
+def iter_ndjson(schedule: ProjectionSchedule, header: Optional[Dict[str, Any]] = None) -> Iterator[bytes]:
+    """
+    推移表を NDJSON で1行ずつ返す
+
+    - 1行目: ヘッダー（呼び出し元の付加情報 + 列名 + 満了時点の集計値）
+    - 2行目以降: PROJECTION_COLUMNS 順の配列（1年1行）
+    """
+    head = {
+        **(header or {}),
+        "columns": list(PROJECTION_COLUMNS),
+        "totals": schedule.totals,
+    }
+    yield (json.dumps(head, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+    for row in schedule.iter_rows():
+        yield (json.dumps(row, separators=(",", ":")) + "\n").encode("utf-8")
@@ -3,15 +3,17 @@
 quotes, quote_details, quote_scenarios テーブルと連携するサービス層モジュール
 
 - 見積もりの取得（一覧・個別）
-- 見積もりの保存
+- 見積もりの保存（新規作成は PostgreSQL・MongoDB へ並行書き込み）
 - ステータス更新
 """
 
+import asyncio
 from datetime import datetime
 import logging
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from uuid import UUID
 
+from sqlalchemy import tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
@@ -24,6 +26,10 @@ from app.models.quotes import (
     PensionQuoteCalculateResult
 )
 
+from app.services.event_outbox import stage_event
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.scenario_store import ScenarioStore
+
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.config.config import Config
@@ -35,40 +41,112 @@ config = Config()
 rules = config.pension
 logger = logging.getLogger(__name__)
 
+# シナリオ保存先（1見積もり1ドキュメント、未移行分は従来形式から読み込み）
+scenario_store = ScenarioStore(
+    key_field="quote_id",
+    database=config.mongodb["database"],
+    legacy_collection=config.mongodb["scenario_collection"],
+    settings=config.mongodb.get("scenario_storage", {}),
+)
+
+# 一覧取得で fields= 指定可能な項目（レスポンス項目名 → カラム）
+QUOTE_LIST_FIELDS = {
+    "quote_id": Quote.quote_id,
+    "user_id": Quote.user_id,
+    "quote_state": Quote.quote_state,
+    "created_at": Quote.created_at,
+    "updated_at": Quote.updated_at,
+    "created_by": Quote.created_by,
+    "updated_by": Quote.updated_by,
+    "birth_date": QuoteDetail.birth_date,
+    "gender": QuoteDetail.gender,
+    "monthly_premium": QuoteDetail.monthly_premium,
+    "payment_period_years": QuoteDetail.payment_period_years,
+    "pension_payment_years": QuoteDetail.pension_payment_years,
+    "tax_deduction_enabled": QuoteDetail.tax_deduction_enabled,
+    "contract_date": QuoteDetail.contract_date,
+    "contract_interest_rate": QuoteDetail.contract_interest_rate,
+    "total_paid_amount": QuoteDetail.total_paid_amount,
+    "pension_start_age": QuoteDetail.pension_start_age,
+    "annual_tax_deduction": QuoteDetail.annual_tax_deduction,
+    "plan_code": QuoteDetail.plan_code,
+}
+
 ####参照処理
 
 # ------------------------------------------------------------------------------
-# 見積もり一覧取得（ユーザー単位、シナリオなし）
+# 見積もり一覧取得（ユーザー単位、シナリオなし、キーセットページング）
 # ------------------------------------------------------------------------------
 async def get_quotes_by_user_id(
     session: AsyncSession,
-    user_id: UUID
-) -> List[PensionQuoteResponseModel]:
+    user_id: UUID,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[Union[PensionQuoteResponseModel, Dict[str, Any]]], Optional[str]]:
     """
     指定ユーザーの見積もりを最新順で取得（PostgreSQLのみ）
 
+    - (created_at, quote_id) の降順でキーセットページングする
+    - fields 指定時は該当カラムのみを SELECT し、dict で返す
+      （quote_details のカラムを含まない場合は JOIN も省略）
+
+    Parameters:
+        limit (int): 1ページの最大件数（None の場合は全件）
+        cursor (str): 前ページの next_cursor（None の場合は先頭から）
+        fields (List[str]): 取得項目（QUOTE_LIST_FIELDS のキー、None の場合は全項目）
+
     Returns:
-        List[PensionQuoteResponseModel]
+        (見積もり一覧, 次ページカーソル or None)
     """
-    logger.info("見積もり一覧取得: user_id=%s", user_id)
+    logger.info("見積もり一覧取得: user_id=%s, limit=%s, cursor=%s", user_id, limit, bool(cursor))
+
+    if fields is None:
+        stmt = (
+            select(Quote, QuoteDetail)
+            .join(QuoteDetail, Quote.quote_id == QuoteDetail.quote_id)
+        )
+    else:
+        # カーソル生成用の created_at / quote_id は常に取得する
+        columns = list(dict.fromkeys(fields + ["created_at", "quote_id"]))
+        stmt = select(*[QUOTE_LIST_FIELDS[f].label(f) for f in columns])
+        if any(QUOTE_LIST_FIELDS[f].class_ is QuoteDetail for f in columns):
+            stmt = stmt.join(QuoteDetail, Quote.quote_id == QuoteDetail.quote_id)
+        else:
+            stmt = stmt.select_from(Quote)
+
+    stmt = stmt.where(Quote.user_id == user_id)
+    if cursor:
+        cursor_created_at, cursor_quote_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Quote.created_at, Quote.quote_id) < tuple_(cursor_created_at, cursor_quote_id)
+        )
+    stmt = stmt.order_by(Quote.created_at.desc(), Quote.quote_id.desc())
+    if limit is not None:
+        # 次ページ有無の判定用に1件多く取得
+        stmt = stmt.limit(limit + 1)
 
-    # JOINして一括取得
-    stmt = (
-        select(Quote, QuoteDetail)
-        .join(QuoteDetail, Quote.quote_id == QuoteDetail.quote_id)
-        .where(Quote.user_id == user_id)
-        .order_by(Quote.created_at.desc())
-    )
     results = await session.execute(stmt)
     records = results.all()
 
-    response_list = []
-    for quote, detail in records:
-        # MongoDBシナリオは含めないので空リスト
-        response = _build_response_model(quote, detail, scenarios=[])
-        response_list.append(response)
+    has_more = limit is not None and len(records) > limit
+    if has_more:
+        records = records[:limit]
+
+    response_list: List[Union[PensionQuoteResponseModel, Dict[str, Any]]] = []
+    if fields is None:
+        for quote, detail in records:
+            # MongoDBシナリオは含めないので空リスト
+            response = _build_response_model(quote, detail, scenarios=[])
+            response_list.append(response)
+        last_key = (records[-1][0].created_at, records[-1][0].quote_id) if records else None
+    else:
+        for row in records:
+            response_list.append({f: row._mapping[f] for f in fields})
+        last_key = (records[-1].created_at, records[-1].quote_id) if records else None
 
-    return response_list
+    next_cursor = encode_cursor(*last_key) if has_more and last_key else None
+    return response_list, next_cursor
 
 # ------------------------------------------------------------------------------
 # 見積もり単体取得
@@ -114,22 +192,42 @@ async def get_scenarios_by_quote_id(
     :param quote_id: 見積もりID（UUID文字列）
     :return: PensionQuoteScenarioModel のリスト
     """
-    try:
-        db_name = config.mongodb["database"]
-        collection_name = config.mongodb["scenario_collection"]
-        logger.info(f"MongoDBシナリオ取得開始 (quote_id={quote_id})")
+    scenarios_map = await get_scenarios_by_quote_ids(mongo_client, [quote_id])
+    return scenarios_map.get(str(quote_id), [])
 
-        cursor = mongo_client[db_name][collection_name].find({"quote_id": quote_id})
-        documents = await cursor.to_list(length=None)
+# ------------------------------------------------------------------------------
+# 見積もりシナリオ一括取得（複数見積もりID、$in による1クエリ）
+# ------------------------------------------------------------------------------
+async def get_scenarios_by_quote_ids(
+    mongo_client: AsyncIOMotorClient,
+    quote_ids: Iterable[str]
+) -> Dict[str, List[PensionQuoteScenarioModel]]:
+    """
+    複数の quote_id に対応するシナリオ情報を MongoDB から1回のクエリで取得し、
+    quote_id ごとにグループ化して返す。
 
-        logger.info(f"MongoDBシナリオ取得成功 (quote_id={quote_id}, 件数={len(documents)})")
+    :param mongo_client: MongoDBクライアントインスタンス
+    :param quote_ids: 見積もりIDの一覧（UUID文字列）
+    :return: quote_id → PensionQuoteScenarioModel のリスト（シナリオが無いIDは空リスト）
+    """
+    ids = list(dict.fromkeys(str(q) for q in quote_ids))
+    scenarios_map: Dict[str, List[PensionQuoteScenarioModel]] = {q: [] for q in ids}
+    if not ids:
+        return scenarios_map
 
-        scenarios = [PensionQuoteScenarioModel(**doc) for doc in documents]
-        return scenarios
+    try:
+        logger.info(f"MongoDBシナリオ一括取得開始 (quote_id件数={len(ids)})")
+
+        documents = await scenario_store.load_many(mongo_client, ids)
+        for quote_id, docs in documents.items():
+            scenarios_map[quote_id] = [PensionQuoteScenarioModel(**doc) for doc in docs]
+
+        logger.info(f"MongoDBシナリオ一括取得成功 (quote_id件数={len(ids)}, 取得件数={len(documents)})")
+        return scenarios_map
 
     except Exception as e:
-        logger.error(f"MongoDBシナリオ取得失敗 (quote_id={quote_id}): {e}")
-        return []
+        logger.error(f"MongoDBシナリオ一括取得失敗 (quote_id件数={len(ids)}): {e}")
+        return {q: [] for q in ids}
 
 ####更新処理
 
@@ -157,6 +255,113 @@ async def save_quote(
     """
     logger.info("見積もり保存開始: quote_id=%s", calculate_result.quote_id)
 
+    quote, detail = _build_quote_rows(user_id, request, calculate_result, operator_id)
+
+    # 登録実行
+    session.add_all([quote, detail])
+    await session.commit()
+    logger.info("見積もり保存完了: quote_id=%s", calculate_result.quote_id)
+
+    return calculate_result.quote_id
+
+# ------------------------------------------------------------------------------
+# 見積もり新規作成（PostgreSQL・MongoDB 並行書き込み + 補償処理）
+# ------------------------------------------------------------------------------
+async def create_quote(
+    session: AsyncSession,
+    mongo_client: AsyncIOMotorClient,
+    user_id: UUID,
+    request: PensionQuoteRequestModel,
+    calculate_result: PensionQuoteCalculateResult,
+    operator_id: str = None,
+    events: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+) -> PensionQuoteResponseModel:
+    """
+    見積もり（quotes, quote_details）とシナリオ（MongoDB）を並行して保存し、レスポンスモデルを返す
+
+    - 2つの書き込みは独立しているため asyncio.gather で同時に実行する
+    - PostgreSQL 側は INSERT（flush）までを行い、MongoDB の保存が成功した後にコミットする
+      （MongoDB の保存に失敗した場合はロールバックのみで元に戻る）
+    - コミットに失敗した場合は、保存済みの MongoDB シナリオを削除して元に戻す（補償処理）
+    - レスポンスは保存した内容から組み立て、再読み込みは行わない
+      （created_at / updated_at は INSERT の RETURNING で取得済み）
+    - events（サブジェクト, ペイロード）は見積もりと同じトランザクションでアウトボックスに登録する
+      （両方の保存が成功してコミットされるまでリレーからは見えないため、失敗時に発行されることはない）
+
+    Raises:
+        HTTPException: いずれかの保存に失敗した場合は 500
+    """
+    quote_id = calculate_result.quote_id
+    logger.info("見積もり作成開始: quote_id=%s", quote_id)
+
+    quote, detail = _build_quote_rows(user_id, request, calculate_result, operator_id)
+
+    async def _write_postgres():
+        session.add_all([quote, detail])
+        for subject, payload in events or []:
+            stage_event(session, subject, payload)
+        # コミットは MongoDB の保存結果を確認してから行う
+        await session.flush()
+
+    pg_result, mongo_result = await asyncio.gather(
+        _write_postgres(),
+        save_scenarios_to_mongo(
+            mongo_client=mongo_client,
+            quote_id=str(quote_id),
+            scenarios=calculate_result.scenarios,
+            replace_existing=False,
+            rate_version=calculate_result.rate_version,
+        ),
+        return_exceptions=True,
+    )
+    pg_failed = isinstance(pg_result, BaseException)
+    mongo_failed = isinstance(mongo_result, BaseException)
+
+    if pg_failed:
+        logger.error("見積もり保存失敗（PostgreSQL）: quote_id=%s, error=%s", quote_id, pg_result)
+    if mongo_failed:
+        logger.error("MongoDBシナリオ保存失敗: quote_id=%s, error=%s", quote_id, mongo_result)
+    if pg_failed or mongo_failed:
+        # 見積もり・イベントは未コミットのため、ロールバックで破棄される
+        await session.rollback()
+        if not mongo_failed:
+            await _compensate(delete_scenarios_from_mongo(mongo_client, str(quote_id)), "MongoDBシナリオ削除", quote_id)
+        raise HTTPException(status_code=500, detail="Failed to save quote")
+
+    try:
+        await session.commit()
+    except Exception as e:
+        logger.error("見積もり保存失敗（PostgreSQL コミット）: quote_id=%s, error=%s", quote_id, e)
+        await session.rollback()
+        await _compensate(delete_scenarios_from_mongo(mongo_client, str(quote_id)), "MongoDBシナリオ削除", quote_id)
+        raise HTTPException(status_code=500, detail="Failed to save quote")
+
+    logger.info("見積もり作成完了: quote_id=%s", quote_id)
+    return _build_response_model(quote, detail, scenarios=calculate_result.scenarios)
+
+
+async def _compensate(action, label: str, quote_id: UUID) -> None:
+    """
+    補償処理を実行する（失敗しても元の例外を優先し、ログのみ出力する）
+    """
+    try:
+        await action
+        logger.info("補償処理完了: %s, quote_id=%s", label, quote_id)
+    except Exception:
+        logger.exception("補償処理失敗（手動での整合確認が必要）: %s, quote_id=%s", label, quote_id)
+
+# ------------------------------------------------------------------------------
+# 内部: 保存用レコード組み立て
+# ------------------------------------------------------------------------------
+def _build_quote_rows(
+    user_id: UUID,
+    request: PensionQuoteRequestModel,
+    calculate_result: PensionQuoteCalculateResult,
+    operator_id: str = None
+) -> Tuple[Quote, QuoteDetail]:
+    """
+    入力内容と計算結果から quotes, quote_details のレコードを生成する
+    """
     # quotes テーブル作成
     quote = Quote(
         quote_id=calculate_result.quote_id,
@@ -182,13 +387,7 @@ async def save_quote(
         pension_start_age=calculate_result.pension_start_age,
         annual_tax_deduction=calculate_result.annual_tax_deduction,
     )
-
-    # 登録実行
-    session.add_all([quote, detail])
-    await session.commit()
-    logger.info("見積もり保存完了: quote_id=%s", calculate_result.quote_id)
-
-    return calculate_result.quote_id
+    return quote, detail
 
 # ------------------------------------------------------------------------------
 # ステータス更新処理
@@ -313,12 +512,14 @@ async def delete_quote(session: AsyncSession, quote_id: UUID, user_id: UUID):
     logger.info("見積もり削除完了: quote_id=%s", quote_id)
 
 # ------------------------------------------------------------------------------
-# シナリオ保存関数（既存削除 → 上書き保存）
+# シナリオ保存関数（1見積もり1ドキュメントで置き換え保存）
 # ------------------------------------------------------------------------------
 async def save_scenarios_to_mongo(
     mongo_client: AsyncIOMotorClient,
     quote_id: UUID,
-    scenarios: List[PensionQuoteScenarioModel]
+    scenarios: List[PensionQuoteScenarioModel],
+    replace_existing: bool = True,
+    rate_version: Optional[str] = None
 ):
     """
     指定されたquote_idに紐づくシナリオ情報をMongoDBに上書き保存する。
@@ -334,19 +535,14 @@ async def save_scenarios_to_mongo(
         上書き対象の見積もりID
     scenarios : List[PensionQuoteScenarioModel]
         上書き保存する新しいシナリオの一覧
+    replace_existing : bool
+        既存シナリオを削除してから保存するか（legacy モードのみ。新規作成時は False で削除を省略）
+    rate_version : str
+        シナリオ計算に使用した利率版ID（document モードで保存）
     """
     logger.info("MongoDBシナリオ上書き開始: quote_id=%s", quote_id)
 
-    # 保存先情報の取得
-    db_name = config.mongodb["database"]
-    collection_name = config.mongodb["scenario_collection"]
-    collection = mongo_client[db_name][collection_name]
-
-    # ① 既存のシナリオを一括削除
-    delete_result = await collection.delete_many({"quote_id": str(quote_id)})
-    logger.debug("既存シナリオ削除完了: 件数=%d", delete_result.deleted_count)
-
-    # ② 新しいシナリオを構築・保存
+    # ① 新しいシナリオを構築
     scenario_docs = []
     for scenario in scenarios:
         # Pydanticモデルを辞書形式に変換
@@ -367,12 +563,25 @@ async def save_scenarios_to_mongo(
 
         scenario_docs.append(doc)
 
-    # ③ シナリオが存在する場合のみ保存
-    if scenario_docs:
-        await collection.insert_many(scenario_docs)
-        logger.info("MongoDBシナリオ上書き完了: 件数=%d", len(scenario_docs))
-    else:
-        logger.warning("保存対象のシナリオが空のためMongoDBへの保存をスキップ")
+    # ② 保存（document モード: replace_one の1操作 / legacy モード: 削除 → 一括挿入）
+    await scenario_store.save(
+        mongo_client,
+        str(quote_id),
+        scenario_docs,
+        rate_version=rate_version,
+        replace_existing=replace_existing,
+    )
+
+# ------------------------------------------------------------------------------
+# シナリオ削除関数
+# ------------------------------------------------------------------------------
+async def delete_scenarios_from_mongo(mongo_client: AsyncIOMotorClient, quote_id: str) -> int:
+    """
+    指定された quote_id のシナリオ情報を MongoDB から削除し、削除件数を返す
+    """
+    deleted_count = await scenario_store.delete(mongo_client, str(quote_id))
+    logger.info("MongoDBシナリオ削除: quote_id=%s, 件数=%d", quote_id, deleted_count)
+    return deleted_count
 
 # ------------------------------------------------------------------------------
 # 内部: レスポンスモデル組み立て
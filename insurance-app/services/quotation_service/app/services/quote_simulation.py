@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+見積もり試算グリッド（what-if シミュレーション）
+
+- 月額保険料 × 払込期間 × 年金受取期間 の全組み合わせについて、base / low / high の3シナリオを試算する
+- 利率は1回だけ取得したスナップショット（同一の利率版）を全行に適用する
+- 計算は benefit_engine で全行を一括処理し、結果は列形式で返す
+- PostgreSQL / MongoDB への保存・イベント発行は行わない（読み取り専用）
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.quotes import PensionQuoteSimulationRequestModel
+from app.services.benefit_engine import BENEFIT_COLUMNS, compute_benefit_columns
+from app.services.calculate_quote import (
+    MAX_ANNUAL_TAX_DEDUCTION,
+    PLAN_CODE,
+    check_contract_conditions,
+)
+from app.services.rate_repository import get_interest_rates
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 設定・ロガー初期化
+# ------------------------------------------------------------------------------
+config = Config()
+logger = logging.getLogger(__name__)
+
+# 1リクエストで試算できる組み合わせ数の上限
+MAX_GRID_POINTS = config.simulation.get("max_grid_points", 2000)
+
+# シナリオ種別 → 利率キー（calculate_quote と同じ順序）
+SCENARIO_RATES = (("base", "contract_rate"), ("low", "min_rate"), ("high", "high_rate"))
+
+
+# ------------------------------------------------------------------------------
+# グリッド構築
+# ------------------------------------------------------------------------------
+def _range_values(name: str, value_range: Any) -> List[int]:
+    """
+    範囲指定（min / max / step）を両端を含む値のリストに展開する
+
+    Raises:
+        HTTPException: min > max の場合は 400
+    """
+    if value_range.min > value_range.max:
+        raise HTTPException(status_code=400, detail=f"{name} の min は max 以下で指定してください")
+    return list(range(value_range.min, value_range.max + 1, value_range.step))
+
+
+def build_grid(request: PensionQuoteSimulationRequestModel) -> Dict[str, np.ndarray]:
+    """
+    3軸の全組み合わせを行方向に展開した条件列を返す（月額保険料 → 払込期間 → 年金受取期間の順）
+
+    Raises:
+        HTTPException: 範囲指定が不正、または組み合わせ数が上限を超える場合は 400
+    """
+    premiums = _range_values("monthly_premium", request.monthly_premium)
+    payment_years = _range_values("payment_period_years", request.payment_period_years)
+    pension_years = _range_values("pension_payment_years", request.pension_payment_years)
+
+    grid_size = len(premiums) * len(payment_years) * len(pension_years)
+    if grid_size > MAX_GRID_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"試算の組み合わせ数が上限を超えています（{grid_size} > {MAX_GRID_POINTS}）"
+        )
+
+    mesh = np.meshgrid(
+        np.asarray(premiums, dtype=np.int64),
+        np.asarray(payment_years, dtype=np.int64),
+        np.asarray(pension_years, dtype=np.int64),
+        indexing="ij",
+    )
+    return {
+        "monthly_premium": mesh[0].ravel(),
+        "payment_period_years": mesh[1].ravel(),
+        "pension_payment_years": mesh[2].ravel(),
+    }
+
+
+# ------------------------------------------------------------------------------
+# 一括試算
+# ------------------------------------------------------------------------------
+def simulate_grid(axes: Dict[str, np.ndarray], rates: Dict[str, Any]) -> Dict[str, Dict[str, list]]:
+    """
+    条件列 × 3シナリオを1回の一括計算で試算し、シナリオ種別ごとの結果列を返す
+
+    Parameters:
+        axes: build_grid の戻り値
+        rates: get_interest_rates の戻り値
+
+    Returns:
+        dict: シナリオ種別 → {列名: 値のリスト}（BENEFIT_COLUMNS 参照）
+    """
+    grid_size = len(axes["monthly_premium"])
+    scenario_count = len(SCENARIO_RATES)
+
+    # 全シナリオ分を縦に連結して1回で計算する（行順: シナリオ → グリッド）
+    columns = compute_benefit_columns(
+        monthly_premium=np.tile(axes["monthly_premium"], scenario_count),
+        payment_years=np.tile(axes["payment_period_years"], scenario_count),
+        pension_years=np.tile(axes["pension_payment_years"], scenario_count),
+        contract_rate=np.repeat([rates[key] for _, key in SCENARIO_RATES], grid_size),
+        annuity_conversion_rate=rates["annuity_conversion_rate"],
+        surrender_rate_15=rates["surrender_rates"].get(15, 0.0),
+    )
+
+    scenarios: Dict[str, Dict[str, list]] = {}
+    for i, (scenario_type, _) in enumerate(SCENARIO_RATES):
+        window = slice(i * grid_size, (i + 1) * grid_size)
+        scenarios[scenario_type] = {
+            name: columns[name][window].tolist() for name in BENEFIT_COLUMNS
+        }
+    return scenarios
+
+
+# ------------------------------------------------------------------------------
+# メイン処理：試算グリッド生成
+# ------------------------------------------------------------------------------
+async def simulate_quote_grid(
+    request: PensionQuoteSimulationRequestModel,
+    mongo_client: AsyncIOMotorClient,
+) -> Dict[str, Any]:
+    """
+    見積もり試算グリッドを生成する（保存なし）
+
+    Parameters:
+        request: 試算グリッドの要求モデル
+        mongo_client: MongoDBクライアント（利率スナップショット未読み込み時のみ使用）
+
+    Returns:
+        dict: PensionQuoteSimulationResponseModel と同じ構造（JSON直列化可能な値のみ）
+    """
+    # 契約日・契約年齢の検証（calculate_quote と同じ業務ルール）
+    contract_date, pension_start_age = check_contract_conditions(
+        request.birth_date, request.payment_period_years.min
+    )
+
+    axes = build_grid(request)
+
+    try:
+        rates = await get_interest_rates(
+            db=mongo_client,
+            plan_code=PLAN_CODE,
+            contract_date=contract_date
+        )
+    except Exception:
+        logger.exception("[利率取得失敗] MongoDBエラー")
+        raise HTTPException(status_code=503, detail="利率情報の取得に失敗しました")
+
+    scenarios = simulate_grid(axes, rates)
+    grid_size = len(axes["monthly_premium"])
+    logger.info("[試算グリッド] grid_size=%d, rate_version=%s", grid_size, rates.get("rate_version"))
+
+    return {
+        "contract_date": contract_date.isoformat(),
+        "pension_start_age": pension_start_age,
+        "annual_tax_deduction": MAX_ANNUAL_TAX_DEDUCTION,
+        "rate_version": rates.get("rate_version"),
+        "interest_rates": {scenario_type: rates[key] for scenario_type, key in SCENARIO_RATES},
+        "grid_size": grid_size,
+        "axes": {name: values.tolist() for name, values in axes.items()},
+        "scenarios": scenarios,
+    }
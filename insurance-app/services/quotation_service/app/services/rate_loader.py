@@ -11,7 +11,7 @@
 # ------------------------------------------------------------------------------
 import logging
 from datetime import datetime, time, timezone
-from typing import Dict, Any
+from typing import Any, Dict, Mapping, Optional
 
 from motor.motor_asyncio import AsyncIOMotorClient
 
@@ -23,6 +23,40 @@ from app.config.config import Config
 config = Config()
 logger = logging.getLogger(__name__)
 
+# ------------------------------------------------------------------------------
+# 解約返戻率テーブルの正規化
+# ------------------------------------------------------------------------------
+def normalize_surrender_rates(table: Optional[Mapping[Any, Any]]) -> Dict[int, float]:
+    """
+    利率レコードの surrender_rates（MongoDB 上はキーが文字列）を {経過年数(int): 返戻率} に変換する
+
+    数値に変換できないキー・値は警告を出して除外する。
+    """
+    normalized: Dict[int, float] = {}
+    for key, value in (table or {}).items():
+        try:
+            normalized[int(key)] = float(value)
+        except (TypeError, ValueError):
+            logger.warning("[利率取得] 不正な解約返戻率を除外: key=%r, value=%r", key, value)
+    return normalized
+
+# ------------------------------------------------------------------------------
+# 利率レコード → 利率情報への変換
+# ------------------------------------------------------------------------------
+def build_rates(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    利率コレクションの1レコードを、計算で使う利率情報の辞書に変換する
+    （高金利シナリオ利率 = 契約利率 + 0.3、解約返戻率のキーは経過年数の整数）
+    """
+    contract_rate = float(record.get("contract_rate"))
+    return {
+        "contract_rate": contract_rate,
+        "min_rate": float(record.get("min_rate")),
+        "annuity_conversion_rate": float(record.get("annuity_conversion_rate")),
+        "high_rate": round(contract_rate + 0.3, 3),
+        "surrender_rates": normalize_surrender_rates(record.get("surrender_rates"))
+    }
+
 # ------------------------------------------------------------------------------
 # メイン処理: 利率取得ロジック
 # ------------------------------------------------------------------------------
@@ -80,24 +114,15 @@ async def load_interest_rates(
         # ----------------------------------------------------------------------
         # 利率の抽出と変換
         # ----------------------------------------------------------------------
-        contract_rate = float(record.get("contract_rate"))
-        min_rate = float(record.get("min_rate"))
-        annuity_conversion_rate = float(record.get("annuity_conversion_rate"))
-        high_rate = round(contract_rate + 0.3, 3)
-        surrender_rates = record.get("surrender_rates", {})
+        rates = build_rates(record)
 
         logger.info(
             "[利率取得] 利率取得成功: contract_rate=%.3f, min_rate=%.3f, annuity_conversion_rate=%.3f, high_rate=%.3f, surrender_rate=%s",
-            contract_rate, min_rate, annuity_conversion_rate, high_rate, surrender_rates
+            rates["contract_rate"], rates["min_rate"], rates["annuity_conversion_rate"],
+            rates["high_rate"], rates["surrender_rates"]
         )
 
-        return {
-            "contract_rate": contract_rate,
-            "min_rate": min_rate,
-            "annuity_conversion_rate": annuity_conversion_rate,
-            "high_rate": high_rate,
-            "surrender_rates": surrender_rates
-        }
+        return rates
 
     except Exception as e:
         # ----------------------------------------------------------------------
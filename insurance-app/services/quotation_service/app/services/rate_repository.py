@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+利率リポジトリ（インメモリ利率テーブル）
+
+- 利率コレクションの全期間を plan_code ごとに開始日順で保持し、
+  契約日からの検索を二分探索（O(log n)）で行う
+- Mongo の change stream で変更を検知して再読み込みする
+  （一時的な切断は watch_retry_backoff_seconds に従って再接続し、再接続時に全体を読み直す。
+  レプリカセットでない等で change stream が利用できない場合のみ version stamp 付きのポーリングに切り替え）
+- 再読み込みは新しいスナップショットを組み立ててから参照を差し替える（読み取り側は常に一貫した版を参照）
+- 各スナップショットは利率版ID（rate_version）を持つ
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+from datetime import date, datetime, time, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.services.rate_loader import build_rates, load_interest_rates
+from app.config.config import Config
+
+# ------------------------------------------------------------------------------
+# 初期化
+# ------------------------------------------------------------------------------
+config = Config()
+logger = logging.getLogger(__name__)
+
+# 既定値（config.yaml の mongodb.rate_cache で上書き可能）
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "refresh_mode": "change_stream",
+    "poll_interval_seconds": 60,
+    "watch_retry_backoff_seconds": [1, 2, 5, 10, 30],  # change stream 切断時の再接続間隔
+}
+
+
+# ------------------------------------------------------------------------------
+# 日付の正規化（load_interest_rates と同じ規則で UTC 00:00:00 に揃える）
+# ------------------------------------------------------------------------------
+def _normalize_date(value: Any) -> datetime:
+    """
+    検索キーとして使う naive UTC の日付（00:00:00）に変換する
+    """
+    if isinstance(value, datetime):
+        # load_interest_rates と同様、タイムゾーンは変換せず日付部分をそのまま UTC とみなす
+        return value.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    raise TypeError(f"日付型ではありません: {value!r}")
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# ------------------------------------------------------------------------------
+# スナップショット（読み取り専用）
+# ------------------------------------------------------------------------------
+class RateSnapshot:
+    """
+    ある時点の利率テーブル全体（plan_code ごとの開始日順インデックス）
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], version: str):
+        self.version = version
+        self.loaded_at = datetime.now(timezone.utc)
+        self.record_count = len(records)
+
+        periods: Dict[str, List[Tuple[datetime, datetime, Dict[str, Any]]]] = {}
+        for record in records:
+            try:
+                start = _naive_utc(record["start_date"])
+                end = _naive_utc(record["end_date"])
+                rates = {**build_rates(record), "rate_version": version}
+            except Exception as e:
+                logger.warning("[利率リポジトリ] 不正な利率レコードを除外: _id=%s, error=%s", record.get("_id"), e)
+                continue
+            periods.setdefault(record.get("plan_code"), []).append((start, end, rates))
+
+        # plan_code → (開始日リスト, [(終了日, 利率)])
+        self._index: Dict[str, Tuple[List[datetime], List[Tuple[datetime, Dict[str, Any]]]]] = {}
+        for plan_code, items in periods.items():
+            items.sort(key=lambda item: item[0])
+            self._index[plan_code] = (
+                [start for start, _, _ in items],
+                [(end, rates) for _, end, rates in items],
+            )
+
+    def lookup(self, plan_code: str, contract_date: Any) -> Optional[Dict[str, Any]]:
+        """
+        start_date <= 契約日 < end_date を満たす期間の利率を返す（該当なしは None）
+        """
+        entry = self._index.get(plan_code)
+        if entry is None:
+            return None
+        starts, values = entry
+        target = _normalize_date(contract_date)
+        pos = bisect.bisect_right(starts, target) - 1
+        if pos < 0:
+            return None
+        end, rates = values[pos]
+        if target >= end:
+            return None
+        return dict(rates)
+
+    @property
+    def plan_codes(self) -> List[str]:
+        return list(self._index)
+
+
+# ------------------------------------------------------------------------------
+# リポジトリ本体
+# ------------------------------------------------------------------------------
+class RateRepository:
+    """
+    利率コレクションをメモリに保持し、変更を追従する
+    """
+
+    def __init__(self, database: str, collection: str, settings: Optional[Dict[str, Any]] = None):
+        """
+        Parameters:
+            database (str): 利率コレクションのDB名
+            collection (str): 利率コレクション名
+            settings (dict): config.yaml の rate_cache セクション
+        """
+        s = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.enabled = bool(s["enabled"])
+        self.refresh_mode = s["refresh_mode"]
+        self.poll_interval = float(s["poll_interval_seconds"])
+        self.watch_backoff = [float(b) for b in s["watch_retry_backoff_seconds"]] or [1.0]
+        self._database = database
+        self._collection = collection
+
+        self._snapshot: Optional[RateSnapshot] = None
+        self._mongo_client: Optional[AsyncIOMotorClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # 統計
+        self.reloads = 0
+        self.hits = 0
+        self.fallbacks = 0
+        self.watch_restarts = 0
+        self.active_mode: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    # --------------------------------------------------------------------------
+    # ライフサイクル
+    # --------------------------------------------------------------------------
+    async def start(self, mongo_client: AsyncIOMotorClient) -> None:
+        """
+        初回読み込みを行い、変更追従タスクを開始する（アプリ起動時）
+        """
+        if not self.enabled:
+            logger.info("[利率リポジトリ] 無効化されています（毎回MongoDBから取得）")
+            return
+        self._mongo_client = mongo_client
+        try:
+            await self.reload()
+        except Exception:
+            logger.exception("[利率リポジトリ] 初回読み込みに失敗（MongoDB直接取得で継続）")
+        self._task = asyncio.create_task(self._watch_loop())
+
+    async def stop(self) -> None:
+        """
+        変更追従タスクを停止する（アプリ停止時）
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # --------------------------------------------------------------------------
+    # 読み込み
+    # --------------------------------------------------------------------------
+    def _get_collection(self):
+        return self._mongo_client.get_database(self._database).get_collection(self._collection)
+
+    @staticmethod
+    def _compute_version(records: List[Dict[str, Any]]) -> str:
+        """
+        レコード内容から利率版ID（version stamp）を算出する
+        """
+        payload = json.dumps(
+            sorted(records, key=lambda r: str(r.get("_id"))),
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    async def reload(self) -> bool:
+        """
+        利率コレクション全体を読み込み、内容が変わっていればスナップショットを差し替える
+
+        Returns:
+            bool: 差し替えた場合 True
+        """
+        records = await self._get_collection().find({}).to_list(length=None)
+        version = self._compute_version(records)
+        if self._snapshot is not None and self._snapshot.version == version:
+            return False
+
+        snapshot = RateSnapshot(records, version)
+        self._snapshot = snapshot
+        self.reloads += 1
+        logger.info(
+            "[利率リポジトリ] スナップショット更新: version=%s, records=%d, plans=%s",
+            version, snapshot.record_count, snapshot.plan_codes
+        )
+        return True
+
+    async def _watch_loop(self) -> None:
+        """
+        change stream で変更を待ち受ける（切断時は再接続し、利用不可の場合のみポーリングに切り替える）
+        """
+        if self.refresh_mode == "change_stream":
+            failures = 0
+            while True:
+                try:
+                    self.active_mode = "change_stream"
+                    async with self._get_collection().watch() as stream:
+                        logger.info("[利率リポジトリ] change stream 監視開始")
+                        # 監視開始前（初回読み込み失敗・起動直後・切断中）の変更を取りこぼさないよう全体を読み直す
+                        # （内容が同じ場合は差し替えない）
+                        await self.reload()
+                        failures = 0
+                        async for _ in stream:
+                            await self.reload()
+                except asyncio.CancelledError:
+                    raise
+                except OperationFailure as e:
+                    logger.warning("[利率リポジトリ] change stream 利用不可のためポーリングに切り替え: %s", e)
+                    break
+                except PyMongoError as e:
+                    self.last_error = str(e)
+                    reason = f"切断: {e}"
+                else:
+                    # ストリームが終了した場合（コレクション削除等による invalidate）も再接続する
+                    reason = "ストリーム終了"
+
+                failures += 1
+                self.watch_restarts += 1
+                delay = self.watch_backoff[min(failures, len(self.watch_backoff)) - 1]
+                self.active_mode = "change_stream_retrying"
+                logger.warning("[利率リポジトリ] change stream %s（%.0f秒後に再接続）", reason, delay)
+                await asyncio.sleep(delay)
+
+        self.active_mode = "poll"
+        logger.info("[利率リポジトリ] ポーリング開始: interval=%ss", self.poll_interval)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning("[利率リポジトリ] ポーリング読み込み失敗（前回の版を継続利用）: %s", e)
+
+    # --------------------------------------------------------------------------
+    # 参照
+    # --------------------------------------------------------------------------
+    def get_rates(self, plan_code: str, contract_date: Any) -> Optional[Dict[str, Any]]:
+        """
+        メモリ上のスナップショットから利率を返す（未読み込み・該当なしは None）
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        rates = snapshot.lookup(plan_code, contract_date)
+        if rates is not None:
+            self.hits += 1
+        return rates
+
+    @property
+    def version(self) -> Optional[str]:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        リポジトリの状態を返す（メトリクス用）
+        """
+        current = self._snapshot
+        return {
+            "enabled": self.enabled,
+            "mode": self.active_mode,
+            "version": current.version if current else None,
+            "loaded_at": current.loaded_at.isoformat() if current else None,
+            "records": current.record_count if current else 0,
+            "reloads": self.reloads,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "watch_restarts": self.watch_restarts,
+            "last_error": self.last_error,
+        }
+
+
+# ------------------------------------------------------------------------------
+# 共有インスタンス
+# ------------------------------------------------------------------------------
+rate_repository = RateRepository(
+    database=config.mongodb["database"],
+    collection=config.mongodb["collection"],
+    settings=config.mongodb.get("rate_cache", {}),
+)
+
+
+# ------------------------------------------------------------------------------
+# 利率取得（リポジトリ優先、未ロード・該当なし時は MongoDB へフォールバック）
+# ------------------------------------------------------------------------------
+async def get_interest_rates(
+    db: AsyncIOMotorClient,
+    plan_code: str,
+    contract_date: datetime
+) -> Dict[str, Any]:
+    """
+    契約日とプランコードに該当する利率情報を返す
+
+    通常はメモリ上のスナップショットから返し、MongoDB へのアクセスは発生しない。
+    スナップショット未読み込み、または該当期間が無い場合（追加直後の反映待ち等）は
+    従来どおり load_interest_rates で MongoDB から取得する。
+    フォールバックで取得したレコードはスナップショットに含まれないため、rate_version は None とする
+    （試算結果のキャッシュ対象外となり、保存するシナリオにも版を記録しない）。
+
+    Raises:
+        ValueError: 利率情報が見つからない場合
+    """
+    rates = rate_repository.get_rates(plan_code, contract_date)
+    if rates is not None:
+        return rates
+
+    rate_repository.fallbacks += 1
+    rates = await load_interest_rates(db=db, plan_code=plan_code, contract_date=contract_date)
+    return {**rates, "rate_version": None}
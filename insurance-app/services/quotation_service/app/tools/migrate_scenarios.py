@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+シナリオ保存形式の移行ツール（1シナリオ1ドキュメント → 1見積もり1ドキュメント）
+
+- 従来コレクション（mongodb.scenario_collection）を見積もりIDごとに集約し、
+  document 形式のコレクション（mongodb.scenario_storage.document_collection）へ一括書き込みする
+- 既に document 形式で保存済みの見積もりは上書きしないため、サービス稼働中に実行できる
+- 従来コレクションは削除しない（移行結果を確認した後に手動で削除する）
+
+使い方（サービスのルートディレクトリで実行）:
+    python -m app.tools.migrate_scenarios [--batch-size 500] [--dry-run]
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import argparse
+import asyncio
+import logging
+
+from app.dependencies.get_mongo_client import init_mongo_client, close_mongo_client
+from app.services.quote_manager import scenario_store
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------
+# 移行処理
+# ------------------------------------------------------------------------------
+async def run(batch_size: int, dry_run: bool) -> dict:
+    """
+    従来形式のシナリオを document 形式へ移行し、件数を返す
+    """
+    mongo_client = init_mongo_client()
+    try:
+        logger.info(
+            "[シナリオ移行] 開始: %s.%s → %s (batch_size=%d, dry_run=%s)",
+            scenario_store.database, scenario_store.legacy_collection,
+            scenario_store.document_collection, batch_size, dry_run
+        )
+        return await scenario_store.migrate_legacy(mongo_client, batch_size=batch_size, dry_run=dry_run)
+    finally:
+        close_mongo_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="シナリオを1見積もり1ドキュメント形式へ移行する")
+    parser.add_argument("--batch-size", type=int, default=500, help="bulk_write 1回あたりの件数")
+    parser.add_argument("--dry-run", action="store_true", help="書き込みを行わず対象件数のみ集計する")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(name)s - %(message)s")
+    stats = asyncio.run(run(args.batch_size, args.dry_run))
+    logger.info("[シナリオ移行] 完了: %s", stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Alembic 実行環境（PostgreSQL / asyncpg）
+
+- 接続先は config.yaml の postgres.dsn を使用する（alembic.ini の sqlalchemy.url は使用しない）
+- サービスのルートディレクトリ（alembic.ini と同じ階層）で実行する
+    alembic upgrade head
+    alembic upgrade head --sql   # オフライン（SQL出力のみ）
+"""
+
+# ------------------------------------------------------------------------------
+# インポート
+# ------------------------------------------------------------------------------
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import async_engine_from_config
+
+from app.config.config import Config
+from app.db_models.quotes import Base
+from app.db_models.outbox import Base as OutboxBase
+
+# ------------------------------------------------------------------------------
+# 設定読み込み
+# ------------------------------------------------------------------------------
+alembic_config = context.config
+if alembic_config.config_file_name is not None:
+    fileConfig(alembic_config.config_file_name)
+
+alembic_config.set_main_option("sqlalchemy.url", Config().postgres["dsn"])
+# 見積もりとアウトボックスはモデルの Base が別のため、両方のメタデータを比較対象にする
+target_metadata = [Base.metadata, OutboxBase.metadata]
+
+
+# ------------------------------------------------------------------------------
+# オフライン実行（SQL出力）
+# ------------------------------------------------------------------------------
+def run_migrations_offline() -> None:
+    context.configure(
+        url=alembic_config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+# ------------------------------------------------------------------------------
+# オンライン実行（DB接続）
+# ------------------------------------------------------------------------------
+def do_run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    connectable = async_engine_from_config(
+        alembic_config.get_section(alembic_config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
+
+def run_migrations_online() -> None:
+    asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
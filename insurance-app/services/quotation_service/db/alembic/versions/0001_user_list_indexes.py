@@ -0,0 +1,90 @@
+"""ユーザー別一覧・参照用インデックスの追加
+
+Revision ID: 0001_user_list_indexes
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+- quotes / applications / contracts のユーザー別一覧（キーセットページング）と
+  申込・契約の見積もりID / 申込ID 参照をインデックスで処理する
+- テーブル本体は db/insurance_schema.sql で作成済みであることを前提とする
+- 稼働中のテーブルをロックしないよう CREATE INDEX CONCURRENTLY で作成する
+  （トランザクション内では実行できないため autocommit_block で実行する）
+- 途中で失敗した場合に INVALID なインデックスが残ることがあるため、作成前に
+  pg_index.indisvalid を確認し、INVALID なものは DROP INDEX CONCURRENTLY で削除して作り直す
+  （IF NOT EXISTS は INVALID なインデックスも「存在する」として作成を省略するため）
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_user_list_indexes"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (インデックス名, テーブル名, カラム, INCLUDE カラム)
+INDEXES = (
+    # 見積もり一覧: WHERE user_id = ? ORDER BY created_at DESC, quote_id DESC
+    (
+        "ix_quotes_user_id_created_at",
+        "quotes",
+        ["user_id", sa.text("created_at DESC"), sa.text("quote_id DESC")],
+        ["quote_state"],
+    ),
+    # 申込一覧: WHERE user_id = ? ORDER BY applied_at DESC, application_id DESC
+    (
+        "ix_applications_user_id_applied_at",
+        "applications",
+        ["user_id", sa.text("applied_at DESC"), sa.text("application_id DESC")],
+        ["application_status", "quote_id"],
+    ),
+    # 見積もりIDからの申込参照
+    ("ix_applications_quote_id", "applications", ["quote_id"], []),
+    # 契約一覧・申込IDからの契約参照（外部キー削除時の参照も兼ねる）
+    ("ix_contracts_user_id", "contracts", ["user_id"], []),
+    ("ix_contracts_application_id", "contracts", ["application_id"], []),
+)
+
+
+# 現在のスキーマで INVALID（作成途中で中断）なインデックス名を取得する
+INVALID_INDEXES_SQL = sa.text(
+    """
+    SELECT c.relname
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+      AND c.relname = ANY(:names)
+      AND NOT i.indisvalid
+    """
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        names = [name for name, _, _, _ in INDEXES]
+        # オフライン（--sql）では DB を参照できないため確認しない
+        invalid = set() if op.get_context().as_sql else set(
+            op.get_bind().execute(INVALID_INDEXES_SQL, {"names": names}).scalars()
+        )
+        for name, table, columns, include in INDEXES:
+            if name in invalid:
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_include=include,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
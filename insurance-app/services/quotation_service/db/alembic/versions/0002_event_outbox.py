@@ -0,0 +1,48 @@
+"""イベントアウトボックス（event_outbox）テーブルの追加
+
+Revision ID: 0002_event_outbox
+Revises: 0001_user_list_indexes
+Create Date: 2026-10-18 00:00:00
+
+- 見積もり・申込の更新と同じトランザクションで発行予定のイベントを記録する
+- 各サービスのリレーが source ごとに未送信行（sent_at IS NULL）を id 順に取得して NATS に発行する
+- 新規テーブルのため、インデックスは CONCURRENTLY を使わずに作成する
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_event_outbox"
+down_revision: Union[str, None] = "0001_user_list_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_outbox",
+        sa.Column("id", sa.BigInteger(), sa.Identity(always=False), primary_key=True),
+        sa.Column("source", sa.String(64), nullable=False),
+        sa.Column("subject", sa.String(255), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("sent_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+    )
+    # リレーの未送信取得: WHERE source = ? AND sent_at IS NULL ORDER BY id
+    op.create_index(
+        "ix_event_outbox_unsent",
+        "event_outbox",
+        ["source", "id"],
+        postgresql_where=sa.text("sent_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_outbox_unsent", table_name="event_outbox")
+    op.drop_table("event_outbox")
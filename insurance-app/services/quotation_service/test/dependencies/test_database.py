@@ -0,0 +1,73 @@
+# tests/dependencies/test_database.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import pytest
+from unittest import mock
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+from app.db import database
+from app.db.database import InstrumentedAsyncQueuePool, PostgresPoolMetrics, build_engine_options
+
+
+def test_engine_options_from_config():
+    options = build_engine_options({
+        "pool": {"pool_size": 8, "max_overflow": 4, "pool_timeout": 2},
+        "statement_cache_size": 256,
+        "statement_timeout_ms": 5000,
+    })
+
+    assert (options["pool_size"], options["max_overflow"], options["pool_timeout"]) == (8, 4, 2.0)
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"]["prepared_statement_cache_size"] == 256
+    assert options["connect_args"]["server_settings"] == {"statement_timeout": "5000"}
+
+
+def test_engine_options_pgbouncer_disables_statement_cache():
+    options = build_engine_options({"pgbouncer": True, "statement_cache_size": 256, "statement_timeout_ms": 5000})
+    connect_args = options["connect_args"]
+
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
+    # PgBouncer は起動パラメータを受け付けないため送らない
+    assert "server_settings" not in connect_args
+
+
+@pytest.mark.asyncio
+async def test_pool_records_checkout_wait_and_saturation(mocker):
+    metrics = PostgresPoolMetrics()
+    mocker.patch.object(database, "pg_pool_metrics", metrics)
+    pool = InstrumentedAsyncQueuePool(mock.Mock, pool_size=1, max_overflow=0, timeout=0.05)
+    metrics.bind(pool, 1)
+
+    conn = await greenlet_spawn(pool.connect)
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["saturation"] == 1.0
+
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+    snapshot = metrics.snapshot()
+    assert snapshot["checkout_timeouts"] == 1
+    assert snapshot["wait_seconds_max"] >= 0.05
+
+    await greenlet_spawn(conn.close)
+    assert metrics.snapshot()["saturation"] == 0.0
+
+
+def test_statement_latency_by_operation():
+    metrics = PostgresPoolMetrics(slow_statement_ms=100)
+
+    metrics.observe_statement("SELECT 1", 0.01)
+    metrics.observe_statement("\n  select 2", 0.2)
+    metrics.observe_statement("INSERT INTO quotes VALUES (1)", 0.02, failed=True)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["statements"] == 3
+    assert snapshot["slow_statements"] == 1
+    assert snapshot["statement_errors"] == 1
+    assert snapshot["by_operation"]["SELECT"]["count"] == 2
+    assert snapshot["by_operation"]["INSERT"]["seconds_max"] == 0.02
@@ -0,0 +1,86 @@
+# tests/dependencies/test_jwks_cache.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import pytest
+import asyncio
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose.utils import base64url_encode
+from app.dependencies.jwks_cache import JWKSCache
+
+
+def _jwk(kid: str, private_key) -> dict:
+    numbers = private_key.public_key().public_numbers()
+    n = numbers.n.to_bytes((numbers.n.bit_length() + 7) // 8, "big")
+    e = numbers.e.to_bytes((numbers.e.bit_length() + 7) // 8, "big")
+    return {
+        "kid": kid,
+        "kty": "RSA",
+        "use": "sig",
+        "n": base64url_encode(n).decode("utf-8"),
+        "e": base64url_encode(e).decode("utf-8"),
+    }
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return {
+        "k1": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "k2": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_key_cached_by_kid(mocker, keys):
+    cache = JWKSCache("http://example/certs", unknown_kid_cooldown_seconds=0)
+    fetch = mocker.patch.object(
+        cache, "_fetch_jwks",
+        new=mocker.AsyncMock(return_value={"keys": [_jwk("k1", keys["k1"])]})
+    )
+
+    key1 = await cache.get_key("k1")
+    key2 = await cache.get_key("k1")
+
+    assert key1 is key2
+    assert key1.public_numbers() == keys["k1"].public_key().public_numbers()
+    assert fetch.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_collapses_concurrent_refetch(mocker, keys):
+    cache = JWKSCache("http://example/certs", unknown_kid_cooldown_seconds=0)
+    responses = [
+        {"keys": [_jwk("k1", keys["k1"])]},
+        {"keys": [_jwk("k1", keys["k1"]), _jwk("k2", keys["k2"])]},
+    ]
+
+    async def slow_fetch():
+        await asyncio.sleep(0.01)
+        return responses.pop(0)
+
+    fetch = mocker.patch.object(cache, "_fetch_jwks", new=mocker.AsyncMock(side_effect=slow_fetch))
+
+    await cache.get_key("k1")
+    generation = cache.generation
+    results = await asyncio.gather(*[cache.get_key("k2") for _ in range(10)])
+
+    assert all(r is results[0] for r in results)
+    assert fetch.await_count == 2
+    assert cache.generation == generation + 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_raises_after_single_refetch(mocker, keys):
+    cache = JWKSCache("http://example/certs", unknown_kid_cooldown_seconds=0)
+    fetch = mocker.patch.object(
+        cache, "_fetch_jwks",
+        new=mocker.AsyncMock(return_value={"keys": [_jwk("k1", keys["k1"])]})
+    )
+
+    with pytest.raises(KeyError):
+        await cache.get_key("missing")
+
+    # 初回取得 + 未知kidによる再取得 の2回のみ
+    assert fetch.await_count == 2
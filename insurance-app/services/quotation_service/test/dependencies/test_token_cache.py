@@ -0,0 +1,51 @@
+# tests/dependencies/test_token_cache.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import time
+from app.dependencies.token_cache import VerifiedTokenCache
+
+
+def test_hit_and_miss_counts():
+    cache = VerifiedTokenCache(max_entries=10)
+    claims = {"sub": "user-1", "exp": time.time() + 60}
+
+    assert cache.get("token-a", generation=1) is None
+    cache.put("token-a", claims, generation=1)
+    assert cache.get("token-a", generation=1)["sub"] == "user-1"
+
+    stats = cache.snapshot()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_expired_token_is_evicted():
+    cache = VerifiedTokenCache(max_entries=10)
+    cache.put("token-a", {"sub": "user-1", "exp": time.time() + 60}, generation=1)
+    cache._entries[cache._hash("token-a")] = ({"sub": "user-1"}, time.time() - 1)
+
+    assert cache.get("token-a", generation=1) is None
+    assert cache.snapshot()["entries"] == 0
+
+
+def test_key_rotation_clears_cache():
+    cache = VerifiedTokenCache(max_entries=10)
+    cache.put("token-a", {"sub": "user-1", "exp": time.time() + 60}, generation=1)
+
+    assert cache.get("token-a", generation=2) is None
+    assert cache.snapshot()["entries"] == 0
+
+
+def test_lru_bound():
+    cache = VerifiedTokenCache(max_entries=2)
+    exp = time.time() + 60
+    cache.put("token-a", {"sub": "a", "exp": exp}, generation=1)
+    cache.put("token-b", {"sub": "b", "exp": exp}, generation=1)
+    cache.get("token-a", generation=1)
+    cache.put("token-c", {"sub": "c", "exp": exp}, generation=1)
+
+    assert cache.get("token-b", generation=1) is None
+    assert cache.get("token-a", generation=1)["sub"] == "a"
+    assert cache.get("token-c", generation=1)["sub"] == "c"
@@ -0,0 +1,71 @@
+# test/integration/test_index_plans_integration.py
+#
+# 前提: ローカルの PostgreSQL（config.yaml の postgres.dsn）に
+#       db/insurance_schema.sql と alembic upgrade head が適用済みであること
+
+import pytest
+from uuid import uuid4
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.config.config import Config
+from app.db_models.quotes import Quote
+
+USER_ID = str(uuid4())
+
+
+async def _explain(sql: str, params: dict) -> str:
+    engine = create_async_engine(Config().postgres["dsn"])
+    try:
+        async with engine.begin() as conn:
+            # 件数の少ないテスト環境でもインデックスを使える場合は使わせる
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            result = await conn.execute(text(f"EXPLAIN {sql}"), params)
+            return "\n".join(row[0] for row in result)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_quote_list_uses_user_index_without_sort():
+    stmt = (
+        select(Quote.quote_id, Quote.quote_state, Quote.created_at)
+        .where(Quote.user_id == USER_ID)
+        .order_by(Quote.created_at.desc(), Quote.quote_id.desc())
+        .limit(21)
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    plan = await _explain(sql, {})
+
+    assert "ix_quotes_user_id_created_at" in plan
+    # インデックス順に読むためソートは発生しない
+    assert "Sort" not in plan
+
+
+@pytest.mark.asyncio
+async def test_application_list_uses_user_index_without_sort():
+    plan = await _explain(
+        "SELECT application_id, application_status, quote_id, applied_at FROM applications"
+        " WHERE user_id = CAST(:user_id AS UUID)"
+        " ORDER BY applied_at DESC, application_id DESC LIMIT 21",
+        {"user_id": USER_ID},
+    )
+
+    assert "ix_applications_user_id_applied_at" in plan
+    assert "Sort" not in plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sql, index_name",
+    [
+        ("SELECT application_id FROM applications WHERE quote_id = CAST(:id AS UUID)", "ix_applications_quote_id"),
+        ("SELECT contract_id FROM contracts WHERE user_id = CAST(:id AS UUID)", "ix_contracts_user_id"),
+        ("SELECT contract_id FROM contracts WHERE application_id = CAST(:id AS UUID)", "ix_contracts_application_id"),
+    ],
+)
+async def test_lookup_uses_index(sql, index_name):
+    plan = await _explain(sql, {"id": USER_ID})
+
+    assert index_name in plan
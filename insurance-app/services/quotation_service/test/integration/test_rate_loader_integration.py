@@ -25,4 +25,4 @@ async def test_load_interest_rates_with_real_mongo():
     assert result["min_rate"] == 0.5
     assert result["high_rate"] == 1.5
     assert result["annuity_conversion_rate"] == 0.8
-    assert result["surrender_rates"]["15"] == 0.85
\ No newline at end of file
+    assert result["surrender_rates"][15] == 0.85
\ No newline at end of file
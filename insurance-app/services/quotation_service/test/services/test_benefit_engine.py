@@ -0,0 +1,67 @@
+# tests/services/test_benefit_engine.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import random
+import numpy as np
+from app.services.benefit_engine import compute_benefit_columns, benefit_rows, py_round
+
+
+def _scalar_benefits(monthly_premium, payment_years, pension_years, contract_rate,
+                     annuity_conversion_rate, surrender_rate_15):
+    """従来のスカラー実装（端数処理の比較基準）"""
+    total_paid = monthly_premium * 12 * payment_years
+    lump_sum = int(total_paid * (1 + contract_rate / 100) ** payment_years)
+    annual_pension = int(lump_sum * (annuity_conversion_rate / 100) / pension_years)
+    estimated_pension = annual_pension * pension_years
+    return {
+        "total_paid": total_paid,
+        "lump_sum_amount": lump_sum,
+        "annual_pension": annual_pension,
+        "estimated_pension": estimated_pension,
+        "pension_refund_rate": round(estimated_pension / total_paid * 100, 2),
+        "lump_sum_refund_rate": round(lump_sum / total_paid * 100, 2),
+        "refund_on_15_years": int(monthly_premium * 12 * 15 * surrender_rate_15),
+        "refund_rate": round(surrender_rate_15 * 100, 2),
+    }
+
+
+def test_matches_scalar_implementation():
+    rng = random.Random(42)
+    n = 5000
+    inputs = [
+        (
+            rng.randint(1, 200) * 500,
+            rng.randint(15, 45),
+            rng.randint(5, 30),
+            round(rng.uniform(0, 5), rng.choice([1, 2, 3])),
+            round(rng.uniform(50, 120), rng.choice([0, 1, 2])),
+            round(rng.uniform(0, 1.2), rng.choice([2, 3, 4])),
+        )
+        for _ in range(n)
+    ]
+
+    columns = compute_benefit_columns(*[list(col) for col in zip(*inputs)])
+    rows = benefit_rows(columns)
+
+    for args, row in zip(inputs, rows):
+        assert row == _scalar_benefits(*args)
+
+
+def test_scalar_inputs_broadcast():
+    columns = compute_benefit_columns(10000, 20, 10, [0.5, 1.0, 1.5], 95.0, 0.85)
+
+    assert len(columns["lump_sum_amount"]) == 3
+    assert (columns["total_paid"] == 10000 * 12 * 20).all()
+    assert columns["lump_sum_amount"][0] < columns["lump_sum_amount"][2]
+
+
+def test_py_round_matches_builtin_round_on_ties():
+    # 2進表現で .xx5 の前後にずれる値（np.round とは結果が異なる）
+    values = [0.125, 0.375, 1.005, 2.675, 1.115, 0.285, 1234.565, 99.995]
+    expected = [round(v, 2) for v in values]
+
+    assert py_round(values, 2).tolist() == expected
+    assert py_round(np.arange(0, 10000) / 1000, 2).tolist() == [round(i / 1000, 2) for i in range(10000)]
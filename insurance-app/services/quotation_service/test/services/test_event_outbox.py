@@ -0,0 +1,162 @@
+# tests/services/test_event_outbox.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy.dialects import postgresql
+from uuid import uuid4
+from app.db_models.outbox import OutboxEvent
+from app.services.event_outbox import OutboxRelay, stage_event
+
+
+class _Transaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Session:
+    def __init__(self, rows, locked=True):
+        self.rows = rows
+        self.locked = locked
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    def begin(self):
+        return _Transaction()
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        rows = self.rows
+        locked = self.locked
+
+        class _Result:
+            def scalar(self):
+                return locked
+
+            def scalars(self):
+                return self
+
+            def all(self):
+                return rows
+
+        return _Result()
+
+
+def _row(event_id, subject="quotes.QuoteCreated"):
+    return OutboxEvent(
+        id=event_id,
+        source="quotation_service",
+        subject=subject,
+        payload={"event": "QuoteCreated", "id": event_id},
+        created_at=datetime.now(timezone.utc),
+        attempts=0,
+    )
+
+
+def _relay(mocker, rows, publish=None, locked=True):
+    session = _Session(rows, locked=locked)
+    relay = OutboxRelay(
+        session_factory=lambda: session,
+        publish=publish or mocker.AsyncMock(),
+        flush=mocker.AsyncMock(),
+        settings={"source": "quotation_service", "batch_size": 10, "max_attempts": 3},
+    )
+    return relay, session
+
+
+def test_stage_event_adds_serializable_row(mocker):
+    session = mocker.Mock()
+    quote_id = uuid4()
+
+    event = stage_event(session, "quotes.QuoteCreated", {"quote_id": quote_id, "created_at": datetime(2025, 8, 1)})
+
+    session.add.assert_called_once_with(event)
+    assert event.subject == "quotes.QuoteCreated"
+    assert event.payload == {"quote_id": str(quote_id), "created_at": "2025-08-01 00:00:00"}
+    assert event.sent_at is None
+
+
+@pytest.mark.asyncio
+async def test_relay_once_publishes_batch_in_order_and_marks_sent(mocker):
+    rows = [_row(1), _row(2), _row(3)]
+    relay, session = _relay(mocker, rows)
+
+    sent, failed = await relay.relay_once()
+
+    assert (sent, failed) == (3, False)
+    assert [call.args[0] for call in relay.publish.await_args_list] == ["quotes.QuoteCreated"] * 3
+    assert [call.args[1]["id"] for call in relay.publish.await_args_list] == [1, 2, 3]
+    relay.flush.assert_awaited_once()
+    assert all(row.sent_at is not None for row in rows)
+
+    lock_sql = str(session.statements[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "pg_try_advisory_xact_lock(hashtext('event_outbox:quotation_service'))" in lock_sql
+    sql = str(session.statements[1].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "ORDER BY event_outbox.id" in sql
+    assert relay.snapshot()["published"] == 3
+
+
+@pytest.mark.asyncio
+async def test_relay_once_stops_at_first_failure_and_records_attempt(mocker):
+    rows = [_row(1), _row(2), _row(3)]
+    publish = mocker.AsyncMock(side_effect=[None, RuntimeError("NATS接続が確立されていません"), None])
+    relay, _ = _relay(mocker, rows, publish=publish)
+
+    sent, failed = await relay.relay_once()
+
+    assert (sent, failed) == (1, True)
+    assert rows[0].sent_at is not None
+    assert rows[1].sent_at is None and rows[1].attempts == 1
+    assert "NATS" in rows[1].last_error
+    # 失敗行より後ろは次回に登録順のまま送信する
+    assert rows[2].sent_at is None and rows[2].attempts == 0
+    assert publish.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_relay_once_flush_failure_leaves_rows_unsent(mocker):
+    rows = [_row(1), _row(2)]
+    relay, _ = _relay(mocker, rows)
+    relay.flush.side_effect = TimeoutError()
+
+    with pytest.raises(TimeoutError):
+        await relay.relay_once()
+
+    assert all(row.sent_at is None for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_relay_once_without_rows_does_not_flush(mocker):
+    relay, _ = _relay(mocker, [])
+
+    assert await relay.relay_once() == (0, False)
+    relay.flush.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_relay_once_skips_when_another_replica_holds_lock(mocker):
+    rows = [_row(1), _row(2)]
+    relay, session = _relay(mocker, rows, locked=False)
+
+    assert await relay.relay_once() == (0, False)
+    # 未送信行の取得・発行は行わない
+    assert len(session.statements) == 1
+    relay.publish.assert_not_called()
+    assert relay.snapshot()["lock_skips"] == 1
+
+
+def test_backoff_for_caps_at_last_value(mocker):
+    relay, _ = _relay(mocker, [])
+
+    assert [relay.backoff_for(n) for n in (1, 2, 5, 99)] == [1.0, 2.0, 30.0, 30.0]
@@ -0,0 +1,77 @@
+# tests/services/test_mongo_indexes.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import pytest
+from app.services.mongo_indexes import MongoIndexManager, build_index_specs
+
+SPECS = [
+    {"database": "db", "collection": "rates", "name": "ix_rates", "keys": [("plan_code", 1), ("start_date", 1)]},
+    {"database": "db", "collection": "status", "name": "ux_status_user_id", "keys": [("user_id", 1)], "options": {"unique": True}},
+]
+
+
+def _mock_mongo(mocker, indexes_by_collection, create_error=None):
+    collections = {}
+    for name, indexes in indexes_by_collection.items():
+        collection = mocker.Mock()
+        collection.index_information = mocker.AsyncMock(return_value=indexes)
+        collection.create_index = mocker.AsyncMock(side_effect=create_error)
+        collections[name] = collection
+    mock_client = mocker.MagicMock()
+    mock_client.__getitem__.return_value.__getitem__.side_effect = collections.__getitem__
+    return mock_client, collections
+
+
+@pytest.mark.asyncio
+async def test_creates_only_missing_indexes(mocker):
+    mock_client, collections = _mock_mongo(mocker, {
+        "rates": {"_id_": {"key": [("_id", 1)]}, "ix_rates": {"key": [("plan_code", 1.0), ("start_date", 1.0)], "v": 2}},
+        "status": {"_id_": {"key": [("_id", 1)]}},
+    })
+
+    report = await MongoIndexManager(SPECS).ensure(mock_client)
+
+    assert report["ok"] == ["db.rates.ix_rates"]
+    assert report["created"] == ["db.status.ux_status_user_id"]
+    collections["rates"].create_index.assert_not_called()
+    collections["status"].create_index.assert_awaited_once_with([("user_id", 1)], name="ux_status_user_id", unique=True)
+
+
+@pytest.mark.asyncio
+async def test_reports_drift_without_changes(mocker):
+    mock_client, collections = _mock_mongo(mocker, {
+        # キーが異なる
+        "rates": {"ix_rates": {"key": [("plan_code", 1)]}, "extra": {"key": [("x", 1)]}},
+        # 一意制約なしで同一キーが別名で存在
+        "status": {"user_id_1": {"key": [("user_id", 1)]}},
+    })
+
+    report = await MongoIndexManager(SPECS).ensure(mock_client)
+
+    assert report["drift"] == ["db.rates.ix_rates", "db.status.ux_status_user_id"]
+    assert report["unmanaged"] == ["db.rates.extra", "db.status.user_id_1"]
+    collections["rates"].create_index.assert_not_called()
+    collections["status"].create_index.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_check_only_and_failures(mocker):
+    mock_client, _ = _mock_mongo(mocker, {"rates": {}, "status": {}}, create_error=RuntimeError("duplicate key"))
+    manager = MongoIndexManager(SPECS)
+
+    report = await manager.ensure(mock_client, create=False)
+    assert report["missing"] == ["db.rates.ix_rates", "db.status.ux_status_user_id"]
+
+    report = await manager.ensure(mock_client)
+    assert report["failed"] == ["db.rates.ix_rates", "db.status.ux_status_user_id"]
+    assert manager.snapshot()["report"] == report
+
+
+def test_service_specs_cover_queried_fields():
+    keys = {spec["name"]: [field for field, _ in spec["keys"]] for spec in build_index_specs()}
+
+    assert keys["ix_rates_plan_code_period"] == ["plan_code", "start_date", "end_date"]
+    assert keys["ix_quote_scenarios_quote_id"][0] == "quote_id"
@@ -0,0 +1,72 @@
+# tests/services/test_monte_carlo.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import asyncio
+import pytest
+from app.services.calculate_quote import calculate_benefits
+from app.services.monte_carlo import MonteCarloRunner, simulate_rate_paths
+
+PARAMS = {
+    "monthly_premium": 10000,
+    "payment_years": 20,
+    "pension_years": 10,
+    "contract_rate": 1.2,
+    "min_rate": 0.5,
+    "annuity_conversion_rate": 95.0,
+    "mean_reversion": 0.15,
+    "volatility": 0.25,
+    "paths": 2000,
+    "seed": 7,
+}
+
+
+def test_same_seed_same_result():
+    assert simulate_rate_paths(PARAMS) == simulate_rate_paths(PARAMS)
+    assert simulate_rate_paths(PARAMS) != simulate_rate_paths({**PARAMS, "seed": 8})
+
+
+def test_zero_volatility_matches_base_scenario():
+    result = simulate_rate_paths({**PARAMS, "volatility": 0.0})
+    expected = calculate_benefits(10000, 20, 10, 1.2, 95.0, {})
+
+    # 複利の計算順序（累乗と逐次積）の差は1円以内
+    assert abs(result["lump_sum_amount"]["p50"] - expected["lump_sum_amount"]) <= 1
+    assert result["lump_sum_amount"]["p5"] == result["lump_sum_amount"]["p95"]
+    assert result["average_rate"]["p50"] == 1.2
+
+
+def test_rates_are_floored_and_bands_ordered():
+    result = simulate_rate_paths({**PARAMS, "volatility": 2.0})
+
+    assert result["average_rate"]["p5"] >= PARAMS["min_rate"]
+    for name in ("average_rate", "lump_sum_amount", "annual_pension"):
+        band = result[name]
+        assert band["p5"] <= band["p50"] <= band["p95"]
+
+
+@pytest.mark.asyncio
+async def test_runner_caches_per_rate_version():
+    runner = MonteCarloRunner({"max_workers": 1})
+    try:
+        first, second = await asyncio.gather(runner.run(PARAMS, "v1"), runner.run(PARAMS, "v1"))
+        assert first == second
+        assert runner.runs == 1 and runner.shared == 1
+        # 計算用プロセスは fork ではなく spawn で起動する
+        assert runner._executor._mp_context.get_start_method() == "spawn"
+
+        await runner.run(PARAMS, "v1")
+        assert runner.cache_hits == 1
+
+        # 利率版が変われば再計算
+        await runner.run(PARAMS, "v2")
+        assert runner.runs == 2
+
+        # 利率版不明はキャッシュしない
+        await runner.run(PARAMS, None)
+        await runner.run(PARAMS, None)
+        assert runner.runs == 4
+    finally:
+        runner.shutdown()
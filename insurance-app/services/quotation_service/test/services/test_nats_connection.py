@@ -0,0 +1,151 @@
+# tests/services/test_nats_connection.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import pytest
+from app.services import nats_connection
+from app.services.nats_connection import NatsConnectionManager
+
+
+def _manager(**settings):
+    return NatsConnectionManager("nats://localhost:4222", {"name": "quotation_service", **settings})
+
+
+def _client(mocker, connected=True):
+    client = mocker.Mock()
+    client.is_connected = connected
+    client.is_reconnecting = not connected
+    client.is_draining = False
+    client.is_closed = False
+    client.connected_url = None
+    client.pending_data_size = 128
+    client.stats = {"in_msgs": 3, "in_bytes": 300, "out_msgs": 2}
+    client.publish = mocker.AsyncMock()
+    client.flush = mocker.AsyncMock()
+    client.drain = mocker.AsyncMock()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_connect_passes_reconnect_and_buffer_settings(mocker):
+    client = _client(mocker)
+    client.connect = mocker.AsyncMock()
+    mocker.patch.object(nats_connection, "NATS", return_value=client)
+    manager = _manager(pending_size_bytes=1024, max_reconnect_attempts=10)
+
+    await manager.connect()
+    await manager.connect()
+
+    client.connect.assert_awaited_once()
+    kwargs = client.connect.await_args.kwargs
+    assert kwargs["servers"] == ["nats://localhost:4222"]
+    assert kwargs["name"] == "quotation_service"
+    assert kwargs["pending_size"] == 1024
+    assert kwargs["max_reconnect_attempts"] == 10
+    assert await manager.wait_connected(timeout=1) is client
+    assert manager.health()["ready"] is True
+
+
+@pytest.mark.asyncio
+async def test_connect_failure_schedules_background_retry(mocker):
+    client = _client(mocker, connected=False)
+    client.connect = mocker.AsyncMock(side_effect=OSError("connection refused"))
+    mocker.patch.object(nats_connection, "NATS", return_value=client)
+    manager = _manager(connect_backoff_seconds=[60])
+
+    await manager.connect()
+
+    health = manager.health()
+    assert health == {"ready": False, "status": "retrying", "server": None, "last_error": "connection refused"}
+    with pytest.raises(RuntimeError):
+        manager.require_client()
+
+    await manager.drain()
+    assert manager.health()["status"] == "disconnected"
+
+
+@pytest.mark.asyncio
+async def test_publish_records_bytes_and_latency(mocker):
+    manager = _manager()
+    manager.client = _client(mocker)
+
+    await manager.publish("quotes.QuoteCreated", b'{"event": "QuoteCreated"}')
+    await manager.flush()
+
+    manager.client.publish.assert_awaited_once_with("quotes.QuoteCreated", b'{"event": "QuoteCreated"}', headers=None)
+    manager.client.flush.assert_awaited_once_with(timeout=2.0)
+    snapshot = manager.snapshot()
+    assert snapshot["published"] == 1
+    assert snapshot["bytes_out"] == len(b'{"event": "QuoteCreated"}')
+    assert snapshot["flushes"] == 1
+    assert snapshot["pending_bytes"] == 128
+    assert snapshot["in_msgs"] == 3
+
+
+@pytest.mark.asyncio
+async def test_publish_and_flush_failures_are_counted(mocker):
+    manager = _manager()
+    manager.client = _client(mocker)
+    manager.client.publish.side_effect = OSError("outbound buffer limit")
+    manager.client.flush.side_effect = TimeoutError()
+
+    with pytest.raises(OSError):
+        await manager.publish("quotes.QuoteCreated", b"{}")
+    with pytest.raises(TimeoutError):
+        await manager.flush(timeout=0.5)
+
+    manager.client.flush.assert_awaited_once_with(timeout=0.5)
+    snapshot = manager.snapshot()
+    assert (snapshot["published"], snapshot["publish_failures"]) == (0, 1)
+    assert snapshot["flush_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_publish_buffers_while_reconnecting(mocker):
+    from nats.errors import OutboundBufferLimitError
+
+    manager = _manager()
+    manager.client = _client(mocker, connected=False)
+
+    await manager.publish("quotes.QuoteCreated", b"{}")
+    manager.client.publish.assert_awaited_once_with("quotes.QuoteCreated", b"{}", headers=None)
+
+    manager.client.publish.side_effect = OutboundBufferLimitError()
+    with pytest.raises(OutboundBufferLimitError):
+        await manager.publish("quotes.QuoteCreated", b"{}")
+    assert manager.snapshot()["publish_failures"] == 1
+
+    manager.client.is_reconnecting = False
+    manager.client.is_closed = True
+    with pytest.raises(RuntimeError):
+        manager.require_client()
+
+
+@pytest.mark.asyncio
+async def test_callbacks_update_reconnect_counters(mocker):
+    manager = _manager()
+    manager.client = _client(mocker, connected=False)
+
+    await manager._on_disconnected()
+    assert manager.health()["status"] == "reconnecting"
+    await manager._on_reconnected()
+    await manager._on_error(OSError("stale connection"))
+
+    snapshot = manager.snapshot()
+    assert (snapshot["disconnects"], snapshot["reconnects"], snapshot["errors"]) == (1, 1, 1)
+    assert snapshot["last_error"] == "stale connection"
+
+
+@pytest.mark.asyncio
+async def test_drain_closes_shared_connection(mocker):
+    manager = _manager()
+    client = _client(mocker)
+    manager.client = client
+
+    await manager.drain()
+
+    client.drain.assert_awaited_once()
+    assert manager.client is None
+    assert manager.health()["ready"] is False
@@ -0,0 +1,101 @@
+# tests/services/test_nats_dispatcher.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import asyncio
+import json
+import pytest
+from app.services.nats_dispatcher import KeyedDispatcher, ordering_key
+
+
+class _Msg:
+    def __init__(self, subject, payload):
+        self.subject = subject
+        self.data = json.dumps(payload).encode()
+
+
+def test_ordering_key_prefers_quote_id():
+    assert ordering_key(_Msg("applications.ApplicationCreated", {"quote_id": "q1", "application_id": "a1"})) == "q1"
+    assert ordering_key(_Msg("contracts.ContractCreated", {"application_id": "a1"})) == "a1"
+    assert ordering_key(_Msg("contracts.Other", {"event": "Other"})) == "contracts.Other"
+
+    broken = _Msg("applications.Broken", {})
+    broken.data = b"not json"
+    assert ordering_key(broken) == "applications.Broken"
+
+
+@pytest.mark.asyncio
+async def test_same_key_is_processed_in_order_while_keys_run_concurrently():
+    dispatcher = KeyedDispatcher({"workers": 4, "queue_size": 10})
+    dispatcher.start()
+    processed = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(msg):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        payload = json.loads(msg.data)
+        await asyncio.sleep(0.01)
+        processed.append((payload["quote_id"], payload["seq"]))
+        in_flight -= 1
+
+    keys = ["q-a", "q-b", "q-c", "q-d", "q-e", "q-f"]
+    for seq in range(5):
+        for key in keys:
+            await dispatcher.submit(handler, _Msg("applications.ApplicationChanged", {"quote_id": key, "seq": seq}))
+    await dispatcher.stop()
+
+    for key in keys:
+        assert [seq for k, seq in processed if k == key] == list(range(5))
+    assert max_in_flight > 1
+    snapshot = dispatcher.snapshot()
+    assert snapshot["submitted"] == snapshot["completed"] == 30
+    assert snapshot["queue_depth"] == 0
+    assert snapshot["running"] is False
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure():
+    dispatcher = KeyedDispatcher({"workers": 1, "queue_size": 1})
+    dispatcher.start()
+    release = asyncio.Event()
+
+    async def handler(msg):
+        await release.wait()
+
+    await dispatcher.submit(handler, _Msg("applications.A", {"quote_id": "q1"}))
+    await asyncio.sleep(0)  # ワーカーが1件目を取り出して処理中になる
+    await dispatcher.submit(handler, _Msg("applications.A", {"quote_id": "q1"}))
+
+    blocked = asyncio.create_task(dispatcher.submit(handler, _Msg("applications.A", {"quote_id": "q1"})))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert dispatcher.snapshot()["queue_depth"] == 1
+
+    release.set()
+    await blocked
+    await dispatcher.stop()
+    assert dispatcher.snapshot()["completed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_handler_exception_does_not_stop_worker():
+    dispatcher = KeyedDispatcher({"workers": 1, "queue_size": 5})
+    dispatcher.start()
+    calls = []
+
+    async def handler(msg):
+        calls.append(msg.subject)
+        if msg.subject.endswith("Failed"):
+            raise RuntimeError("db down")
+
+    await dispatcher.submit(handler, _Msg("applications.Failed", {"quote_id": "q1"}))
+    await dispatcher.submit(handler, _Msg("applications.ApplicationCreated", {"quote_id": "q1"}))
+    await dispatcher.stop()
+
+    assert calls == ["applications.Failed", "applications.ApplicationCreated"]
+    assert dispatcher.snapshot()["failed"] == 1
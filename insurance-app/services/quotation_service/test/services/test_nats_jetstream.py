@@ -0,0 +1,150 @@
+# tests/services/test_nats_jetstream.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import pytest
+from nats.errors import TimeoutError as NatsTimeoutError
+from app.services import nats_jetstream
+from app.services.nats_jetstream import PullConsumer, stream_for
+from app.services.nats_dispatcher import KeyedDispatcher
+from app.services.nats_metrics import SubscriberMetrics
+
+SETTINGS = {"max_deliver": 3, "backoff_seconds": [1, 10], "batch_size": 10}
+
+
+def _msg(mocker, subject, num_delivered=1):
+    msg = mocker.Mock()
+    msg.subject = subject
+    msg.data = b"{}"
+    msg.metadata.num_delivered = num_delivered
+    msg.ack = mocker.AsyncMock()
+    msg.nak = mocker.AsyncMock()
+    msg.term = mocker.AsyncMock()
+    return msg
+
+
+def test_stream_for_groups_by_subject_prefix():
+    assert stream_for("applications.*") == {"name": "APPLICATIONS", "subjects": ["applications.*"]}
+    assert stream_for("quotes.QuoteCreated") == {"name": "QUOTES", "subjects": ["quotes.*"]}
+    assert stream_for("dlq.applications.ApplicationCreated") == {"name": "DLQ", "subjects": ["dlq.>"]}
+
+
+@pytest.mark.asyncio
+async def test_process_acks_after_handler_success(mocker):
+    js = mocker.Mock()
+    handler = mocker.AsyncMock()
+    consumer = PullConsumer(js, "applications.*", handler, settings=SETTINGS, metrics=SubscriberMetrics())
+    msg = _msg(mocker, "applications.ApplicationCreated")
+
+    await consumer.process(msg)
+
+    handler.assert_awaited_once_with(msg)
+    msg.ack.assert_awaited_once()
+    msg.nak.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_process_naks_with_backoff_until_max_deliver(mocker):
+    js = mocker.Mock()
+    js.publish = mocker.AsyncMock()
+    metrics = SubscriberMetrics()
+    consumer = PullConsumer(js, "applications.*", mocker.AsyncMock(side_effect=RuntimeError("db down")), settings=SETTINGS, metrics=metrics)
+
+    first = _msg(mocker, "applications.ApplicationCreated", num_delivered=1)
+    second = _msg(mocker, "applications.ApplicationCreated", num_delivered=2)
+    await consumer.process(first)
+    await consumer.process(second)
+
+    first.nak.assert_awaited_once_with(delay=1.0)
+    second.nak.assert_awaited_once_with(delay=10.0)
+    first.ack.assert_not_called()
+    js.publish.assert_not_called()
+    assert metrics.snapshot()["applications.ApplicationCreated"]["redelivery_requested"] == 2
+
+
+@pytest.mark.asyncio
+async def test_process_dead_letters_poison_message(mocker):
+    js = mocker.Mock()
+    js.publish = mocker.AsyncMock()
+    metrics = SubscriberMetrics()
+    consumer = PullConsumer(js, "applications.*", mocker.AsyncMock(side_effect=ValueError("bad payload")), settings=SETTINGS, metrics=metrics)
+    msg = _msg(mocker, "applications.ApplicationCreated", num_delivered=3)
+
+    await consumer.process(msg)
+
+    js.publish.assert_awaited_once()
+    args, kwargs = js.publish.call_args
+    assert args == ("dlq.applications.ApplicationCreated", b"{}")
+    assert kwargs["headers"]["X-Original-Subject"] == "applications.ApplicationCreated"
+    assert kwargs["headers"]["X-Num-Delivered"] == "3"
+    msg.term.assert_awaited_once()
+    msg.nak.assert_not_called()
+    assert metrics.snapshot()["applications.ApplicationCreated"]["dead_lettered"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_processes_fetched_batch(mocker):
+    consumer = PullConsumer(mocker.Mock(), "applications.*", mocker.AsyncMock(), settings=SETTINGS, metrics=SubscriberMetrics())
+    messages = [_msg(mocker, "applications.ApplicationCreated") for _ in range(3)]
+
+    async def fetch(batch, timeout):
+        assert batch == 10
+        if consumer._subscription.fetch.await_count == 1:
+            raise NatsTimeoutError
+        consumer.stop()
+        return messages
+
+    consumer._subscription = mocker.Mock()
+    consumer._subscription.fetch = mocker.AsyncMock(side_effect=fetch)
+
+    await consumer.run()
+
+    for msg in messages:
+        msg.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ensure_stream_updates_existing_stream_once(mocker):
+    from nats.js.errors import BadRequestError
+
+    mocker.patch.object(nats_jetstream, "_ensured_streams", set())
+    js = mocker.Mock()
+    js.add_stream = mocker.AsyncMock(side_effect=BadRequestError())
+    js.update_stream = mocker.AsyncMock()
+
+    assert await nats_jetstream.ensure_stream(js, "contracts.ContractCreated") == "CONTRACTS"
+    assert await nats_jetstream.ensure_stream(js, "contracts.*") == "CONTRACTS"
+
+    js.add_stream.assert_awaited_once()
+    js.update_stream.assert_awaited_once()
+    assert js.update_stream.call_args.kwargs["subjects"] == ["contracts.*"]
+
+
+@pytest.mark.asyncio
+async def test_run_with_dispatcher_waits_for_batch_before_next_fetch(mocker):
+    dispatcher = KeyedDispatcher({"workers": 2, "queue_size": 100})
+    dispatcher.start()
+    consumer = PullConsumer(
+        mocker.Mock(), "applications.*", mocker.AsyncMock(), settings=SETTINGS,
+        metrics=SubscriberMetrics(), dispatcher=dispatcher
+    )
+    first = [_msg(mocker, "applications.ApplicationCreated") for _ in range(3)]
+
+    async def fetch(batch, timeout):
+        if consumer._subscription.fetch.await_count == 1:
+            return first
+        # 前のバッチは全件応答済み（未応答は batch_size 件まで）
+        for msg in first:
+            msg.ack.assert_awaited_once()
+        consumer.stop()
+        return []
+
+    consumer._subscription = mocker.Mock()
+    consumer._subscription.fetch = mocker.AsyncMock(side_effect=fetch)
+
+    await consumer.run()
+    await dispatcher.stop()
+
+    assert consumer._subscription.fetch.await_count == 2
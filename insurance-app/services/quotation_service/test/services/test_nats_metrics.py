@@ -0,0 +1,62 @@
+# tests/services/test_nats_metrics.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import json
+import pytest
+from uuid import uuid4
+from app.services.nats_metrics import SubscriberMetrics
+
+
+class _Msg:
+    def __init__(self, subject):
+        self.subject = subject
+        self.data = b"{}"
+
+
+@pytest.mark.asyncio
+async def test_instrument_counts_per_subject():
+    metrics = SubscriberMetrics()
+
+    async def handler(msg):
+        if msg.subject.endswith("Failed"):
+            raise RuntimeError("db down")
+
+    callback = metrics.instrument(handler)
+    await callback(_Msg("applications.ApplicationCreated"))
+    await callback(_Msg("applications.ApplicationCreated"))
+    # 例外は購読側に伝播させない
+    await callback(_Msg("applications.Failed"))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["applications.ApplicationCreated"]["received"] == 2
+    assert snapshot["applications.ApplicationCreated"]["handled"] == 2
+    assert snapshot["applications.Failed"]["failed"] == 1
+    assert snapshot["applications.Failed"]["handled"] == 0
+
+
+@pytest.mark.asyncio
+async def test_message_handler_failure_is_counted(mocker):
+    from app.services import nats_subscriber
+
+    mocker.patch.object(nats_subscriber, "mark_quote_state", mocker.AsyncMock(side_effect=RuntimeError("db down")))
+
+    async def session_gen():
+        yield mocker.Mock()
+
+    mocker.patch.object(nats_subscriber, "get_async_session", session_gen)
+    metrics = SubscriberMetrics()
+    msg = _Msg("applications.ApplicationCreated")
+    msg.data = json.dumps({
+        "event": "ApplicationCreated",
+        "quote_id": str(uuid4()),
+        "user_id": str(uuid4()),
+        "application_id": str(uuid4()),
+        "created_at": "2025-08-01T00:00:00",
+    }).encode()
+
+    await metrics.instrument(nats_subscriber.message_handler)(msg)
+
+    assert metrics.snapshot()["applications.ApplicationCreated"]["failed"] == 1
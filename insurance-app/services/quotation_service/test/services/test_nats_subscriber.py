@@ -0,0 +1,44 @@
+# tests/services/test_nats_subscriber.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import asyncio
+import pytest
+from nats.errors import TimeoutError as NatsTimeoutError
+from app.services import nats_subscriber
+from app.services.nats_jetstream import PullConsumer
+from app.services.nats_metrics import SubscriberMetrics
+
+
+@pytest.mark.asyncio
+async def test_stop_nats_subscriber_stops_fetch_loops(mocker):
+    consumer = PullConsumer(mocker.Mock(), "applications.*", mocker.AsyncMock(), settings={"fetch_timeout_seconds": 0.01}, metrics=SubscriberMetrics())
+
+    async def fetch(batch, timeout):
+        await asyncio.sleep(timeout)
+        raise NatsTimeoutError
+
+    consumer._subscription = mocker.Mock()
+    consumer._subscription.fetch = mocker.AsyncMock(side_effect=fetch)
+    task = asyncio.create_task(consumer.run())
+    mocker.patch.object(nats_subscriber, "pull_consumers", [consumer])
+    mocker.patch.object(nats_subscriber, "consumer_tasks", [task])
+
+    await asyncio.wait_for(nats_subscriber.stop_nats_subscriber(), timeout=1)
+
+    assert task.done() and not task.cancelled()
+    assert nats_subscriber.pull_consumers == [] and nats_subscriber.consumer_tasks == []
+
+
+@pytest.mark.asyncio
+async def test_stop_nats_subscriber_drains_core_subscriptions(mocker):
+    subscription = mocker.Mock()
+    subscription.drain = mocker.AsyncMock()
+    mocker.patch.object(nats_subscriber, "subscriptions", [subscription])
+
+    await nats_subscriber.stop_nats_subscriber()
+
+    subscription.drain.assert_awaited_once()
+    assert nats_subscriber.subscriptions == []
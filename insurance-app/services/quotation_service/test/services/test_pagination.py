@@ -0,0 +1,38 @@
+# tests/services/test_pagination.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import pytest
+from datetime import datetime, timezone
+from uuid import uuid4
+from fastapi import HTTPException
+from app.services.pagination import encode_cursor, decode_cursor, parse_fields
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 8, 1, 12, 30, tzinfo=timezone.utc)
+    quote_id = uuid4()
+
+    cursor = encode_cursor(created_at, quote_id)
+
+    assert decode_cursor(cursor) == (created_at, quote_id)
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor")
+
+    assert exc_info.value.status_code == 400
+
+
+def test_parse_fields():
+    allowed = ["quote_id", "quote_state", "created_at"]
+
+    assert parse_fields(None, allowed) is None
+    assert parse_fields("quote_id, quote_state,quote_id", allowed) == ["quote_id", "quote_state"]
+
+    with pytest.raises(HTTPException) as exc_info:
+        parse_fields("quote_id,birth_date", allowed)
+    assert exc_info.value.status_code == 400
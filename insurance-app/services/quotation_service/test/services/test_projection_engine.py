@@ -0,0 +1,81 @@
+# tests/services/test_projection_engine.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import json
+from app.services.calculate_quote import calculate_benefits
+from app.services.rate_loader import build_rates
+from app.services.projection_engine import (
+    PROJECTION_COLUMNS,
+    ProjectionSchedule,
+    iter_ndjson,
+    normalize_surrender_rates,
+)
+
+
+def _schedule(surrender_rates=None):
+    return ProjectionSchedule(
+        monthly_premium=10000,
+        payment_years=20,
+        pension_years=10,
+        contract_rate=1.2,
+        annuity_conversion_rate=95.0,
+        surrender_rates={"15": 0.85, "20": 0.9} if surrender_rates is None else surrender_rates,
+    )
+
+
+def test_normalize_surrender_rates():
+    assert normalize_surrender_rates({"15": "0.85", 20: 0.9, "x": 1.0}) == {15: 0.85, 20: 0.9}
+    assert normalize_surrender_rates(None) == {}
+
+
+def test_schedule_matches_benefit_calculation():
+    schedule = _schedule()
+    rows = [dict(zip(PROJECTION_COLUMNS, row)) for row in schedule.iter_rows()]
+    expected = calculate_benefits(10000, 20, 10, 1.2, 95.0, {15: 0.85})
+
+    assert len(rows) == 30
+    assert rows[0]["year"] == 1 and rows[-1]["year"] == 30
+    # 払込満了年の積立額 = 一括受取額
+    assert rows[19]["accumulated_value"] == expected["lump_sum_amount"]
+    # 15年時点の解約返戻金 = refund_on_15_years
+    assert rows[14]["surrender_value"] == expected["refund_on_15_years"]
+    # 年金受取期間の累計 = 年金累計額
+    assert rows[-1]["cumulative_annuity"] == expected["estimated_pension"]
+    assert schedule.totals["annual_pension"] == expected["annual_pension"]
+
+    assert rows[19]["phase"] == "accumulation" and rows[20]["phase"] == "annuity"
+    assert rows[20]["premium_paid"] == 0 and rows[20]["surrender_value"] == 0
+    assert rows[20]["cumulative_premium"] == expected["total_paid"]
+
+
+def test_rate_record_keys_agree_between_quote_and_projection():
+    # MongoDB 上の利率レコードは解約返戻率のキーが文字列
+    rates = build_rates({
+        "contract_rate": 1.2,
+        "min_rate": 0.5,
+        "annuity_conversion_rate": 95.0,
+        "surrender_rates": {"15": 0.85, "20": 0.9},
+    })
+    expected = calculate_benefits(10000, 20, 10, rates["contract_rate"], rates["annuity_conversion_rate"], rates["surrender_rates"])
+    rows = [dict(zip(PROJECTION_COLUMNS, row)) for row in _schedule(rates["surrender_rates"]).iter_rows()]
+
+    assert expected["refund_on_15_years"] > 0
+    assert rows[14]["surrender_value"] == expected["refund_on_15_years"]
+
+
+def test_missing_surrender_years_are_zero():
+    rows = list(_schedule(surrender_rates={}).iter_rows())
+    surrender_value = PROJECTION_COLUMNS.index("surrender_value")
+    assert all(row[surrender_value] == 0 for row in rows)
+
+
+def test_iter_ndjson():
+    lines = [json.loads(line) for line in iter_ndjson(_schedule(), {"quote_id": "q1"})]
+
+    assert lines[0]["quote_id"] == "q1"
+    assert lines[0]["columns"] == list(PROJECTION_COLUMNS)
+    assert len(lines) == 31
+    assert lines[1][:2] == [1, "accumulation"]
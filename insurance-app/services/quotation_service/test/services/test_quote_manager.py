@@ -0,0 +1,289 @@
+# tests/services/test_quote_manager.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import pytest
+from datetime import date, datetime, timezone
+from uuid import uuid4
+from fastapi import HTTPException
+from app.models.quotes import (
+    PensionQuoteCalculateResult,
+    PensionQuoteRequestModel,
+    PensionQuoteScenarioModel,
+)
+from app.services.quote_manager import (
+    create_quote,
+    get_scenarios_by_quote_ids,
+    get_scenarios_by_quote_id,
+    scenario_store,
+)
+
+
+def _scenario_doc(quote_id, scenario_type):
+    return {
+        "quote_id": quote_id,
+        "scenario_type": scenario_type,
+        "interest_rate": 1.0,
+        "estimated_pension": 1000000,
+        "pension_refund_rate": 100.0,
+        "annual_pension": 100000,
+        "lump_sum_amount": 1000000,
+        "lump_sum_refund_rate": 100.0,
+        "refund_on_15_years": 900000,
+        "refund_rate": 90.0,
+        "created_at": datetime(2025, 8, 1),
+    }
+
+
+def _mock_mongo(mocker, documents):
+    mock_cursor = mocker.Mock()
+    mock_cursor.to_list = mocker.AsyncMock(return_value=documents)
+    mock_collection = mocker.Mock()
+    mock_collection.find.return_value = mock_cursor
+    mock_client = mocker.MagicMock()
+    mock_client.__getitem__.return_value.__getitem__.return_value = mock_collection
+    return mock_client, mock_collection
+
+
+@pytest.fixture
+def legacy_mode(mocker):
+    mocker.patch.object(scenario_store, "mode", "legacy")
+
+
+@pytest.mark.asyncio
+async def test_get_scenarios_by_quote_ids_single_query(mocker, legacy_mode):
+    q1, q2, q3 = str(uuid4()), str(uuid4()), str(uuid4())
+    docs = [_scenario_doc(q1, "base"), _scenario_doc(q2, "base"), _scenario_doc(q1, "low")]
+    mock_client, mock_collection = _mock_mongo(mocker, docs)
+
+    result = await get_scenarios_by_quote_ids(mock_client, [q1, q2, q3])
+
+    # $in による1クエリのみ
+    mock_collection.find.assert_called_once()
+    assert mock_collection.find.call_args[0][0] == {"quote_id": {"$in": [q1, q2, q3]}}
+
+    assert [s.scenario_type for s in result[q1]] == ["base", "low"]
+    assert len(result[q2]) == 1
+    assert result[q3] == []
+
+
+@pytest.mark.asyncio
+async def test_get_scenarios_by_quote_ids_empty_input(mocker):
+    mock_client, mock_collection = _mock_mongo(mocker, [])
+
+    assert await get_scenarios_by_quote_ids(mock_client, []) == {}
+    mock_collection.find.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_scenarios_by_quote_id_uses_batch_loader(mocker, legacy_mode):
+    q1 = str(uuid4())
+    mock_client, _ = _mock_mongo(mocker, [_scenario_doc(q1, "high")])
+
+    scenarios = await get_scenarios_by_quote_id(mock_client, q1)
+
+    assert len(scenarios) == 1
+    assert scenarios[0].scenario_type == "high"
+
+
+@pytest.mark.asyncio
+async def test_get_scenarios_by_quote_ids_document_mode(mocker):
+    q1, q2 = str(uuid4()), str(uuid4())
+    document = scenario_store.build_document(q1, [_scenario_doc(q1, "base"), _scenario_doc(q1, "low")], "v1")
+    mock_client, mock_collection = _mock_mongo(mocker, [document])
+    mocker.patch.object(scenario_store, "legacy_read_fallback", False)
+
+    result = await get_scenarios_by_quote_ids(mock_client, [q1, q2])
+
+    # _id による1クエリのみ
+    mock_collection.find.assert_called_once_with({"_id": {"$in": [q1, q2]}})
+    assert [s.scenario_type for s in result[q1]] == ["base", "low"]
+    assert str(result[q1][0].quote_id) == q1
+    assert result[q2] == []
+
+
+@pytest.mark.asyncio
+async def test_get_scenarios_by_quote_ids_falls_back_to_legacy(mocker):
+    q1, q2 = str(uuid4()), str(uuid4())
+    document = scenario_store.build_document(q1, [_scenario_doc(q1, "base")])
+    mock_client, mock_collection = _mock_mongo(mocker, [])
+    mock_collection.find.side_effect = [
+        mocker.Mock(to_list=mocker.AsyncMock(return_value=[document])),
+        mocker.Mock(to_list=mocker.AsyncMock(return_value=[_scenario_doc(q2, "high")])),
+    ]
+
+    result = await get_scenarios_by_quote_ids(mock_client, [q1, q2])
+
+    # 未移行のIDのみ従来コレクションから読む
+    assert mock_collection.find.call_args_list[1][0][0] == {"quote_id": {"$in": [q2]}}
+    assert result[q1][0].scenario_type == "base"
+    assert result[q2][0].scenario_type == "high"
+
+
+def test_build_document_embeds_scenarios():
+    q1 = str(uuid4())
+    document = scenario_store.build_document(q1, [{**_scenario_doc(q1, "base"), "_id": "x", "logged_at": 1}], "v1")
+
+    assert document["_id"] == q1 and document["quote_id"] == q1
+    assert document["rate_version"] == "v1"
+    assert set(document["scenarios"][0]) == set(_scenario_doc(q1, "base")) - {"quote_id"}
+
+
+def _create_inputs():
+    quote_id = uuid4()
+    request = PensionQuoteRequestModel(
+        birth_date=date(1990, 1, 1),
+        gender="male",
+        monthly_premium=10000,
+        payment_period_years=20,
+        pension_payment_years=10,
+        tax_deduction_enabled=True,
+    )
+    scenario_doc = {**_scenario_doc(quote_id, "base"), "quote_id": quote_id}
+    result = PensionQuoteCalculateResult(
+        quote_id=quote_id,
+        contract_date=date(2025, 9, 1),
+        contract_interest_rate=1.2,
+        total_paid_amount=2400000,
+        pension_start_age=35,
+        annual_tax_deduction=40000,
+        scenarios=[PensionQuoteScenarioModel(**scenario_doc)],
+    )
+    return request, result
+
+
+def _mock_session(mocker, commit_error=None, flush_error=None):
+    session = mocker.Mock()
+
+    async def flush():
+        if flush_error:
+            raise flush_error
+        # RETURNING で取得されるサーバ既定値を模擬
+        for quote in [a[0][0][0] for a in session.add_all.call_args_list]:
+            quote.created_at = quote.updated_at = datetime(2025, 8, 1, tzinfo=timezone.utc)
+
+    session.flush = mocker.AsyncMock(side_effect=flush)
+    session.commit = mocker.AsyncMock(side_effect=commit_error)
+    session.rollback = mocker.AsyncMock()
+    session.execute = mocker.AsyncMock()
+    return session
+
+
+def _mock_mongo_writes(mocker, insert_error=None):
+    mock_collection = mocker.Mock()
+    mock_collection.replace_one = mocker.AsyncMock(side_effect=insert_error)
+    mock_collection.delete_one = mocker.AsyncMock(return_value=mocker.Mock(deleted_count=1))
+    mock_collection.delete_many = mocker.AsyncMock(return_value=mocker.Mock(deleted_count=1))
+    mock_client = mocker.MagicMock()
+    mock_client.__getitem__.return_value.__getitem__.return_value = mock_collection
+    return mock_client, mock_collection
+
+
+@pytest.mark.asyncio
+async def test_create_quote_builds_response_without_reload(mocker):
+    request, result = _create_inputs()
+    session = _mock_session(mocker)
+    mock_client, mock_collection = _mock_mongo_writes(mocker)
+
+    created = await create_quote(session, mock_client, str(uuid4()), request, result)
+
+    assert created.quote_id == result.quote_id
+    assert created.created_at == datetime(2025, 8, 1, tzinfo=timezone.utc)
+    assert created.scenarios == result.scenarios
+    session.commit.assert_awaited_once()
+    session.execute.assert_not_called()
+    # 1見積もり1ドキュメントを upsert する1操作のみ
+    mock_collection.replace_one.assert_awaited_once()
+    filter_, document = mock_collection.replace_one.call_args[0]
+    assert filter_ == {"_id": str(result.quote_id)}
+    assert len(document["scenarios"]) == 1
+    assert mock_collection.replace_one.call_args[1] == {"upsert": True}
+    mock_collection.delete_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_quote_legacy_mode_inserts_without_delete(mocker, legacy_mode):
+    request, result = _create_inputs()
+    session = _mock_session(mocker)
+    mock_client, mock_collection = _mock_mongo_writes(mocker)
+    mock_collection.insert_many = mocker.AsyncMock()
+
+    await create_quote(session, mock_client, str(uuid4()), request, result)
+
+    # 新規作成のため既存シナリオの削除は行わない
+    mock_collection.insert_many.assert_awaited_once()
+    mock_collection.delete_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_quote_rolls_back_postgres_when_mongo_fails(mocker):
+    request, result = _create_inputs()
+    session = _mock_session(mocker)
+    mock_client, _ = _mock_mongo_writes(mocker, insert_error=RuntimeError("mongo down"))
+
+    with pytest.raises(HTTPException) as exc:
+        await create_quote(session, mock_client, str(uuid4()), request, result)
+
+    assert exc.value.status_code == 500
+    # 見積もりは未コミットのため、ロールバックのみで元に戻す
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_called()
+    session.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_quote_commits_events_only_after_both_writes(mocker):
+    request, result = _create_inputs()
+    session = _mock_session(mocker)
+    mock_client, mock_collection = _mock_mongo_writes(mocker)
+
+    async def replace_one(*args, **kwargs):
+        # MongoDB の保存中はイベントがコミットされていない（リレーから見えない）
+        session.commit.assert_not_called()
+
+    mock_collection.replace_one.side_effect = replace_one
+
+    await create_quote(
+        session, mock_client, str(uuid4()), request, result,
+        events=[("quotes.QuoteCreated", {"quote_id": result.quote_id})]
+    )
+
+    # 見積もりと同じセッションにアウトボックス行を追加し、両方の保存後に1回でコミット
+    staged = session.add.call_args[0][0]
+    assert staged.subject == "quotes.QuoteCreated"
+    assert staged.payload == {"quote_id": str(result.quote_id)}
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_quote_discards_events_when_mongo_fails(mocker):
+    request, result = _create_inputs()
+    session = _mock_session(mocker)
+    mock_client, _ = _mock_mongo_writes(mocker, insert_error=RuntimeError("mongo down"))
+
+    with pytest.raises(HTTPException):
+        await create_quote(
+            session, mock_client, str(uuid4()), request, result,
+            events=[("quotes.QuoteCreated", {"quote_id": result.quote_id})]
+        )
+
+    session.add.assert_called_once()
+    session.commit.assert_not_called()
+    session.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failure", ["flush_error", "commit_error"])
+async def test_create_quote_compensates_mongo_when_postgres_fails(mocker, failure):
+    request, result = _create_inputs()
+    session = _mock_session(mocker, **{failure: RuntimeError("pg down")})
+    mock_client, mock_collection = _mock_mongo_writes(mocker)
+
+    with pytest.raises(HTTPException):
+        await create_quote(session, mock_client, str(uuid4()), request, result)
+
+    session.rollback.assert_awaited_once()
+    mock_collection.delete_one.assert_awaited_once_with({"_id": str(result.quote_id)})
+    mock_collection.delete_many.assert_awaited_once_with({"quote_id": str(result.quote_id)})
@@ -0,0 +1,81 @@
+# tests/services/test_quote_simulation.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import pytest
+from datetime import date
+from fastapi import HTTPException
+from app.models.quotes import PensionQuoteSimulationRequestModel
+from app.services.calculate_quote import calculate_benefits
+from app.services.quote_simulation import simulate_quote_grid
+
+RATES = {
+    "contract_rate": 1.2,
+    "min_rate": 0.5,
+    "high_rate": 1.7,
+    "annuity_conversion_rate": 95.0,
+    "surrender_rates": {15: 0.85},
+    "rate_version": "v1",
+}
+
+
+def _request(premium=(10000, 12000, 1000), payment=(15, 16, 1), pension=(10, 10, 1)):
+    return PensionQuoteSimulationRequestModel(
+        birth_date=date(1990, 1, 1),
+        gender="male",
+        monthly_premium=dict(zip(("min", "max", "step"), premium)),
+        payment_period_years=dict(zip(("min", "max", "step"), payment)),
+        pension_payment_years=dict(zip(("min", "max", "step"), pension)),
+        tax_deduction_enabled=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_grid_matches_single_quote_calculation(mocker):
+    mocker.patch("app.services.quote_simulation.get_interest_rates", new=mocker.AsyncMock(return_value=RATES))
+
+    result = await simulate_quote_grid(_request(), mongo_client=None)
+
+    assert result["grid_size"] == 6
+    assert result["rate_version"] == "v1"
+    assert result["interest_rates"] == {"base": 1.2, "low": 0.5, "high": 1.7}
+    assert result["axes"]["monthly_premium"] == [10000, 10000, 11000, 11000, 12000, 12000]
+    assert result["axes"]["payment_period_years"] == [15, 16, 15, 16, 15, 16]
+
+    # 各行が calculate_benefits（POST /quotes/pension と同じ計算）と一致すること
+    for scenario_type, rate_key in (("base", "contract_rate"), ("low", "min_rate"), ("high", "high_rate")):
+        columns = result["scenarios"][scenario_type]
+        for i in range(result["grid_size"]):
+            expected = calculate_benefits(
+                monthly_premium=result["axes"]["monthly_premium"][i],
+                payment_years=result["axes"]["payment_period_years"][i],
+                pension_years=result["axes"]["pension_payment_years"][i],
+                contract_rate=RATES[rate_key],
+                annuity_conversion_rate=RATES["annuity_conversion_rate"],
+                surrender_rates=RATES["surrender_rates"],
+            )
+            assert {name: values[i] for name, values in columns.items()} == expected
+
+
+@pytest.mark.asyncio
+async def test_grid_size_limit(mocker):
+    mocker.patch("app.services.quote_simulation.MAX_GRID_POINTS", 5)
+    rates_mock = mocker.patch("app.services.quote_simulation.get_interest_rates", new=mocker.AsyncMock())
+
+    with pytest.raises(HTTPException) as exc:
+        await simulate_quote_grid(_request(), mongo_client=None)
+
+    assert exc.value.status_code == 400
+    rates_mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_invalid_range(mocker):
+    mocker.patch("app.services.quote_simulation.get_interest_rates", new=mocker.AsyncMock(return_value=RATES))
+
+    with pytest.raises(HTTPException) as exc:
+        await simulate_quote_grid(_request(payment=(20, 15, 1)), mongo_client=None)
+
+    assert exc.value.status_code == 400
@@ -34,7 +34,7 @@ async def test_load_interest_rates_success(mocker):
 
     assert result["contract_rate"] == 1.2
     assert result["high_rate"] == 1.5
-    assert result["surrender_rates"]["15"] == 0.85
+    assert result["surrender_rates"][15] == 0.85
 
 @pytest.mark.asyncio
 async def test_load_interest_rates_not_found(mocker):
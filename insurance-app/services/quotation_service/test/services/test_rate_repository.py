@@ -0,0 +1,175 @@
+# tests/services/test_rate_repository.py
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "./../../../")))
+
+import asyncio
+import pytest
+from datetime import date, datetime, timezone
+from app.services.rate_repository import RateRepository, RateSnapshot
+
+
+def _record(start, end, contract_rate, plan_code="PENSION_001"):
+    return {
+        "_id": f"{plan_code}-{start.isoformat()}",
+        "plan_code": plan_code,
+        "start_date": start,
+        "end_date": end,
+        "contract_rate": contract_rate,
+        "min_rate": 0.5,
+        "annuity_conversion_rate": 0.8,
+        "surrender_rates": {"15": 0.85},
+    }
+
+
+RECORDS = [
+    _record(datetime(2025, 7, 1), datetime(2025, 8, 1), 1.1),
+    _record(datetime(2025, 4, 1), datetime(2025, 7, 1), 1.0),
+    _record(datetime(2025, 8, 1), datetime(2026, 1, 1), 1.2),
+]
+
+
+def test_lookup_by_interval():
+    snapshot = RateSnapshot(RECORDS, version="v1")
+
+    assert snapshot.lookup("PENSION_001", date(2025, 4, 1))["contract_rate"] == 1.0
+    assert snapshot.lookup("PENSION_001", date(2025, 6, 30))["contract_rate"] == 1.0
+    # end_date は含まない
+    assert snapshot.lookup("PENSION_001", datetime(2025, 8, 1, tzinfo=timezone.utc))["contract_rate"] == 1.2
+    assert snapshot.lookup("PENSION_001", date(2025, 8, 1))["high_rate"] == 1.5
+    assert snapshot.lookup("PENSION_001", date(2025, 8, 1))["rate_version"] == "v1"
+
+
+def test_lookup_outside_periods_returns_none():
+    snapshot = RateSnapshot(RECORDS, version="v1")
+
+    assert snapshot.lookup("PENSION_001", date(2025, 3, 31)) is None
+    assert snapshot.lookup("PENSION_001", date(2026, 1, 1)) is None
+    assert snapshot.lookup("UNKNOWN", date(2025, 8, 1)) is None
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_only_when_version_changes(mocker):
+    records = list(RECORDS)
+    mock_cursor = mocker.Mock()
+    mock_cursor.to_list = mocker.AsyncMock(side_effect=lambda length=None: list(records))
+    mock_collection = mocker.Mock()
+    mock_collection.find.return_value = mock_cursor
+    mock_client = mocker.Mock()
+    mock_client.get_database.return_value.get_collection.return_value = mock_collection
+
+    repository = RateRepository("quote_db", "interest_rates")
+    repository._mongo_client = mock_client
+
+    assert await repository.reload() is True
+    first_version = repository.version
+    assert await repository.reload() is False
+
+    records[2] = _record(datetime(2025, 8, 1), datetime(2026, 1, 1), 1.3)
+    assert await repository.reload() is True
+    assert repository.version != first_version
+    assert repository.get_rates("PENSION_001", date(2025, 9, 1))["contract_rate"] == 1.3
+
+
+class _Stream:
+    def __init__(self, events):
+        self.events = list(events)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.events:
+            raise StopAsyncIteration
+        event = self.events.pop(0)
+        if isinstance(event, Exception):
+            raise event
+        return event
+
+
+@pytest.mark.asyncio
+async def test_watch_loop_reconnects_after_disconnect_and_polls_only_when_unsupported(mocker):
+    from pymongo.errors import AutoReconnect, OperationFailure
+    from app.services import rate_repository as module
+
+    repository = RateRepository("quote_db", "interest_rates", {"watch_retry_backoff_seconds": [1, 5]})
+    mock_collection = mocker.Mock()
+    mock_collection.watch.side_effect = [
+        _Stream([{"op": "update"}, AutoReconnect("connection reset")]),
+        _Stream([]),
+        OperationFailure("The $changeStream stage is only supported on replica sets"),
+    ]
+    repository._get_collection = mocker.Mock(return_value=mock_collection)
+    repository.reload = mocker.AsyncMock(return_value=False)
+
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+        if repository.active_mode == "poll":
+            raise asyncio.CancelledError
+
+    mocker.patch.object(module.asyncio, "sleep", side_effect=sleep)
+
+    with pytest.raises(asyncio.CancelledError):
+        await repository._watch_loop()
+
+    # 監視開始ごとに全体を読み直す（開始・変更・切断後の再接続）→ ストリーム終了 → 利用不可 → ポーリング
+    assert mock_collection.watch.call_count == 3
+    assert sleeps == [1.0, 1.0, 60.0]
+    assert repository.reload.await_count == 3
+    assert repository.snapshot()["watch_restarts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_start_loads_snapshot_when_initial_reload_fails(mocker):
+    from pymongo.errors import ServerSelectionTimeoutError
+
+    mock_cursor = mocker.Mock()
+    mock_cursor.to_list = mocker.AsyncMock(side_effect=[ServerSelectionTimeoutError("mongo unavailable"), list(RECORDS)])
+    mock_collection = mocker.Mock()
+    mock_collection.find.return_value = mock_cursor
+    opened = asyncio.Event()
+
+    class _IdleStream(_Stream):
+        async def __anext__(self):
+            opened.set()
+            await asyncio.Event().wait()
+
+    mock_collection.watch.return_value = _IdleStream([])
+    mock_client = mocker.Mock()
+    mock_client.get_database.return_value.get_collection.return_value = mock_collection
+
+    repository = RateRepository("quote_db", "interest_rates")
+    await repository.start(mock_client)
+    assert repository.version is None
+
+    # 変更イベントが無くても、監視開始時の読み直しでスナップショットが用意される
+    await asyncio.wait_for(opened.wait(), timeout=1)
+    await repository.stop()
+
+    assert repository.version is not None
+    assert repository.get_rates("PENSION_001", date(2025, 9, 1))["contract_rate"] == 1.2
+
+
+@pytest.mark.asyncio
+async def test_get_interest_rates_fallback_has_no_rate_version(mocker):
+    from app.services import rate_repository as module
+
+    repository = RateRepository("quote_db", "interest_rates")
+    repository._snapshot = RateSnapshot(RECORDS, version="v1")
+    mocker.patch.object(module, "rate_repository", repository)
+    mocker.patch.object(module, "load_interest_rates", mocker.AsyncMock(return_value={"contract_rate": 1.4}))
+
+    rates = await module.get_interest_rates(mocker.Mock(), "PENSION_001", date(2026, 2, 1))
+
+    # スナップショットに無いレコードに現在の版を付けない
+    assert rates == {"contract_rate": 1.4, "rate_version": None}
+    assert repository.fallbacks == 1
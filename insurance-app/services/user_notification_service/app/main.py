@@ -5,13 +5,15 @@ import asyncio
 import logging
 
 from fastapi import FastAPI
-from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.routes import (
-    user_notifications
+    user_notifications,
+    metrics
 )
+from app.dependencies.get_mongo_client import init_mongo_client, close_mongo_client
+from app.services.mongo_indexes import index_manager
 
-from app.services.nats_subscriber import run_nats_subscriber
+from app.services.nats_subscriber import run_nats_subscriber, stop_nats_subscriber, close_nats_subscriber
 
 from app.config.config import Config
 
@@ -38,6 +40,7 @@ app = FastAPI(title="Notification Service")
 # ルーター登録（通知管理API）
 # ------------------------------------------------------------------------------
 app.include_router(user_notifications.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
 
 # ------------------------------------------------------------------------------
 # スタートアップイベント: MongoDB クライアントの初期化
@@ -45,14 +48,34 @@ app.include_router(user_notifications.router, prefix="/api/v1")
 @app.on_event("startup")
 async def startup_db_client():
     """
-    アプリケーション起動時にMongoDBクライアントを初期化し、
+    アプリケーション起動時に共有MongoDBクライアントを初期化し、
     `app.state.mongo_client` に接続インスタンスを保持する。
     """
     logger.info("MongoDB クライアントの初期化")
-    app.state.mongo_client = AsyncIOMotorClient(config.mongodb["dsn"])
+    app.state.mongo_client = init_mongo_client()
+
+    # 検索用インデックスの不足分を作成（大規模コレクションでは無効化し、CLI で作成する）
+    if config.mongodb.get("indexes", {}).get("ensure_on_startup", True):
+        await index_manager.ensure(app.state.mongo_client)
+
+@app.on_event("shutdown")
+async def shutdown_nats_subscriber():
+    """
+    アプリケーション停止時に NATS の取得ループを止め、処理中のメッセージを終えてから drain して切断する。
+    （MongoDB クライアントのクローズより先に実行する）
+    """
+    await stop_nats_subscriber()
+    await close_nats_subscriber()
+
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    """
+    アプリケーション停止時に共有MongoDBクライアントをクローズする。
+    """
+    close_mongo_client()
 
 # 起動時に NATS 購読を開始
 @app.on_event("startup")
 async def startup_event():
     logging.basicConfig(level=logging.INFO)
-    asyncio.create_task(run_nats_subscriber())
\ No newline at end of file
+    asyncio.create_task(run_nats_subscriber())
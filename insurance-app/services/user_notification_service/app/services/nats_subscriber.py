@@ -6,13 +6,14 @@ NATSイベント購読モジュール（quotation_service）
 - 対象の quote_id に対応する quote_state を適切に更新する
 """
 
+import asyncio
 import json
 import logging
+from typing import List
 from datetime import datetime
 
 from app.dependencies.get_mongo_client import get_mongo_client
 
-from nats.aio.client import Client as NATS
 from nats.aio.msg import Msg
 
 from app.models.events import (
@@ -24,6 +25,9 @@ from app.services.user_notification_service import (
     post_user_notifications,
 )
 
+from app.services.nats_connection import nats_manager
+from app.services.nats_jetstream import PullConsumer, jetstream_enabled
+from app.services.nats_metrics import subscriber_metrics
 from app.config.config import Config
 
 # ------------------------------------------------------------------------------
@@ -32,6 +36,13 @@ from app.config.config import Config
 config = Config()
 logger = logging.getLogger(__name__)
 
+# 購読対象トピック
+SUBJECTS = ["notifications.*"]
+
+# JetStream モードで起動した consumer と取得ループのタスク
+pull_consumers: List[PullConsumer] = []
+consumer_tasks: List[asyncio.Task] = []
+
 # ------------------------------------------------------------------------------
 # NATS購読処理のエントリポイント
 # ------------------------------------------------------------------------------
@@ -39,24 +50,63 @@ async def run_nats_subscriber():
     """
     quotation_service 起動時に呼び出されるNATS購読セットアップ関数。
 
-    - NATSサーバに接続
+    - 共有のNATS接続（nats_manager）の確立を待つ
     - "notifications.*" トピックを購読
     - 受信メッセージを汎用 message_handler に委譲
+    - nats.jetstream.enabled の場合は durable pull consumer で購読する
     """
     logger.info("[NATS] サブスクライバ初期化開始")
     try:
-        nc = NATS()
         logger.debug(f"[NATS] 接続先: {config.nats['address']}")
-        await nc.connect(config.nats["address"])
+        await nats_manager.connect()
+        nc = await nats_manager.wait_connected()
         logger.info("[NATS] 接続成功")
 
-        # メッセージハンドラをトピックにバインド（notifications.*）
-        await nc.subscribe("notifications.*", cb=message_handler)
-        logger.info("NATS購読開始: トピック = notifications.*")
+        if jetstream_enabled():
+            # JetStream: durable pull consumer でバッチ取得し、処理成功後に ack する
+            js = nats_manager.jetstream()
+            for subject in SUBJECTS:
+                consumer = PullConsumer(js, subject, message_handler)
+                await consumer.subscribe()
+                pull_consumers.append(consumer)
+                consumer_tasks.append(asyncio.create_task(consumer.run()))
+            return
+
+        # 同一キューグループ内では1メッセージを1レプリカのみが処理する（空の場合は全レプリカに配信）
+        queue_group = config.nats.get("queue_group", "")
+        callback = subscriber_metrics.instrument(message_handler)
+
+        # メッセージハンドラをトピックにバインド
+        for subject in SUBJECTS:
+            await nc.subscribe(subject, queue=queue_group, cb=callback)
+            logger.info("NATS購読開始: トピック = %s, キューグループ = %s", subject, queue_group or "(なし)")
 
     except Exception as e:
         logger.exception("[NATS] サブスクライバ初期化中にエラーが発生しました")
 
+
+async def stop_nats_subscriber():
+    """
+    アプリ停止時に JetStream の取得ループを止める（取得済みのバッチは処理・応答してから終了する）
+
+    - 接続の drain・ディスパッチャの停止より先に呼び出す
+    """
+    for consumer in pull_consumers:
+        consumer.stop()
+    if consumer_tasks:
+        await asyncio.gather(*consumer_tasks, return_exceptions=True)
+    pull_consumers.clear()
+    consumer_tasks.clear()
+    logger.info("[NATS] 取得ループ停止")
+
+
+async def close_nats_subscriber():
+    """
+    アプリ停止時に購読を終了し、接続を閉じる（処理中のメッセージを終えてから切断）
+    """
+    await nats_manager.drain()
+    logger.info("[NATS] サブスクライバ停止")
+
 # ------------------------------------------------------------------------------
 # NATSメッセージ共通ハンドラ
 # ------------------------------------------------------------------------------
@@ -66,24 +116,20 @@ async def message_handler(msg: Msg):
 
     - JSONデコード → イベント種別判定 → 各処理にディスパッチ
     - サポート対象外のイベントは警告ログ出力
-    - 処理中の例外はすべてログ出力し握り潰す（サービス継続性確保のため）
+    - 処理中の例外は呼び出し元（subscriber_metrics.instrument）でログ出力し、失敗として計上する
     """
-    try:
-        logger.debug(f"[NATS] メッセージ受信: subject={msg.subject}, data={msg.data}")
-        data = json.loads(msg.data.decode())
-        event_type = data.get("event")
-        logger.debug(f"[NATS] パース結果: event_type={event_type}")
-
-        if event_type == "GlobalNotificationCreated":
-            event = CreateGlobalNotificationEvent(**data)
-            logger.debug(f"[NATS] CreateGlobalNotificationEvent イベントインスタンス生成: {event}")
-            await handle_user_notification_created(event)
+    logger.debug(f"[NATS] メッセージ受信: subject={msg.subject}, data={msg.data}")
+    data = json.loads(msg.data.decode())
+    event_type = data.get("event")
+    logger.debug(f"[NATS] パース結果: event_type={event_type}")
 
-        else:
-            logger.warning(f"[NATS] 未対応のイベント種別を受信: event={event_type}")
+    if event_type == "GlobalNotificationCreated":
+        event = CreateGlobalNotificationEvent(**data)
+        logger.debug(f"[NATS] CreateGlobalNotificationEvent イベントインスタンス生成: {event}")
+        await handle_user_notification_created(event)
 
-    except Exception as e:
-        logger.exception("NATSメッセージ処理中にエラーが発生しました")
+    else:
+        logger.warning(f"[NATS] 未対応のイベント種別を受信: event={event_type}")
 
 # ------------------------------------------------------------------------------
 # イベント別処理関数群
@@ -118,4 +164,5 @@ async def handle_user_notification_created(
         )
         
     except Exception as e:
-        logger.exception(f"[NATS] GlobalNotificationCreated 処理失敗: message_id={event.global_notification.message_id}")
\ No newline at end of file
+        logger.error(f"[NATS] GlobalNotificationCreated 処理失敗: message_id={event.global_notification.message_id}")
+        raise
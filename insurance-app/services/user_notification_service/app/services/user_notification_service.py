@@ -115,18 +115,13 @@ async def mark_user_notifications_as_read(
         # 今回の message_ids から新規に追加すべきものを抽出
         newly_marked = list(set(request.message_ids) - set(already_read_ids))
 
-        if record:
-            # 既存レコードに新規分を追記
-            await mongo_client[db_name][collection_name].update_one(
-                {"user_id": user_id},
-                {"$addToSet": {"read_message_ids": {"$each": newly_marked}}}
-            )
-        else:
-            # 新規レコードを作成
-            await mongo_client[db_name][collection_name].insert_one({
-                "user_id": user_id,
-                "read_message_ids": newly_marked
-            })
+        # 既存レコードに新規分を追記（なければ作成）
+        # user_id は一意インデックスのため、同時リクエストでもレコードは1件に保たれる
+        await mongo_client[db_name][collection_name].update_one(
+            {"user_id": user_id},
+            {"$addToSet": {"read_message_ids": {"$each": newly_marked}}},
+            upsert=True
+        )
 
         return ReadNotificationResponse(
             user_id = user_id,